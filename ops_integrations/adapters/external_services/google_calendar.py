@@ -1,21 +1,254 @@
 import os
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+# Local event mirror (see CalendarEventMirror / get_calendar_adapter)
+MIRROR_ENABLED = os.getenv('GOOGLE_CALENDAR_MIRROR', 'true').lower() not in ('0', 'false', 'no', 'off')
+MIRROR_TTL_SEC = float(os.getenv('GOOGLE_CALENDAR_MIRROR_TTL_SEC', '300'))
+MIRROR_REFRESH_SEC = float(os.getenv('GOOGLE_CALENDAR_MIRROR_REFRESH_SEC', '60'))
+MIRROR_LOOKBACK_DAYS = int(os.getenv('GOOGLE_CALENDAR_MIRROR_LOOKBACK_DAYS', '1'))
+MIRROR_PAGE_SIZE = 2500
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _event_bounds(event: Dict[str, Any]) -> Optional[Tuple[datetime, datetime]]:
+    """(start, end) of an event as naive UTC; all-day events span their dates. None when malformed."""
+    try:
+        bounds = []
+        for key in ('start', 'end'):
+            part = event.get(key) or {}
+            if part.get('dateTime'):
+                bounds.append(_to_naive_utc(datetime.fromisoformat(part['dateTime'].replace('Z', '+00:00'))))
+            elif part.get('date'):
+                bounds.append(datetime.fromisoformat(part['date']))
+            else:
+                return None
+        return bounds[0], bounds[1]
+    except Exception:
+        return None
+
+
+def _http_status(error: Exception) -> Optional[int]:
+    try:
+        return int(getattr(getattr(error, 'resp', None), 'status', None))
+    except (TypeError, ValueError):
+        return None
+
+
+class CalendarEventMirror:
+    """
+    In-memory copy of one calendar's events, kept fresh with incremental sync.
+
+    The first refresh lists every event from MIRROR_LOOKBACK_DAYS ago onward and
+    keeps the nextSyncToken; later refreshes send only that token and apply the
+    changes (cancelled events are removed). A 410 Gone response means the token
+    expired and triggers a full resync. While the last successful sync is younger
+    than ttl_sec, events_between answers from memory with no API request.
+    """
+
+    def __init__(self, adapter: 'CalendarAdapter', ttl_sec: float = MIRROR_TTL_SEC,
+                 lookback_days: int = MIRROR_LOOKBACK_DAYS):
+        self.adapter = adapter
+        self.ttl_sec = ttl_sec
+        self.lookback_days = lookback_days
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._bounds: Dict[str, Tuple[datetime, datetime]] = {}
+        self._sorted: Optional[List[Tuple[datetime, str]]] = None
+        self._starts: List[datetime] = []
+        self._max_span = timedelta(0)
+        self._sync_token: Optional[str] = None
+        self._synced_at: Optional[float] = None
+        self.covered_from: Optional[datetime] = None
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {'full_syncs': 0, 'incremental_syncs': 0, 'token_resets': 0, 'errors': 0,
+                         'hits': 0, 'misses': 0}
+
+    # --- sync -------------------------------------------------------------
+
+    def _list_all(self, sync_token: Optional[str], time_min: datetime) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        params: Dict[str, Any] = {'calendarId': self.adapter.calendar_id, 'singleEvents': True,
+                                  'maxResults': MIRROR_PAGE_SIZE}
+        if sync_token:
+            # timeMin/orderBy are remembered by the token and must not be resent
+            params['syncToken'] = sync_token
+        else:
+            params['timeMin'] = time_min.isoformat() + 'Z'
+        items: List[Dict[str, Any]] = []
+        while True:
+            result = self.adapter._execute(self.adapter.service.events().list(**params))
+            items.extend(result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return items, result.get('nextSyncToken')
+            params['pageToken'] = page_token
+
+    def refresh(self) -> bool:
+        """Pull changes since the last sync (or everything on the first call). Returns True on success."""
+        if self.adapter.service is None:
+            return False
+        with self._sync_lock:
+            time_min = datetime.utcnow() - timedelta(days=self.lookback_days)
+            token = self._sync_token
+            try:
+                try:
+                    items, next_token = self._list_all(token, time_min)
+                except HttpError as error:
+                    if not token or _http_status(error) != 410:
+                        raise
+                    logging.info("Calendar sync token expired; running a full resync")
+                    self.counters['token_resets'] += 1
+                    token = None
+                    items, next_token = self._list_all(None, time_min)
+            except Exception as e:
+                self.counters['errors'] += 1
+                logging.error(f"Calendar mirror refresh failed: {e}")
+                return False
+            with self._lock:
+                if token is None:
+                    self._events.clear()
+                    self._bounds.clear()
+                    self.covered_from = time_min
+                    self.counters['full_syncs'] += 1
+                else:
+                    self.counters['incremental_syncs'] += 1
+                for item in items:
+                    self._apply_locked(item)
+                self._prune_locked(time_min)
+                self._sync_token = next_token
+                self._synced_at = time.monotonic()
+            return True
+
+    def _apply_locked(self, event: Dict[str, Any]) -> None:
+        event_id = event.get('id')
+        if not event_id:
+            return
+        self._sorted = None
+        bounds = _event_bounds(event)
+        if event.get('status') == 'cancelled' or bounds is None:
+            self._events.pop(event_id, None)
+            self._bounds.pop(event_id, None)
+            return
+        self._events[event_id] = event
+        self._bounds[event_id] = bounds
+
+    def _prune_locked(self, cutoff: datetime) -> None:
+        stale = [event_id for event_id, (_, end) in self._bounds.items() if end < cutoff]
+        for event_id in stale:
+            self._events.pop(event_id, None)
+            self._bounds.pop(event_id, None)
+        if stale:
+            self._sorted = None
+        if self.covered_from is None or cutoff > self.covered_from:
+            self.covered_from = cutoff
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Write-through for an event this process created or updated."""
+        with self._lock:
+            self._apply_locked(event)
+
+    def remove(self, event_id: str) -> None:
+        """Write-through for an event this process deleted."""
+        with self._lock:
+            self._apply_locked({'id': event_id, 'status': 'cancelled'})
+
+    # --- reads ------------------------------------------------------------
+
+    def is_fresh(self) -> bool:
+        return self._synced_at is not None and (time.monotonic() - self._synced_at) < self.ttl_sec
+
+    def _index_locked(self) -> List[Tuple[datetime, str]]:
+        if self._sorted is None:
+            self._sorted = sorted((bounds[0], event_id) for event_id, bounds in self._bounds.items())
+            self._starts = [start for start, _ in self._sorted]
+            self._max_span = max((end - start for start, end in self._bounds.values()), default=timedelta(0))
+        return self._sorted
+
+    def events_between(self, start_date: datetime, end_date: datetime,
+                       max_results: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """
+        Events overlapping [start_date, end_date) ordered by start, like events.list.
+
+        Returns:
+            The events, or None when the mirror is stale or does not cover start_date
+            (the caller then asks the API)
+        """
+        start_date, end_date = _to_naive_utc(start_date), _to_naive_utc(end_date)
+        with self._lock:
+            if not self.is_fresh() or self.covered_from is None or start_date < self.covered_from:
+                self.counters['misses'] += 1
+                return None
+            index = self._index_locked()
+            lo = bisect_left(self._starts, start_date - self._max_span)
+            hi = bisect_left(self._starts, end_date)
+            events = []
+            for _, event_id in index[lo:hi]:
+                if self._bounds[event_id][1] > start_date:
+                    events.append(self._events[event_id])
+                    if len(events) >= max_results:
+                        break
+            self.counters['hits'] += 1
+            return events
+
+    # --- background refresh -----------------------------------------------
+
+    def start(self, interval_sec: float = MIRROR_REFRESH_SEC) -> None:
+        """Refresh now and every interval_sec on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval_sec,), name='calendar-mirror', daemon=True)
+        self._thread.start()
+
+    def _run(self, interval_sec: float) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(interval_sec)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            age = None if self._synced_at is None else round(time.monotonic() - self._synced_at, 1)
+            lookups = self.counters['hits'] + self.counters['misses']
+            return {
+                'events': len(self._events),
+                'fresh': self.is_fresh(),
+                'lastSyncAgeSec': age,
+                'coveredFrom': self.covered_from.isoformat() + 'Z' if self.covered_from else None,
+                'hitRate': round(self.counters['hits'] / lookups, 3) if lookups else 0.0,
+                **self.counters,
+            }
+
+
 class CalendarAdapter:
-    def __init__(self):
+    def __init__(self, calendar_id: Optional[str] = None):
         self.service = None
-        self.calendar_id = os.getenv('GOOGLE_CALENDAR_ID', 'primary')
+        self.calendar_id = calendar_id or os.getenv('GOOGLE_CALENDAR_ID', 'primary')
         self.scopes = ['https://www.googleapis.com/auth/calendar']
         self.credentials_path = os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json')
         self.token_path = os.getenv('GOOGLE_TOKEN_PATH', 'token.json')
         self.enabled = False
+        self.mirror: Optional[CalendarEventMirror] = None
+        # httplib2 connections are not thread-safe; the mirror refreshes from its own thread
+        self._api_lock = threading.RLock()
         self._authenticate_safe()
     
     def _authenticate_safe(self):
@@ -53,6 +286,19 @@ class CalendarAdapter:
             self.service = None
             self.enabled = False
     
+    def _execute(self, request) -> Any:
+        with self._api_lock:
+            return request.execute()
+
+    def enable_mirror(self, refresh_interval_sec: float = MIRROR_REFRESH_SEC) -> Optional[CalendarEventMirror]:
+        """Serve get_events from a local mirror refreshed in the background. No-op when disabled."""
+        if not self.enabled:
+            return None
+        if self.mirror is None:
+            self.mirror = CalendarEventMirror(self)
+        self.mirror.start(refresh_interval_sec)
+        return self.mirror
+
     def _ensure_available(self) -> bool:
         if self.service is None:
             # Try once more in case creds appeared later
@@ -81,7 +327,9 @@ class CalendarAdapter:
         if attendees:
             event['attendees'] = [{'email': email} for email in attendees]
         try:
-            event = self.service.events().insert(calendarId=self.calendar_id, body=event).execute()
+            event = self._execute(self.service.events().insert(calendarId=self.calendar_id, body=event))
+            if self.mirror is not None:
+                self.mirror.apply(event)
             logging.info(f"Event created: {event.get('htmlLink')}")
             return event
         except HttpError as error:
@@ -90,7 +338,11 @@ class CalendarAdapter:
     
     def get_events(self, start_date: datetime = None, end_date: datetime = None, 
                   max_results: int = 100) -> List[Dict[str, Any]]:
-        """Get events from calendar within a date range. Returns [] when disabled/unavailable."""
+        """
+        Get events from calendar within a date range. Returns [] when disabled/unavailable.
+
+        Served from the local mirror when it is fresh and covers the range.
+        """
         if not self._ensure_available():
             logging.info("Calendar get_events skipped: service unavailable")
             return []
@@ -98,15 +350,19 @@ class CalendarAdapter:
             start_date = datetime.utcnow()
         if not end_date:
             end_date = start_date + timedelta(days=30)
+        if self.mirror is not None:
+            events = self.mirror.events_between(start_date, end_date, max_results)
+            if events is not None:
+                return events
         try:
-            events_result = self.service.events().list(
+            events_result = self._execute(self.service.events().list(
                 calendarId=self.calendar_id,
                 timeMin=start_date.isoformat() + 'Z',
                 timeMax=end_date.isoformat() + 'Z',
                 maxResults=max_results,
                 singleEvents=True,
                 orderBy='startTime'
-            ).execute()
+            ))
             return events_result.get('items', [])
         except HttpError as error:
             logging.error(f"Error fetching events: {error}")
@@ -118,7 +374,7 @@ class CalendarAdapter:
             logging.info("Calendar update_event skipped: service unavailable")
             return {}
         try:
-            event = self.service.events().get(calendarId=self.calendar_id, eventId=event_id).execute()
+            event = self._execute(self.service.events().get(calendarId=self.calendar_id, eventId=event_id))
             for key, value in kwargs.items():
                 if key in ['summary', 'description', 'location']:
                     event[key] = value
@@ -126,9 +382,11 @@ class CalendarAdapter:
                     event['start']['dateTime'] = value.isoformat()
                 elif key == 'end_time' and isinstance(value, datetime):
                     event['end']['dateTime'] = value.isoformat()
-            updated_event = self.service.events().update(
+            updated_event = self._execute(self.service.events().update(
                 calendarId=self.calendar_id, eventId=event_id, body=event
-            ).execute()
+            ))
+            if self.mirror is not None:
+                self.mirror.apply(updated_event)
             logging.info(f"Event updated: {updated_event.get('htmlLink')}")
             return updated_event
         except HttpError as error:
@@ -141,7 +399,9 @@ class CalendarAdapter:
             logging.info("Calendar delete_event skipped: service unavailable")
             return False
         try:
-            self.service.events().delete(calendarId=self.calendar_id, eventId=event_id).execute()
+            self._execute(self.service.events().delete(calendarId=self.calendar_id, eventId=event_id))
+            if self.mirror is not None:
+                self.mirror.remove(event_id)
             logging.info(f"Event deleted: {event_id}")
             return True
         except HttpError as error:
@@ -177,3 +437,36 @@ class CalendarAdapter:
                 stats['errors'] += 1
         logging.info(f"Sync completed: {stats}")
         return stats
+
+
+_shared_adapters: Dict[Optional[str], CalendarAdapter] = {}
+_shared_adapter_lock = threading.Lock()
+
+
+def get_calendar_adapter(calendar_id: Optional[str] = None) -> CalendarAdapter:
+    """
+    Process-wide CalendarAdapter for calendar_id (default: GOOGLE_CALENDAR_ID).
+
+    Authentication, token loading and the discovery build() run once per
+    calendar; when the calendar is enabled its event mirror starts refreshing in
+    the background (set GOOGLE_CALENDAR_MIRROR=false to always query the API).
+    """
+    adapter = _shared_adapters.get(calendar_id)
+    if adapter is None:
+        with _shared_adapter_lock:
+            adapter = _shared_adapters.get(calendar_id)
+            if adapter is None:
+                adapter = CalendarAdapter(calendar_id)
+                if MIRROR_ENABLED:
+                    adapter.enable_mirror()
+                _shared_adapters[calendar_id] = adapter
+    return adapter
+
+
+def calendar_mirror_stats() -> Dict[str, Any]:
+    """Mirror stats per calendar for the ops dashboard, without creating any adapter."""
+    mirrors = {adapter.calendar_id: adapter.mirror.stats()
+               for adapter in list(_shared_adapters.values()) if adapter.mirror is not None}
+    if not mirrors:
+        return {'enabled': False}
+    return {'enabled': True, 'calendars': mirrors}
@@ -4,29 +4,81 @@ import logging
 import base64
 from pyexpat.errors import messages
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Any, Awaitable, Callable, Iterator, List, Optional, Tuple, Union
 from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, BackgroundTasks
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import json
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from twilio import twiml
 from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse, Start
+from twilio.twiml.voice_response import VoiceResponse, Start, Connect
 import io
 import wave
 from openai import OpenAI
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 import re
 # Import from the installed package
 try:
     from ..services.plumbing_services import (
         get_function_definition,
+        get_turn_analysis_function_definition,
         infer_job_type_from_text,
         infer_multiple_job_types_from_text,
+        PLUMBING_SERVICES,
+        TURN_ANALYSIS_FIELDS,
     )
+    from ..services.barge_in import BargeInDetector
+    from ..services.llm_cache import LLMResultCache, date_bucket_for, normalize_utterance
+    from ..services.media_playback import MediaStreamPlayer, PCMToMulaw, audio_duration
+    from ..services.single_flight import SingleFlight
+    from ..services.speech_gate import SpeechGateStats
+    from ..services.prompt_catalogue import get_prompt_catalogue
+    from ..services.tts_cache import AUDIO_CONTENT_TYPES, AUDIO_SUFFIXES, TTSAudioCache, is_tts_cache_key, tts_cache_key
+    from ..services.turn_latency import TurnLatencyStats
+    from ..services.twiml_push import TwilioCallUpdater, TwiMLPushCoalescer
+    from ..services.tts_stream import TTSLatencyStats, TTSStream
+    from ..services.tts_template import TemplateTTSStats, join_audio, split_template
+    from ..services.tts_prefetch import TTSPrefetcher
+    from ..services.utterance_analysis import (
+        EMERGENCY_KEYWORDS,
+        GOODBYE_KEYWORDS,
+        NEGATIVE_EXPRESSIONS,
+        NOISE_MARKERS,
+        STRICT_NEGATIVE_KEYWORDS,
+        STRICT_NEGATIVE_PHRASES,
+        STRICT_NO_KEYWORDS,
+        STRICT_POSITIVE_KEYWORDS,
+        STRICT_POSITIVE_PHRASES,
+        STRICT_YES_KEYWORDS,
+        TRANSFER_KEYWORDS,
+        URGENCY_EMERGENCY_KEYWORDS,
+        URGENCY_SAME_DAY_KEYWORDS,
+        VOCAL_CONFIRMATIONS,
+        VOCAL_NEGATIONS,
+        UtteranceAnalysis,
+        analyze_utterance,
+    )
+    from ..services.datetime_grammar import datetime_grammar_stats, parse_relative_datetime
+    from ..services.name_recognizer import get_name_recognizer
+    from ..services.slot_engine import BusyIndex
+    from ..services.availability_engine import AvailabilityMatrix, SlotAssignment, get_technicians
+    from ..services.transcript_filters import (
+        ALLOWED_REPETITION_WORDS,
+        MAX_REPEAT_PERIOD,
+        collapse_repeats,
+        get_transcript_filter,
+        iter_repeats,
+        tokenize_for_repetition,
+    )
+    from ..flows.intent_model import get_local_intent_model
+    from ..flows.intent_index import get_intent_index
     from ..core.job_booking import book_emergency_job, book_scheduled_job 
-    from .external_services.google_calendar import CalendarAdapter
+    from .external_services.google_calendar import (
+        CalendarAdapter,
+        calendar_mirror_stats,
+        get_calendar_adapter,
+    )
     from .conversation_manager import ConversationManager
 except Exception:
     import sys as _sys
@@ -37,11 +89,65 @@ except Exception:
         _sys.path.insert(0, _OPS_ROOT)
     from ops_integrations.services.plumbing_services import (
         get_function_definition,
+        get_turn_analysis_function_definition,
         infer_job_type_from_text,
         infer_multiple_job_types_from_text,
+        PLUMBING_SERVICES,
+        TURN_ANALYSIS_FIELDS,
+    )
+    from ops_integrations.services.barge_in import BargeInDetector
+    from ops_integrations.services.llm_cache import LLMResultCache, date_bucket_for, normalize_utterance
+    from ops_integrations.services.media_playback import MediaStreamPlayer, PCMToMulaw, audio_duration
+    from ops_integrations.services.single_flight import SingleFlight
+    from ops_integrations.services.speech_gate import SpeechGateStats
+    from ops_integrations.services.prompt_catalogue import get_prompt_catalogue
+    from ops_integrations.services.tts_cache import (
+        AUDIO_CONTENT_TYPES, AUDIO_SUFFIXES, TTSAudioCache, is_tts_cache_key, tts_cache_key,
     )
+    from ops_integrations.services.turn_latency import TurnLatencyStats
+    from ops_integrations.services.twiml_push import TwilioCallUpdater, TwiMLPushCoalescer
+    from ops_integrations.services.tts_stream import TTSLatencyStats, TTSStream
+    from ops_integrations.services.tts_template import TemplateTTSStats, join_audio, split_template
+    from ops_integrations.services.tts_prefetch import TTSPrefetcher
+    from ops_integrations.services.utterance_analysis import (
+        EMERGENCY_KEYWORDS,
+        GOODBYE_KEYWORDS,
+        NEGATIVE_EXPRESSIONS,
+        NOISE_MARKERS,
+        STRICT_NEGATIVE_KEYWORDS,
+        STRICT_NEGATIVE_PHRASES,
+        STRICT_NO_KEYWORDS,
+        STRICT_POSITIVE_KEYWORDS,
+        STRICT_POSITIVE_PHRASES,
+        STRICT_YES_KEYWORDS,
+        TRANSFER_KEYWORDS,
+        URGENCY_EMERGENCY_KEYWORDS,
+        URGENCY_SAME_DAY_KEYWORDS,
+        VOCAL_CONFIRMATIONS,
+        VOCAL_NEGATIONS,
+        UtteranceAnalysis,
+        analyze_utterance,
+    )
+    from ops_integrations.services.datetime_grammar import datetime_grammar_stats, parse_relative_datetime
+    from ops_integrations.services.name_recognizer import get_name_recognizer
+    from ops_integrations.services.slot_engine import BusyIndex
+    from ops_integrations.services.availability_engine import AvailabilityMatrix, SlotAssignment, get_technicians
+    from ops_integrations.services.transcript_filters import (
+        ALLOWED_REPETITION_WORDS,
+        MAX_REPEAT_PERIOD,
+        collapse_repeats,
+        get_transcript_filter,
+        iter_repeats,
+        tokenize_for_repetition,
+    )
+    from ops_integrations.flows.intent_model import get_local_intent_model
+    from ops_integrations.flows.intent_index import get_intent_index
     from ops_integrations.core.job_booking import book_emergency_job, book_scheduled_job 
-    from ops_integrations.adapters.external_services.google_calendar import CalendarAdapter
+    from ops_integrations.adapters.external_services.google_calendar import (
+        CalendarAdapter,
+        calendar_mirror_stats,
+        get_calendar_adapter,
+    )
     from ops_integrations.adapters.conversation_manager import ConversationManager
 from datetime import datetime, timedelta, timezone
 try:
@@ -61,7 +167,12 @@ import httpx
 
 # Import prompt for intent classification
 try:
-    from ..prompts.prompt_layer import INTENT_CLASSIFICATION_PROMPT
+    from ..prompts.prompt_layer import (
+        INTENT_CLASSIFICATION_PROMPT,
+        INTENT_CLASSIFICATION_PROMPT_VERSION,
+        TURN_ANALYSIS_PROMPT,
+        TURN_ANALYSIS_PROMPT_VERSION,
+    )
 except Exception:
     import sys as _sys
     import os as _os
@@ -69,7 +180,12 @@ except Exception:
     _OPS_ROOT = _os.path.abspath(_os.path.join(_CURRENT_DIR, '..'))
     if _OPS_ROOT not in _sys.path:
         _sys.path.insert(0, _OPS_ROOT)
-    from ops_integrations.prompts.prompt_layer import INTENT_CLASSIFICATION_PROMPT
+    from ops_integrations.prompts.prompt_layer import (
+        INTENT_CLASSIFICATION_PROMPT,
+        INTENT_CLASSIFICATION_PROMPT_VERSION,
+        TURN_ANALYSIS_PROMPT,
+        TURN_ANALYSIS_PROMPT_VERSION,
+    )
 
 # Try to import audioop for mu-law decoding and resampling; may be missing on some Python versions
 try:
@@ -86,6 +202,7 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
     TWILIO_ACCOUNT_SID: str
     TWILIO_AUTH_TOKEN: str
+    TWILIO_API_BASE_URL: str = "https://api.twilio.com"  # Override the REST host (e.g. a local stand-in server)
     EXTERNAL_WEBHOOK_URL: str = os.getenv("EXTERNAL_WEBHOOK_URL", "http://localhost:5001")  # External URL for WebSocket (e.g., ngrok URL)
     SERVER_HOST: str = "0.0.0.0"
     SERVER_PORT: int = 5001
@@ -97,11 +214,18 @@ class Settings(BaseSettings):
     ELEVENLABS_API_KEY: Optional[str] = None
     ELEVENLABS_VOICE_ID: Optional[str] = None  # Set a default in env if desired
     ELEVENLABS_MODEL_ID: Optional[str] = None  # e.g. "eleven_multilingual_v2"
+    ELEVENLABS_BASE_URL: Optional[str] = None  # Override the API host (e.g. a local stand-in server)
     FORCE_SAY_ONLY: bool = False  # Diagnostics: avoid TTS and use <Say>
     USE_ELEVENLABS_TTS: bool = False  # Control whether to use ElevenLabs (True) or OpenAI TTS (False)
     # OpenAI TTS Configuration
     OPENAI_TTS_SPEED: float = 1.25  # Increased from 1.0 for faster responses (0.25 to 4.0)
     SPEECH_GATE_BUFFER_SEC: float = 1.0  # Buffer time added to TTS duration for speech gate
+    SPEECH_GATE_MARK_TAIL_SEC: float = 0.2  # Echo tail kept gated after Twilio acknowledges the end of playback
+    # Barge-in: the caller talking over Media Stream playback stops it
+    BARGE_IN_ENABLED: bool = True
+    BARGE_IN_MIN_RMS: float = 200.0  # Caller level needed even when the bot is quiet
+    BARGE_IN_ECHO_RATIO: float = 0.5  # Caller level needed as a fraction of the bot's playback level (echo)
+    BARGE_IN_SUSTAIN_MS: int = 240  # Voiced audio needed before playback is cleared
     # Confidence Thresholds
     TRANSCRIPTION_CONFIDENCE_THRESHOLD: float = -0.7  # Optimized based on 99.75% accuracy test (-1.0 = normal, -0.5 = stricter)
     INTENT_CONFIDENCE_THRESHOLD: float = 0.5  # Increased from 0.4 - higher intent confidence requirement
@@ -122,10 +246,81 @@ class Settings(BaseSettings):
     TWILIO_SMS_FROM: Optional[str] = os.getenv("TWILIO_SMS_FROM") or os.getenv("TWILIO_FROM_NUMBER")
     # Human dispatcher transfer number
     DISPATCH_NUMBER: str = os.getenv("DISPATCH_NUMBER", "+14693096560")
+    # Cross-call LLM result cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 2048
+    LLM_CACHE_TTL_SEC: float = 6 * 3600
+    LLM_CACHE_PATH: Optional[str] = None  # SQLite file for the persistent tier; memory-only when unset
+    # Local intent classifier (GPT is only called below its calibrated confidence)
+    LOCAL_INTENT_MODEL_ENABLED: bool = True
+    LOCAL_INTENT_MODEL_PATH: Optional[str] = None  # .npz artifact; fitted from flows/intents.json when missing
+    INTENT_TRANSCRIPT_LOG_PATH: Optional[str] = None  # JSONL of GPT-labelled transcripts for retraining
+    # Cross-call TTS audio cache (content-addressed by text + voice settings)
+    TTS_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    TTS_CACHE_DIR: Optional[str] = os.path.join(os.path.dirname(__file__), '..', 'data', 'tts_cache')  # empty: memory only
+    TTS_CACHE_MAX_DISK_BYTES: int = 512 * 1024 * 1024
+    TTS_FIRST_AUDIO_TIMEOUT_SEC: float = 10.0  # Fall back to <Say> when no audio has arrived by then
+    # Pre-synthesis of the fixed prompt catalogue at startup and on voice settings changes
+    TTS_PREWARM_ENABLED: bool = True
+    TTS_PREWARM_CONCURRENCY: int = 3
+    TTS_PREWARM_DELAY_SEC: float = 1.0  # Let startup finish before the job competes for the loop
+    # Speak over the /stream WebSocket (<Connect><Stream>) instead of pushing <Play> TwiML each turn
+    MEDIA_STREAM_PLAYBACK: bool = False
+    # Cached acknowledgement ("One moment.") played when a turn's response is slow to compute
+    FILLER_AUDIO_ENABLED: bool = True
+    FILLER_DELAY_SEC: float = 0.7
+    # Speak personalized prompts as cached static segments joined to freshly synthesized names and slot times
+    TTS_TEMPLATE_ENABLED: bool = True
+    # Synthesize the likely next prompts in the background when a call's dialog step changes
+    TTS_PREFETCH_ENABLED: bool = True
+    TTS_PREFETCH_CONCURRENCY: int = 2
 
 settings = Settings()
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Results of intent/extraction/datetime LLM calls shared across calls
+llm_result_cache = LLMResultCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SEC,
+    persist_path=settings.LLM_CACHE_PATH,
+)
+GPT_DATETIME_PROMPT_VERSION = "datetime-v1"
+# Coalesces concurrent identical LLM work keyed by (call, utterance, task); results kept briefly for late joiners
+llm_flights = SingleFlight(result_ttl_seconds=30.0)
+# Synthesized prompts shared across calls, served by content key from /tts/
+tts_audio_cache = TTSAudioCache(
+    max_bytes=settings.TTS_CACHE_MAX_BYTES,
+    disk_dir=settings.TTS_CACHE_DIR or None,
+    max_disk_bytes=settings.TTS_CACHE_MAX_DISK_BYTES,
+)
+# Clips still being synthesized, by the content key their /tts/ URL names
+tts_streams: dict[str, TTSStream] = {}
+tts_template_stats = TemplateTTSStats()
+tts_prefetcher = TTSPrefetcher(max_concurrency=settings.TTS_PREFETCH_CONCURRENCY)
+# URL key -> key the audio is cached under, when a fallback provider produced the clip
+tts_key_aliases: "OrderedDict[str, str]" = OrderedDict()
+TTS_KEY_ALIASES_MAX = 1024
+# Time-to-first-audio and total synthesis time per provider
+tts_latency_stats = TTSLatencyStats()
+# URL key -> text, for <Play> URLs issued without synthesizing the mp3 (Media Stream playback fallback)
+tts_key_texts: "OrderedDict[str, str]" = OrderedDict()
+# Current catalogue pre-synthesis job and the voice settings it warms
+tts_prewarm_state: dict = {"task": None, "voice": None}
+# Which classifier decided each transcript intent
+intent_classifier_stats = {"local": 0, "gpt": 0, "turn_analysis": 0, "pattern": 0}
+# Dialog steps answered by handle_intent directly, without classifying a fresh intent
+FOLLOWUP_DIALOG_STEPS = (
+    'awaiting_path_choice',
+    'awaiting_problem_details',
+    'awaiting_time',
+    'awaiting_time_confirm',
+    'awaiting_location_confirm',
+    'awaiting_operator_confirm',
+)
+# Dialog steps whose turns never start a classification flight; the dashboard labels them without GPT
+UNCLASSIFIED_DIALOG_STEPS = frozenset(
+    FOLLOWUP_DIALOG_STEPS + ('post_booking_qa', 'awaiting_name', 'awaiting_transfer_confirm')
+)
 # Transcription configuration
 USE_LOCAL_WHISPER = False    # Set to False to use remote Whisper service
 USE_REMOTE_WHISPER = True  # Set to True to use remote Whisper service
@@ -182,12 +377,25 @@ call_dialog_state = {}
 # Store call information when calls start
 call_info_store = {}
 
-# Store TTS audio in-memory per call for Twilio <Play>
-tts_audio_store: dict[str, bytes] = {}
+# Content key of the latest TTS clip per call (audio lives in tts_audio_cache)
+tts_audio_store: dict[str, str] = {}
+# Media Stream players of calls whose stream accepts outbound audio
+media_players: dict[str, MediaStreamPlayer] = {}
+# mu-law prompts added to the TwiML being built for a call, played over the stream when it is pushed
+pending_stream_prompts: dict[str, list] = {}
+media_playback_stats = {"turns": 0, "fallbacks": 0}
+# (text, mp3 stream or None) spoken by the TwiML being built for a call; the gate is armed when it is delivered
+pending_gate_clips: dict[str, list] = {}
+speech_gate_stats = SpeechGateStats()
+barge_in_stats = {"barge_ins": 0, "echo_rejected_frames": 0}
+# Played from the TTS cache while a slow response is worked out; never synthesized mid-turn
+FILLER_PROMPTS = ("One moment.", "Let me check that.")
+# Timing of the turn each call is waiting on: started, first_audible, filler, filler_hold
+turn_timings: dict[str, dict] = {}
+turn_latency_stats = TurnLatencyStats()
 # Store last TwiML per call for fallback delivery via URL
 last_twiml_store: dict[str, str] = {}
-# Track last TwiML push timestamp to throttle rapid updates
-last_twiml_push_ts: dict[str, float] = {}
+# Minimum spacing of TwiML pushes to one call; newer TwiML replaces a push still waiting
 TWIML_PUSH_MIN_INTERVAL_SEC = 1.5
 # Incrementing version per call to bust TwiML dedupe/caching for <Play>
 tts_version_counter: dict[str, int] = {}
@@ -253,6 +461,11 @@ try:
 except Exception as e:
     logger.error(f"Twilio client init failed: {e}")
     twilio_client = None
+# Async REST client for mid-call TwiML updates (pooled keep-alive connections)
+twilio_call_updater: Optional[TwilioCallUpdater] = None
+if twilio_client is not None:
+    twilio_call_updater = TwilioCallUpdater(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN,
+                                            base_url=settings.TWILIO_API_BASE_URL)
 
 # Initialize conversation manager for tracking clarification attempts
 conversation_manager = ConversationManager()
@@ -355,6 +568,23 @@ def _compute_ops_snapshot() -> dict:
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "aht": _format_duration(aht_sec),
         "avgWait": _format_duration(avg_wait_sec),
+        "llmCache": llm_result_cache.stats(),
+        "llmFlights": llm_flights.stats(),
+        "intentClassifier": dict(intent_classifier_stats),
+        "transcriptFilters": get_transcript_filter().stats(),
+        "nameRecognizer": get_name_recognizer().stats(),
+        "datetimeGrammar": datetime_grammar_stats(),
+        "calendarMirror": calendar_mirror_stats(),
+        "ttsCache": tts_audio_cache.stats(),
+        "ttsStreaming": {"inflight": len(tts_streams), "providers": tts_latency_stats.stats()},
+        "ttsTemplates": tts_template_stats.stats(),
+        "ttsPrefetch": tts_prefetcher.stats(),
+        "promptCatalogue": _prompt_catalogue().coverage_report(),
+        "mediaPlayback": _media_playback_snapshot(),
+        "speechGate": speech_gate_stats.stats(),
+        "bargeIn": {"enabled": settings.BARGE_IN_ENABLED, **barge_in_stats},
+        "twimlPush": twiml_pusher.stats(),
+        "turnLatency": turn_latency_stats.stats(),
     }
     return snapshot
 
@@ -382,8 +612,16 @@ async def _broadcast_transcript(call_sid: str, text: str):
     if not ops_ws_clients:
         return
     
-    # Classify intent for the transcript text
-    intent, intent_confidence = await classify_transcript_intent(text)
+    # Classify intent for the transcript text, joining the dialog path's classification when it is in flight.
+    # Follow-up steps run no classification of their own, so label those turns without a GPT request.
+    dialog_step = (call_dialog_state.get(call_sid) or {}).get('step')
+    if dialog_step in UNCLASSIFIED_DIALOG_STEPS:
+        intent, intent_confidence = await classify_transcript_intent(text, dialog_step=dialog_step, use_gpt=False)
+    else:
+        intent, intent_confidence = await llm_flights.do(
+            _flight_key(call_sid, text, "classify", dialog_step),
+            lambda: classify_transcript_intent(text, dialog_step=dialog_step),
+        )
     
     payload = {
         "type": "transcript",
@@ -410,44 +648,65 @@ async def _broadcast_transcript(call_sid: str, text: str):
             pass
 
 
-async def classify_transcript_intent(text: str) -> tuple[str, float]:
+async def classify_transcript_intent(text: str, gpt_intent: Optional[str] = None,
+                                     dialog_step: Optional[str] = None,
+                                     use_gpt: bool = True) -> tuple[str, float]:
     """
     Classify the intent of a transcript text using parallel pattern matching and GPT classification.
     
+    Args:
+        text: Transcript text to classify
+        gpt_intent: Intent tag already produced by the turn-analysis call; skips the separate GPT request
+        dialog_step: Current dialog step, part of the GPT result cache key
+        use_gpt: When False, fall back to the best pattern match instead of a GPT request
+    
     Returns:
         tuple: (intent_tag, confidence_score)
     """
     try:
-        # Run pattern matching and GPT classification in parallel for speed
-        pattern_task = asyncio.create_task(_calculate_pattern_confidence_async(text))
-        gpt_task = asyncio.create_task(_gpt_classify_intent_async(text))
-        
-        # Wait for both to complete
-        pattern_confidence, intent = await asyncio.gather(pattern_task, gpt_task)
+        local_prediction = None
+        if gpt_intent:
+            pattern_confidence = await _calculate_pattern_confidence_async(text)
+            intent = gpt_intent.strip().upper()
+            intent_classifier_stats["turn_analysis"] += 1
+        else:
+            local_prediction = _predict_intent_locally(text)
+            if local_prediction:
+                # Local model is confident enough; skip the GPT round trip
+                pattern_confidence = await _calculate_pattern_confidence_async(text)
+                intent = local_prediction[0]
+                intent_classifier_stats["local"] += 1
+            elif not use_gpt:
+                # No LLM budget for this turn; take the strongest pattern match
+                pattern_confidence = await _calculate_pattern_confidence_async(text)
+                best = max(pattern_confidence.items(), key=lambda item: item[1], default=(None, 0.0))
+                intent = best[0] if best[1] > 0 else "UNKNOWN"
+                intent_classifier_stats["pattern"] += 1
+            else:
+                # Run pattern matching and GPT classification in parallel for speed
+                pattern_task = asyncio.create_task(_calculate_pattern_confidence_async(text))
+                gpt_task = asyncio.create_task(_gpt_classify_intent_async(text, dialog_step))
+                
+                # Wait for both to complete
+                pattern_confidence, intent = await asyncio.gather(pattern_task, gpt_task)
+                intent_classifier_stats["gpt"] += 1
         
         # Handle UNKNOWN intent
         if intent == "UNKNOWN":
             return "GENERAL_INQUIRY", 0.2
         
         # Validate that the intent is one we recognize
-        try:
-            from ..flows.intents import get_intent_tags
-        except Exception:
-            from flows.intents import get_intent_tags
-        valid_intents = get_intent_tags()
+        valid_intents = get_intent_index().tag_set
         if intent not in valid_intents:
             logger.debug(f"Unknown intent returned: {intent}, falling back to GENERAL_INQUIRY")
             intent = "GENERAL_INQUIRY"
         
-        # Special handling for booking requests - boost confidence
-        if intent == "BOOKING_REQUEST":
-            # Booking requests should have high confidence when pattern matched
-            final_confidence = max(final_confidence, 0.8)
-            logger.info(f"🎯 Booking request detected with confidence {final_confidence:.3f}")
-        
         # Calculate final confidence by combining pattern matching and GPT confidence
         pattern_conf = pattern_confidence.get(intent, 0.0)
-        gpt_confidence = min(1.0, len(text.split()) / 10.0)  # Basic GPT confidence heuristic
+        if local_prediction:
+            gpt_confidence = local_prediction[1]  # Calibrated local model confidence
+        else:
+            gpt_confidence = min(1.0, len(text.split()) / 10.0)  # Basic GPT confidence heuristic
         
         # Boost confidence when both methods agree
         if pattern_conf > 0.7:
@@ -457,6 +716,12 @@ async def classify_transcript_intent(text: str) -> tuple[str, float]:
         else:
             final_confidence = gpt_confidence * 0.8  # Slight penalty for low pattern agreement
         
+        # Special handling for booking requests - boost confidence
+        if intent == "BOOKING_REQUEST":
+            # Booking requests should have high confidence when pattern matched
+            final_confidence = max(final_confidence, 0.8)
+            logger.info(f"🎯 Booking request detected with confidence {final_confidence:.3f}")
+        
         if settings.CONFIDENCE_DEBUG_MODE:
             logger.info(f"🎯 Intent classification: '{intent}' with confidence {final_confidence:.3f}")
             logger.info(f"🔍 Pattern confidence: {pattern_confidence}")
@@ -464,23 +729,68 @@ async def classify_transcript_intent(text: str) -> tuple[str, float]:
             # Log the specific text being classified for debugging
             logger.info(f"📝 Text being classified: '{text}'")
         
+        if use_gpt and not local_prediction and final_confidence >= 0.8:
+            _log_labeled_transcript(text, intent, final_confidence)
+        
         return intent, final_confidence
             
     except Exception as e:
         logger.debug(f"Error classifying transcript intent: {e}")
         return "GENERAL_INQUIRY", 0.2
 
+def _predict_intent_locally(text: str) -> Optional[tuple[str, float]]:
+    """Local classifier prediction when it clears its calibrated threshold, else None."""
+    if not settings.LOCAL_INTENT_MODEL_ENABLED:
+        return None
+    try:
+        if settings.LOCAL_INTENT_MODEL_PATH:
+            model = get_local_intent_model(settings.LOCAL_INTENT_MODEL_PATH)
+        else:
+            model = get_local_intent_model()
+        return model.predict_confident(text) if model else None
+    except Exception as e:
+        logger.debug(f"Local intent model unavailable: {e}")
+        return None
+
+def _log_labeled_transcript(text: str, intent: str, confidence: float) -> None:
+    """Append a confidently labelled transcript to the retraining log, if configured."""
+    if not settings.INTENT_TRANSCRIPT_LOG_PATH:
+        return
+    try:
+        with open(settings.INTENT_TRANSCRIPT_LOG_PATH, 'a') as f:
+            f.write(json.dumps({"text": text, "intent": intent, "confidence": round(confidence, 3), "ts": time.time()}) + "\n")
+    except Exception as e:
+        logger.debug(f"Failed to log labelled transcript: {e}")
+
 async def _calculate_pattern_confidence_async(text: str) -> dict:
     """Async wrapper for pattern matching confidence calculation."""
     try:
-        from ..flows.intents import load_intents
-        intents_data = load_intents()
-        return calculate_pattern_matching_confidence(text, intents_data)
+        return analyze_utterance(text).pattern_scores()
     except Exception:
         return {}
 
-async def _gpt_classify_intent_async(text: str) -> str:
+def _flight_key(call_sid: str, text: str, task: str, dialog_step: Optional[str] = None) -> tuple:
+    """Single-flight key for LLM work on one utterance of one call in one dialog step."""
+    return (call_sid, dialog_step or "", normalize_utterance(text), task)
+
+def _llm_cache_lookup(key: str) -> tuple[bool, object]:
+    """Look up a cached LLM result when the cache is enabled."""
+    if not settings.LLM_CACHE_ENABLED:
+        return False, None
+    return llm_result_cache.get(key)
+
+def _llm_cache_store(key: str, value) -> None:
+    """Store an LLM result when the cache is enabled."""
+    if settings.LLM_CACHE_ENABLED:
+        llm_result_cache.set(key, value)
+
+async def _gpt_classify_intent_async(text: str, dialog_step: Optional[str] = None) -> str:
     """Async GPT intent classification."""
+    cache_key = LLMResultCache.make_key("classify", text, dialog_step=dialog_step,
+                                        prompt_version=INTENT_CLASSIFICATION_PROMPT_VERSION)
+    found, cached = _llm_cache_lookup(cache_key)
+    if found:
+        return cached
     try:
         response = await asyncio.get_event_loop().run_in_executor(
             None, 
@@ -494,90 +804,28 @@ async def _gpt_classify_intent_async(text: str) -> str:
                 temperature=0.1
             )
         )
-        return response.choices[0].message.content.strip().upper()
+        intent = response.choices[0].message.content.strip().upper()
+        _llm_cache_store(cache_key, intent)
+        return intent
     except Exception:
         return "GENERAL_INQUIRY"
 
-async def _parse_time_parallel(text: str) -> tuple[Optional[datetime], bool]:
-    """Parse time and check for emergency keywords in parallel."""
-    try:
-        # Run both parsing operations concurrently
-        time_task = asyncio.get_event_loop().run_in_executor(None, lambda: parse_human_datetime(text) or gpt_infer_datetime_phrase(text))
-        emergency_task = asyncio.get_event_loop().run_in_executor(None, lambda: contains_emergency_keywords(text))
-        
-        explicit_time, explicit_emergency = await asyncio.gather(time_task, emergency_task)
-        return explicit_time, explicit_emergency
-    except Exception:
-        return None, False
-
 
-def calculate_pattern_matching_confidence(text: str, intents_data: dict) -> dict:
+def calculate_pattern_matching_confidence(text: Union[str, UtteranceAnalysis], intents_data: dict) -> dict:
     """
     Calculate confidence scores for intent patterns using keyword and semantic matching.
     
+    Scoring runs against the compiled intent index (see flows/intent_index.py), which is
+    built once per intents.json snapshot instead of looping over every pattern per call,
+    and is memoized on the utterance's shared analysis.
+    
     Returns:
         dict: {intent_tag: confidence_score}
     """
-    text_lower = text.lower()
-    confidence_scores = {}
-    
-    for intent in intents_data['intents']:
-        intent_tag = intent['tag']
-        patterns = intent['patterns']
-        
-        max_confidence = 0.0
-        
-        # Check for exact keyword matches (high confidence)
-        for pattern in patterns:
-            pattern_lower = pattern.lower()
-            
-            # Exact phrase match (highest confidence)
-            if pattern_lower in text_lower:
-                max_confidence = max(max_confidence, 0.95)
-                logger.debug(f"🎯 Exact pattern match: '{pattern_lower}' in '{text_lower}' -> 0.95 confidence")
-                continue
-            
-            # Partial phrase match (high confidence)
-            if len(pattern_lower) > 3 and any(word in text_lower for word in pattern_lower.split()):
-                # Check if key words from pattern are present
-                pattern_words = pattern_lower.split()
-                key_words = [w for w in pattern_words if len(w) > 2]  # Skip short words like "a", "an", "to"
-                if key_words:
-                    matches = sum(1 for word in key_words if word in text_lower)
-                    if matches >= len(key_words) * 0.7:  # 70% of key words match
-                        partial_confidence = 0.85
-                        max_confidence = max(max_confidence, partial_confidence)
-                        logger.debug(f"🎯 Partial pattern match: {matches}/{len(key_words)} key words from '{pattern_lower}' in '{text_lower}' -> {partial_confidence} confidence")
-                        continue
-            
-            # Word overlap scoring (medium confidence)
-            pattern_words = set(pattern_lower.split())
-            text_words = set(text_lower.split())
-            overlap = len(pattern_words.intersection(text_words))
-            
-            if overlap > 0:
-                word_confidence = overlap / len(pattern_words)
-                overlap_confidence = word_confidence * 0.75
-                max_confidence = max(max_confidence, overlap_confidence)
-                logger.debug(f"🎯 Word overlap: {overlap}/{len(pattern_words)} words from '{pattern_lower}' in '{text_lower}' -> {overlap_confidence} confidence")
-        
-        # Special handling for booking-related keywords
-        if intent_tag == "BOOKING_REQUEST":
-            booking_keywords = ["book", "schedule", "appointment", "booking", "prefer to book", "want to book", "need to book"]
-            for keyword in booking_keywords:
-                if keyword in text_lower:
-                    booking_confidence = 0.9
-                    max_confidence = max(max_confidence, booking_confidence)
-                    logger.debug(f"🎯 Booking keyword match: '{keyword}' in '{text_lower}' -> {booking_confidence} confidence")
-                    break
-        
-        # Try semantic similarity if available
-        if max_confidence < 0.5:
-            semantic_confidence = calculate_semantic_intent_confidence(text_lower, patterns)
-            max_confidence = max(max_confidence, semantic_confidence)
-        
-        confidence_scores[intent_tag] = max_confidence
-    
+    confidence_scores = analyze_utterance(text).pattern_scores(intents_data)
+    if settings.CONFIDENCE_DEBUG_MODE and confidence_scores:
+        best_tag = max(confidence_scores, key=confidence_scores.get)
+        logger.debug(f"🎯 Best pattern match: {best_tag} -> {confidence_scores[best_tag]:.2f} confidence for '{text}'")
     return confidence_scores
 
 
@@ -821,7 +1069,6 @@ async def magiclink_operator_confirm(call_sid: str, request: Request):
             call_dialog_state[call_sid] = {'intent': intent, 'step': 'post_booking_qa'}
             
             # Append stream resume
-            start = Start()
             ws_base = call_info_store.get(call_sid, {}).get('ws_base')
             if ws_base:
                 wss_url = f"{ws_base}{settings.STREAM_ENDPOINT}?callSid={call_sid}"
@@ -832,9 +1079,7 @@ async def magiclink_operator_confirm(call_sid: str, request: Request):
                     wss_url = settings.EXTERNAL_WEBHOOK_URL.replace('http://', 'ws://') + settings.STREAM_ENDPOINT + f"?callSid={call_sid}"
                 else:
                     wss_url = f"wss://{settings.EXTERNAL_WEBHOOK_URL}{settings.STREAM_ENDPOINT}?callSid={call_sid}"
-            start.stream(url=wss_url, track="inbound_track")
-            twiml.append(start)
-            twiml.pause(length=3600)
+            append_stream_resume(twiml, call_sid, wss_url)
             
             # Push to call
             await push_twiml_to_call(call_sid, twiml)
@@ -1194,12 +1439,44 @@ async def _finalize_booking_if_ready(call_sid: str) -> bool:
 # ... existing code ...
 
 # Add endpoint to serve synthesized TTS audio for Twilio <Play>
-@app.get("/tts/{call_sid}.mp3")
-async def serve_tts(call_sid: str):
-    audio = tts_audio_store.get(call_sid)
-    if not audio:
+@app.get("/tts/{clip_id}.{extension}")
+async def serve_tts(clip_id: str, request: Request, extension: str = "mp3"):
+    """
+    Serve a clip by content key, or the latest clip of a call by CallSid.
+
+    Cached clips are sent whole; content-key URLs for them are immutable and
+    carry an ETag. A clip still being synthesized is streamed chunk by chunk
+    as the provider sends it, so playback starts before synthesis ends. The
+    fallback <Play> of a Media Stream prompt is synthesized on first request.
+    The CallSid form stays for URLs issued before a deploy. The extension
+    must be the clip's own (.mp3, or .ulaw for mu-law), and sets the content type.
+    """
+    by_key = is_tts_cache_key(clip_id)
+    key = clip_id if by_key else tts_audio_store.get(clip_id)
+    if not key:
+        raise HTTPException(status_code=404, detail="TTS not found")
+    etag = f'"{key}"'
+    if by_key and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    cache_key = tts_key_aliases.get(key, key)
+    audio = tts_audio_cache.get(cache_key)
+    if audio:
+        audio_format = tts_audio_cache.audio_format(cache_key)
+        if AUDIO_SUFFIXES[audio_format] != f".{extension}":
+            raise HTTPException(status_code=404, detail="TTS not found")
+        tts_audio_cache.note_served(len(audio))
+        headers = ({"Cache-Control": "public, max-age=31536000, immutable", "ETag": etag} if by_key
+                   else {"Cache-Control": "no-cache"})
+        return Response(content=audio, media_type=AUDIO_CONTENT_TYPES[audio_format], headers=headers)
+    stream = tts_streams.get(key)
+    if stream is None and key in tts_key_texts and extension == "mp3":
+        # Issued as the fallback of a Media Stream prompt; synthesize it now that Twilio wants it
+        stream = open_tts_stream(tts_key_texts[key])
+    if stream is None or AUDIO_SUFFIXES[stream.audio_format] != f".{extension}":
         raise HTTPException(status_code=404, detail="TTS not found")
-    return Response(content=audio, media_type="audio/mpeg")
+    # Not cacheable: a provider failing mid-clip would leave a truncated copy
+    return StreamingResponse(stream.iter_chunks(), media_type=AUDIO_CONTENT_TYPES[stream.audio_format],
+                             headers={"Cache-Control": "no-store"})
 
 # Add test endpoint for ngrok verification
 @app.get("/")
@@ -1211,6 +1488,14 @@ async def root():
 async def root_post(request: Request):
     return await voice_webhook(request)
 
+# Reached when a <Connect><Stream> ends without the call having moved on: reopen the stream
+@app.post("/stream/resume/{call_sid}")
+async def resume_stream(call_sid: str):
+    logger.warning(f"🔌 Media stream for {call_sid} ended; reconnecting")
+    resp = VoiceResponse()
+    append_stream_resume(resp, call_sid)
+    return Response(content=str(resp), media_type="application/xml")
+
 # Serve last TwiML as a fallback via URL fetch (Twilio update url=...)
 @app.get("/twiml/{call_sid}")
 async def serve_twiml(call_sid: str):
@@ -1282,6 +1567,12 @@ async def voice_webhook(request: Request):
         logger.error("Missing CallSid in webhook payload")
         raise HTTPException(status_code=400, detail="CallSid required")
 
+    # Picks up voice settings changes; a no-op while the catalogue is warm for the current voice
+    try:
+        schedule_prompt_prewarm()
+    except Exception as e:
+        logger.debug(f"Prompt pre-synthesis check failed: {e}")
+
     # Extract all available call information from Twilio webhook
     call_info = {
         "call_sid": call_sid,
@@ -1348,10 +1639,9 @@ async def voice_webhook(request: Request):
     
     # Set initial dialog state to collect name
     call_dialog_state[call_sid] = {'step': 'awaiting_name'}
-    start = Start()
-    start.stream(url=wss_url, track="inbound_track")
-    resp.append(start)
-    resp.pause(length=3600)
+    append_stream_resume(resp, call_sid, wss_url)
+    # Returned to Twilio directly rather than pushed, so gate the greeting here
+    asyncio.create_task(_gate_pushed_prompts(call_sid, pending_gate_clips.pop(call_sid, []), time.time()))
     logger.info(f"🎯 Stream will start after greeting for call {call_sid}")
     logger.info(f"🔗 WebSocket URL generated: {wss_url}")
     logger.debug(f"📄 TwiML Response: {str(resp)}")
@@ -1391,10 +1681,16 @@ class ConnectionManager:
             audio_config_store.pop(call_sid, None)
             tts_audio_store.pop(call_sid, None)
             last_twiml_store.pop(call_sid, None)
+            twiml_pusher.forget(call_sid)
+            tts_prefetcher.forget(call_sid)
+            turn_timings.pop(call_sid, None)
+            pending_gate_clips.pop(call_sid, None)
+            _close_media_player(call_sid)
             # Clean up consecutive failure tracking
             consecutive_intent_failures.pop(call_sid, None)
             consecutive_overall_failures.pop(call_sid, None)
             consecutive_missing_fields_failures.pop(call_sid, None)
+            llm_flights.forget(call_sid)
             # Clean up speech gate state
             if call_sid in vad_states:
                 vad_states[call_sid]['speech_gate_active'] = False
@@ -1573,6 +1869,12 @@ async def handle_media_packet(call_sid: str, msg: str):
         # Track stream start time for preroll suppression
         state = vad_states[call_sid]
         state['stream_start_time'] = time.time()
+        _open_media_player(call_sid, packet.get("streamSid") or packet.get("start", {}).get("streamSid"))
+    elif event == "mark":
+        # Twilio finished playing everything we sent before this mark
+        player = media_players.get(call_sid)
+        if player is not None:
+            player.on_mark((packet.get("mark") or {}).get("name", ""))
     elif event == "media":
         payload_b64 = packet["media"]["payload"]
         # Log first media frame and update heartbeat
@@ -1665,6 +1967,52 @@ def convert_media_payload_to_pcm16(call_sid: str, payload_b64: str) -> bytes:
     # Already PCM16 (audio/l16)
     return raw_bytes
 
+async def _detect_barge_in(call_sid: str, audio: bytes, sample_rate: int) -> bool:
+    """
+    Check caller audio that arrived while the speech gate is closed for barge-in.
+
+    Only Media Stream playback can be interrupted. Once the caller has talked
+    over the bot for BARGE_IN_SUSTAIN_MS above the echo-adjusted level, the
+    stream is cleared, the gate opens and the interrupting audio goes through
+    process_audio like any other speech.
+
+    Returns:
+        True when the audio was consumed by a barge-in
+    """
+    vad_state = vad_states[call_sid]
+    player = media_players.get(call_sid)
+    if not settings.BARGE_IN_ENABLED or player is None or not player.is_playing():
+        vad_state.pop('barge_in', None)
+        return False
+    detector = vad_state.get('barge_in')
+    if detector is None:
+        vad = vad_state['vad']
+        detector = BargeInDetector(
+            lambda frame: vad.is_speech(frame, sample_rate),
+            sample_rate=sample_rate,
+            frame_ms=VAD_FRAME_DURATION_MS,
+            min_rms=settings.BARGE_IN_MIN_RMS,
+            echo_ratio=settings.BARGE_IN_ECHO_RATIO,
+            sustain_ms=settings.BARGE_IN_SUSTAIN_MS,
+        )
+        vad_state['barge_in'] = detector
+    rejected = detector.echo_rejected
+    interrupted = detector.feed(audio, player.level())
+    barge_in_stats["echo_rejected_frames"] += detector.echo_rejected - rejected
+    if not interrupted:
+        return False
+
+    barge_in_stats["barge_ins"] += 1
+    logger.info(f"✋ Barge-in on {call_sid}: caller spoke over the bot; clearing playback")
+    vad_state.pop('barge_in', None)
+    await player.clear()
+    _open_speech_gate(call_sid, reason=" (barge-in)")
+    # Audio buffered while gated is the bot's echo; only the interruption is kept
+    audio_buffers[call_sid] = bytearray()
+    vad_state['fallback_buffer'] = bytearray()
+    await process_audio(call_sid, detector.captured())
+    return True
+
 #---------------ASR/INTENT & FOLLOW-UPS (STUBS) ---------------
 FUNCTIONS = [get_function_definition()]
 
@@ -1684,6 +2032,8 @@ async def process_audio(call_sid: str, audio: bytes):
     
     # Check if bot is currently speaking (speech gate)
     if vad_state.get('speech_gate_active', False):
+        if await _detect_barge_in(call_sid, audio, sample_rate):
+            return
         # Bot is speaking - suppress user speech processing but still log
         gate_start_time = vad_state.get('bot_speech_start_time', current_time)
         gate_elapsed = current_time - gate_start_time
@@ -1904,6 +2254,7 @@ async def process_speech_segment(call_sid: str, audio_data: bytearray):
     
     # Set processing lock
     vad_state['processing_lock'] = True
+    _begin_turn(call_sid)
     
     try:
         sample_rate = audio_config_store.get(call_sid, {}).get('sample_rate', SAMPLE_RATE_DEFAULT)
@@ -2085,7 +2436,7 @@ async def process_speech_segment(call_sid: str, audio_data: bytearray):
         
         normalized = text.lower().strip().strip(".,!? ")
         # Immediate transfer if user requests it, even with low confidence
-        if is_transfer_request(normalized):
+        if is_transfer_request(analyze_utterance(text)):
             logger.info(f"🟢 Transfer keyword detected for {call_sid}: '{text}' (avg_logprob={mean_lp})")
             await perform_dispatch_transfer(call_sid)
             # Release processing lock since we're transferring
@@ -2170,10 +2521,13 @@ async def response_to_user_speech(call_sid: str, text: str) -> None:
         logger.info(f"🚫 Skipping speech response processing for {call_sid} - handoff already requested")
         return
     
+    # Normalize/tokenize once; every text heuristic below reads from this
+    utterance = analyze_utterance(text)
+    
     # Post-booking Q&A flow
     dialog = call_dialog_state.get(call_sid)
     if dialog and dialog.get('step') == 'post_booking_qa':
-        if is_negative_response(text):
+        if is_negative_response(utterance):
             twiml = VoiceResponse()
             await add_tts_or_say_to_twiml(twiml, call_sid, "Thanks for trusting SafeHarbour to help you with your plumbing needs. Goodbye.")
             twiml.hangup()
@@ -2181,25 +2535,26 @@ async def response_to_user_speech(call_sid: str, text: str) -> None:
             await push_twiml_to_call(call_sid, twiml)
             return
         # Answer with GPT-4o and re-prompt
-        answer = await answer_customer_question(call_sid, text)
+        answer = await _respond_with_filler(call_sid, answer_customer_question(call_sid, text))
         reply = f"{answer} Please let me know if you have any other questions."
         twiml = VoiceResponse()
         await add_tts_or_say_to_twiml(twiml, call_sid, reply)
         # Keep in QA mode and resume stream
-        def append_stream_and_pause_local(resp: VoiceResponse):
-            start = Start()
-            wss_url_local = _build_wss_url_for_resume(call_sid)
-            start.stream(url=wss_url_local, track="inbound_track")
-            resp.append(start)
-            resp.pause(length=3600)
-        append_stream_and_pause_local(twiml)
+        append_stream_resume(twiml, call_sid)
         await push_twiml_to_call(call_sid, twiml)
         return
 
     # Name collection handling
     if dialog and dialog.get('step') == 'awaiting_name':
-        # Extract name from user response
-        customer_name = extract_name_from_text(text)
+        # Recognize the name locally; a name-only turn analysis runs only when the recognizer abstains
+        name_match = get_name_recognizer().recognize(text)
+        customer_name = name_match.name
+        if name_match.abstained:
+            analysis = await analyze_turn(text, ("customer_name",), dialog_step='awaiting_name')
+            customer_name = _validate_extracted_name(analysis.get('customer_name'), text)
+            get_name_recognizer().record_fallback(customer_name)
+        else:
+            logger.info(f"👤 Local name recognizer for {call_sid}: {customer_name!r} via {name_match.source} ({name_match.confidence:.2f})")
         if customer_name:
             # Store the name and acknowledge it
             dialog['customer_name'] = customer_name
@@ -2217,11 +2572,7 @@ async def response_to_user_speech(call_sid: str, text: str) -> None:
                 f"Nice to meet you, {customer_name}. If at any point you'd like to speak to a human dispatcher, just say 'transfer'. What can we assist you with today?"
             )
             # Resume streaming to listen for their plumbing issue
-            start = Start()
-            wss_url = _build_wss_url_for_resume(call_sid)
-            start.stream(url=wss_url, track="inbound_track")
-            twiml.append(start)
-            twiml.pause(length=3600)
+            append_stream_resume(twiml, call_sid)
             await push_twiml_to_call(call_sid, twiml)
             logger.info(f"👤 Collected name '{customer_name}' for {call_sid}")
             return
@@ -2261,17 +2612,13 @@ async def response_to_user_speech(call_sid: str, text: str) -> None:
                 "I didn't catch your name clearly. Could you please tell me your name?"
             )
             # Keep the same dialog state and resume streaming
-            start = Start()
-            wss_url = _build_wss_url_for_resume(call_sid)
-            start.stream(url=wss_url, track="inbound_track")
-            twiml.append(start)
-            twiml.pause(length=3600)
+            append_stream_resume(twiml, call_sid)
             await push_twiml_to_call(call_sid, twiml)
             return
 
     # Transfer confirmation handling
     if dialog and dialog.get('step') == 'awaiting_transfer_confirm':
-        if is_affirmative_response(text):
+        if is_affirmative_response(utterance):
             # User said yes - transfer to dispatch
             twiml = VoiceResponse()
             await add_tts_or_say_to_twiml(twiml, call_sid, "Connecting you to our dispatch team now.")
@@ -2290,7 +2637,7 @@ async def response_to_user_speech(call_sid: str, text: str) -> None:
             await push_twiml_to_call(call_sid, twiml)
             logger.info(f"📞 User confirmed transfer for {call_sid} after unclear attempts")
             return
-        elif is_negative_response(text):
+        elif is_negative_response(utterance):
             # User said no - continue with clarification
             twiml = VoiceResponse()
             await add_tts_or_say_to_twiml(
@@ -2302,11 +2649,7 @@ async def response_to_user_speech(call_sid: str, text: str) -> None:
             call_dialog_state.pop(call_sid, None)
             reset_unclear_attempts(call_sid)
             # Resume streaming to listen for their response
-            start = Start()
-            wss_url = _build_wss_url_for_resume(call_sid)
-            start.stream(url=wss_url, track="inbound_track")
-            twiml.append(start)
-            twiml.pause(length=3600)
+            append_stream_resume(twiml, call_sid)
             await push_twiml_to_call(call_sid, twiml)
             logger.info(f"💬 User declined transfer for {call_sid}, continuing with clarification")
             return
@@ -2315,38 +2658,32 @@ async def response_to_user_speech(call_sid: str, text: str) -> None:
             twiml = VoiceResponse()
             await add_tts_or_say_to_twiml(twiml, call_sid, "I didn't catch that. Should I transfer you to a representative? Please say yes or no.")
             # Keep the same dialog state
-            start = Start()
-            wss_url = _build_wss_url_for_resume(call_sid)
-            start.stream(url=wss_url, track="inbound_track")
-            twiml.append(start)
-            twiml.pause(length=3600)
+            append_stream_resume(twiml, call_sid)
             await push_twiml_to_call(call_sid, twiml)
             return
 
     # Scheduling/path and confirmation follow-up handling
-    if dialog and dialog.get('step') in (
-        'awaiting_path_choice',
-        'awaiting_problem_details',
-        'awaiting_time',
-        'awaiting_time_confirm',
-        'awaiting_location_confirm',
-        'awaiting_operator_confirm',
-    ):
+    if dialog and dialog.get('step') in FOLLOWUP_DIALOG_STEPS:
         logger.info(f"Handling follow-up scheduling/path utterance for {call_sid}: '{text}'")
-        twiml = await handle_intent(call_sid, dialog.get('intent', {}), followup_text=text)
+        twiml = await _respond_with_filler(
+            call_sid, handle_intent(call_sid, dialog.get('intent', {}), followup_text=text)
+        )
         await push_twiml_to_call(call_sid, twiml)
         return
 
-    # Otherwise, extract a fresh intent with parallel processing for speed
-    if FAST_RESPONSE_MODE:
-        # Run intent extraction and time parsing in parallel
-        intent_task = asyncio.create_task(extract_intent_from_text(call_sid, text))
-        time_task = asyncio.create_task(_parse_time_parallel(text))
-        intent, (explicit_time, explicit_emergency) = await asyncio.gather(intent_task, time_task)
-    else:
-        intent = await extract_intent_from_text(call_sid, text)
-        explicit_time = parse_human_datetime(text) or gpt_infer_datetime_phrase(text)
-        explicit_emergency = contains_emergency_keywords(text)
+    # Otherwise, extract a fresh intent: one structured LLM call covers intent tag, job, urgency,
+    # name, address and datetime instead of separate classify/extract/datetime round trips.
+    # Claim the classification flight before the first await so the dashboard broadcast joins it.
+    dialog_step = (dialog or {}).get('step')
+    classification = llm_flights.submit(
+        _flight_key(call_sid, text, "classify", dialog_step),
+        lambda: _classify_from_turn_analysis(call_sid, text, dialog_step),
+    )
+    analysis = await _analyze_turn_shared(call_sid, text, dialog_step)
+    _, intent_confidence = await asyncio.shield(classification)
+    intent = await extract_intent_from_text(call_sid, text, analysis=analysis, intent_confidence=intent_confidence)
+    explicit_time = parse_human_datetime(text) or analysis.get('datetime')
+    explicit_emergency = contains_emergency_keywords(utterance)
     
     # Check if this is a plumbing issue and we haven't asked for problem details yet
     info = call_info_store.get(call_sid, {})
@@ -2373,99 +2710,173 @@ async def response_to_user_speech(call_sid: str, text: str) -> None:
             call_sid,
             f"Tell me more about your {_speakable(job_type)}, specifically how and when it started."
         )
-        start = Start()
-        wss_url = _build_wss_url_for_resume(call_sid)
-        start.stream(url=wss_url, track="inbound_track")
-        twiml.append(start)
-        twiml.pause(length=3600)
+        append_stream_resume(twiml, call_sid)
         await push_twiml_to_call(call_sid, twiml)
         return
     
     # Defer prompting/booking until caller provides explicit signals (date/time or emergency) or after at least 2 segments
     if (segments_count < 2 and not explicit_time and not explicit_emergency and 
-        not is_affirmative_response(text)):
+        not is_affirmative_response(utterance)):
         # Don't set any step yet - just continue listening
         logger.info(f"Deferring prompt; continuing to listen for {call_sid} (segments={segments_count})")
         return
-    twiml = await handle_intent(call_sid, intent)
+    twiml = await _respond_with_filler(call_sid, handle_intent(call_sid, intent))
     await push_twiml_to_call(call_sid, twiml)
 
-async def extract_intent_from_text(call_sid: str, text:str) -> dict:
-   # Enhanced prompt with better context and examples
-   enhanced_prompt = f"""
-You are a plumbing service booking assistant. Extract structured information from customer requests.
-
-CUSTOMER REQUEST: "{text}"
-
-INSTRUCTIONS:
-1. Identify the specific plumbing job type from the comprehensive list of services
-2. Determine urgency: emergency (immediate), same_day (today), flex (anytime)
-3. Extract customer name and contact info
-4. Parse address information
-5. Assess confidence and handoff needs
-
-EXAMPLES:
-- "kitchen sink is clogged" → job_type: clogged_kitchen_sink
-- "bathroom sink won't drain" → job_type: clogged_bathroom_sink
-- "toilet is running constantly" → job_type: running_toilet
-- "water heater burst" → job_type: water_heater_repair, urgency: emergency
-- "need new faucet installed" → job_type: faucet_replacement
-- "sewer camera inspection" → job_type: camera_inspection
-- "drain smells bad" → job_type: camera_inspection
-- "can come tomorrow" → urgency: flex
-- "need today" → urgency: same_day
-- "emergency leak" → urgency: emergency
-
-Be precise and extract all available information. Match to the most specific service type available.
-"""
-
-   # Send user text to ChatCompletion with function calling
-   resp = client.chat.completions.create(
+def _run_turn_analysis(text: str, fields: tuple, now: datetime) -> dict:
+    """Blocking single structured LLM call returning only the requested turn fields."""
+    tool = get_turn_analysis_function_definition(fields, intent_tags=get_intent_index().tags)
+    resp = client.chat.completions.create(
         model="gpt-4o-mini",
-        messages=[{"role": "user", "content": enhanced_prompt}],
-        tools=FUNCTIONS,
-        tool_choice="auto",
-        temperature=0.1,  # Lower temperature for more consistent results
-        max_tokens=1000
-   )
-   msg = resp.choices[0].message
-   if msg.tool_calls:
-    tool_call = msg.tool_calls[0]
-    args = json.loads(tool_call.function.arguments)
+        messages=[
+            {"role": "system", "content": TURN_ANALYSIS_PROMPT},
+            {"role": "user", "content": json.dumps({
+                "now": now.strftime("%Y-%m-%d %H:%M (%A)"),
+                "fields": list(fields),
+                "utterance": text,
+            })}
+        ],
+        tools=[tool],
+        tool_choice={"type": "function", "function": {"name": "analyze_turn"}},
+        temperature=0,
+        max_tokens=200
+    )
+    msg = resp.choices[0].message
+    args = json.loads(msg.tool_calls[0].function.arguments) if msg.tool_calls else {}
+    return {field: args.get(field) for field in fields}
+
+
+def _normalize_turn_analysis(result: dict) -> dict:
+    """Coerce raw turn-analysis values into the types the dialog code expects."""
+    normalized = dict(result)
+    if normalized.get('intent_tag'):
+        normalized['intent_tag'] = str(normalized['intent_tag']).strip().upper()
+    for key in ('customer_name', 'raw_address', 'job_type'):
+        value = normalized.get(key)
+        if isinstance(value, str) and value.strip().lower() in ('', 'none', 'null', 'n/a'):
+            normalized[key] = None
+    dt_value = normalized.get('datetime')
+    if isinstance(dt_value, str):
+        try:
+            from dateutil import parser as _dtparser  # lazy import
+            normalized['datetime'] = _dtparser.parse(dt_value)
+        except Exception:
+            normalized['datetime'] = None
+    return normalized
+
+
+async def analyze_turn(text: str, fields: tuple = TURN_ANALYSIS_FIELDS, now: Optional[datetime] = None,
+                       dialog_step: Optional[str] = None) -> dict:
+    """
+    Analyze one caller utterance with a single structured LLM call.
     
-    # Post-process and validate the extracted data
-    validated_args = validate_and_enhance_extraction(args, text, call_sid)
-    return validated_args
+    Args:
+        text: Caller utterance
+        fields: Subset of TURN_ANALYSIS_FIELDS the caller actually needs
+        now: Reference time for relative datetime expressions
+        dialog_step: Current dialog step, part of the result cache key
+    
+    Returns:
+        dict with every requested field (None when absent); 'datetime' is a datetime object
+    """
+    fields = tuple(fields)
+    if now is None:
+        now = datetime.now()
+    cache_key = LLMResultCache.make_key(
+        "turn:" + ",".join(sorted(fields)),
+        text,
+        dialog_step=dialog_step,
+        prompt_version=TURN_ANALYSIS_PROMPT_VERSION,
+        date_bucket=date_bucket_for(text, now) if "datetime" in fields else None,
+    )
+    found, cached = _llm_cache_lookup(cache_key)
+    if found:
+        return dict(cached)
+    try:
+        result = await asyncio.get_event_loop().run_in_executor(
+            None, lambda: _run_turn_analysis(text, fields, now)
+        )
+        analysis = _normalize_turn_analysis(result)
+        _llm_cache_store(cache_key, analysis)
+        return dict(analysis)
+    except Exception as e:
+        logger.debug(f"Turn analysis failed: {e}")
+        return {field: None for field in fields}
+
+
+async def _analyze_turn_shared(call_sid: str, text: str, dialog_step: Optional[str] = None) -> dict:
+    """Full turn analysis coalesced per (call, utterance) so concurrent requesters share one call."""
+    analysis = await llm_flights.do(
+        _flight_key(call_sid, text, "analyze_turn", dialog_step),
+        lambda: analyze_turn(text, TURN_ANALYSIS_FIELDS, dialog_step=dialog_step),
+    )
+    return dict(analysis)
+
+
+async def _classify_from_turn_analysis(call_sid: str, text: str, dialog_step: Optional[str] = None) -> tuple[str, float]:
+    """Intent classification that reuses the turn analysis tag instead of a separate GPT request."""
+    analysis = await _analyze_turn_shared(call_sid, text, dialog_step)
+    return await classify_transcript_intent(text, gpt_intent=analysis.get('intent_tag') or 'UNKNOWN',
+                                            dialog_step=dialog_step)
+
+
+def _intent_args_from_turn_analysis(analysis: dict, text: str) -> dict:
+    """Shape turn-analysis fields like the book_job function-call arguments."""
+    return {
+        "intent": "BOOK_JOB",
+        "customer": {"name": analysis.get('customer_name')},
+        "job": {
+            "type": analysis.get('job_type'),
+            "urgency": analysis.get('urgency'),
+            "description": text,
+        },
+        "location": {"raw_address": analysis.get('raw_address')},
+    }
+
 
-   # Fallback: no function call, return freeform description
-   return create_fallback_response(text)
+async def extract_intent_from_text(call_sid: str, text: str, analysis: Optional[dict] = None,
+                                   intent_confidence: Optional[float] = None) -> dict:
+    """Extract a book_job-shaped intent, reusing an existing turn analysis when provided."""
+    if analysis is None:
+        analysis = await analyze_turn(text, ("job_type", "urgency", "customer_name", "raw_address"))
+    
+    if not any(analysis.get(key) for key in ("job_type", "urgency", "customer_name", "raw_address")):
+        # Fallback: analysis call failed, return freeform description
+        return create_fallback_response(text)
+    
+    # Post-process and validate the extracted data
+    args = _intent_args_from_turn_analysis(analysis, text)
+    return validate_and_enhance_extraction(args, text, call_sid, intent_confidence=intent_confidence)
 
-def validate_and_enhance_extraction(args: dict, original_text: str, call_sid: str = None) -> dict:
+def validate_and_enhance_extraction(args: dict, original_text: str, call_sid: str = None,
+                                    intent_confidence: Optional[float] = None) -> dict:
     """Validate and enhance extracted data with additional processing"""
+    utterance = analyze_utterance(original_text)
     
     # Ensure required fields exist
     if 'intent' not in args:
         args['intent'] = 'BOOK_JOB'
     
-    # Calculate intent confidence for the original text
-    try:
-        # Use the same intent classification system for confidence
-        import asyncio
-        if asyncio.iscoroutinefunction(classify_transcript_intent):
-            # If in async context, calculate intent confidence
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # Schedule intent confidence calculation
-                intent_confidence = 0.7  # Default for now, will be calculated properly
+    # Calculate intent confidence for the original text unless the caller already has it
+    if intent_confidence is None:
+        try:
+            # Use the same intent classification system for confidence
+            import asyncio
+            if asyncio.iscoroutinefunction(classify_transcript_intent):
+                # If in async context, calculate intent confidence
+                loop = asyncio.get_event_loop()
+                if loop.is_running():
+                    # Schedule intent confidence calculation
+                    intent_confidence = 0.7  # Default for now, will be calculated properly
+                else:
+                    intent, intent_confidence = loop.run_until_complete(classify_transcript_intent(original_text))
             else:
-                intent, intent_confidence = loop.run_until_complete(classify_transcript_intent(original_text))
-        else:
-            intent_confidence = 0.7  # Default fallback
-    except:
-        intent_confidence = 0.7  # Default fallback if async context issues
+                intent_confidence = 0.7  # Default fallback
+        except:
+            intent_confidence = 0.7  # Default fallback if async context issues
     
     # Enhance job type recognition with keyword matching and multi-intent detection
-    multi_intent_result = infer_multiple_job_types_from_text(original_text)
+    multi_intent_result = utterance.job_types
     
     if not args.get('job', {}).get('type'):
         args['job'] = args.get('job', {})
@@ -2473,7 +2884,7 @@ def validate_and_enhance_extraction(args: dict, original_text: str, call_sid: st
     
     # Add secondary intents if detected
     if multi_intent_result['secondary']:
-        args['job']['secondary_intents'] = multi_intent_result['secondary']
+        args['job']['secondary_intents'] = list(multi_intent_result['secondary'])
     
     # Enhance description with secondary intents
     if multi_intent_result['description_suffix']:
@@ -2487,7 +2898,7 @@ def validate_and_enhance_extraction(args: dict, original_text: str, call_sid: st
     
     # Improve urgency classification
     if not args.get('job', {}).get('urgency'):
-        args['job']['urgency'] = infer_urgency_from_text(original_text)
+        args['job']['urgency'] = infer_urgency_from_text(utterance)
     
     # Extract phone numbers if missing
     if not args.get('customer', {}).get('phone'):
@@ -2522,145 +2933,453 @@ def validate_and_enhance_extraction(args: dict, original_text: str, call_sid: st
 
 
 
-def infer_urgency_from_text(text: str) -> str:
+def infer_urgency_from_text(text: Union[str, UtteranceAnalysis]) -> str:
     """Infer urgency from text using keyword matching"""
-    text_lower = text.lower()
+    utterance = analyze_utterance(text)
     
     # Emergency indicators
-    if any(word in text_lower for word in ['emergency', 'burst', 'flooding', 'water everywhere', 'immediately', 'urgent']):
+    if utterance.has_any(URGENCY_EMERGENCY_KEYWORDS):
         return 'emergency'
     
     # Same day indicators
-    if any(word in text_lower for word in ['today', 'asap', 'soon', 'quickly', 'urgent']):
+    if utterance.has_any(URGENCY_SAME_DAY_KEYWORDS):
         return 'same_day'
     
-    # Flexible indicators
-    if any(word in text_lower for word in ['tomorrow', 'next week', 'when convenient', 'schedule', 'appointment']):
-        return 'flex'
-    
-    return 'flex'  # Default to flexible
+    # Flexible indicators (tomorrow, next week, schedule, ...) and the default
+    return 'flex'
 
 # TTS: synthesize with ElevenLabs or OpenAI 4o TTS
-async def synthesize_tts(text: str) -> Optional[bytes]:
-    # Check if ElevenLabs TTS is enabled and configured
-    if (settings.USE_ELEVENLABS_TTS and 
-        settings.ELEVENLABS_API_KEY and 
-        settings.ELEVENLABS_VOICE_ID):
-        try:
-            from elevenlabs import ElevenLabs
-            
-            # Create ElevenLabs client with API key
-            elevenlabs_client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
-            
-            # Use configured voice ID or default to the specified one
-            voice_id = settings.ELEVENLABS_VOICE_ID
-            model_id = settings.ELEVENLABS_MODEL_ID or "eleven_multilingual_v2"
-            
-            # Generate audio using ElevenLabs
-            logger.info(f"🎤 Using ElevenLabs TTS (voice: {voice_id}, model: {model_id})")
-            audio_stream = elevenlabs_client.text_to_speech.convert(
-                voice_id=voice_id,
-                text=text,
-                model_id=model_id
-            )
-            
-            # Convert iterator to bytes
-            audio = b"".join(audio_stream)
-            
-            if audio:
-                logger.debug(f"ElevenLabs TTS generated {len(audio)} bytes for text: {text[:50]}...")
-                return audio
-            else:
-                logger.error("ElevenLabs TTS returned empty response")
-                
-        except Exception as e:
-            logger.error(f"ElevenLabs TTS failed: {e}")
-            logger.info("Falling back to OpenAI TTS...")
-    
-    # If ElevenLabs is disabled or not configured, use OpenAI TTS
-    if not settings.USE_ELEVENLABS_TTS:
-        logger.info("🎤 ElevenLabs TTS disabled via USE_ELEVENLABS_TTS=False, using OpenAI TTS")
-    
-    # Use OpenAI TTS (either as fallback or primary choice)
-    try:
-        voice = getattr(settings, 'OPENAI_TTS_VOICE', 'alloy')  # Default to 'alloy' voice
-        model = getattr(settings, 'OPENAI_TTS_MODEL', 'tts-1')  # Default to 'tts-1' model
-        speed = settings.OPENAI_TTS_SPEED  # Use configured speed (0.25 to 4.0)
-        
-        logger.info(f"🎤 Using OpenAI TTS (voice: {voice}, model: {model}, speed: {speed})")
-        
-        response = client.audio.speech.create(
-            model=model,
-            voice=voice,
-            input=text,
-            response_format="mp3",
-            speed=speed
+def _tts_voice_params() -> List[Tuple[str, str, str, Optional[float]]]:
+    """
+    Providers to try for a prompt, in order, as (provider, voice, model, speed).
+
+    ElevenLabs comes first when enabled and configured; OpenAI is always the
+    last resort. Each tuple is exactly what goes into the clip's cache key.
+    """
+    candidates = []
+    if settings.USE_ELEVENLABS_TTS and settings.ELEVENLABS_API_KEY and settings.ELEVENLABS_VOICE_ID:
+        candidates.append((
+            "elevenlabs",
+            settings.ELEVENLABS_VOICE_ID,
+            settings.ELEVENLABS_MODEL_ID or "eleven_multilingual_v2",
+            None,
+        ))
+    candidates.append((
+        "openai",
+        getattr(settings, 'OPENAI_TTS_VOICE', 'alloy'),  # Default to 'alloy' voice
+        getattr(settings, 'OPENAI_TTS_MODEL', 'tts-1'),  # Default to 'tts-1' model
+        settings.OPENAI_TTS_SPEED,  # Use configured speed (0.25 to 4.0)
+    ))
+    return candidates
+
+_elevenlabs_client = None
+
+def _get_elevenlabs_client():
+    global _elevenlabs_client
+    if _elevenlabs_client is None:
+        from elevenlabs import ElevenLabs
+
+        # One client (and connection pool) for the process
+        kwargs = {"base_url": settings.ELEVENLABS_BASE_URL} if settings.ELEVENLABS_BASE_URL else {}
+        _elevenlabs_client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY, **kwargs)
+    return _elevenlabs_client
+
+def _elevenlabs_tts_chunks(text: str, voice_id: str, model_id: str) -> Iterator[bytes]:
+    logger.info(f"🎤 Using ElevenLabs TTS (voice: {voice_id}, model: {model_id})")
+    return _get_elevenlabs_client().text_to_speech.stream(
+        voice_id=voice_id,
+        text=text,
+        model_id=model_id,
+        # The SDK re-buffers the body into 1 KB pieces by default; pass frames on as they arrive
+        request_options={"chunk_size": None}
+    )
+
+def _openai_tts_chunks(text: str, voice: str, model: str, speed: float) -> Iterator[bytes]:
+    logger.info(f"🎤 Using OpenAI TTS (voice: {voice}, model: {model}, speed: {speed})")
+    with client.audio.speech.with_streaming_response.create(
+        model=model,
+        voice=voice,
+        input=text,
+        response_format="mp3",
+        speed=speed
+    ) as response:
+        # Forward chunks as the HTTP body arrives instead of waiting for all of it
+        yield from response.iter_bytes()
+
+def _tts_chunks(text: str, provider: str, voice: str, model: str, speed: Optional[float]) -> Iterator[bytes]:
+    """Blocking iterator over one provider's mp3 chunks for text."""
+    if provider == "elevenlabs":
+        return _elevenlabs_tts_chunks(text, voice, model)
+    return _openai_tts_chunks(text, voice, model, speed)
+
+def _tts_mulaw_chunks(text: str, provider: str, voice: str, model: str, speed: Optional[float]) -> Iterator[bytes]:
+    """Blocking iterator over one provider's 8 kHz mu-law chunks for text, for Media Stream playback."""
+    if provider == "elevenlabs":
+        logger.info(f"🎤 Using ElevenLabs TTS (voice: {voice}, model: {model}, ulaw_8000)")
+        yield from _get_elevenlabs_client().text_to_speech.stream(
+            voice_id=voice,
+            text=text,
+            model_id=model,
+            output_format="ulaw_8000",
+            request_options={"chunk_size": None}
         )
-        
-        # Convert response to bytes
-        audio_content = b""
+        return
+    logger.info(f"🎤 Using OpenAI TTS (voice: {voice}, model: {model}, speed: {speed}, pcm)")
+    # OpenAI has no mu-law output; its raw PCM is 24 kHz 16-bit mono
+    transcoder = PCMToMulaw(24000)
+    with client.audio.speech.with_streaming_response.create(
+        model=model,
+        voice=voice,
+        input=text,
+        response_format="pcm",
+        speed=speed
+    ) as response:
         for chunk in response.iter_bytes():
-            audio_content += chunk
-            
-        if audio_content:
-            logger.debug(f"OpenAI TTS generated {len(audio_content)} bytes for text: {text[:50]}...")
-            return audio_content
-        else:
-            logger.error("OpenAI TTS returned empty response")
-            return None
-            
+            mulaw = transcoder.feed(chunk)
+            if mulaw:
+                yield mulaw
+
+def _alias_tts_key(url_key: str, cache_key: str) -> None:
+    tts_key_aliases[url_key] = cache_key
+    tts_key_aliases.move_to_end(url_key)
+    while len(tts_key_aliases) > TTS_KEY_ALIASES_MAX:
+        tts_key_aliases.popitem(last=False)
+
+async def _run_tts_stream(stream: TTSStream, text: str, candidates: list, audio_format: str = "mp3") -> None:
+    """Fill a stream from the first provider that produces audio, then cache the clip."""
+    chunks_for = _tts_mulaw_chunks if audio_format == "mulaw" else _tts_chunks
+    try:
+        for index, (provider, voice, model, speed) in enumerate(candidates):
+            key = tts_cache_key(text, provider, voice, model, speed, audio_format=audio_format)
+            if index > 0:
+                cached = tts_audio_cache.get(key)
+                if cached:
+                    stream.provider, stream.cache_key = provider, key
+                    stream.push(cached)
+                    break
+                logger.info(f"Falling back to {provider} TTS...")
+            before = stream.size
+            ok = await stream.pump(
+                lambda p=provider, v=voice, m=model, sp=speed: chunks_for(text, p, v, m, sp), provider
+            )
+            tts_latency_stats.record(
+                provider, ok,
+                first_audio=stream.time_to_first_audio,
+                total=time.monotonic() - stream.started_at,
+                size=stream.size - before,
+            )
+            if ok:
+                audio = b"".join(stream.chunks)
+                tts_audio_cache.put(key, audio, audio_format)
+                stream.cache_key = key
+                logger.debug(f"{provider} TTS generated {len(audio)} bytes "
+                             f"(first audio {stream.time_to_first_audio:.3f}s) for text: {text[:50]}...")
+                break
+            if stream.size:
+                # Part of the clip may already be playing; another voice cannot finish it
+                break
+        if stream.cache_key and stream.cache_key != stream.key:
+            _alias_tts_key(stream.key, stream.cache_key)
+        stream.finish(None if stream.cache_key else RuntimeError("TTS synthesis failed"))
+    except BaseException as e:
+        stream.finish(e)
+        raise
+    finally:
+        if tts_streams.get(stream.key) is stream:
+            del tts_streams[stream.key]
+
+def open_tts_stream(text: str, audio_format: str = "mp3") -> TTSStream:
+    """
+    Get a stream over the audio for text, starting synthesis if nobody has yet.
+
+    A cached clip comes back as a completed stream. Otherwise concurrent
+    requesters share one in-flight stream, keyed by the primary provider's
+    content key, which is also what the /tts/ URL names while it runs.
+
+    Args:
+        text: Text to speak
+        audio_format: 'mp3' for <Play>, 'mulaw' for Media Stream playback
+
+    Returns:
+        The stream; its key is the URL key, its cache_key is set once the clip is cached
+    """
+    candidates = _tts_voice_params()
+    key = tts_cache_key(text, *candidates[0], audio_format=audio_format)
+    audio = tts_audio_cache.get(key)
+    if audio:
+        logger.debug(f"🎵 TTS cache hit ({candidates[0][0]}) for text: {text[:50]}...")
+        return TTSStream.completed(key, audio, candidates[0][0], audio_format)
+    stream = tts_streams.get(key)
+    if stream is None:
+        stream = TTSStream(key, audio_format)
+        tts_streams[key] = stream
+        stream.task = asyncio.ensure_future(_run_tts_stream(stream, text, candidates, audio_format))
+    return stream
+
+async def _run_template_stream(stream: TTSStream, text: str, segments: List[str], candidates: list,
+                               audio_format: str = "mp3") -> None:
+    """Fill a stream with the segments' clips joined, or with the whole text synthesized when they cannot be."""
+    joined = None
+    try:
+        parts = [open_tts_stream(segment, audio_format) for segment in segments]
+        clips = [await part.result() for part in parts]
+        if all(clips) and all(part.provider == candidates[0][0] for part in parts):
+            joined = join_audio(clips, audio_format)
+    except asyncio.CancelledError as e:
+        stream.finish(e)
+        if tts_streams.get(stream.key) is stream:
+            del tts_streams[stream.key]
+        raise
     except Exception as e:
-        logger.error(f"OpenAI TTS failed: {e}")
+        logger.error(f"Template TTS failed for text: {text[:50]}...: {e}")
+    if joined is None:
+        # A segment failed or came from a fallback voice: one voice, and one synthesis, for the whole prompt
+        tts_template_stats.counters["whole_fallbacks"] += 1
+        await _run_tts_stream(stream, text, candidates, audio_format)
+        return
+    tts_audio_cache.put(stream.key, joined, audio_format)
+    stream.provider, stream.cache_key = candidates[0][0], stream.key
+    stream.push(joined)
+    stream.finish()
+    if tts_streams.get(stream.key) is stream:
+        del tts_streams[stream.key]
+
+def open_template_tts_stream(text: str, segments: List[Tuple[str, bool]], audio_format: str = "mp3") -> TTSStream:
+    """
+    Like open_tts_stream, but assemble the clip from separately cached segments.
+
+    Static segments are shared by every caller and come from the cache after
+    the first call; only the variable ones (a name, a slot time) are new. The
+    joined clip is ready once the slowest uncached segment is, which is short.
+
+    Args:
+        text: Full text to speak
+        segments: split_template(text, ...) of it
+        audio_format: 'mp3' for <Play>, 'mulaw' for Media Stream playback
+
+    Returns:
+        The stream, keyed like open_tts_stream(text) so /tts/ URLs and the clip cache work unchanged
+    """
+    if len(segments) < 2:
+        return open_tts_stream(text, audio_format)
+    candidates = _tts_voice_params()
+    key = tts_cache_key(text, *candidates[0], audio_format=audio_format)
+    audio = tts_audio_cache.get(key)
+    if audio:
+        return TTSStream.completed(key, audio, candidates[0][0], audio_format)
+    stream = tts_streams.get(key)
+    if stream is None:
+        tts_template_stats.record([
+            (is_variable, tts_audio_cache.contains(tts_cache_key(segment, *candidates[0], audio_format=audio_format)))
+            for segment, is_variable in segments
+        ])
+        stream = TTSStream(key, audio_format)
+        tts_streams[key] = stream
+        stream.task = asyncio.ensure_future(
+            _run_template_stream(stream, text, [segment for segment, _ in segments], candidates, audio_format)
+        )
+    return stream
+
+async def synthesize_tts_keyed(text: str) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Get the complete audio for text from the shared TTS cache, synthesizing it on a miss.
+
+    A clip is cached under the key of the provider that actually produced it,
+    so an OpenAI fallback never poses as ElevenLabs audio.
+
+    Args:
+        text: Text to speak
+
+    Returns:
+        (cache key, mp3 bytes), or (None, None) when every provider failed
+    """
+    stream = open_tts_stream(text)
+    audio = await stream.result()
+    if not audio:
+        return None, None
+    return stream.cache_key, audio
+
+async def synthesize_tts(text: str) -> Optional[bytes]:
+    _, audio = await synthesize_tts_keyed(text)
+    return audio
+
+def _prompt_catalogue():
+    return get_prompt_catalogue(variants={"_speakable(job_type)": [_speakable(j) for j in PLUMBING_SERVICES]})
+
+async def _presynthesize_prompt(text: str, audio_format: str = "mp3") -> bool:
+    return await open_tts_stream(text, audio_format).result() is not None
+
+def schedule_prompt_prewarm(delay_sec: float = 0.0) -> Optional[asyncio.Task]:
+    """
+    Pre-synthesize the prompt catalogue for the current voice settings in the background.
+
+    Cheap to call often: a run already started (or finished) for the same
+    settings is reused, and a run for outdated settings is cancelled first.
+    Prompts are warmed in the format turns will play them in, like the fillers.
+
+    Args:
+        delay_sec: Wait before the first synthesis
+
+    Returns:
+        The job's task, or None when pre-synthesis is disabled
+    """
+    if not settings.TTS_PREWARM_ENABLED or settings.FORCE_SAY_ONLY:
         return None
+    audio_format = "mulaw" if settings.MEDIA_STREAM_PLAYBACK else "mp3"
+    voice = _tts_voice_params()[0] + (audio_format,)
+    task = tts_prewarm_state.get("task")
+    if task is not None and tts_prewarm_state.get("voice") == voice and not task.cancelled():
+        return task
+    if task is not None and not task.done():
+        logger.info("🎵 Voice settings changed; restarting prompt pre-synthesis")
+        task.cancel()
+    label = "/".join(str(part) for part in voice if part is not None)
+
+    async def _run():
+        if delay_sec > 0:
+            await asyncio.sleep(delay_sec)
+        await _prompt_catalogue().presynthesize(
+            lambda text: _presynthesize_prompt(text, audio_format),
+            concurrency=settings.TTS_PREWARM_CONCURRENCY, voice=label,
+        )
 
-async def _activate_speech_gate(call_sid: str, text: str):
-    """Activate speech gate to prevent user speech processing during bot TTS output"""
+    task = asyncio.create_task(_run())
+    tts_prewarm_state.update(task=task, voice=voice)
+    return task
+
+@app.on_event("startup")
+async def _prewarm_prompts_on_startup():
     try:
-        vad_state = vad_states[call_sid]
-        current_time = time.time()
-        
-        # Estimate TTS duration based on text length and speed
-        # Rough estimate: ~150 words per minute at normal speed, adjusted by TTS speed
-        word_count = len(text.split())
-        base_duration = (word_count / 150) * 60  # Base duration in seconds
-        actual_duration = base_duration / settings.OPENAI_TTS_SPEED  # Adjust for speed
-        
+        schedule_prompt_prewarm(settings.TTS_PREWARM_DELAY_SEC)
+        if settings.FILLER_AUDIO_ENABLED and settings.TTS_PREWARM_ENABLED and not settings.FORCE_SAY_ONLY:
+            asyncio.create_task(_prewarm_fillers())
+    except Exception as e:
+        logger.warning(f"Prompt pre-synthesis not started: {e}")
+
+@app.on_event("shutdown")
+async def _stop_prompt_prewarm():
+    task = tts_prewarm_state.get("task")
+    if task is not None and not task.done():
+        task.cancel()
+
+@app.on_event("shutdown")
+async def _close_twilio_call_updater():
+    if twilio_call_updater is not None:
+        await twilio_call_updater.aclose()
+
+def _estimate_speech_duration(text: str) -> float:
+    """Word-count guess at how long text takes to say: ~150 words per minute, scaled by the TTS speed."""
+    word_count = len(text.split())
+    return (word_count / 150) * 60 / settings.OPENAI_TTS_SPEED
+
+def _close_speech_gate(call_sid: str) -> int:
+    """Start suppressing caller audio; returns the sequence number that may reopen this gate."""
+    vad_state = vad_states[call_sid]
+    seq = int(vad_state.get('speech_gate_seq', 0)) + 1
+    vad_state['speech_gate_seq'] = seq
+    vad_state['speech_gate_active'] = True
+    vad_state['bot_speaking'] = True
+    vad_state['bot_speech_start_time'] = time.time()
+    return seq
+
+def _open_speech_gate(call_sid: str, seq: Optional[int] = None, reason: str = "") -> bool:
+    """
+    Let caller audio through again.
+
+    Args:
+        seq: Gate being reopened; ignored if a newer prompt has closed the gate since
+        reason: Appended to the log line
+
+    Returns:
+        True when this call opened an active gate
+    """
+    vad_state = vad_states.get(call_sid)
+    if not vad_state or (seq is not None and vad_state.get('speech_gate_seq') != seq):
+        return False
+    was_active = bool(vad_state.get('speech_gate_active'))
+    vad_state['speech_gate_active'] = False
+    vad_state['bot_speaking'] = False
+    if was_active:
+        logger.info(f"🔊 Speech gate deactivated for {call_sid}{reason}")
+    # Clear any accumulated audio during gate period to avoid processing stale audio
+    if vad_state.get('is_speaking'):
+        vad_state['is_speaking'] = False
+        vad_state['pending_audio'] = bytearray()
+        logger.debug(f"Cleared pending audio for {call_sid} after speech gate")
+    return was_active
+
+async def _activate_speech_gate(call_sid: str, text: str, duration: Optional[float] = None) -> Optional[int]:
+    """
+    Activate speech gate to prevent user speech processing during bot TTS output
+
+    Args:
+        call_sid: Call the bot is speaking on
+        text: What is being said
+        duration: Playback length when known; estimated from the word count otherwise
+
+    Returns:
+        The gate's sequence number, or None when it could not be activated
+    """
+    try:
+        if duration is None:
+            duration = _estimate_speech_duration(text)
         # Add buffer time for network latency and processing
-        buffer_time = settings.SPEECH_GATE_BUFFER_SEC
-        gate_duration = actual_duration + buffer_time
-        
-        # Activate the speech gate
-        vad_state['speech_gate_active'] = True
-        vad_state['bot_speaking'] = True
-        vad_state['bot_speech_start_time'] = current_time
-        
+        gate_duration = duration + settings.SPEECH_GATE_BUFFER_SEC
+        seq = _close_speech_gate(call_sid)
         logger.info(f"🔇 Speech gate activated for {call_sid}: {gate_duration:.2f}s (text: {len(text)} chars)")
-        
-        # Schedule gate deactivation
-        asyncio.create_task(_deactivate_speech_gate_after_delay(call_sid, gate_duration))
-        
+        asyncio.create_task(_deactivate_speech_gate_after_delay(call_sid, gate_duration, seq))
+        return seq
     except Exception as e:
         logger.error(f"Failed to activate speech gate for {call_sid}: {e}")
+        return None
 
-async def _deactivate_speech_gate_after_delay(call_sid: str, delay: float):
-    """Deactivate speech gate after estimated TTS completion"""
+async def _deactivate_speech_gate_after_delay(call_sid: str, delay: float, seq: Optional[int] = None) -> bool:
+    """Deactivate speech gate after the given playback time, unless a newer prompt re-closed it"""
     try:
         await asyncio.sleep(delay)
-        
-        vad_state = vad_states.get(call_sid)
-        if vad_state:
-            vad_state['speech_gate_active'] = False
-            vad_state['bot_speaking'] = False
-            logger.info(f"🔊 Speech gate deactivated for {call_sid} after {delay:.2f}s")
-            
-            # Clear any accumulated audio during gate period to avoid processing stale audio
-            if vad_state.get('is_speaking'):
-                vad_state['is_speaking'] = False
-                vad_state['pending_audio'] = bytearray()
-                logger.debug(f"Cleared pending audio for {call_sid} after speech gate")
-                
+        return _open_speech_gate(call_sid, seq, f" after {delay:.2f}s")
     except Exception as e:
         logger.error(f"Failed to deactivate speech gate for {call_sid}: {e}")
+        return False
+
+async def _gate_pushed_prompts(call_sid: str, clips: list, pushed_at: float) -> None:
+    """
+    Keep the speech gate closed while prompts delivered as TwiML play.
+
+    Twilio starts playing about when the TwiML lands, so the gate closes at
+    once and opens at push time + the decoded length of the clips + the
+    buffer, measured as soon as synthesis completes. Prompts without audio
+    (<Say>) fall back to the word-count estimate.
+
+    Args:
+        call_sid: Call the prompts were pushed to
+        clips: (text, mp3 TTSStream or None) per prompt, in order
+        pushed_at: time.time() of the push
+    """
+    if not clips:
+        return
+    try:
+        seq = _close_speech_gate(call_sid)
+        text = " ".join(clip_text for clip_text, _ in clips)
+        playback, measured = 0.0, True
+        for clip_text, stream in clips:
+            audio = await stream.result() if stream is not None else None
+            duration = audio_duration(audio) if audio else None
+            if duration is None:
+                measured = False
+                duration = _estimate_speech_duration(clip_text)
+            playback += duration
+        playback_end = pushed_at + playback
+        gate_end = playback_end + settings.SPEECH_GATE_BUFFER_SEC
+        logger.info(f"🔇 Speech gate for {call_sid}: {playback:.2f}s of audio "
+                    f"({'decoded' if measured else 'estimated'}), open in {max(0.0, gate_end - time.time()):.2f}s")
+        if await _deactivate_speech_gate_after_delay(call_sid, max(0.0, gate_end - time.time()), seq):
+            speech_gate_stats.record(
+                "duration", time.time(), playback_end,
+                estimate_error=(_estimate_speech_duration(text) - playback) if measured else None,
+            )
+    except Exception as e:
+        logger.error(f"Failed to gate pushed prompts for {call_sid}: {e}")
 
 def get_natural_conversation_starter(text: str, dialog: dict, call_sid: str) -> str:
     """
@@ -2720,7 +3439,14 @@ def get_natural_conversation_starter(text: str, dialog: dict, call_sid: str) ->
     # Return empty string for initial responses or when no starter is appropriate
     return ""
 
-async def add_tts_or_say_to_twiml(target, call_sid: str, text: str):
+def _personalize_prompt(call_sid: str, text: str) -> Tuple[str, Optional[str]]:
+    """
+    The words actually spoken for a dialog prompt.
+
+    Returns:
+        (speak_text, customer_name): the prompt with the caller's name and a
+        conversation starter prepended where appropriate, and the name if any
+    """
     # Get customer name from dialog state and prepend it to most messages
     dialog = call_dialog_state.get(call_sid, {})
     customer_name = dialog.get('customer_name')
@@ -2745,122 +3471,470 @@ async def add_tts_or_say_to_twiml(target, call_sid: str, text: str):
             speak_text = f"{customer_name}, {text}".replace("_", " ")
     else:
         speak_text = text.replace("_", " ")
+    return speak_text, customer_name
+
+async def add_tts_or_say_to_twiml(target, call_sid: str, text: str):
+    speak_text, customer_name = _personalize_prompt(call_sid, text)
+    segments = _template_segments(speak_text, customer_name)
     
     preview = speak_text if len(speak_text) <= 200 else speak_text[:200] + "..."
     
-    # Activate speech gate when bot starts speaking
-    await _activate_speech_gate(call_sid, speak_text)
+    # The speech gate closes when this TwiML is delivered and stays closed for what is actually played
+    gate_clips = pending_gate_clips.setdefault(call_sid, [])
     
     if settings.FORCE_SAY_ONLY:
         logger.info(f"🗣️ OpenAI TTS SAY for CallSid={call_sid}: {preview}")
+        gate_clips.append((speak_text, None))
         target.say(speak_text)
         return
-    audio = await synthesize_tts(speak_text)
-    if audio:
-        tts_audio_store[call_sid] = audio
-        # Bump version so TwiML <Play> URL changes each time (prevents identical-string dedupe)
-        v = int(tts_version_counter.get(call_sid, 0)) + 1
-        tts_version_counter[call_sid] = v
-        audio_url = f"{settings.EXTERNAL_WEBHOOK_URL}/tts/{call_sid}.mp3?v={v}"
-        logger.info(f"🗣️ OpenAI TTS PLAY for CallSid={call_sid}: url={audio_url} bytes={len(audio)} text={preview}")
+    player = media_players.get(call_sid)
+    on_stream = player is not None and player.connected
+    # Counted against the clip spoken now, which a rotated starter or new name would change
+    tts_prefetcher.claim(call_sid, tts_cache_key(speak_text, *_tts_voice_params()[0],
+                                                 audio_format="mulaw" if on_stream else "mp3"))
+    if on_stream:
+        # Spoken over the open stream when this TwiML is pushed; the <Play> is only its fallback
+        stream = open_template_tts_stream(speak_text, segments, audio_format="mulaw")
+        pending_stream_prompts.setdefault(call_sid, []).append(stream)
+        gate_clips.append((speak_text, None))
+        _prompt_catalogue().record_runtime(speak_text, stream.done)
+        key = tts_cache_key(speak_text, *_tts_voice_params()[0])
+        _remember_tts_text(key, speak_text)
+        audio_url = _tts_play_url(call_sid, key)
+        logger.info(f"🗣️ OpenAI TTS STREAM for CallSid={call_sid}: fallback url={audio_url} text={preview}")
+        target.play(audio_url)
+        return
+    cached = tts_audio_cache.contains(tts_cache_key(speak_text, *_tts_voice_params()[0]))
+    stream = open_template_tts_stream(speak_text, segments)
+    # Play as soon as the provider has sent audio; /tts/ streams the rest as it arrives
+    ready = await stream.wait_first_chunk(settings.TTS_FIRST_AUDIO_TIMEOUT_SEC)
+    _prompt_catalogue().record_runtime(speak_text, cached)
+    if ready:
+        audio_url = _tts_play_url(call_sid, stream.key)
+        logger.info(f"🗣️ OpenAI TTS PLAY for CallSid={call_sid}: url={audio_url} bytes={stream.size}{'' if stream.done else '+'} text={preview}")
+        gate_clips.append((speak_text, stream))
         target.play(audio_url)
     else:
         logger.info(f"🗣️ OpenAI TTS SAY (fallback) for CallSid={call_sid}: {preview}")
+        gate_clips.append((speak_text, None))
         target.say(speak_text)
 
+def _template_segments(speak_text: str, customer_name: Optional[str]) -> List[Tuple[str, bool]]:
+    """Split a prompt around the caller's name and any slot time, so the rest is cached once for every caller."""
+    if not settings.TTS_TEMPLATE_ENABLED:
+        return [(speak_text, False)]
+    variables = [match.group(0) for match in _SLOT_PHRASE_RE.finditer(speak_text)]
+    if customer_name:
+        variables.append(customer_name.replace("_", " "))
+    return split_template(speak_text, variables)
+
+def _predict_next_prompts(dialog: dict) -> List[str]:
+    """
+    Prompts the dialog may speak on the caller's next turn, most likely first.
+
+    Only replies whose whole text is known in the current step are listed;
+    they must match the text handle_intent passes to add_tts_or_say_to_twiml.
+    """
+    step = dialog.get('step')
+    suggested_time = dialog.get('suggested_time')
+    job = (dialog.get('intent') or {}).get('job') or {}
+    if step == 'awaiting_time_confirm' and isinstance(suggested_time, datetime):
+        return [
+            "Perfect! You'll get an SMS confirmation. Thanks for choosing SafeHarbour!",
+            "No problem. What date and time works better?",
+        ]
+    if step == 'awaiting_operator_confirm':
+        time_str = _format_slot(suggested_time) if isinstance(suggested_time, datetime) else "your requested time"
+        return [
+            f"Thanks! Your appointment is confirmed for {time_str}. Thanks for choosing SafeHarbour Plumbing Services.",
+            "Please continue to hold while our operator confirms your booking.",
+        ]
+    if step == 'awaiting_problem_details' and job.get('urgency', 'flex') != 'emergency':
+        job_type = job.get('type', 'plumbing issue')
+        return [f"Thanks for telling me more about your {_speakable(job_type)}. For your {_speakable(job_type)}, is this an emergency, or would you like to book a technician to come check it out?"]
+    if step == 'awaiting_path_choice':
+        return ["Great. Tell me your preferred time, or say 'earliest'."]
+    return []
+
+async def _prefetch_prompt(speak_text: str, segments: List[Tuple[str, bool]], audio_format: str) -> bool:
+    """Get one predicted prompt into the TTS cache; cancelling it stops synthesis it started."""
+    key = tts_cache_key(speak_text, *_tts_voice_params()[0], audio_format=audio_format)
+    started_here = key not in tts_streams
+    stream = open_template_tts_stream(speak_text, segments, audio_format)
+    try:
+        return await stream.result() is not None
+    except asyncio.CancelledError:
+        if started_here and not stream.done and stream.task is not None:
+            stream.task.cancel()
+        raise
+
+# Verbs after which the caller answers no further prompt on this call
+CALL_LEAVING_VERBS = {"Hangup", "Dial"}
+
+def _prefetch_next_prompts(call_sid: str, response: VoiceResponse) -> None:
+    """
+    On a dialog step change, start synthesizing what the caller may hear next.
+
+    Called once the turn's TwiML has been delivered; a turn that hangs up or
+    dials out has no next prompt to prepare.
+    """
+    if not settings.TTS_PREFETCH_ENABLED or settings.FORCE_SAY_ONLY:
+        return
+    if any(verb.name in CALL_LEAVING_VERBS for verb in getattr(response, "verbs", [])):
+        return
+    try:
+        dialog = call_dialog_state.get(call_sid) or {}
+        player = media_players.get(call_sid)
+        audio_format = "mulaw" if player is not None and player.connected else "mp3"
+        prompts = []
+        for text in _predict_next_prompts(dialog):
+            speak_text, customer_name = _personalize_prompt(call_sid, text)
+            key = tts_cache_key(speak_text, *_tts_voice_params()[0], audio_format=audio_format)
+            synthesize = None if tts_audio_cache.contains(key) else (
+                lambda t=speak_text, n=customer_name: _prefetch_prompt(t, _template_segments(t, n), audio_format)
+            )
+            # By the clip, not the prompt: a hit means these exact words (name, starter) are spoken
+            prompts.append((key, synthesize))
+        tts_prefetcher.predict(call_sid, (dialog.get('step'), dialog.get('suggested_time'), audio_format), prompts)
+    except Exception as e:
+        logger.debug(f"TTS prefetch skipped for {call_sid}: {e}")
+
+def _tts_play_url(call_sid: str, key: str) -> str:
+    audio_url = f"{settings.EXTERNAL_WEBHOOK_URL}/tts/{key}.mp3"
+    if tts_audio_store.get(call_sid) == key:
+        # Same clip again: bump version so the TwiML differs (prevents identical-string dedupe)
+        v = int(tts_version_counter.get(call_sid, 0)) + 1
+        tts_version_counter[call_sid] = v
+        audio_url += f"?v={v}"
+    tts_audio_store[call_sid] = key
+    return audio_url
+
+def _remember_tts_text(key: str, text: str) -> None:
+    tts_key_texts[key] = text
+    tts_key_texts.move_to_end(key)
+    while len(tts_key_texts) > TTS_KEY_ALIASES_MAX:
+        tts_key_texts.popitem(last=False)
+
+# Verbs a turn may contain and still be spoken over the open stream (the stream resume is a no-op there)
+STREAM_PLAYABLE_VERBS = {"Play", "Start", "Connect", "Pause", "Redirect"}
+
+def append_stream_resume(twiml: VoiceResponse, call_sid: str, wss_url: Optional[str] = None) -> None:
+    """
+    Append the verbs that (re)open the call's media stream and keep it listening.
+
+    With MEDIA_STREAM_PLAYBACK the stream is bidirectional (<Connect><Stream>),
+    so later prompts can be played over it; Twilio moves past <Connect> when
+    the socket drops, so a short <Pause> and a <Redirect> to /stream/resume
+    reconnect it instead of ending the call. Otherwise it is the inbound-only
+    <Start><Stream> followed by a long <Pause>.
+    """
+    wss_url = wss_url or _build_wss_url_for_resume(call_sid)
+    if settings.MEDIA_STREAM_PLAYBACK:
+        connect = Connect()
+        connect.stream(url=wss_url)
+        twiml.append(connect)
+        twiml.pause(length=1)
+        twiml.redirect(f"{settings.EXTERNAL_WEBHOOK_URL}/stream/resume/{call_sid}", method="POST")
+        return
+    start = Start()
+    start.stream(url=wss_url, track="inbound_track")
+    twiml.append(start)
+    twiml.pause(length=3600)
+
+def _open_media_player(call_sid: str, stream_sid: Optional[str]) -> None:
+    ws = manager.active_connections.get(call_sid)
+    if not settings.MEDIA_STREAM_PLAYBACK or ws is None or not stream_sid:
+        return
+    previous = media_players.pop(call_sid, None)
+    if previous is not None:
+        previous.close()
+    media_players[call_sid] = MediaStreamPlayer(ws.send_text, stream_sid)
+    logger.info(f"🔈 Media Stream playback ready for {call_sid} (stream {stream_sid})")
+
+def _close_media_player(call_sid: str) -> None:
+    player = media_players.pop(call_sid, None)
+    if player is not None:
+        player.close()
+    pending_stream_prompts.pop(call_sid, None)
+
+def _media_playback_snapshot() -> dict:
+    totals = {"prompts": 0, "frames": 0, "marks_sent": 0, "marks_acked": 0, "cleared": 0, "failed": 0}
+    for player in list(media_players.values()):
+        for name in totals:
+            totals[name] += player.counters.get(name, 0)
+    return {"enabled": settings.MEDIA_STREAM_PLAYBACK, "players": len(media_players),
+            **media_playback_stats, **totals}
+
+def _without_played_prompts(response: VoiceResponse, played: int) -> VoiceResponse:
+    """Copy of a turn's TwiML without its first `played` <Play> verbs."""
+    remaining = VoiceResponse()
+    for verb in getattr(response, "verbs", []):
+        if verb.name == "Play" and played > 0:
+            played -= 1
+            continue
+        remaining.append(verb)
+    return remaining
+
+async def _play_prompts_over_stream(call_sid: str, player: MediaStreamPlayer, prompts: list,
+                                    response: VoiceResponse, clips: Optional[list] = None,
+                                    on_delivered: Optional[Callable[[], None]] = None) -> None:
+    """
+    Speak a turn's prompts over the stream, pushing the turn's TwiML instead if the stream fails.
+
+    The speech gate closes as the turn starts playing and opens when Twilio
+    acknowledges the mark after the last prompt (plus a short echo tail). If
+    the mark is late, it opens once the audio sent should have played. A
+    barge-in clears the stream and opens the gate itself. The TwiML fallback
+    carries only the prompts that had not played, so none is heard twice.
+    on_delivered runs once every prompt has been sent or the fallback pushed.
+    """
+    clips = clips or []
+    seq = _close_speech_gate(call_sid)
+    label = ""
+    for played, stream in enumerate(prompts):
+        label = f"{stream.key[:12]}-{player.counters['prompts']}"
+        cleared = player.counters["cleared"]
+        if not await player.play(stream.iter_chunks(), label):
+            if player.connected and player.counters["cleared"] != cleared:
+                # The caller barged in; the rest of the turn is dropped, not re-sent as TwiML
+                return
+            media_playback_stats["fallbacks"] += 1
+            logger.warning(f"Media Stream playback failed for {call_sid} after {played} of {len(prompts)} "
+                           f"prompt(s); falling back to TwiML push")
+            if await _push_twiml_rest(call_sid, _without_played_prompts(response, played)):
+                if on_delivered is not None:
+                    on_delivered()
+                await _gate_pushed_prompts(call_sid, clips[played:], time.time())
+            return
+    media_playback_stats["turns"] += 1
+    if on_delivered is not None:
+        on_delivered()
+    logger.info(f"🔊 Played {len(prompts)} prompt(s) over the media stream for {call_sid}")
+
+    # Everything is sent; Twilio echoes the mark when the last frame has played
+    playback = sum(audio_duration(b"".join(stream.chunks), "mulaw") or 0.0 for stream in prompts)
+    text = " ".join(clip_text for clip_text, _ in clips)
+    estimate_error = (_estimate_speech_duration(text) - playback) if text else None
+    expected_end = time.time() + player.remaining()
+    if await player.wait_mark(label, timeout=player.remaining() + settings.SPEECH_GATE_BUFFER_SEC):
+        acked_at = time.time()
+        await asyncio.sleep(settings.SPEECH_GATE_MARK_TAIL_SEC)
+        if _open_speech_gate(call_sid, seq, " on playback mark"):
+            speech_gate_stats.record("mark", time.time(), acked_at, estimate_error)
+        return
+    if not _open_speech_gate(call_sid, seq, " (playback mark overdue)"):
+        return
+    opened_at = time.time()
+    # A mark that still arrives shows how early the gate opened
+    if await player.wait_mark(label, timeout=settings.SPEECH_GATE_BUFFER_SEC * 5):
+        speech_gate_stats.record("timeout", opened_at, time.time(), estimate_error)
+    else:
+        speech_gate_stats.record("timeout", opened_at, expected_end, estimate_error)
+
 # Push updated TwiML mid-call to Twilio
 async def push_twiml_to_call(call_sid: str, response: VoiceResponse):
-     try:
-         twiml_str = str(response)
-         # Skip if identical to last TwiML pushed
-         prev = last_twiml_store.get(call_sid)
-         now_ts = time.time()
-         if prev == twiml_str:
-             logger.info(f"Skipping TwiML push for {call_sid}: identical to last")
-             return
-         # Throttle frequent pushes
-         last_ts = last_twiml_push_ts.get(call_sid, 0)
-         if now_ts - last_ts < TWIML_PUSH_MIN_INTERVAL_SEC:
-             logger.info(f"Throttling TwiML push for {call_sid}: pushed {now_ts - last_ts:.2f}s ago")
-             return
-         last_twiml_store[call_sid] = twiml_str
-         last_twiml_push_ts[call_sid] = now_ts
-         logger.info(f"🔊 Pushing TwiML to call {call_sid}")
-         logger.debug(f"Updating call {call_sid} with TwiML: {twiml_str}")
-         if twilio_client is None:
-             logger.warning("TwiML push skipped: Twilio client unavailable")
-             return
-         loop = asyncio.get_event_loop()
-         def _update():
-             return twilio_client.calls(call_sid).update(twiml=twiml_str)  # type: ignore[union-attr]
-         result = await loop.run_in_executor(None, _update)
-         logger.info(f"Pushed TwiML update to call {call_sid}; status={getattr(result, 'status', 'unknown')}")
-     except Exception as e:
-         logger.error(f"Failed to push TwiML directly to call {call_sid}: {e}; attempting URL fallback")
-         if twilio_client is None:
-             return
-         try:
-             url = f"{settings.EXTERNAL_WEBHOOK_URL}/twiml/{call_sid}"
-             loop = asyncio.get_event_loop()
-             def _update_url():
-                 return twilio_client.calls(call_sid).update(url=url, method="GET")  # type: ignore[union-attr]
-             result = await loop.run_in_executor(None, _update_url)
-             logger.info(f"Pushed TwiML via URL to call {call_sid}; status={getattr(result, 'status', 'unknown')} url={url}")
-         except Exception as e2:
-             logger.error(f"URL fallback also failed for call {call_sid}: {e2}")
-
-def extract_name_from_text(text: str) -> str:
-    """Extract customer name from text response"""
-    import re
-    
-    # Normalize and clean the text
+    """
+    Deliver a turn's TwiML.
+
+    When its prompts were synthesized for Media Stream playback and the turn
+    only speaks and keeps listening, the audio goes out over the open stream
+    and no TwiML is pushed. Anything else (dial, hangup, a dropped stream)
+    updates the call through the Twilio REST API. Once delivered, the next
+    step's likely prompts are prefetched.
+    """
+    prompts = pending_stream_prompts.pop(call_sid, None)
+    clips = pending_gate_clips.pop(call_sid, [])
+    player = media_players.get(call_sid)
+    if prompts and player is not None and player.connected:
+        verbs = [verb.name for verb in getattr(response, "verbs", [])]
+        if all(name in STREAM_PLAYABLE_VERBS for name in verbs) and verbs.count("Play") == len(prompts):
+            asyncio.create_task(_play_prompts_over_stream(
+                call_sid, player, prompts, response, clips,
+                on_delivered=lambda: _prefetch_next_prompts(call_sid, response),
+            ))
+            _turn_answered(call_sid)
+            return
+    if await _push_twiml_rest(call_sid, response):
+        _turn_answered(call_sid)
+        if clips:
+            asyncio.create_task(_gate_pushed_prompts(call_sid, clips, time.time()))
+        _prefetch_next_prompts(call_sid, response)
+
+async def _push_twiml_rest(call_sid: str, response: VoiceResponse, filler: bool = False) -> bool:
+    """
+    Update the call with this TwiML through the Twilio REST API.
+
+    Pushes to a call are coalesced: one arriving within
+    TWIML_PUSH_MIN_INTERVAL_SEC of the previous push waits for the interval,
+    and is dropped if a newer TwiML for the call replaces it meanwhile.
+
+    Args:
+        call_sid: Call to update
+        response: TwiML to run
+        filler: This is the turn's filler, which does not wait out its own hold
+
+    Returns:
+        True once this TwiML has been pushed; False if it was superseded, repeated
+        the TwiML already on the call or failed, so nothing new is playing
+    """
+    try:
+        twiml_str = str(response)
+        # Latest TwiML for the URL fallback, even while its push is still waiting
+        last_twiml_store[call_sid] = twiml_str
+        # Right after a filler only its own length (and the fetch allowance) is waited out, not the full push interval
+        hold = None if filler else _filler_hold(call_sid)
+        pushed = await twiml_pusher.submit(call_sid, twiml_str, min_interval=hold)
+        if not pushed:
+            logger.info(f"TwiML for {call_sid} not pushed (superseded by a newer response, a duplicate or failed)")
+        return pushed
+    except Exception as e:
+        logger.error(f"Failed to schedule TwiML push for {call_sid}: {e}")
+        return False
+
+async def _send_twiml_update(call_sid: str, twiml_str: str) -> None:
+    """Send one TwiML update, falling back to having Twilio fetch it from /twiml/{call_sid}."""
+    if twilio_call_updater is None:
+        logger.warning("TwiML push skipped: Twilio client unavailable")
+        return
+    logger.info(f"🔊 Pushing TwiML to call {call_sid}")
+    logger.debug(f"Updating call {call_sid} with TwiML: {twiml_str}")
+    try:
+        result = await twilio_call_updater.update(call_sid, Twiml=twiml_str)
+        logger.info(f"Pushed TwiML update to call {call_sid}; status={result.get('status', 'unknown')}")
+    except Exception as e:
+        logger.error(f"Failed to push TwiML directly to call {call_sid}: {e}; attempting URL fallback")
+        url = f"{settings.EXTERNAL_WEBHOOK_URL}/twiml/{call_sid}"
+        try:
+            result = await twilio_call_updater.update(call_sid, Url=url, Method="GET")
+            logger.info(f"Pushed TwiML via URL to call {call_sid}; status={result.get('status', 'unknown')} url={url}")
+        except Exception as e2:
+            logger.error(f"URL fallback also failed for call {call_sid}: {e2}")
+            raise
+
+twiml_pusher = TwiMLPushCoalescer(lambda sid, xml: _send_twiml_update(sid, xml), min_interval=TWIML_PUSH_MIN_INTERVAL_SEC)
+
+def _begin_turn(call_sid: str) -> None:
+    """The caller has stopped speaking: start timing the bot's answer."""
+    turn_timings[call_sid] = {"started": time.time(), "first_audible": None, "filler": False, "filler_hold": None}
+
+def _turn_answered(call_sid: str) -> None:
+    """The turn's response has been delivered: record perceived and total latency."""
+    turn = turn_timings.pop(call_sid, None)
+    if turn is None:
+        return
+    now = time.time()
+    first_audible = turn["first_audible"] or now
+    turn_latency_stats.record(first_audible - turn["started"], now - turn["started"], turn["filler"])
+
+def _filler_hold(call_sid: str) -> Optional[float]:
+    turn = turn_timings.get(call_sid)
+    return turn.get("filler_hold") if turn else None
+
+def _next_filler_text(call_sid: str) -> str:
+    info = call_info_store.setdefault(call_sid, {})
+    count = int(info.get('filler_count', 0))
+    info['filler_count'] = count + 1
+    return FILLER_PROMPTS[count % len(FILLER_PROMPTS)]
+
+async def _play_filler(call_sid: str) -> bool:
+    """
+    Play a cached acknowledgement while the turn's response is still being worked out.
+
+    Over the Media Stream the response's audio queues behind it. On the TwiML
+    path it is pushed like any turn, and the response push waits only for the
+    filler's length plus SPEECH_GATE_BUFFER_SEC (Twilio's fetch of the clip),
+    counted from when the filler push completed. A filler that is not cached
+    yet is not played; the synthesis this starts serves the next slow turn.
+
+    Returns:
+        True when the filler was delivered
+    """
+    text = _next_filler_text(call_sid)
+    player = media_players.get(call_sid)
+    on_stream = player is not None and player.connected
+    stream = open_tts_stream(text, audio_format="mulaw" if on_stream else "mp3")
+    if not stream.done or not stream.cache_key:
+        turn_latency_stats.counters["fillers_skipped"] += 1
+        logger.info(f"⏳ Filler '{text}' not cached yet for {call_sid}; staying silent")
+        return False
+    response = VoiceResponse()
+    if on_stream:
+        key = tts_cache_key(text, *_tts_voice_params()[0])
+        _remember_tts_text(key, text)
+        response.play(_tts_play_url(call_sid, key))
+        append_stream_resume(response, call_sid)
+        asyncio.create_task(_play_prompts_over_stream(call_sid, player, [stream], response, [(text, None)]))
+    else:
+        response.play(_tts_play_url(call_sid, stream.key))
+        append_stream_resume(response, call_sid)
+        turn = turn_timings.get(call_sid)
+        if turn is not None:
+            duration = audio_duration(await stream.result())
+            turn["filler_hold"] = duration + settings.SPEECH_GATE_BUFFER_SEC if duration else None
+        if not await _push_twiml_rest(call_sid, response, filler=True):
+            return False
+        asyncio.create_task(_gate_pushed_prompts(call_sid, [(text, stream)], time.time()))
+    turn = turn_timings.get(call_sid)
+    if turn is not None and turn["first_audible"] is None:
+        turn["first_audible"] = time.time()
+        turn["filler"] = True
+    logger.info(f"⏳ Played filler '{text}' for {call_sid} while the response is prepared")
+    return True
+
+async def _respond_with_filler(call_sid: str, work: Awaitable[Any]) -> Any:
+    """
+    Await the slow part of a turn, playing a filler if it runs past FILLER_DELAY_SEC.
+
+    Args:
+        call_sid: Call whose turn this is
+        work: Builds the response (e.g. handle_intent)
+
+    Returns:
+        Whatever work returns
+    """
+    task = asyncio.ensure_future(work)
+    if settings.FILLER_AUDIO_ENABLED and not settings.FORCE_SAY_ONLY and call_sid in turn_timings:
+        done, _ = await asyncio.wait({task}, timeout=settings.FILLER_DELAY_SEC)
+        if not done:
+            asyncio.create_task(_play_filler(call_sid))
+    return await task
+
+async def _prewarm_fillers() -> None:
+    """Synthesize the filler prompts into the TTS cache in the format turns will play them in."""
+    audio_format = "mulaw" if settings.MEDIA_STREAM_PLAYBACK else "mp3"
+    for text in FILLER_PROMPTS:
+        await open_tts_stream(text, audio_format=audio_format).result()
+
+def _validate_extracted_name(name: Optional[str], source_text: str) -> Optional[str]:
+    """Validate a model-extracted name against the utterance it came from."""
+    if not name:
+        return None
+    name = name.strip()
+    if name.lower() in ['none', 'no', 'n/a', '']:
+        return None
+    # Basic validation - should be letters, hyphens, apostrophes, reasonable length
+    # Allow common punctuation like periods, commas, exclamation marks
+    if (len(name) >= 2 and len(name) <= 50 and 
+        all(char.isalpha() or char in ['-', "'", ' '] for char in name) and
+        not any(char.isdigit() for char in source_text) and
+        not any(char in ['@', '#', '$', '%', '&', '*', '+', '=', '<', '>', '[', ']', '{', '}', '(', ')', '|', '\\', '/', '`', '~', '^'] for char in source_text)):
+        return name.title()
+    return None
+
+def extract_name_from_text(text: str, allow_gpt: bool = True) -> Optional[str]:
+    """
+    Extract customer name from text response.
+
+    The offline gazetteer recognizer decides first; GPT is asked only when it
+    abstains. Set allow_gpt=False when the caller runs its own turn analysis.
+    """
+    recognizer = get_name_recognizer()
+    match = recognizer.recognize(text)
+    if not match.abstained or not allow_gpt:
+        return match.name
+
     text = text.strip().lower()
-    
-    # Common name introduction patterns
-    name_patterns = [
-        r"(?:my name is|i'm|i am|this is|it's|it is|call me)\s+([a-zA-ZÀ-ÿ][a-zA-ZÀ-ÿ\s\-']+)",
-        r"^([a-zA-ZÀ-ÿ][a-zA-ZÀ-ÿ\s\-']+?)(?:\s+here|[.,!?]?\s*$)",  # Simple name at start, with optional punctuation
-        r"(?:i saw|i met|i know)\s+([a-zA-ZÀ-ÿ][a-zA-ZÀ-ÿ\s\-']+)",  # "I saw Daniel" type patterns
-        r"(?:this is|that's|that is)\s+([a-zA-ZÀ-ÿ][a-zA-ZÀ-ÿ\s\-']+)",  # "This is Daniel" type patterns
-        r"^(?:um|uh|well|so|like|just)\s+([a-zA-ZÀ-ÿ][a-zA-ZÀ-ÿ\s\-']+)",  # Handle filler words before names
-    ]
-    
-    for pattern in name_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            name = match.group(1).strip().title()
-            # Filter out common non-name words
-            skip_words = {
-                'hello', 'hi', 'hey', 'good', 'morning', 'afternoon', 'evening', 
-                'yes', 'yeah', 'yep', 'sure', 'okay', 'ok', 'calling', 'about',
-                'speaking', 'here', 'with', 'you', 'the', 'a', 'an', 'and',
-                'saw', 'met', 'know', 'is', 'that',
-                'thank', 'thanks', 'no', 'nope', 'nah',
-                'um', 'uh', 'well', 'so', 'like', 'just'
-            }
-            # Check if any word in the name is in skip words
-            name_words = name.lower().split()
-            if (not any(word in skip_words for word in name_words) and 
-                len(name) >= 2 and len(name) <= 50 and 
-                not any(char.isdigit() for char in name) and
-                all(char.isalpha() or char in ['-', "'", ' '] for char in name)):
-                
-                # For multi-word names, return only the first word
-                if ' ' in name:
-                    first_name = name.split()[0]
-                    # Only return if first name is not a skip word
-                    if first_name.lower() not in skip_words:
-                        return first_name
-                else:
-                    return name
-    
-    # If no name found with regex patterns, try GPT as fallback
     try:
-        from openai import OpenAI
-        import os
-        
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
         prompt = f"""
         Extract the person's name from this text. Return ONLY the name, nothing else.
         If no clear name is found, return "None".
@@ -2882,19 +3956,9 @@ def extract_name_from_text(text: str) -> str:
             temperature=0
         )
         
-        name = response.choices[0].message.content.strip()
-        
-        # Validate the response
-        if name.lower() in ['none', 'no', 'n/a', '']:
-            return None
-            
-        # Basic validation - should be letters, hyphens, apostrophes, reasonable length
-        # Allow common punctuation like periods, commas, exclamation marks
-        if (name and len(name) >= 2 and len(name) <= 50 and 
-            all(char.isalpha() or char in ['-', "'", ' '] for char in name) and
-            not any(char.isdigit() for char in text) and
-            not any(char in ['@', '#', '$', '%', '&', '*', '+', '=', '<', '>', '[', ']', '{', '}', '(', ')', '|', '\\', '/', '`', '~', '^'] for char in text)):
-            return name.title()
+        name = _validate_extracted_name(response.choices[0].message.content.strip(), text)
+        recognizer.record_fallback(name)
+        return name
             
     except Exception as e:
         logger.debug(f"GPT name extraction failed: {e}")
@@ -3084,26 +4148,16 @@ GOODBYE_PATTERNS = {
     "thanks for your time", "appreciate it", "no thank you", "nothing else", "all set", "we're good"
 }
 
-def is_goodbye_statement(text: str) -> bool:
+def is_goodbye_statement(text: Union[str, UtteranceAnalysis]) -> bool:
     """Detect if user is trying to end the call politely"""
-    norm = " ".join(text.lower().split())
+    utterance = analyze_utterance(text)
     
     # Check for exact matches
-    if norm in GOODBYE_PATTERNS:
+    if utterance.norm in GOODBYE_PATTERNS:
         return True
     
     # Check for partial matches
-    goodbye_keywords = [
-        "thank you for listening", "thank you for watching", "see you next time",
-        "have a good day", "take care", "thanks for your time", "appreciate it",
-        "we're done", "we are done", "all set", "we're good", "we are good"
-    ]
-    
-    for pattern in goodbye_keywords:
-        if pattern in norm:
-            return True
-    
-    return False
+    return utterance.has_any(GOODBYE_KEYWORDS)
 
 def has_no_clear_service_intent(intent: dict) -> bool:
     """Check if the intent lacks clear plumbing service indicators"""
@@ -3124,8 +4178,8 @@ def has_no_clear_service_intent(intent: dict) -> bool:
     
     return False
 
-def is_negative_response(text: str) -> bool:
-    norm = " ".join(text.lower().split())
+def is_negative_response(text: Union[str, UtteranceAnalysis]) -> bool:
+    norm = analyze_utterance(text).norm
     if norm in NEGATIVE_PATTERNS:
         return True
     # Prefix matches for common closers
@@ -3143,35 +4197,32 @@ AFFIRMATIVE_PATTERNS = {
     "that sounds right", "that's right", "that is right", "i agree", "agreed"
 }
 
-def is_affirmative_response(text: str) -> bool:
-    norm = " ".join((text or "").lower().strip().strip(".,!?").split())
+# Explicit booking/confirmation phrases accepted anywhere in the utterance
+AFFIRMATIVE_EXPLICIT_RE = re.compile(
+    r"\bbook(\s+it|\s+that)?\b|\bconfirm\b|\bschedule(\s+it)?\b|\bgo ahead\b|\bthat works\b"
+    r"|\bsounds good\b|\blet'?s do it\b|\bdo it\b|\bplease book\b"
+)
+
+SHORT_CONFIRMATION_WORDS = {
+    "yes", "yeah", "yep", "yup", "ok", "okay", "sure", "correct", "affirmative", "done", "right", "exactly",
+    "absolutely", "definitely"
+}
+
+def is_affirmative_response(text: Union[str, UtteranceAnalysis]) -> bool:
+    utterance = analyze_utterance(text)
+    norm = utterance.stripped
     if norm in AFFIRMATIVE_PATTERNS:
         return True
     # Token-based checks
-    words = norm.split()
+    words = utterance.tokens
     # Short generic confirmations only (avoid long sentences like "yeah, my ...")
-    if len(words) <= 3 and words[0] in {"yes", "yeah", "yep", "yup", "ok", "okay", "sure", "correct", "affirmative", "done", "right", "exactly", "absolutely", "definitely"}:
+    if words and len(words) <= 3 and words[0] in SHORT_CONFIRMATION_WORDS:
         return True
     # Vocal confirmations that might be transcribed differently
-    vocal_confirms = ["uh huh", "mm hmm", "mhm", "for sure", "of course", "you bet"]
-    if norm in vocal_confirms:
+    if norm in VOCAL_CONFIRMATIONS:
         return True
     # Explicit booking/confirmation phrases anywhere in the utterance
-    explicit_patterns = [
-        r"\bbook(\s+it|\s+that)?\b",
-        r"\bconfirm\b",
-        r"\bschedule(\s+it)?\b",
-        r"\bgo ahead\b",
-        r"\bthat works\b",
-        r"\bsounds good\b",
-        r"\blet'?s do it\b",
-        r"\bdo it\b",
-        r"\bplease book\b",
-    ]
-    for pat in explicit_patterns:
-        if re.search(pat, norm):
-            return True
-    return False
+    return AFFIRMATIVE_EXPLICIT_RE.search(norm) is not None
 
 # STRICT yes/no confirmation for appointment scheduling
 STRICT_YES_PATTERNS = {
@@ -3186,63 +4237,35 @@ STRICT_NO_PATTERNS = {
     "incorrect", "maybe not", "probably not", "i don't think so", "i don't agree"
 }
 
-def is_strict_affirmative_response(text: str) -> bool:
+def is_strict_affirmative_response(text: Union[str, UtteranceAnalysis]) -> bool:
     """Flexible yes detection for appointment confirmation - accepts any response with affirmative intent"""
-    norm = " ".join((text or "").lower().strip().strip(".,!?").split())
-    
-    # Check for any form of "yes" anywhere in the text
-    if any(word in norm for word in ["yes", "yeah", "yep", "yup"]):
-        return True
-    
-    # Check for positive confirmation words
-    positive_words = ["sure", "okay", "ok", "correct", "right", "absolutely", "definitely", "perfect", "great", "good", "sounds good", "works", "fine"]
-    if any(word in norm for word in positive_words):
-        return True
-    
-    # Check for positive phrases
-    positive_phrases = ["let's do it", "that works", "that sounds good", "i'll take it", "book it", "schedule it", "go ahead", "do it", "sounds great", "looks good", "works for me", "i'm good", "that's good"]
-    if any(phrase in norm for phrase in positive_phrases):
-        return True
-    
-    # Vocal confirmations
-    if any(vocal in norm for vocal in ["uh huh", "mm hmm", "mhm", "for sure", "of course", "you bet"]):
-        return True
+    utterance = analyze_utterance(text)
     
-    return False
+    # Any form of "yes", positive words/phrases or vocal confirmation anywhere in the text
+    return (utterance.has_any(STRICT_YES_KEYWORDS) or
+            utterance.has_any(STRICT_POSITIVE_KEYWORDS) or
+            utterance.has_any(STRICT_POSITIVE_PHRASES) or
+            utterance.has_any(VOCAL_CONFIRMATIONS))
 
-def is_strict_negative_response(text: str) -> bool:
+def is_strict_negative_response(text: Union[str, UtteranceAnalysis]) -> bool:
     """Flexible no detection for appointment confirmation - accepts any response with negative intent"""
-    norm = " ".join((text or "").lower().strip().strip(".,!?").split())
-    
-    # Check for any form of "no" anywhere in the text
-    if any(word in norm for word in ["no", "nope", "nah"]):
-        return True
-    
-    # Check for negative words
-    negative_words = ["not", "can't", "cannot", "won't", "will not", "don't", "do not", "doesn't", "does not", "unable", "unavailable", "busy", "conflict"]
-    if any(word in norm for word in negative_words):
-        return True
-    
-    # Check for negative phrases
-    negative_phrases = ["that doesn't work", "that does not work", "not that time", "not today", "can't make it", "cannot make it", "not available", "busy then", "have other plans", "doesn't work", "does not work", "not good", "not right", "wrong time", "bad time"]
-    if any(phrase in norm for phrase in negative_phrases):
-        return True
-    
-    # Vocal negations
-    if any(vocal in norm for vocal in ["uh uh", "nuh uh", "mm mm", "not really", "maybe not", "probably not"]):
-        return True
-    
-    # Common negative expressions
-    if any(expr in norm for expr in ["i don't think so", "i don't agree", "that's not right", "that's wrong"]):
-        return True
+    utterance = analyze_utterance(text)
     
-    return False
+    # Any form of "no", negative words/phrases, vocal negations or common negative expressions
+    return (utterance.has_any(STRICT_NO_KEYWORDS) or
+            utterance.has_any(STRICT_NEGATIVE_KEYWORDS) or
+            utterance.has_any(STRICT_NEGATIVE_PHRASES) or
+            utterance.has_any(VOCAL_NEGATIONS) or
+            utterance.has_any(NEGATIVE_EXPRESSIONS))
 
 def _speakable(text: Optional[str]) -> str:
     if not text:
         return ""
     return " ".join(text.replace("_", " ").split())
 
+# A slot as _format_slot speaks it, e.g. "tomorrow at 9:00 AM" or "March 4 at 2:30 PM"
+_SLOT_PHRASE_RE = re.compile(r"\b(?:today|tomorrow|[A-Z][a-z]+ \d{1,2}) at \d{1,2}:\d{2} [AP]M\b")
+
 def _format_slot(dt: datetime) -> str:
     # Format: Month D at H:MM AM/PM (no year) - more natural speech
     now = datetime.now()
@@ -3283,7 +4306,7 @@ def _is_slot_free_with_buffer(
 ) -> bool:
     try:
         if calendar is None:
-            calendar = CalendarAdapter()
+            calendar = get_calendar_adapter()
         if not getattr(calendar, "enabled", False):
             return True
         candidate_start = candidate_start.replace(second=0, microsecond=0)
@@ -3291,170 +4314,150 @@ def _is_slot_free_with_buffer(
         check_start = candidate_start - timedelta(minutes=buffer_minutes)
         check_end = candidate_end + timedelta(minutes=buffer_minutes)
         events = calendar.get_events(start_date=check_start, end_date=check_end)
-        for ev in events or []:
-            s_raw = ((ev.get("start") or {}).get("dateTime") or "")
-            e_raw = ((ev.get("end") or {}).get("dateTime") or "")
-            if not s_raw or not e_raw:
-                continue
-            try:
-                s = datetime.fromisoformat(s_raw.replace("Z", "+00:00"))
-                e = datetime.fromisoformat(e_raw.replace("Z", "+00:00"))
-                # Normalize to naive UTC for comparison with naive check_start/check_end
-                if s.tzinfo is not None:
-                    s = s.astimezone(timezone.utc).replace(tzinfo=None)
-                if e.tzinfo is not None:
-                    e = e.astimezone(timezone.utc).replace(tzinfo=None)
-            except Exception:
-                continue
-            # Overlap if event intersects the [check_start, check_end) window
-            if not (e <= check_start or s >= check_end):
-                return False
-        return True
+        # Overlap if any timed event intersects the [check_start, check_end) window
+        return BusyIndex.from_events(events).is_free(check_start, check_end)
     except Exception:
         return True
 
 
-def find_next_compliant_slot(
+def _technician_calendar(technician):
+    try:
+        if technician.calendar_id:
+            return get_calendar_adapter(technician.calendar_id)
+        return get_calendar_adapter()
+    except Exception:
+        return None
+
+
+def find_compliant_assignments(
     earliest_start: datetime,
     emergency: bool = False,
     duration_minutes: int = 120,
     search_horizon_hours: int = 72,
-) -> datetime:
+    count: int = 3,
+    buffer_minutes: int = 60,
+) -> List[SlotAssignment]:
+    """
+    Find the earliest bookable (technician, start) pairs across all technicians' calendars.
+
+    Args:
+        earliest_start: Earliest acceptable start
+        emergency: Emergency jobs start no sooner than 30 minutes from now
+        duration_minutes: Job length
+        search_horizon_hours: How far past the first candidate to search
+        count: Number of assignments to return
+        buffer_minutes: Free time required before and after the job
+
+    Returns:
+        Up to `count` assignments with quarter-hour aligned starts; the first
+        technician at the aligned earliest start when no calendar is enabled or
+        nothing is free in the horizon
+    """
     now = datetime.now()
     base = earliest_start
     if emergency:
         min_emergency_start = now + timedelta(minutes=30)
         if base < min_emergency_start:
             base = min_emergency_start
-    try:
-        cal = CalendarAdapter()
-    except Exception:
-        cal = None
+    technicians = get_technicians()
+    calendars = [_technician_calendar(tech) for tech in technicians]
     # Align to next quarter hour
     start = _ceil_to_quarter_hour(base)
-    # If calendar disabled, just return aligned start
-    if not getattr(cal, "enabled", False):
-        return start
-    # Scan forward in 15-minute increments for an available slot
+    # If no calendar is enabled, just return aligned starts
+    if not any(getattr(cal, "enabled", False) for cal in calendars):
+        return [SlotAssignment(technicians[0], start + timedelta(minutes=duration_minutes * i)) for i in range(count)]
     horizon_end = start + timedelta(hours=search_horizon_hours)
-    step = timedelta(minutes=15)
-    candidate = start
-    while candidate <= horizon_end:
-        if _is_slot_free_with_buffer(candidate, duration_minutes=duration_minutes, buffer_minutes=60, calendar=cal):
-            return candidate
-        candidate += step
+    try:
+        matrix = AvailabilityMatrix.fetch(
+            technicians,
+            calendars,
+            start - timedelta(minutes=buffer_minutes),
+            horizon_end + timedelta(minutes=duration_minutes + buffer_minutes),
+        )
+    except Exception as e:
+        logger.warning(f"Free/busy fetch failed, offering unchecked slot: {e}")
+        return [SlotAssignment(technicians[0], start)]
+    assignments = matrix.earliest(start, horizon_end, duration_minutes, buffer_minutes, count=count)
     # Fallback to start if nothing found
-    return start
-
-def _normalize_relative_datetime_phrases(text: str, now: datetime) -> str:
-    norm = text
-    # Normalize possessives like "today's", "tuesday's"
-    norm = re.sub(r"\b(today)'?s\b", r"\1", norm, flags=re.I)
-    norm = re.sub(r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday)'?s\b", r"\1", norm, flags=re.I)
-
-    # Handle today/tomorrow/tonight
-    if re.search(r"\btomorrow\b", norm, re.I):
-        d = (now + timedelta(days=1)).strftime("%Y-%m-%d")
-        norm = re.sub(r"\btomorrow\b", d, norm, flags=re.I)
-    if re.search(r"\btoday\b", norm, re.I):
-        d = now.strftime("%Y-%m-%d")
-        norm = re.sub(r"\btoday\b", d, norm, flags=re.I)
-    if re.search(r"\btonight\b", norm, re.I):
-        d = now.strftime("%Y-%m-%d")
-        norm = re.sub(r"\btonight\b", f"{d} 7 pm", norm, flags=re.I)
-
-    # Handle "in N days/weeks/hours" (digits or words)
-    number_words = {
-        'zero': 0, 'one': 1, 'a': 1, 'an': 1, 'two': 2, 'couple': 2, 'three': 3, 'four': 4, 'five': 5,
-        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13,
-        'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19,
-        'twenty': 20, 'thirty': 30
-    }
+    return assignments or [SlotAssignment(technicians[0], start)]
 
-    def repl_in_duration(m: re.Match) -> str:
-        qty_str = m.group(1).lower()
-        unit = m.group(2).lower()
-        if qty_str.isdigit():
-            qty = int(qty_str)
-        else:
-            qty = number_words.get(qty_str)
-        if qty is None:
-            return m.group(0)
-        if unit.startswith('hour'):
-            target = now + timedelta(hours=qty)
-            return target.strftime('%Y-%m-%d %H:%M')
-        if unit.startswith('week'):
-            target = now + timedelta(days=qty * 7)
-            return target.strftime('%Y-%m-%d')
-        # default days
-        target = now + timedelta(days=qty)
-        return target.strftime('%Y-%m-%d')
-
-    norm = re.sub(r"\bin\s+(\d+|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty|thirty|a|an|couple)\s+(day|days|week|weeks|hour|hours)\b",
-                   repl_in_duration, norm, flags=re.I)
-
-    # Handle parts of day when no explicit time provided
-    norm = re.sub(r"\bmorning\b", "9 am", norm, flags=re.I)
-    norm = re.sub(r"\bafternoon\b", "2 pm", norm, flags=re.I)
-    norm = re.sub(r"\bevening\b", "6 pm", norm, flags=re.I)
-
-    # Weekday handling
-    days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-
-    def date_for_weekday(name: str, use_next: bool) -> str:
-        wd = days.index(name)
-        delta = (wd - now.weekday()) % 7
-        if delta == 0:
-            delta = 7 if use_next else 0
-        target = now + timedelta(days=delta)
-        return target.strftime("%Y-%m-%d")
-
-    # next <weekday>
-    for dname in days:
-        norm = re.sub(rf"\bnext\s+{dname}\b", date_for_weekday(dname, True), norm, flags=re.I)
-    # this <weekday>
-    for dname in days:
-        norm = re.sub(rf"\bthis\s+{dname}\b", date_for_weekday(dname, False), norm, flags=re.I)
-    # bare weekday → pick next occurrence if same-day has likely passed
-    for dname in days:
-        norm = re.sub(rf"\b{dname}\b", date_for_weekday(dname, False), norm, flags=re.I)
-
-    return norm
+
+def find_compliant_slots(
+    earliest_start: datetime,
+    emergency: bool = False,
+    duration_minutes: int = 120,
+    search_horizon_hours: int = 72,
+    count: int = 3,
+    buffer_minutes: int = 60,
+) -> List[datetime]:
+    """
+    Start times of find_compliant_assignments, without repeats when several
+    technicians are free at the same time.
+
+    Every technician can share one start, so count per technician are searched
+    to still find `count` distinct starts when the horizon has them.
+    """
+    starts: List[datetime] = []
+    for assignment in find_compliant_assignments(
+        earliest_start,
+        emergency=emergency,
+        duration_minutes=duration_minutes,
+        search_horizon_hours=search_horizon_hours,
+        count=count * max(1, len(get_technicians())),
+        buffer_minutes=buffer_minutes,
+    ):
+        if assignment.start not in starts:
+            starts.append(assignment.start)
+            if len(starts) == count:
+                break
+    return starts
 
 
+def find_next_compliant_slot(
+    earliest_start: datetime,
+    emergency: bool = False,
+    duration_minutes: int = 120,
+    search_horizon_hours: int = 72,
+) -> datetime:
+    return find_compliant_slots(
+        earliest_start,
+        emergency=emergency,
+        duration_minutes=duration_minutes,
+        search_horizon_hours=search_horizon_hours,
+        count=1,
+    )[0]
+
 def parse_human_datetime(text: str, now: Optional[datetime] = None) -> Optional[datetime]:
-    try:
-        from dateutil import parser as _dtparser  # lazy import
-    except Exception:
-        return None
-    if now is None:
-        now = datetime.now()
-    
-    # Create a clean default time (same date as now, but at midnight)
-    # This prevents inheriting current minutes/seconds when only hour is specified
-    clean_default = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    prepared = _normalize_relative_datetime_phrases(text, now)
-    try:
-        dt = _dtparser.parse(prepared, fuzzy=True, default=clean_default)
-        
-        # If the parsed time is in the past and only a time was specified,
-        # assume it's for tomorrow
-        if dt < now and not any(word in text.lower() for word in ['today', 'tomorrow', 'yesterday']):
-            # Check if it looks like just a time specification
-            import re
-            if re.search(r'\b\d{1,2}(:\d{2})?\s*(am|pm|a\.?m\.?|p\.?m\.?)\b', text.lower()):
-                dt = dt + timedelta(days=1)
-        
-        return dt
-    except Exception:
-        return None
+    """
+    Parse a scheduling phrase ("tomorrow at 3", "next tuesday morning", "half past two").
+
+    Uses the local grammar in services/datetime_grammar.py; returns None both when
+    the text has no time and when the grammar abstains (see parse_relative_datetime
+    to tell those apart before falling back to gpt_infer_datetime_phrase).
+    """
+    return parse_relative_datetime(text, now).value
+
+
+def infer_requested_datetime(text: str) -> Optional[datetime]:
+    """Parse a requested time with the local grammar; only a phrase it abstains on goes to the LLM."""
+    parsed = parse_relative_datetime(text)
+    if parsed.abstained:
+        return gpt_infer_datetime_phrase(text)
+    return parsed.value
 
 
 def gpt_infer_datetime_phrase(text: str, now_dt: Optional[datetime] = None) -> Optional[datetime]:
     try:
         if now_dt is None:
             now_dt = datetime.now()
+        cache_key = LLMResultCache.make_key(
+            "datetime", text,
+            prompt_version=GPT_DATETIME_PROMPT_VERSION,
+            date_bucket=date_bucket_for(text, now_dt),
+        )
+        found, cached = _llm_cache_lookup(cache_key)
+        if found:
+            return cached
         system = (
             "You extract a single scheduling datetime from a short phrase. "
             "Use the provided NOW as the reference for relative expressions. "
@@ -3492,7 +4495,9 @@ def gpt_infer_datetime_phrase(text: str, now_dt: Optional[datetime] = None) -> O
         if not iso_str:
             return None
         from dateutil import parser as _dtparser  # type: ignore
-        return _dtparser.parse(iso_str)
+        parsed = _dtparser.parse(iso_str)
+        _llm_cache_store(cache_key, parsed)
+        return parsed
     except Exception as e:
         logger.debug(f"GPT datetime inference failed: {e}")
         return None
@@ -3583,12 +4588,8 @@ async def handle_intent(call_sid: str, intent: dict, followup_text: str = None):
 
     # Helper: append stream-and-pause so audio resumes streaming after we speak
     def append_stream_and_pause(resp: VoiceResponse):
-        start = Start()
-        wss_url_local = _build_wss_url_for_resume(call_sid)
-        start.stream(url=wss_url_local, track="inbound_track")
-        resp.append(start)
-        resp.pause(length=3600)
-        logger.info(f"Appended stream resume to TwiML for {call_sid} -> {wss_url_local}")
+        append_stream_resume(resp, call_sid)
+        logger.info(f"Appended stream resume to TwiML for {call_sid}")
 
     # Check for goodbye statements or unclear service intent BEFORE proceeding with booking flow
     original_text = followup_text or intent.get('job', {}).get('description', '')
@@ -3681,7 +4682,7 @@ async def handle_intent(call_sid: str, intent: dict, followup_text: str = None):
             # Now proceed with the original emergency vs scheduling flow
             if urgency == 'emergency':
                 try:
-                    calendar_adapter = CalendarAdapter()
+                    calendar_adapter = get_calendar_adapter()
                     now = datetime.now()
                     # Emergency: at least 30 minutes from now, quarter-hour aligned, 1h buffer from other jobs
                     earliest = now + timedelta(minutes=30)
@@ -3932,7 +4933,7 @@ async def handle_intent(call_sid: str, intent: dict, followup_text: str = None):
             # If user provided a new date/time at confirmation step, re-parse and re-suggest
             newly_parsed = parse_human_datetime(followup_text)
             if newly_parsed:
-                calendar_adapter = CalendarAdapter()
+                calendar_adapter = get_calendar_adapter()
                 events = []
                 if getattr(calendar_adapter, 'enabled', False):
                     end_time = newly_parsed + timedelta(hours=2)
@@ -3993,14 +4994,12 @@ async def handle_intent(call_sid: str, intent: dict, followup_text: str = None):
                 return twiml
         # If user gives a date/time directly, recognize but don't book yet
         try:
-            preferred_time = parse_human_datetime(followup_text)
-            if not preferred_time:
-                preferred_time = gpt_infer_datetime_phrase(followup_text)
+            preferred_time = infer_requested_datetime(followup_text)
             if preferred_time:
                 try:
                     # Regular jobs: align to quarter-hour and respect 1h buffer
                     requested = _ceil_to_quarter_hour(preferred_time)
-                    cal = CalendarAdapter()
+                    cal = get_calendar_adapter()
                     if _is_slot_free_with_buffer(requested, duration_minutes=120, buffer_minutes=60, calendar=cal):
                         await add_tts_or_say_to_twiml(
                             twiml,
@@ -4054,7 +5053,7 @@ async def handle_intent(call_sid: str, intent: dict, followup_text: str = None):
     # Initial intent handling (no <Gather>; we keep streaming and listen continuously)
     if urgency == 'emergency':
         try:
-            calendar_adapter = CalendarAdapter()
+            calendar_adapter = get_calendar_adapter()
             now = datetime.now()
             # Emergency: at least 30 minutes from now, quarter-hour aligned, 1h buffer from other jobs
             earliest = now + timedelta(minutes=30)
@@ -4101,11 +5100,7 @@ async def streaming_watchdog(call_sid: str, delay_seconds: float = 5.0):
         if has_conn and (not last_media_time or last_media_time < start_ts):
             logger.info(f"🛡️ Watchdog: no media received for {call_sid} after {delay_seconds:.0f}s; re-pushing TwiML to restart streaming")
             resp = VoiceResponse()
-            start = Start()
-            wss_url = _build_wss_url_for_resume(call_sid)
-            start.stream(url=wss_url, track="inbound_track")
-            resp.append(start)
-            resp.pause(length=3600)
+            append_stream_resume(resp, call_sid)
             await push_twiml_to_call(call_sid, resp)
         else:
             logger.debug(f"Watchdog: media already flowing for {call_sid}; no action needed")
@@ -4166,22 +5161,8 @@ def pcm_to_wav_bytes(pcm: bytes, sample_rate: int) -> bytes:
         wf.writeframes(pcm)
     return buf.getvalue()
 
-def contains_emergency_keywords(text: str) -> bool:
-    norm = " ".join((text or "").lower().split())
-    keywords = [
-        "emergency",
-        "burst pipe",
-        "pipe burst",
-        "water everywhere",
-        "flooding",
-        "sewage",
-        "sewer backup",
-        "gas leak",
-    ]
-    for k in keywords:
-        if k in norm:
-            return True
-    return False
+def contains_emergency_keywords(text: Union[str, UtteranceAnalysis, None]) -> bool:
+    return analyze_utterance(text).has_any(EMERGENCY_KEYWORDS)
 
 #---------------MAIN---------------
 if __name__ == "__main__":
@@ -4196,38 +5177,40 @@ if __name__ == "__main__":
     )
 
 # Heuristic: detect noise/unknown utterances with no recognizable intent cues
-def is_noise_or_unknown(text: str) -> bool:
-    norm = " ".join((text or "").lower().strip().strip(".,!?").split())
+# Common scheduling and intent cue words
+NOISE_CUE_WORDS = frozenset({
+    'emergency','urgent','immediately','schedule','book','appointment','technician','today','tomorrow','tonight',
+    'morning','afternoon','evening','am','pm','earliest','soon','asap','next','this','monday','tuesday','wednesday','thursday','friday','saturday','sunday'
+})
+_TIME_LIKE_RE = re.compile(r"\b\d{1,2}(:\d{2})?\s*(am|pm)\b")
+_URL_LIKE_RE = re.compile(r"(https?://|www\.|\.[a-z]{2,6}\b)")
+
+def is_noise_or_unknown(text: Union[str, UtteranceAnalysis, None]) -> bool:
+    utterance = analyze_utterance(text)
+    norm = utterance.stripped
     if not norm:
         return True
     # If affirmative/negative or contains path/time cues, it's not noise
-    if is_affirmative_response(norm) or is_negative_response(norm):
+    stripped = utterance.stripped_analysis
+    if is_affirmative_response(stripped) or is_negative_response(stripped):
         return False
     # Common scheduling and intent cue words
-    cue_words = {
-        'emergency','urgent','immediately','schedule','book','appointment','technician','today','tomorrow','tonight',
-        'morning','afternoon','evening','am','pm','earliest','soon','asap','next','this','monday','tuesday','wednesday','thursday','friday','saturday','sunday'
-    }
-    tokens = set(norm.split())
-    if tokens & cue_words:
+    tokens = utterance.token_set
+    if not tokens.isdisjoint(NOISE_CUE_WORDS):
         return False
     # Accept explicit time-like expressions (e.g., 3 pm, 10:30 am)
-    if re.search(r"\b\d{1,2}(:\d{2})?\s*(am|pm)\b", norm):
+    if _TIME_LIKE_RE.search(norm):
         return False
     # Treat URLs/domains and review chatter as noise
-    if re.search(r"(https?://|www\.|\.[a-z]{2,6}\b)", norm) or 'pissedconsumer' in norm or 'review' in norm:
+    if _URL_LIKE_RE.search(norm) or utterance.has_any(NOISE_MARKERS):
         return True
     # Single very short/uncommon word → treat as noise
     return len(tokens) <= 2
 
 # Transfer intent detection
-def is_transfer_request(text: str) -> bool:
-    norm = " ".join((text or "").lower().strip().split())
+def is_transfer_request(text: Union[str, UtteranceAnalysis, None]) -> bool:
     # Keywords that indicate a transfer request
-    transfer_keywords = [
-        "transfer", "transfer me", "dispatcher", "operator", "human", "representative", "agent"
-    ]
-    return any(k in norm for k in transfer_keywords)
+    return analyze_utterance(text).has_any(TRANSFER_KEYWORDS)
 
 async def perform_dispatch_transfer(call_sid: str) -> None:
     try:
@@ -4328,7 +5311,6 @@ async def handle_followup_or_handoff(call_sid: str, followup_text: str, twiml: V
             call_dialog_state.pop(call_sid, None)
             reset_unclear_attempts(call_sid)
             # Resume streaming to listen for their response
-            start = Start()
             ws_base = call_info_store.get(call_sid, {}).get('ws_base')
             if ws_base:
                 wss_url = f"{ws_base}{settings.STREAM_ENDPOINT}?callSid={call_sid}"
@@ -4339,9 +5321,7 @@ async def handle_followup_or_handoff(call_sid: str, followup_text: str, twiml: V
                     wss_url = settings.EXTERNAL_WEBHOOK_URL.replace('http://', 'ws://') + settings.STREAM_ENDPOINT + f"?callSid={call_sid}"
                 else:
                     wss_url = f"wss://{settings.EXTERNAL_WEBHOOK_URL}{settings.STREAM_ENDPOINT}?callSid={call_sid}"
-            start.stream(url=wss_url, track="inbound_track")
-            twiml.append(start)
-            twiml.pause(length=3600)
+            append_stream_resume(twiml, call_sid, wss_url)
             logger.info(f"💬 User declined transfer for {call_sid}, continuing with clarification")
             return twiml
         else:
@@ -4349,11 +5329,7 @@ async def handle_followup_or_handoff(call_sid: str, followup_text: str, twiml: V
             twiml = VoiceResponse()
             await add_tts_or_say_to_twiml(twiml, call_sid, "I didn't catch that. Should I transfer you to a representative? Please say yes or no.")
             # Keep the same dialog state and resume streaming
-            start = Start()
-            wss_url = _build_wss_url_for_resume(call_sid)
-            start.stream(url=wss_url, track="inbound_track")
-            twiml.append(start)
-            twiml.pause(length=3600)
+            append_stream_resume(twiml, call_sid)
             return twiml
 
     # 1) If user explicitly asks for a human, route immediately.
@@ -4418,11 +5394,7 @@ async def handle_followup_or_handoff(call_sid: str, followup_text: str, twiml: V
                 # Set dialog state to await transfer confirmation
                 call_dialog_state[call_sid] = {'step': 'awaiting_transfer_confirm'}
                 # Resume streaming to listen for yes/no response
-                start = Start()
-                wss_url = _build_wss_url_for_resume(call_sid)
-                start.stream(url=wss_url, track="inbound_track")
-                twiml.append(start)
-                twiml.pause(length=3600)
+                append_stream_resume(twiml, call_sid)
             except Exception:
                 pass
             return twiml
@@ -4493,371 +5465,18 @@ def clean_and_filter_transcription(text: str) -> tuple[str, bool]:
     # Convert to lowercase for pattern matching
     text_lower = text.lower()
     
-    # Patterns to completely suppress the entire transcription
-    suppression_patterns = [
-        # FEMA references
-        r'for more information,?\s*visit\s*www\.fema\.gov',
-        r'visit\s*www\.fema\.gov',
-        r'fema\.gov',
-        r'federal emergency management agency',
-        # Common transcription artifacts
-        r'thank you for watching',
-        r'subscribe.*channel',
-        r'like.*comment',
-        r'video.*description',
-        r'pissedconsumer',
-        # Sound/noise words that should be suppressed
-        r'\bbeep\b',
-        r'\bboop\b',
-        r'\bclick\b',
-        r'\bclunk\b',
-        r'\bwhir\b',
-        r'\bwhirr\b',
-        r'\bwhistle\b',
-        r'\bchime\b',
-        r'\bding\b',
-        r'\bdong\b',
-        r'\bbuzz\b',
-        r'\bhum\b',
-        r'\bstatic\b',
-        r'\bnoise\b',
-        r'\bbackground noise\b',
-        r'\bdial tone\b',
-        r'\bhangup signal\b',
-        r'\bhang up signal\b',
-        r'\bdisconnect tone\b',
-        r'\bbusy signal\b',
-        r'\bhold music\b',
-        r'\bhold tone\b',
-        r'\bwaiting tone\b',
-        r'\bconnection sound\b',
-        r'\bphone sound\b',
-        r'\btelephone sound\b',
-        r'\bline noise\b',
-        r'\binterference\b',
-        r'\bdistortion\b',
-        r'\bfeedback\b',
-        r'\becho\b',
-        r'\bdelay\b',
-        r'\blatency\b',
-        r'\bdead air\b',
-        r'\bsilence\b',
-        r'\bquiet\b',
-        r'\bwhite noise\b',
-        r'\bpink noise\b',
-        r'\bbrown noise\b',
-        r'\bambient noise\b',
-        r'\broom tone\b',
-        r'\bair conditioning\b',
-        r'\bventilation\b',
-        r'\bfan noise\b',
-        r'\bengine noise\b',
-        r'\btraffic noise\b',
-        r'\bconstruction noise\b',
-        r'\bconversation noise\b',
-        r'\bcrowd noise\b',
-        r'\bbackground conversation\b',
-        r'\bbackground music\b',
-        r'\bbackground tv\b',
-        r'\bbackground radio\b',
-        r'\bbackground audio\b',
-        r'\bbackground sound\b',
-        r'\bbackground voice\b',
-        r'\bbackground speech\b',
-        r'\bbackground talking\b',
-        r'\bbackground chatter\b',
-        r'\bbackground murmur\b',
-        r'\bbackground hum\b',
-        r'\bbackground drone\b',
-        r'\bbackground rumble\b',
-        r'\bbackground roar\b',
-        r'\bbackground hiss\b',
-        r'\bbackground crackle\b',
-        r'\bbackground pop\b',
-        r'\bbackground snap\b',
-        r'\bbackground crack\b',
-        r'\bbackground thud\b',
-        r'\bbackground thump\b',
-        r'\bbackground bang\b',
-        r'\bbackground crash\b',
-        r'\bbackground slam\b',
-        r'\bbackground knock\b',
-        r'\bbackground tap\b',
-        r'\bbackground tick\b',
-        r'\bbackground tock\b',
-        r'\bbackground tick tock\b',
-        r'\bbackground clock\b',
-        r'\bbackground alarm\b',
-        r'\bbackground ring\b',
-        r'\bbackground ringtone\b',
-        r'\bbackground notification\b',
-        r'\bbackground alert\b',
-        r'\bbackground warning\b',
-        r'\bbackground error\b',
-        r'\bbackground system\b',
-        r'\bbackground computer\b',
-        r'\bbackground device\b',
-        r'\bbackground machine\b',
-        r'\bbackground equipment\b',
-        r'\bbackground appliance\b',
-        r'\bbackground tool\b',
-        r'\bbackground instrument\b',
-        r'\bbackground apparatus\b',
-        r'\bbackground mechanism\b',
-        r'\bbackground contraption\b',
-        r'\bbackground gadget\b',
-        r'\bbackground gizmo\b',
-        r'\bbackground widget\b',
-        r'\bbackground thingamajig\b',
-        r'\bbackground whatchamacallit\b',
-        r'\bbackground doohickey\b',
-        r'\bbackground doodad\b',
-        r'\bbackground thingy\b',
-        r'\bbackground thing\b',
-        r'\bbackground object\b',
-        r'\bbackground item\b',
-        r'\bbackground piece\b',
-        r'\bbackground part\b',
-        r'\bbackground component\b',
-        r'\bbackground element\b',
-        r'\bbackground factor\b',
-        r'\bbackground aspect\b',
-        r'\bbackground feature\b',
-        r'\bbackground characteristic\b',
-        r'\bbackground property\b',
-        r'\bbackground attribute\b',
-        r'\bbackground quality\b',
-        r'\bbackground trait\b',
-        r'\bbackground mark\b',
-        r'\bbackground sign\b',
-        r'\bbackground indicator\b',
-        r'\bbackground signal\b',
-        r'\bbackground cue\b',
-        r'\bbackground hint\b',
-        r'\bbackground clue\b',
-        r'\bbackground evidence\b',
-        r'\bbackground proof\b',
-        r'\bbackground trace\b',
-        r'\bbackground remnant\b',
-        r'\bbackground residue\b',
-        r'\bbackground leftover\b',
-        r'\bbackground remainder\b',
-        r'\bbackground excess\b',
-        r'\bbackground surplus\b',
-        r'\bbackground extra\b',
-        r'\bbackground additional\b',
-        r'\bbackground supplementary\b',
-        r'\bbackground complementary\b',
-        r'\bbackground auxiliary\b',
-        r'\bbackground secondary\b',
-        r'\bbackground tertiary\b',
-        r'\bbackground quaternary\b',
-        r'\bbackground quinary\b',
-        r'\bbackground senary\b',
-        r'\bbackground septenary\b',
-        r'\bbackground octonary\b',
-        r'\bbackground nonary\b',
-        r'\bbackground denary\b',
-        r'\bbackground undenary\b',
-        r'\bbackground duodenary\b',
-        r'\bbackground tredenary\b',
-        r'\bbackground quattuordenary\b',
-        r'\bbackground quindenary\b',
-        r'\bbackground sexdenary\b',
-        r'\bbackground septendenary\b',
-        r'\bbackground octodenary\b',
-        r'\bbackground novemdenary\b',
-        r'\bbackground vigintenary\b',
-        # URLs and domains
-        r'https?://[^\s]+',
-        r'www\.[^\s]+',
-        r'\b[a-z0-9-]+\.[a-z]{2,6}\b',
-    ]
+    # Suppression/removal patterns live in config/transcription_filters.json,
+    # compiled once into an automaton + alternation regex
+    transcript_filter = get_transcript_filter()
     
     # Check if we should suppress the entire transcription
-    for pattern in suppression_patterns:
-        if re.search(pattern, text_lower):
-            logger.info(f"🚫 Suppressing transcription due to pattern '{pattern}': '{original_text}'")
-            return "", True
-    
-    # Clean text by removing unwanted content but keep the rest
-    cleaned_text = text
-    
-    # Remove specific phrases (case-insensitive)
-    removal_patterns = [
-        r'for more information,?\s*visit\s*www\.fema\.gov',
-        r'visit\s*www\.fema\.gov',
-        r'fema\.gov',
-        r'thank you for watching',
-        r'subscribe to.*channel',
-        r'like and comment',
-        r'check the description',
-        # Sound/noise words to remove but keep the rest of the text
-        r'\bbeep\b',
-        r'\bboop\b',
-        r'\bclick\b',
-        r'\bclunk\b',
-        r'\bwhir\b',
-        r'\bwhirr\b',
-        r'\bwhistle\b',
-        r'\bchime\b',
-        r'\bding\b',
-        r'\bdong\b',
-        r'\bbuzz\b',
-        r'\bhum\b',
-        r'\bstatic\b',
-        r'\bnoise\b',
-        r'\bbackground noise\b',
-        r'\bdial tone\b',
-        r'\bhangup signal\b',
-        r'\bhang up signal\b',
-        r'\bdisconnect tone\b',
-        r'\bbusy signal\b',
-        r'\bhold music\b',
-        r'\bhold tone\b',
-        r'\bwaiting tone\b',
-        r'\bconnection sound\b',
-        r'\bphone sound\b',
-        r'\btelephone sound\b',
-        r'\bline noise\b',
-        r'\binterference\b',
-        r'\bdistortion\b',
-        r'\bfeedback\b',
-        r'\becho\b',
-        r'\bdelay\b',
-        r'\blatency\b',
-        r'\bdead air\b',
-        r'\bsilence\b',
-        r'\bquiet\b',
-        r'\bwhite noise\b',
-        r'\bpink noise\b',
-        r'\bbrown noise\b',
-        r'\bambient noise\b',
-        r'\broom tone\b',
-        r'\bair conditioning\b',
-        r'\bventilation\b',
-        r'\bfan noise\b',
-        r'\bengine noise\b',
-        r'\btraffic noise\b',
-        r'\bconstruction noise\b',
-        r'\bconversation noise\b',
-        r'\bcrowd noise\b',
-        r'\bbackground conversation\b',
-        r'\bbackground music\b',
-        r'\bbackground tv\b',
-        r'\bbackground radio\b',
-        r'\bbackground audio\b',
-        r'\bbackground sound\b',
-        r'\bbackground voice\b',
-        r'\bbackground speech\b',
-        r'\bbackground talking\b',
-        r'\bbackground chatter\b',
-        r'\bbackground murmur\b',
-        r'\bbackground hum\b',
-        r'\bbackground drone\b',
-        r'\bbackground rumble\b',
-        r'\bbackground roar\b',
-        r'\bbackground hiss\b',
-        r'\bbackground crackle\b',
-        r'\bbackground pop\b',
-        r'\bbackground snap\b',
-        r'\bbackground crack\b',
-        r'\bbackground thud\b',
-        r'\bbackground thump\b',
-        r'\bbackground bang\b',
-        r'\bbackground crash\b',
-        r'\bbackground slam\b',
-        r'\bbackground knock\b',
-        r'\bbackground tap\b',
-        r'\bbackground tick\b',
-        r'\bbackground tock\b',
-        r'\bbackground tick tock\b',
-        r'\bbackground clock\b',
-        r'\bbackground alarm\b',
-        r'\bbackground ring\b',
-        r'\bbackground ringtone\b',
-        r'\bbackground notification\b',
-        r'\bbackground alert\b',
-        r'\bbackground warning\b',
-        r'\bbackground error\b',
-        r'\bbackground system\b',
-        r'\bbackground computer\b',
-        r'\bbackground device\b',
-        r'\bbackground machine\b',
-        r'\bbackground equipment\b',
-        r'\bbackground appliance\b',
-        r'\bbackground tool\b',
-        r'\bbackground instrument\b',
-        r'\bbackground apparatus\b',
-        r'\bbackground mechanism\b',
-        r'\bbackground contraption\b',
-        r'\bbackground gadget\b',
-        r'\bbackground gizmo\b',
-        r'\bbackground widget\b',
-        r'\bbackground thingamajig\b',
-        r'\bbackground whatchamacallit\b',
-        r'\bbackground doohickey\b',
-        r'\bbackground doodad\b',
-        r'\bbackground thingy\b',
-        r'\bbackground thing\b',
-        r'\bbackground object\b',
-        r'\bbackground item\b',
-        r'\bbackground piece\b',
-        r'\bbackground part\b',
-        r'\bbackground component\b',
-        r'\bbackground element\b',
-        r'\bbackground factor\b',
-        r'\bbackground aspect\b',
-        r'\bbackground feature\b',
-        r'\bbackground characteristic\b',
-        r'\bbackground property\b',
-        r'\bbackground attribute\b',
-        r'\bbackground quality\b',
-        r'\bbackground trait\b',
-        r'\bbackground mark\b',
-        r'\bbackground sign\b',
-        r'\bbackground indicator\b',
-        r'\bbackground signal\b',
-        r'\bbackground cue\b',
-        r'\bbackground hint\b',
-        r'\bbackground clue\b',
-        r'\bbackground evidence\b',
-        r'\bbackground proof\b',
-        r'\bbackground trace\b',
-        r'\bbackground remnant\b',
-        r'\bbackground residue\b',
-        r'\bbackground leftover\b',
-        r'\bbackground remainder\b',
-        r'\bbackground excess\b',
-        r'\bbackground surplus\b',
-        r'\bbackground extra\b',
-        r'\bbackground additional\b',
-        r'\bbackground supplementary\b',
-        r'\bbackground complementary\b',
-        r'\bbackground auxiliary\b',
-        r'\bbackground secondary\b',
-        r'\bbackground tertiary\b',
-        r'\bbackground quaternary\b',
-        r'\bbackground quinary\b',
-        r'\bbackground senary\b',
-        r'\bbackground septenary\b',
-        r'\bbackground octonary\b',
-        r'\bbackground nonary\b',
-        r'\bbackground denary\b',
-        r'\bbackground undenary\b',
-        r'\bbackground duodenary\b',
-        r'\bbackground tredenary\b',
-        r'\bbackground quattuordenary\b',
-        r'\bbackground quindenary\b',
-        r'\bbackground sexdenary\b',
-        r'\bbackground septendenary\b',
-        r'\bbackground octodenary\b',
-        r'\bbackground novemdenary\b',
-        r'\bbackground vigintenary\b',
-    ]
+    fired_pattern = transcript_filter.find_suppression(text_lower)
+    if fired_pattern:
+        logger.info(f"🚫 Suppressing transcription due to pattern '{fired_pattern}': '{original_text}'")
+        return "", True
     
-    for pattern in removal_patterns:
-        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE)
+    # Clean text by removing unwanted content but keep the rest (case-insensitive)
+    cleaned_text = transcript_filter.remove(text)
     
     # Check for excessive repetitions before cleaning
     if has_excessive_repetitions(cleaned_text):
@@ -4897,43 +5516,26 @@ def has_excessive_repetitions(text: str) -> bool:
     if len(words) <= 2:
         return False
     
-    # Define allowed repetition words (time-related and yes/no responses)
-    allowed_repetition_words = {
-        # Time-related words
-        'am', 'pm', 'a.m.', 'p.m.', 'morning', 'afternoon', 'evening', 'night',
-        'today', 'tomorrow', 'yesterday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
-        'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december',
-        'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec',
-        'o\'clock', 'oclock', 'hour', 'hours', 'minute', 'minutes', 'second', 'seconds',
-        # Yes/no responses
-        'yes', 'no', 'yeah', 'yep', 'yup', 'nope', 'nah', 'ok', 'okay', 'sure', 'right',
-        # Numbers (for time)
-        'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
-        'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen', 'twenty',
-        'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety', 'hundred',
-        # Time indicators
-        'sharp', 'exactly', 'precisely', 'around', 'about', 'approximately', 'roughly',
-        'early', 'late', 'soon', 'later', 'earlier', 'now', 'then', 'when', 'time'
-    }
+    # Normalize once; repeats are found on interned token ids
+    norms, ids = tokenize_for_repetition(words)
     
     # Check for single word repetitions (3+ consecutive same word)
     i = 0
     while i < len(words):
-        word = words[i].lower().strip('.,!?')
+        word = norms[i]
         if not word:  # Skip empty words
             i += 1
             continue
-            
+        
         # Count consecutive repetitions of this word
-        repetitions = 1
         j = i + 1
-        while j < len(words) and words[j].lower().strip('.,!?') == word:
-            repetitions += 1
+        while j < len(words) and ids[j] == ids[i]:
             j += 1
+        repetitions = j - i
         
         # If we have 3+ repetitions of the same word, check if it's allowed
         if repetitions >= 3:
-            if word in allowed_repetition_words:
+            if word in ALLOWED_REPETITION_WORDS:
                 logger.info(f"✅ Allowed repetition for '{word}' repeated {repetitions} times (time/yes-no word)")
                 # Continue processing - this will be cleaned to single instance later
             else:
@@ -4944,49 +5546,30 @@ def has_excessive_repetitions(text: str) -> bool:
     
     # Check for phrase repetitions (2+ consecutive same phrase)
     for phrase_length in [2, 3]:
-        if len(words) >= phrase_length * 2:
-            i = 0
-            while i < len(words):
-                if i + phrase_length * 2 <= len(words):
-                    # Get current phrase and next phrase
-                    current_phrase = [w.lower().strip('.,!?') for w in words[i:i+phrase_length]]
-                    next_phrase = [w.lower().strip('.,!?') for w in words[i+phrase_length:i+phrase_length*2]]
-                    
-                    if current_phrase == next_phrase:
-                        # Found repetition, count how many times it repeats
-                        phrase_repetitions = 1
-                        check_pos = i + phrase_length
-                        while check_pos + phrase_length <= len(words):
-                            check_phrase = [w.lower().strip('.,!?') for w in words[check_pos:check_pos+phrase_length]]
-                            if check_phrase == current_phrase:
-                                phrase_repetitions += 1
-                                check_pos += phrase_length
-                            else:
-                                break
-                        
-                        # Check if phrase contains only allowed repetition words
-                        phrase_text = ' '.join(current_phrase)
-                        all_words_allowed = all(w in allowed_repetition_words for w in current_phrase)
-                        
-                        if phrase_repetitions >= 2:
-                            if all_words_allowed:
-                                logger.info(f"✅ Allowed phrase repetition: '{phrase_text}' repeated {phrase_repetitions} times (time/yes-no phrase)")
-                                # Continue processing - this will be cleaned to single instance later
-                            else:
-                                logger.info(f"🚫 Excessive phrase repetition detected: '{phrase_text}' repeated {phrase_repetitions} times")
-                                return True
-                
-                i += 1
+        for start, phrase_repetitions in iter_repeats(ids, phrase_length):
+            current_phrase = norms[start:start + phrase_length]
+            phrase_text = ' '.join(current_phrase)
+            if all(w in ALLOWED_REPETITION_WORDS for w in current_phrase):
+                logger.info(f"✅ Allowed phrase repetition: '{phrase_text}' repeated {phrase_repetitions} times (time/yes-no phrase)")
+                # Continue processing - this will be cleaned to single instance later
+            else:
+                logger.info(f"🚫 Excessive phrase repetition detected: '{phrase_text}' repeated {phrase_repetitions} times")
+                return True
     
     return False
 
-def remove_repeated_phrases(text: str) -> str:
+def remove_repeated_phrases(text: str, max_phrase_length: int = MAX_REPEAT_PERIOD) -> str:
     """
     Remove excessive repetition of words and short phrases.
     Examples:
     - "second, second, second, second" -> "second"
     - "the the the problem" -> "the problem"
     - "help me help me help me" -> "help me"
+    - A 4+ word sentence looped 3+ times (Whisper hallucination) -> one copy
+    
+    Args:
+        text: Transcript text
+        max_phrase_length: Longest phrase (in words) checked for loops
     """
     if not text:
         return text
@@ -4996,76 +5579,31 @@ def remove_repeated_phrases(text: str) -> str:
     if len(words) <= 1:
         return text
     
-    # Remove consecutive repeated words
-    cleaned_words = []
-    i = 0
-    while i < len(words):
-        word = words[i]
-        cleaned_words.append(word)
-        
-        # Count consecutive repetitions of this word
-        repetitions = 1
-        j = i + 1
-        while j < len(words) and words[j].lower().strip('.,!?') == word.lower().strip('.,!?'):
-            repetitions += 1
-            j += 1
-        
-        # If we found repetitions, skip them (keep only the first occurrence)
-        if repetitions > 1:
-            logger.info(f"🔄 Removed {repetitions-1} repetitions of word '{word}'")
-            i = j
-        else:
-            i += 1
-    
-    # Join back into text
-    result = ' '.join(cleaned_words)
-    
-    # Handle repeated short phrases (2-3 words)
-    # Look for patterns like "help me help me" or "can you can you"
-    for phrase_length in [2, 3]:
-        if len(cleaned_words) >= phrase_length * 2:
-            # Check for repeated phrases
-            new_words = []
-            i = 0
-            while i < len(cleaned_words):
-                if i + phrase_length * 2 <= len(cleaned_words):
-                    # Get current phrase and next phrase
-                    current_phrase = cleaned_words[i:i+phrase_length]
-                    next_phrase = cleaned_words[i+phrase_length:i+phrase_length*2]
-                    
-                    # Normalize for comparison (remove punctuation, lowercase)
-                    current_normalized = [w.lower().strip('.,!?') for w in current_phrase]
-                    next_normalized = [w.lower().strip('.,!?') for w in next_phrase]
-                    
-                    if current_normalized == next_normalized:
-                        # Found repetition, count how many times it repeats
-                        phrase_repetitions = 1
-                        check_pos = i + phrase_length
-                        while check_pos + phrase_length <= len(cleaned_words):
-                            check_phrase = cleaned_words[check_pos:check_pos+phrase_length]
-                            check_normalized = [w.lower().strip('.,!?') for w in check_phrase]
-                            if check_normalized == current_normalized:
-                                phrase_repetitions += 1
-                                check_pos += phrase_length
-                            else:
-                                break
-                        
-                        # Keep only first occurrence
-                        if phrase_repetitions > 1:
-                            logger.info(f"🔄 Removed {phrase_repetitions-1} repetitions of phrase '{' '.join(current_phrase)}'")
-                        new_words.extend(current_phrase)
-                        i = check_pos
-                    else:
-                        new_words.append(cleaned_words[i])
-                        i += 1
-                else:
-                    new_words.append(cleaned_words[i])
-                    i += 1
-            
-            cleaned_words = new_words
-            result = ' '.join(cleaned_words)
+    _, ids = tokenize_for_repetition(words)
+    
+    # Remove consecutive repeated words (keep only the first occurrence)
+    keep, collapsed = collapse_repeats(ids, 1)
+    for start, repetitions in collapsed:
+        logger.info(f"🔄 Removed {repetitions-1} repetitions of word '{words[start]}'")
+    cleaned_words = [words[k] for k in keep]
+    cleaned_ids = [ids[k] for k in keep]
+    
+    # Handle repeated short phrases (2-3 words, any repeat) and longer looped
+    # sentences (3+ repeats), e.g. "help me help me" or "can you can you"
+    for phrase_length in range(2, max_phrase_length + 1):
+        min_repeats = 2 if phrase_length <= 3 else 3
+        if len(cleaned_ids) < phrase_length * min_repeats:
+            break
+        keep, collapsed = collapse_repeats(cleaned_ids, phrase_length, min_repeats)
+        if not collapsed:
+            continue
+        for start, phrase_repetitions in collapsed:
+            phrase = ' '.join(cleaned_words[start:start + phrase_length])
+            logger.info(f"🔄 Removed {phrase_repetitions-1} repetitions of phrase '{phrase}'")
+        cleaned_words = [cleaned_words[k] for k in keep]
+        cleaned_ids = [cleaned_ids[k] for k in keep]
     
-    return result
+    return ' '.join(cleaned_words)
 
 # Now update the existing transcription processing code
 
@@ -2,7 +2,12 @@ import asyncio
 import logging
 import time
 from typing import Optional, Dict, Any, Callable
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+
+try:
+    from ..services.media_playback import audio_duration
+except Exception:
+    from ops_integrations.services.media_playback import audio_duration
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +20,8 @@ class TTSManager:
         # Speech gate state per call
         self.speech_gates: Dict[str, Dict[str, Any]] = defaultdict(dict)
         
-        # TTS cache
-        self.tts_cache: Dict[str, bytes] = {}
+        # TTS cache, least recently used first
+        self.tts_cache: "OrderedDict[str, bytes]" = OrderedDict()
         
         # Configuration
         self.speech_gate_buffer_sec = 1.0
@@ -32,6 +37,7 @@ class TTSManager:
             cache_key = f"{text}_{call_sid}"
             if cache_key in self.tts_cache:
                 logger.info(f"🎵 Using cached TTS for {call_sid}")
+                self.tts_cache.move_to_end(cache_key)
                 return self.tts_cache[cache_key]
             
             # Generate new TTS
@@ -49,43 +55,56 @@ class TTSManager:
             return None
     
     def _add_to_cache(self, key: str, audio_data: bytes) -> None:
-        """Add TTS audio to cache"""
-        if len(self.tts_cache) >= self.max_cache_size:
-            # Remove oldest entry
-            oldest_key = next(iter(self.tts_cache))
-            del self.tts_cache[oldest_key]
+        """Add TTS audio to cache, evicting the least recently used entry when full"""
+        if key in self.tts_cache:
+            self.tts_cache.move_to_end(key)
+        elif len(self.tts_cache) >= self.max_cache_size:
+            self.tts_cache.popitem(last=False)
         
         self.tts_cache[key] = audio_data
     
-    def activate_speech_gate(self, call_sid: str, text: str) -> None:
-        """Activate speech gate to prevent overlapping speech"""
+    def activate_speech_gate(self, call_sid: str, text: str, duration: Optional[float] = None) -> None:
+        """Activate speech gate to prevent overlapping speech
+        
+        Args:
+            call_sid: Call the bot is speaking on
+            text: What is being said
+            duration: Playback length read from the synthesized audio; estimated from text when None
+        """
         try:
-            # Estimate TTS duration (rough approximation)
-            estimated_duration = len(text) * 0.06  # ~60ms per character
-            gate_duration = estimated_duration + self.speech_gate_buffer_sec
+            measured = duration is not None
+            if duration is None:
+                duration = self.estimate_tts_duration(text)
+            gate_duration = duration + self.speech_gate_buffer_sec
             
             self.speech_gates[call_sid] = {
                 'active': True,
                 'start_time': time.time(),
                 'duration': gate_duration,
+                'measured': measured,
                 'text': text
             }
             
-            logger.info(f"🔇 Speech gate activated for {call_sid}: {gate_duration:.2f}s (text: {len(text)} chars)")
+            logger.info(f"🔇 Speech gate activated for {call_sid}: {gate_duration:.2f}s "
+                        f"({'decoded' if measured else 'estimated'}, text: {len(text)} chars)")
             
             # Schedule deactivation
-            asyncio.create_task(self._deactivate_speech_gate_after_delay(call_sid, gate_duration))
+            asyncio.create_task(self._deactivate_speech_gate_after_delay(call_sid, gate_duration,
+                                                                         self.speech_gates[call_sid]))
             
         except Exception as e:
             logger.error(f"Failed to activate speech gate for {call_sid}: {e}")
     
-    async def _deactivate_speech_gate_after_delay(self, call_sid: str, delay: float) -> None:
+    async def _deactivate_speech_gate_after_delay(self, call_sid: str, delay: float,
+                                                  gate_state: Optional[Dict[str, Any]] = None) -> None:
         """Deactivate speech gate after specified delay"""
         try:
             await asyncio.sleep(delay)
             
-            gate_state = self.speech_gates.get(call_sid, {})
-            if gate_state.get('active'):
+            # A newer prompt replaces the gate state; its own timer opens that one
+            if gate_state is None:
+                gate_state = self.speech_gates.get(call_sid, {})
+            if self.speech_gates.get(call_sid) is gate_state and gate_state.get('active'):
                 gate_state['active'] = False
                 actual_duration = time.time() - gate_state.get('start_time', time.time())
                 logger.info(f"🔊 Speech gate deactivated for {call_sid} after {actual_duration:.2f}s")
@@ -116,11 +135,9 @@ class TTSManager:
             if not text.strip():
                 return
             
-            # Activate speech gate
-            self.activate_speech_gate(call_sid, text)
-            
-            # Generate TTS
+            # Generate TTS, then gate for the length of the audio itself
             audio_data = await self.synthesize_tts(text, call_sid)
+            self.activate_speech_gate(call_sid, text, audio_duration(audio_data) if audio_data else None)
             
             if audio_data:
                 # Add to TwiML response
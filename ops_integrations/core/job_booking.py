@@ -15,8 +15,9 @@ load_dotenv()
 # Prefer package-relative imports; on failure, fall back to script-friendly absolute imports
 try:
     from ops_integrations.adapters.integrations.crm import CRMAdapter, InteractionType
-    from ops_integrations.adapters.external_services.google_calendar import CalendarAdapter
+    from ops_integrations.adapters.external_services.google_calendar import get_calendar_adapter
     from ops_integrations.adapters.external_services.sms import SMSAdapter
+    from ops_integrations.services.availability_engine import Technician, first_free_assignment, get_technicians
 except Exception:
     import sys as _sys
     import os as _os
@@ -25,15 +26,16 @@ except Exception:
     if _OPS_ROOT not in _sys.path:
         _sys.path.insert(0, _OPS_ROOT)
     from ops_integrations.adapters.integrations.crm import CRMAdapter, InteractionType
-    from ops_integrations.adapters.external_services.google_calendar import CalendarAdapter
+    from ops_integrations.adapters.external_services.google_calendar import get_calendar_adapter
     from ops_integrations.adapters.external_services.sms import SMSAdapter
+    from ops_integrations.services.availability_engine import Technician, first_free_assignment, get_technicians
 
 logging.basicConfig(level=logging.INFO)
 
 class JobBookingSystem:
     def __init__(self):
         self.crm = CRMAdapter()
-        self.calendar = CalendarAdapter()
+        self.calendar = get_calendar_adapter()
         self.sms = SMSAdapter()
         
         # Check system availability
@@ -46,8 +48,14 @@ class JobBookingSystem:
         logging.info(f"  Calendar: {'✅ Available' if self.calendar_available else '❌ Not available'}")
         logging.info(f"  SMS: {'✅ Available' if self.sms_available else '❌ Not available'}")
 
+    def _calendar_for(self, technician: Optional[Technician]):
+        if technician is None or not technician.calendar_id:
+            return self.calendar
+        return get_calendar_adapter(technician.calendar_id)
+
     def book_job(self, customer_phone: str, customer_name: str, service_type: str, 
-                appointment_time: datetime, address: str = "", notes: str = "") -> Dict[str, Any]:
+                appointment_time: datetime, address: str = "", notes: str = "",
+                technician: Optional[Technician] = None) -> Dict[str, Any]:
         """
         Book a job with full integration (CRM + Calendar + SMS).
         
@@ -58,6 +66,7 @@ class JobBookingSystem:
             appointment_time: When the appointment is scheduled
             address: Service address
             notes: Additional notes about the job
+            technician: Technician whose calendar gets the event (default calendar when None)
             
         Returns:
             Dictionary with booking results
@@ -70,7 +79,8 @@ class JobBookingSystem:
             "sms_sent": False,
             "customer_id": None,
             "event_id": None,
-            "sms_result": None
+            "sms_result": None,
+            "technician": technician.name if technician else None
         }
         
         try:
@@ -101,12 +111,15 @@ class JobBookingSystem:
             if self.calendar_available:
                 try:
                     end_time = appointment_time + timedelta(hours=2)  # Default 2-hour slot
+                    description = f"Service: {service_type}\nCustomer: {customer_name}\nPhone: {customer_phone}\nAddress: {address}\nNotes: {notes}"
+                    if technician:
+                        description += f"\nTechnician: {technician.name}"
                     
-                    event = self.calendar.create_event(
+                    event = self._calendar_for(technician).create_event(
                         summary=f"{service_type} - {customer_name}",
                         start_time=appointment_time,
                         end_time=end_time,
-                        description=f"Service: {service_type}\nCustomer: {customer_name}\nPhone: {customer_phone}\nAddress: {address}\nNotes: {notes}",
+                        description=description,
                         location=address
                     )
                     
@@ -261,16 +274,29 @@ class JobBookingSystem:
 # Quick functions for easy job booking
 def book_emergency_job(phone: str, name: str, service: str, address: str = "", notes: str = "") -> Dict[str, Any]:
     """Quick function to book emergency job respecting scheduling rules."""
-    from adapters.phone import find_next_compliant_slot  # lazy import to avoid cycles in adapters
+    from adapters.phone import find_compliant_assignments  # lazy import to avoid cycles in adapters
     booking_system = JobBookingSystem()
     earliest = datetime.now() + timedelta(minutes=30)
-    appointment_time = find_next_compliant_slot(earliest, emergency=True)
-    return booking_system.book_job(phone, name, service, appointment_time, address, notes)
+    assignment = find_compliant_assignments(earliest, emergency=True, count=1)[0]
+    return booking_system.book_job(phone, name, service, assignment.start, address, notes,
+                                   technician=assignment.technician)
 
 def book_scheduled_job(phone: str, name: str, service: str, appointment_time: datetime, address: str = "", notes: str = "") -> Dict[str, Any]:
-    """Quick function to book scheduled job."""
+    """Quick function to book scheduled job on the first technician free at appointment_time."""
     booking_system = JobBookingSystem()
-    return booking_system.book_job(phone, name, service, appointment_time, address, notes)
+    technician = None
+    try:
+        technicians = get_technicians()
+        calendars = [booking_system._calendar_for(tech) for tech in technicians]
+        assignment = first_free_assignment(technicians, calendars, appointment_time)
+        if assignment is None:
+            logging.warning(f"⚠️ No technician free at {appointment_time}; booking on the default calendar")
+        else:
+            # Book the quarter-aligned start that was checked, not the requested minute
+            technician, appointment_time = assignment.technician, assignment.start
+    except Exception as e:
+        logging.error(f"❌ Technician assignment failed: {e}")
+    return booking_system.book_job(phone, name, service, appointment_time, address, notes, technician=technician)
 
 def update_job_status(customer_id: int, status: str, notes: str = "") -> Dict[str, Any]:
     """Quick function to update job status."""
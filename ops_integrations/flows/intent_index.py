@@ -0,0 +1,162 @@
+"""
+Compiled intent pattern index.
+
+Built once from intents.json (and rebuilt when load_intents() sees the file
+change), it precomputes each pattern's lowercase text, token set and key words,
+token→pattern postings, and one Aho–Corasick automaton over every pattern and
+pattern word. Scoring an utterance is then one automaton pass plus one pass over
+its tokens, touching only patterns that share something with the utterance.
+
+Scores are identical to the original nested-loop pattern matcher:
+    exact pattern substring                      -> 0.95
+    >=70% of key words (len > 2) present         -> 0.85
+    whole-token overlap / pattern token count    -> x 0.75
+    booking keyword present (BOOKING_REQUEST)    -> 0.9
+"""
+
+from collections import defaultdict
+from itertools import count
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .intents import load_intents
+
+try:
+    from ..services.keyword_automaton import KeywordAutomaton
+except Exception:
+    import sys as _sys
+    import os as _os
+    _OPS_ROOT = _os.path.abspath(_os.path.join(_os.path.dirname(__file__), '..'))
+    if _OPS_ROOT not in _sys.path:
+        _sys.path.insert(0, _OPS_ROOT)
+    from services.keyword_automaton import KeywordAutomaton
+
+# Each compiled index gets a new version, so per-utterance caches can tell a hot-reloaded index apart
+_index_versions = count(1)
+
+BOOKING_INTENT_TAG = "BOOKING_REQUEST"
+BOOKING_KEYWORDS = ("book", "schedule", "appointment", "booking", "prefer to book", "want to book", "need to book")
+
+
+class CompiledPattern(NamedTuple):
+    intent_pos: int              # position of the owning intent in intents.json
+    text: str                    # lowercased pattern
+    tokens: frozenset            # whitespace tokens
+    key_words: Tuple[str, ...]   # tokens longer than 2 chars, duplicates kept
+    partial_eligible: bool       # pattern longer than 3 chars
+
+
+class IntentIndex:
+    """Precompiled patterns, postings and automaton for one intents.json snapshot."""
+
+    def __init__(self, intents_data: Dict[str, Any]):
+        self.intents_data = intents_data
+        self.version = next(_index_versions)
+        intents = intents_data.get('intents', [])
+        self.tags: List[str] = [intent['tag'] for intent in intents]
+        self.tag_set = frozenset(self.tags)
+        self.patterns: List[CompiledPattern] = []
+        self.patterns_by_tag: Dict[str, List[str]] = {}
+        # Substring (pattern or pattern word) -> ids of patterns that test for it
+        self.substring_postings: Dict[str, List[int]] = defaultdict(list)
+        # Whole token -> ids of patterns containing that token
+        self.token_postings: Dict[str, List[int]] = defaultdict(list)
+        self._empty_pattern_intents = set()
+        self._booking_positions = [pos for pos, tag in enumerate(self.tags) if tag == BOOKING_INTENT_TAG]
+
+        for pos, intent in enumerate(intents):
+            self.patterns_by_tag.setdefault(intent['tag'], []).extend(intent['patterns'])
+            for pattern in intent['patterns']:
+                text = pattern.lower()
+                if not text:
+                    # An empty pattern is a substring of everything
+                    self._empty_pattern_intents.add(pos)
+                    continue
+                words = text.split()
+                pid = len(self.patterns)
+                self.patterns.append(CompiledPattern(
+                    intent_pos=pos,
+                    text=text,
+                    tokens=frozenset(words),
+                    key_words=tuple(w for w in words if len(w) > 2),
+                    partial_eligible=len(text) > 3,
+                ))
+                self.substring_postings[text].append(pid)
+                for word in set(words):
+                    if word != text:
+                        self.substring_postings[word].append(pid)
+                for token in set(words):
+                    self.token_postings[token].append(pid)
+
+        self.substring_postings = dict(self.substring_postings)
+        self.token_postings = dict(self.token_postings)
+        self.automaton = KeywordAutomaton(list(self.substring_postings) + list(BOOKING_KEYWORDS))
+
+    def score(self, text: str) -> Dict[str, float]:
+        """
+        Score an utterance against every intent.
+
+        Args:
+            text: Utterance text
+
+        Returns:
+            dict: {intent_tag: confidence_score}
+        """
+        text_lower = text.lower()
+        hits = self.automaton.find_all(text_lower)
+
+        overlap: Dict[int, int] = defaultdict(int)
+        for token in set(text_lower.split()):
+            for pid in self.token_postings.get(token, ()):
+                overlap[pid] += 1
+
+        candidates = set()
+        for hit in hits:
+            candidates.update(self.substring_postings.get(hit, ()))
+
+        scores = [0.0] * len(self.tags)
+        for pos in self._empty_pattern_intents:
+            scores[pos] = 0.95
+        for pid in candidates:
+            pattern = self.patterns[pid]
+            if pattern.text in hits:
+                confidence = 0.95
+            elif (pattern.partial_eligible and pattern.key_words and
+                  sum(1 for word in pattern.key_words if word in hits) >= len(pattern.key_words) * 0.7):
+                confidence = 0.85
+            elif overlap.get(pid):
+                confidence = overlap[pid] / len(pattern.tokens) * 0.75
+            else:
+                continue
+            if confidence > scores[pattern.intent_pos]:
+                scores[pattern.intent_pos] = confidence
+
+        if self._booking_positions and any(keyword in hits for keyword in BOOKING_KEYWORDS):
+            for pos in self._booking_positions:
+                scores[pos] = max(scores[pos], 0.9)
+
+        return {tag: scores[pos] for pos, tag in enumerate(self.tags)}
+
+    def best_intent(self, text: str) -> Tuple[Optional[str], float]:
+        """Return the highest-scoring intent tag and its score."""
+        scores = self.score(text)
+        if not scores:
+            return None, 0.0
+        tag = max(scores, key=scores.get)
+        return tag, scores[tag]
+
+
+_index_cache: Dict[str, Any] = {"data": None, "index": None}
+
+
+def get_intent_index(intents_data: Optional[Dict[str, Any]] = None) -> IntentIndex:
+    """
+    Get the compiled index for intents_data (default: the current intents.json).
+
+    load_intents() returns the same object until the file's mtime changes, so the
+    index is rebuilt exactly when intents.json is edited.
+    """
+    data = intents_data if intents_data is not None else load_intents()
+    if _index_cache["data"] is not data:
+        _index_cache["index"] = IntentIndex(data)
+        _index_cache["data"] = data
+    return _index_cache["index"]
@@ -0,0 +1,250 @@
+"""
+Local intent classifier: hashed n-gram features with a nearest-centroid model.
+
+Trained from flows/intents.json patterns plus logged production transcripts,
+it loads in milliseconds and answers in microseconds, so GPT is only consulted
+when the calibrated confidence is below the model's threshold.
+
+Model artifact format (.npz):
+    centroids   float32 [n_labels, n_features]  L2-normalized class centroids
+    labels      str     [n_labels]              label for each centroid row
+    meta        str     JSON with n_features, temperature, threshold,
+                        target_precision, n_examples and format version
+"""
+
+import json
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+MODEL_FORMAT_VERSION = 1
+DEFAULT_N_FEATURES = 2 ** 15
+DEFAULT_TEMPERATURE = 12.0
+DEFAULT_TARGET_PRECISION = 0.95
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'intent_model.npz')
+DEFAULT_INTENTS_PATH = os.path.join(os.path.dirname(__file__), 'intents.json')
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def _stable_hash(feature: str) -> int:
+    # Python's hash() is salted per process; crc32 keeps artifacts reproducible
+    return zlib.crc32(feature.encode('utf-8'))
+
+
+def extract_features(text: str, n_features: int = DEFAULT_N_FEATURES) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Hash word unigrams, word bigrams and in-word character trigrams of a text.
+
+    Args:
+        text: Input text
+        n_features: Size of the hashed feature space
+
+    Returns:
+        Tuple of (feature indices, L2-normalized log-scaled weights)
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    features: List[str] = [f"w:{tok}" for tok in tokens]
+    features.extend(f"b:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    for tok in tokens:
+        padded = f"<{tok}>"
+        features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    if not features:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    indices = np.fromiter((_stable_hash(f) % n_features for f in features), dtype=np.int64, count=len(features))
+    unique, counts = np.unique(indices, return_counts=True)
+    weights = (1.0 + np.log(counts)).astype(np.float32)
+    weights /= np.linalg.norm(weights)
+    return unique, weights
+
+
+class LocalIntentClassifier:
+    """Nearest-centroid intent classifier over hashed n-gram features."""
+
+    def __init__(self, centroids: "np.ndarray", labels: Sequence[str], n_features: int = DEFAULT_N_FEATURES,
+                 temperature: float = DEFAULT_TEMPERATURE, threshold: float = 1.0,
+                 target_precision: float = DEFAULT_TARGET_PRECISION, n_examples: int = 0):
+        self.centroids = centroids.astype(np.float32)
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.temperature = temperature
+        self.threshold = threshold
+        self.target_precision = target_precision
+        self.n_examples = n_examples
+        # Leave-one-out (confidence, correct) pairs from training, used for reports
+        self.validation_scores: List[Tuple[float, bool]] = []
+
+    @classmethod
+    def train(cls, examples: Iterable[Tuple[str, str]], n_features: int = DEFAULT_N_FEATURES,
+              temperature: float = DEFAULT_TEMPERATURE,
+              target_precision: float = DEFAULT_TARGET_PRECISION) -> "LocalIntentClassifier":
+        """
+        Fit class centroids and calibrate the confidence threshold.
+
+        The threshold is the lowest leave-one-out confidence at which held-out
+        predictions still reach target_precision; below it callers should ask GPT.
+        """
+        examples = [(text, label) for text, label in examples if text and label]
+        if not examples:
+            raise ValueError("No training examples")
+        labels = sorted({label for _, label in examples})
+        label_index = {label: i for i, label in enumerate(labels)}
+        sums = np.zeros((len(labels), n_features), dtype=np.float64)
+        vectors = []
+        for text, label in examples:
+            idx, w = extract_features(text, n_features)
+            sums[label_index[label], idx] += w
+            vectors.append((idx, w, label_index[label]))
+
+        model = cls(_normalize_rows(sums), labels, n_features, temperature,
+                    target_precision=target_precision, n_examples=len(examples))
+        model.validation_scores = _leave_one_out_scores(sums, vectors, temperature)
+        model.threshold = _calibrate_threshold(model.validation_scores, target_precision)
+        return model
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Return (label, confidence) for a text; (None, 0.0) when it has no usable features."""
+        idx, w = extract_features(text, self.n_features)
+        if idx.size == 0:
+            return None, 0.0
+        sims = self.centroids[:, idx] @ w
+        probs = _softmax(sims * self.temperature)
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+    def predict_confident(self, text: str) -> Optional[Tuple[str, float]]:
+        """Return (label, confidence) only when confidence clears the calibrated threshold."""
+        label, confidence = self.predict(text)
+        if label is None or confidence < self.threshold:
+            return None
+        return label, confidence
+
+    def save(self, path: str) -> None:
+        """Write the model artifact (.npz)."""
+        meta = {
+            "format_version": MODEL_FORMAT_VERSION,
+            "n_features": self.n_features,
+            "temperature": self.temperature,
+            "threshold": self.threshold,
+            "target_precision": self.target_precision,
+            "n_examples": self.n_examples,
+        }
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, centroids=self.centroids, labels=np.array(self.labels), meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIntentClassifier":
+        """Load a model artifact written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format_version") != MODEL_FORMAT_VERSION:
+                raise ValueError(f"Unsupported intent model format: {meta.get('format_version')}")
+            return cls(
+                data["centroids"],
+                [str(label) for label in data["labels"]],
+                n_features=meta["n_features"],
+                temperature=meta["temperature"],
+                threshold=meta["threshold"],
+                target_precision=meta.get("target_precision", DEFAULT_TARGET_PRECISION),
+                n_examples=meta.get("n_examples", 0),
+            )
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def _softmax(x: "np.ndarray") -> "np.ndarray":
+    e = np.exp(x - np.max(x))
+    return e / e.sum()
+
+
+def _leave_one_out_scores(sums: "np.ndarray", vectors: list, temperature: float) -> List[Tuple[float, bool]]:
+    """Confidence and correctness of each example against centroids fitted without it."""
+    scored = []
+    row_norms = np.linalg.norm(sums, axis=1)
+    for idx, w, label in vectors:
+        held_out = sums[:, idx].copy()
+        held_out[label] -= w
+        # Cosine against centroids with this example removed from its own class
+        own_sq = row_norms[label] ** 2 - np.dot(sums[label, idx], sums[label, idx]) + np.dot(held_out[label], held_out[label])
+        norms = row_norms.copy()
+        norms[label] = np.sqrt(max(own_sq, 0.0))
+        norms[norms == 0] = 1.0
+        sims = (held_out @ w) / norms
+        probs = _softmax(sims * temperature)
+        best = int(np.argmax(probs))
+        scored.append((float(probs[best]), best == label))
+    return scored
+
+
+def _calibrate_threshold(scored: List[Tuple[float, bool]], target_precision: float) -> float:
+    """Pick the lowest confidence whose held-out precision above it reaches the target."""
+    threshold = 1.0
+    correct = 0
+    for count, (confidence, is_correct) in enumerate(sorted(scored, key=lambda item: item[0], reverse=True), 1):
+        correct += int(is_correct)
+        if correct / count >= target_precision:
+            threshold = confidence
+    return threshold
+
+
+def load_training_examples(intents_path: str = DEFAULT_INTENTS_PATH,
+                           transcripts_path: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Collect (text, intent_tag) examples from intents.json and a transcript log.
+
+    The transcript log is JSONL with one {"text": ..., "intent": ...} object per line,
+    as written by the phone service when INTENT_TRANSCRIPT_LOG_PATH is set.
+    """
+    with open(intents_path, 'r') as f:
+        intents_data = json.load(f)
+    examples = [(pattern, intent['tag']) for intent in intents_data['intents'] for pattern in intent['patterns']]
+    known_tags = {intent['tag'] for intent in intents_data['intents']}
+    if transcripts_path and os.path.exists(transcripts_path):
+        with open(transcripts_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('intent') in known_tags and record.get('text'):
+                    examples.append((record['text'], record['intent']))
+    return examples
+
+
+_model_cache: Dict[str, Tuple[float, LocalIntentClassifier]] = {}
+
+
+def get_local_intent_model(model_path: str = DEFAULT_MODEL_PATH,
+                           intents_path: str = DEFAULT_INTENTS_PATH) -> Optional[LocalIntentClassifier]:
+    """
+    Get the shared local classifier, loading the artifact or fitting from intents.json.
+
+    Returns None when NumPy is unavailable so callers fall back to GPT.
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    source = model_path if os.path.exists(model_path) else intents_path
+    try:
+        mtime = os.path.getmtime(source)
+    except OSError:
+        return None
+    cached = _model_cache.get(source)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    if source == model_path:
+        model = LocalIntentClassifier.load(model_path)
+    else:
+        model = LocalIntentClassifier.train(load_training_examples(intents_path))
+    _model_cache[source] = (mtime, model)
+    return model
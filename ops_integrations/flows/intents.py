@@ -2,13 +2,19 @@ import json
 import os
 from typing import Dict, List, Any
 
+INTENTS_PATH = os.path.join(os.path.dirname(__file__), 'intents.json')
+
+# Parsed intents.json, reloaded only when the file's mtime changes
+_intents_cache: Dict[str, Any] = {"mtime": None, "data": None}
+
 def load_intents() -> Dict[str, Any]:
-    """Load intents from intents.json file."""
-    current_dir = os.path.dirname(__file__)
-    intents_path = os.path.join(current_dir, 'intents.json')
-    
-    with open(intents_path, 'r') as f:
-        return json.load(f)
+    """Load intents from intents.json file (cached; re-read when the file changes)."""
+    mtime = os.path.getmtime(INTENTS_PATH)
+    if _intents_cache["data"] is None or _intents_cache["mtime"] != mtime:
+        with open(INTENTS_PATH, 'r') as f:
+            _intents_cache["data"] = json.load(f)
+        _intents_cache["mtime"] = mtime
+    return _intents_cache["data"]
 
 def get_intent_tags() -> List[str]:
     """Get list of all available intent tags."""
@@ -21,4 +27,4 @@ def get_intent_patterns(tag: str) -> List[str]:
     for intent in intents_data['intents']:
         if intent['tag'] == tag:
             return intent['patterns']
-    return [] 
\ No newline at end of file
+    return []
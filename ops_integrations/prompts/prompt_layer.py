@@ -7,6 +7,33 @@ RECURRING_PROBLEM, DRAIN_MAINTENANCE, GENERAL_INQUIRY, UNKNOWN
 Use UNKNOWN only when the message is unclear, not plumbing-related, or contains no actionable intent.
 Respond with only the tag name.'''
 
+INTENT_CLASSIFICATION_PROMPT_VERSION = "intent-v1"
+
+TURN_ANALYSIS_PROMPT_VERSION = "turn-v1"
+
+TURN_ANALYSIS_PROMPT = '''
+You are a plumbing service booking assistant for SafeHarbour Plumbing. Analyze a single caller utterance
+from a phone call and call analyze_turn with ONLY the fields it asks for.
+
+Rules:
+- intent_tag: the caller's plumbing intent; UNKNOWN when unclear or not plumbing related.
+- job_type: the most specific plumbing service mentioned, or null if none.
+- urgency: emergency (immediate), same_day (today), flex (anytime).
+- customer_name: the caller's first name only if they say it, otherwise null.
+- raw_address: the service address exactly as spoken, otherwise null.
+- datetime: resolve relative expressions against NOW and return "YYYY-MM-DD HH:MM". Preserve explicit times.
+  If only part of day is given use morning=09:00, afternoon=14:00, evening=18:00. Weekdays mean the next
+  occurrence. Null when no time is requested.
+
+Examples:
+- "kitchen sink is clogged" → job_type: clogged_kitchen_sink
+- "toilet is running constantly" → job_type: running_toilet
+- "water heater burst" → job_type: water_heater_repair, urgency: emergency
+- "need new faucet installed" → job_type: faucet_replacement
+- "drain smells bad" → job_type: camera_inspection
+- "um Sean" → customer_name: Sean
+- "can come tomorrow" → urgency: flex'''
+
 FOLLOW_UP_PROMPTS = {
     "EMERGENCY_FIX": '''
 Customer reported an emergency issue. Ask urgency and fallback to phone call:
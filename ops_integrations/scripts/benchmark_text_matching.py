@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the per-utterance text matching hot paths.
+
+Usage:
+    python ops_integrations/scripts/benchmark_text_matching.py [--rounds 200]
+
+Each section times the current implementation against the legacy one kept in
+the matching equivalence test, over the stress_test_intent.py utterances or the
+test_transcription_cleaning.py cases plus long synthetic transcripts, or the
+test_datetime_grammar.py corpus.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+
+def _time_per_call(func, texts, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        samples.append((time.perf_counter() - start) / len(texts))
+    return statistics.median(samples) * 1e6
+
+
+def _report(name, legacy, current, texts, rounds):
+    legacy_us = _time_per_call(legacy, texts, rounds)
+    current_us = _time_per_call(current, texts, rounds)
+    print(f"{name:<40} legacy {legacy_us:9.1f}µs  current {current_us:9.1f}µs  "
+          f"speedup {legacy_us / current_us:5.1f}x")
+
+
+def bench_job_types(rounds):
+    from ops_integrations.services.plumbing_services import (
+        infer_job_type_from_text,
+        infer_multiple_job_types_from_text,
+    )
+    from ops_integrations.tests.stress_test_intent import MULTI_INTENT_TESTS, SINGLE_INTENT_TESTS
+    from ops_integrations.tests.test_service_matcher import (
+        legacy_infer_job_type_from_text,
+        legacy_infer_multiple_job_types_from_text,
+    )
+
+    short = [case["text"] for case in MULTI_INTENT_TESTS + SINGLE_INTENT_TESTS]
+    long = [" ".join(short[i:i + 8]) for i in range(0, len(short), 8)]
+    print(f"Job-type inference ({len(short)} stress utterances, {len(long)} long transcripts)")
+    _report("infer_job_type_from_text", legacy_infer_job_type_from_text, infer_job_type_from_text, short, rounds)
+    _report("infer_multiple_job_types_from_text", legacy_infer_multiple_job_types_from_text,
+            infer_multiple_job_types_from_text, short, rounds)
+    _report("infer_multiple_job_types_from_text (long)", legacy_infer_multiple_job_types_from_text,
+            infer_multiple_job_types_from_text, long, rounds)
+
+
+def bench_transcript_filters(rounds):
+    from ops_integrations.services.transcript_filters import get_transcript_filter
+    from ops_integrations.tests.test_transcript_filters import legacy_remove, legacy_should_suppress, load_patterns
+    from ops_integrations.tests.test_transcription_cleaning import CLEANING_TEST_CASES
+
+    suppress_patterns, remove_patterns = load_patterns()
+    compiled = get_transcript_filter()
+    texts = [case["input"] for case in CLEANING_TEST_CASES]
+    texts.append(" ".join(texts[4:8] * 4))
+
+    def legacy(text):
+        if not legacy_should_suppress(text.lower(), suppress_patterns):
+            legacy_remove(text, remove_patterns)
+
+    def current(text):
+        if compiled.find_suppression(text.lower()) is None:
+            compiled.remove(text)
+
+    print(f"\nTranscript filters ({len(suppress_patterns)} suppress / {len(remove_patterns)} remove patterns, "
+          f"{len(texts)} transcripts)")
+    _report("suppress + remove", legacy, current, texts, rounds)
+
+
+def bench_repetitions(rounds):
+    import logging
+    import ops_integrations.core  # noqa: F401 - core must be imported before adapters.phone
+    from ops_integrations.adapters.phone import has_excessive_repetitions, remove_repeated_phrases
+    from ops_integrations.tests.test_repetition_detection import (
+        legacy_has_excessive_repetitions,
+        legacy_remove_repeated_phrases,
+    )
+
+    logging.disable(logging.INFO)
+    # ~15 s problem-description chunks: 40 words, 200 words, and a 10x Whisper loop
+    sentence = "the water heater in the garage started leaking from the bottom last night and"
+    texts = [" ".join([sentence] * 3), " ".join([sentence] * 14), " ".join(["thank you so much for calling"] * 10)]
+    texts = [text + " " + str(i) for i, text in enumerate(texts)]
+    print(f"\nRepetition detection ({', '.join(str(len(t.split())) for t in texts)} word transcripts)")
+    _report("has_excessive_repetitions", legacy_has_excessive_repetitions, has_excessive_repetitions, texts, rounds)
+    _report("remove_repeated_phrases", legacy_remove_repeated_phrases, remove_repeated_phrases, texts, rounds)
+    logging.disable(logging.NOTSET)
+
+
+def bench_datetime(rounds):
+    from ops_integrations.services.datetime_grammar import parse_relative_datetime
+    from ops_integrations.tests.test_datetime_grammar import DATETIME_CORPUS, NOW, legacy_parse_human_datetime
+
+    texts = [text for text, _ in DATETIME_CORPUS]
+    print(f"\nRelative datetime parsing ({len(texts)} corpus phrases)")
+    _report("parse_human_datetime", lambda text: legacy_parse_human_datetime(text, NOW),
+            lambda text: parse_relative_datetime(text, NOW), texts, rounds)
+    current_us = _time_per_call(lambda text: parse_relative_datetime(text, NOW), texts, rounds)
+    print(f"{'grammar throughput':<40} {1e6 / current_us:,.0f} parses/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text matching hot paths")
+    parser.add_argument("--rounds", type=int, default=200, help="Timing rounds per measurement")
+    args = parser.parse_args()
+    bench_job_types(args.rounds)
+    bench_transcript_filters(args.rounds)
+    bench_repetitions(args.rounds)
+    bench_datetime(args.rounds)
+
+
+if __name__ == "__main__":
+    main()
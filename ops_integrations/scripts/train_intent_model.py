@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Train the local intent classifier and report accuracy/latency.
+
+Usage:
+    python ops_integrations/scripts/train_intent_model.py \
+        --transcripts logs/intent_transcripts.jsonl \
+        --output ops_integrations/flows/intent_model.npz --report
+
+The report covers leave-one-out accuracy on the training data, how many
+stress_test_intent.py utterances the model answers without GPT, and a job-type
+model trained on SERVICE_KEYWORDS scored against the stress cases' expected
+primary service alongside the rule-based infer_multiple_job_types_from_text.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from ops_integrations.flows.intent_model import (
+    DEFAULT_INTENTS_PATH,
+    DEFAULT_MODEL_PATH,
+    DEFAULT_TARGET_PRECISION,
+    LocalIntentClassifier,
+    load_training_examples,
+)
+
+
+def _latency_summary(samples_sec):
+    samples_us = sorted(s * 1e6 for s in samples_sec)
+    p95 = samples_us[min(len(samples_us) - 1, int(len(samples_us) * 0.95))]
+    return f"p50={statistics.median(samples_us):.0f}µs p95={p95:.0f}µs"
+
+
+def _report_validation(model):
+    scored = model.validation_scores
+    accuracy = sum(correct for _, correct in scored) / len(scored)
+    confident = [correct for confidence, correct in scored if confidence >= model.threshold]
+    coverage = len(confident) / len(scored)
+    precision = (sum(confident) / len(confident)) if confident else 0.0
+    print(f"Leave-one-out accuracy: {accuracy:.1%} over {len(scored)} examples")
+    print(f"Calibrated threshold: {model.threshold:.3f} (target precision {model.target_precision:.0%})")
+    print(f"Above threshold: coverage {coverage:.1%}, precision {precision:.1%}")
+
+
+def _report_stress_cases(model):
+    from ops_integrations.services.plumbing_services import SERVICE_KEYWORDS, infer_multiple_job_types_from_text
+    from ops_integrations.tests.stress_test_intent import MULTI_INTENT_TESTS, SINGLE_INTENT_TESTS
+
+    cases = MULTI_INTENT_TESTS + SINGLE_INTENT_TESTS
+    print(f"\nstress_test_intent.py utterances: {len(cases)}")
+
+    latencies, local = [], 0
+    for case in cases:
+        start = time.perf_counter()
+        prediction = model.predict_confident(case["text"])
+        latencies.append(time.perf_counter() - start)
+        local += prediction is not None
+    print(f"Intent model: answered locally {local}/{len(cases)} (GPT skipped), latency {_latency_summary(latencies)}")
+
+    job_examples = [(keyword, service) for service, keywords in SERVICE_KEYWORDS.items() for keyword in keywords]
+    job_model = LocalIntentClassifier.train(job_examples)
+    model_hits, rule_hits, model_lat, rule_lat = 0, 0, [], []
+    for case in cases:
+        start = time.perf_counter()
+        label, _ = job_model.predict(case["text"])
+        model_lat.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        rule_primary = infer_multiple_job_types_from_text(case["text"])["primary"]
+        rule_lat.append(time.perf_counter() - start)
+        model_hits += label == case["expected_primary"]
+        rule_hits += rule_primary == case["expected_primary"]
+    print(f"Job-type primary accuracy: model {model_hits}/{len(cases)} ({_latency_summary(model_lat)}), "
+          f"rules {rule_hits}/{len(cases)} ({_latency_summary(rule_lat)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local intent classifier")
+    parser.add_argument("--intents", default=DEFAULT_INTENTS_PATH, help="intents.json with tagged patterns")
+    parser.add_argument("--transcripts", default=None, help="JSONL transcript log with text/intent fields")
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH, help="Where to write the .npz model artifact")
+    parser.add_argument("--target-precision", type=float, default=DEFAULT_TARGET_PRECISION,
+                        help="Precision required above the calibrated threshold")
+    parser.add_argument("--report", action="store_true", help="Print accuracy/latency report")
+    args = parser.parse_args()
+
+    examples = load_training_examples(args.intents, args.transcripts)
+    start = time.perf_counter()
+    model = LocalIntentClassifier.train(examples, target_precision=args.target_precision)
+    print(f"Trained on {len(examples)} examples / {len(model.labels)} intents in {time.perf_counter() - start:.2f}s")
+
+    model.save(args.output)
+    start = time.perf_counter()
+    LocalIntentClassifier.load(args.output)
+    print(f"Saved {args.output} (load time {(time.perf_counter() - start) * 1000:.1f}ms)")
+
+    if args.report:
+        _report_validation(model)
+        _report_stress_cases(model)
+
+
+if __name__ == "__main__":
+    main()
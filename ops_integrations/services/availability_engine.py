@@ -0,0 +1,245 @@
+"""
+Availability across several technicians' calendars in one computation.
+
+config/technicians.json lists the technicians and the Google Calendar each one
+is booked on ("calendar_id": null means the default GOOGLE_CALENDAR_ID). Their
+events (one get_events per calendar, served by the local mirror) become a
+boolean busy matrix of technicians x 15-minute buckets. A job of d buckets with
+a buffer of b buckets can start at bucket c when the window [c - b, c + d + b)
+is empty, i.e. a box-kernel convolution of each busy row; window sums come from
+one cumulative sum over the matrix, so every (technician, start) pair is
+checked at once. Durations and buffers that are not whole buckets round up.
+
+For a single technician the result is the same as BusyIndex.find_free_slots.
+Without NumPy the engine falls back to one BusyIndex per technician.
+"""
+
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from .slot_engine import MAX_EVENTS_PER_FETCH, SLOT_STEP_MINUTES, BusyIndex, ceil_to_step, event_interval
+except Exception:
+    import sys as _sys
+    _OPS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if _OPS_ROOT not in _sys.path:
+        _sys.path.insert(0, _OPS_ROOT)
+    from services.slot_engine import MAX_EVENTS_PER_FETCH, SLOT_STEP_MINUTES, BusyIndex, ceil_to_step, event_interval
+
+logger = logging.getLogger(__name__)
+
+BUCKET_MINUTES = SLOT_STEP_MINUTES
+DEFAULT_TECHNICIANS_PATH = os.getenv(
+    'TECHNICIANS_JSON',
+    os.path.join(os.path.dirname(__file__), '..', 'config', 'technicians.json'),
+)
+
+
+@dataclass(frozen=True)
+class Technician:
+    name: str
+    calendar_id: Optional[str] = None  # None: the default GOOGLE_CALENDAR_ID calendar
+
+
+@dataclass(frozen=True)
+class SlotAssignment:
+    technician: Technician
+    start: datetime
+
+
+DEFAULT_TECHNICIAN = Technician('primary')
+
+_technicians_cache: Dict[str, List[Technician]] = {}
+
+
+def get_technicians(path: Optional[str] = None) -> List[Technician]:
+    """
+    Technicians from path (default: TECHNICIANS_JSON or config/technicians.json),
+    loaded on first use; a single default technician when the file is missing.
+    """
+    path = path or DEFAULT_TECHNICIANS_PATH
+    cached = _technicians_cache.get(path)
+    if cached is None:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            cached = [Technician(str(t['name']), t.get('calendar_id') or None) for t in data.get('technicians', [])]
+            if not cached:
+                raise ValueError("no technicians listed")
+        except Exception as e:
+            logger.warning(f"Technicians not loaded from {path}: {e}")
+            cached = [DEFAULT_TECHNICIAN]
+        _technicians_cache[path] = cached
+    return cached
+
+
+def _buckets(minutes: int) -> int:
+    return -(-int(minutes) // BUCKET_MINUTES)
+
+
+class AvailabilityMatrix:
+    """Busy state of each technician per BUCKET_MINUTES bucket over [origin, origin + n_buckets)."""
+
+    def __init__(
+        self,
+        technicians: Sequence[Technician],
+        origin: datetime,
+        n_buckets: int,
+        intervals: Sequence[Iterable[Tuple[datetime, datetime]]],
+    ):
+        self.technicians = list(technicians)
+        self.origin = origin
+        self.n_buckets = max(0, int(n_buckets))
+        self.indexes = [BusyIndex(ivs) for ivs in intervals]
+        self.busy = self._build_busy() if NUMPY_AVAILABLE else None
+
+    @classmethod
+    def fetch(
+        cls,
+        technicians: Sequence[Technician],
+        calendars: Sequence[Any],
+        start: datetime,
+        end: datetime,
+    ) -> 'AvailabilityMatrix':
+        """
+        Build the matrix for [start, end) from one get_events per technician calendar.
+
+        Args:
+            technicians: Rows of the matrix
+            calendars: Calendar adapter per technician; disabled or missing calendars count as free
+            start: First bucket (aligned down to a bucket boundary)
+            end: End of the range (aligned up)
+
+        Returns:
+            The matrix
+        """
+        origin = start.replace(minute=start.minute - start.minute % BUCKET_MINUTES, second=0, microsecond=0)
+        n_buckets = math.ceil(max(0.0, (end - origin).total_seconds()) / (BUCKET_MINUTES * 60))
+        intervals = []
+        for calendar in calendars:
+            if calendar is None or not getattr(calendar, 'enabled', False):
+                intervals.append([])
+                continue
+            events = calendar.get_events(start_date=start, end_date=end, max_results=MAX_EVENTS_PER_FETCH)
+            intervals.append([iv for iv in (event_interval(ev) for ev in events or []) if iv])
+        return cls(technicians, origin, n_buckets, intervals)
+
+    def _build_busy(self):
+        t_count, n = len(self.technicians), self.n_buckets
+        rows, starts, ends = [], [], []
+        for row, index in enumerate(self.indexes):
+            rows.extend([row] * len(index))
+            starts.extend(index.starts)
+            ends.extend(index.ends)
+        # Mark every bucket an interval touches: [floor(start), ceil(end)) via a difference array
+        origin = np.datetime64(self.origin, 's')
+        bucket = np.timedelta64(BUCKET_MINUTES * 60, 's')
+        first = np.floor((np.array(starts, dtype='datetime64[s]') - origin) / bucket).astype(np.int64)
+        last = np.ceil((np.array(ends, dtype='datetime64[s]') - origin) / bucket).astype(np.int64)
+        first, last = np.clip(first, 0, n), np.clip(last, 0, n)
+        keep = last > first
+        diff = np.zeros((t_count, n + 1), dtype=np.int32)
+        np.add.at(diff, (np.array(rows, dtype=np.int64)[keep], first[keep]), 1)
+        np.add.at(diff, (np.array(rows, dtype=np.int64)[keep], last[keep]), -1)
+        return np.cumsum(diff[:, :n], axis=1) > 0
+
+    def feasible_starts(self, duration_minutes: int, buffer_minutes: int):
+        """
+        Bool [technicians, buckets]: True where a job starting at that bucket, with the
+        buffer on both sides, fits in the matrix without touching a busy bucket.
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("feasible_starts needs numpy")
+        n = self.n_buckets
+        dur_b, buf_b = _buckets(duration_minutes), _buckets(buffer_minutes)
+        window_sums = np.zeros((len(self.technicians), n + 1), dtype=np.int32)
+        np.cumsum(self.busy, axis=1, out=window_sums[:, 1:])
+        c = np.arange(n)
+        lo, hi = c - buf_b, c + dur_b + buf_b
+        inside = (lo >= 0) & (hi <= n)
+        lo, hi = np.clip(lo, 0, n), np.clip(hi, 0, n)
+        return inside & (window_sums[:, hi] - window_sums[:, lo] == 0)
+
+    def earliest(
+        self,
+        earliest: datetime,
+        latest: datetime,
+        duration_minutes: int = 120,
+        buffer_minutes: int = 60,
+        count: int = 1,
+    ) -> List[SlotAssignment]:
+        """
+        The earliest feasible (technician, start) pairs with starts in [earliest, latest].
+
+        Args:
+            earliest: Earliest acceptable start (rounded up to a bucket)
+            latest: Latest acceptable start
+            duration_minutes: Job length
+            buffer_minutes: Free time required before and after the job
+            count: Number of pairs to return; a technician's own pairs never overlap
+
+        Returns:
+            Up to `count` assignments ordered by start, then technician order
+        """
+        start = ceil_to_step(earliest, BUCKET_MINUTES)
+        if not NUMPY_AVAILABLE:
+            pairs = []
+            for row, index in enumerate(self.indexes):
+                for slot in index.find_free_slots(start, latest, duration_minutes, buffer_minutes, count,
+                                                  BUCKET_MINUTES):
+                    pairs.append((slot, row))
+            return [SlotAssignment(self.technicians[row], slot) for slot, row in sorted(pairs)[:count]]
+
+        step = timedelta(minutes=BUCKET_MINUTES)
+        c0 = max(0, -(-(start - self.origin) // step))
+        c1 = min((latest - self.origin) // step, self.n_buckets - 1)
+        if c1 < c0:
+            return []
+        start = self.origin + c0 * step
+        dur_b = _buckets(duration_minutes)
+        feasible = self.feasible_starts(duration_minutes, buffer_minutes)[:, c0:c1 + 1]
+        pairs = []
+        for row in range(len(self.technicians)):
+            candidates = np.flatnonzero(feasible[row])
+            pos = 0
+            for _ in range(count):
+                if pos >= len(candidates):
+                    break
+                c = int(candidates[pos])
+                pairs.append((c, row))
+                # The technician's next job starts once this one ends
+                pos = int(np.searchsorted(candidates, c + dur_b))
+        pairs.sort()
+        return [SlotAssignment(self.technicians[row], start + c * step) for c, row in pairs[:count]]
+
+
+def first_free_assignment(
+    technicians: Sequence[Technician],
+    calendars: Sequence[Any],
+    start: datetime,
+    duration_minutes: int = 120,
+    buffer_minutes: int = 60,
+) -> Optional[SlotAssignment]:
+    """
+    The first technician (in configured order) free for a job at start, or None.
+
+    The start is rounded up to the quarter-hour grid before checking; book the
+    returned assignment's start, which is the time that was found free.
+    """
+    buffer = timedelta(minutes=_buckets(buffer_minutes) * BUCKET_MINUTES)
+    duration = timedelta(minutes=_buckets(duration_minutes) * BUCKET_MINUTES)
+    start = ceil_to_step(start, BUCKET_MINUTES)
+    matrix = AvailabilityMatrix.fetch(technicians, calendars, start - buffer, start + duration + buffer)
+    assignments = matrix.earliest(start, start, duration_minutes, buffer_minutes, count=1)
+    return assignments[0] if assignments else None
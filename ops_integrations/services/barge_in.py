@@ -0,0 +1,120 @@
+"""
+Barge-in detection: noticing that the caller has started talking over the bot.
+
+While a prompt plays over the Media Stream, the inbound audio carries the
+caller plus whatever of the bot's own voice leaks back (line echo that the
+carrier's echo canceller did not remove). VAD alone fires on that echo, so a
+frame only counts as the caller when VAD says speech *and* its energy clears
+a threshold raised in proportion to how loud the bot is at that moment.
+Playback is interrupted once such frames are sustained long enough to rule
+out coughs, clicks and line noise.
+"""
+
+import struct
+from collections import deque
+from typing import Callable, Deque
+
+try:
+    import audioop as _audioop  # type: ignore
+except Exception:
+    _audioop = None
+
+
+def pcm16_rms(frame: bytes) -> float:
+    """RMS level of 16-bit little-endian mono PCM."""
+    count = len(frame) // 2
+    if not count:
+        return 0.0
+    if _audioop is not None:
+        return float(_audioop.rms(frame[:count * 2], 2))
+    samples = struct.unpack(f"<{count}h", frame[:count * 2])
+    return (sum(s * s for s in samples) / count) ** 0.5
+
+
+class BargeInDetector:
+    """Per-call detector fed the caller's PCM16 audio while the bot is playing."""
+
+    def __init__(self, is_speech: Callable[[bytes], bool], sample_rate: int = 8000, frame_ms: int = 20,
+                 min_rms: float = 200.0, echo_ratio: float = 0.5, sustain_ms: int = 240,
+                 max_gap_ms: int = 60, preroll_ms: int = 100):
+        """
+        Args:
+            is_speech: VAD decision for one frame
+            sample_rate: Inbound PCM16 sample rate
+            min_rms: Level the caller must reach even when the bot is quiet
+            echo_ratio: Fraction of the bot's current playback level the caller must reach
+            sustain_ms: Voiced audio needed before playback is interrupted
+            max_gap_ms: Unvoiced audio tolerated inside a run (between syllables)
+            preroll_ms: Audio kept from before the run so the first syllable is not lost
+        """
+        self.is_speech = is_speech
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.min_rms = min_rms
+        self.echo_ratio = echo_ratio
+        self.sustain_ms = sustain_ms
+        self.max_gap_ms = max_gap_ms
+        self._preroll: Deque[bytes] = deque(maxlen=max(1, preroll_ms // frame_ms))
+        self._carry = b""
+        self._run = bytearray()
+        self._voiced_ms = 0
+        self._gap_ms = 0
+        self.echo_rejected = 0  # frames VAD called speech that were too quiet to be the caller
+
+    def threshold(self, echo_level: float) -> float:
+        """Caller level needed while the bot's playback is at echo_level (RMS of the audio sent)."""
+        return max(self.min_rms, self.echo_ratio * echo_level)
+
+    def feed(self, pcm: bytes, echo_level: float) -> bool:
+        """
+        Add inbound audio received while the bot is playing.
+
+        Args:
+            pcm: Caller audio; may split frames
+            echo_level: RMS of the bot audio playing now
+
+        Returns:
+            True once the caller has talked over the bot for sustain_ms
+        """
+        data = self._carry + pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._carry = data[usable:]
+        threshold = self.threshold(echo_level)
+        for start in range(0, usable, self.frame_bytes):
+            frame = data[start:start + self.frame_bytes]
+            speech = False
+            try:
+                speech = bool(self.is_speech(frame))
+            except Exception:
+                pass
+            if speech and pcm16_rms(frame) < threshold:
+                self.echo_rejected += 1
+                speech = False
+            if speech:
+                if not self._run:
+                    self._run.extend(b"".join(self._preroll))
+                self._run.extend(frame)
+                self._voiced_ms += self.frame_ms
+                self._gap_ms = 0
+                if self._voiced_ms >= self.sustain_ms:
+                    return True
+            elif self._run:
+                self._run.extend(frame)
+                self._gap_ms += self.frame_ms
+                if self._gap_ms > self.max_gap_ms:
+                    self._run = bytearray()
+                    self._voiced_ms = 0
+                    self._gap_ms = 0
+            self._preroll.append(frame)
+        return False
+
+    def captured(self) -> bytes:
+        """The interrupting speech so far, preroll included."""
+        return bytes(self._run) + self._carry
+
+    def reset(self) -> None:
+        self._preroll.clear()
+        self._carry = b""
+        self._run = bytearray()
+        self._voiced_ms = 0
+        self._gap_ms = 0
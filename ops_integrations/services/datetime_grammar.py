@@ -0,0 +1,639 @@
+"""
+Grammar-based parser for the scheduling phrases callers actually say.
+
+One compiled regex tokenizes the utterance in a single pass (ISO and m/d
+dates, 10:30-style clocks, 5th, bare numbers, a.m./p.m. and words); words are
+then classified with one dict lookup each. A small left-to-right grammar over
+those tokens recognizes:
+
+    relative days       today, tonight, tomorrow, (the) day after tomorrow
+    weekdays            monday, this friday, next tuesday, coming saturday
+    calendar dates      march 5th, the 5th of march, the 15th, 9/14, 2025-09-14
+    offsets             in 2 hours, in an hour, in half an hour, in three days, in a couple weeks
+    clock times         3, 3 pm, 3:30pm, three thirty, ten oh five, 4 o'clock, noon, midnight
+    clock phrases       half past three, quarter past 2, quarter to five, ten to six, 20 minutes past 4
+    parts of day        (tomorrow) morning, afternoon, evening, night
+
+and resolves them against NOW. Bare numbers count as clock times only after a
+cue ("at 3", "around three"), right next to a day or part of day ("tomorrow 7",
+"9 on friday", "8 in the morning") or when the reply is nothing but the time.
+A time that has already passed today is not guessed at: the parse abstains.
+Neither is a choice between times ("tomorrow or friday", "friday not
+thursday", "between 2 and 4") or two days or times that disagree. A day or
+clock time attached to a past reference ("yesterday at 3 pm", "last night
+around 10") says when the problem started, so the parse finds no booking time.
+
+parse_relative_datetime() returns a DateTimeParse with a confidence and one of
+three outcomes: a datetime ("grammar"), no time expression at all ("none"), or
+"abstain" when the utterance mentions time in a way the grammar does not cover
+("sometime next weekend"). Callers ask the LLM only on abstain.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Defaults shared with the LLM datetime prompt in adapters/phone.py
+PART_OF_DAY_HOURS = {'morning': 9, 'afternoon': 14, 'evening': 18, 'tonight': 19, 'night': 20}
+DEFAULT_HOUR = 15  # no time given: 3:00 PM
+
+# Below this a parse is not trusted and the caller should treat it as abstain
+MIN_CONFIDENCE = 0.5
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+MONTHS = ('january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
+          'october', 'november', 'december')
+
+_UNITS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8,
+          'nine': 9}
+_TEENS = {'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15, 'sixteen': 16,
+          'seventeen': 17, 'eighteen': 18, 'nineteen': 19}
+_TENS = {'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50}
+_ORDINALS = {
+    'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5, 'sixth': 6, 'seventh': 7, 'eighth': 8,
+    'ninth': 9, 'tenth': 10, 'eleventh': 11, 'twelfth': 12, 'thirteenth': 13, 'fourteenth': 14,
+    'fifteenth': 15, 'sixteenth': 16, 'seventeenth': 17, 'eighteenth': 18, 'nineteenth': 19, 'twentieth': 20,
+    'thirtieth': 30,
+}
+_UNIT_MINUTES = {'minute': 1, 'minutes': 1, 'min': 1, 'mins': 1, 'hour': 60, 'hours': 60, 'hr': 60, 'hrs': 60,
+                 'day': 1440, 'days': 1440, 'week': 10080, 'weeks': 10080}
+
+
+def _build_lexicon() -> Dict[str, Tuple[str, object]]:
+    lexicon: Dict[str, Tuple[str, object]] = {}
+    for idx, name in enumerate(WEEKDAYS):
+        lexicon[name] = ('WEEKDAY', idx)
+    # No "mon"/"sat"/"sun": ordinary words in a transcript
+    lexicon.update({'tue': ('WEEKDAY', 1), 'tues': ('WEEKDAY', 1), 'wed': ('WEEKDAY', 2), 'weds': ('WEEKDAY', 2),
+                    'thu': ('WEEKDAY', 3), 'thur': ('WEEKDAY', 3), 'thurs': ('WEEKDAY', 3), 'fri': ('WEEKDAY', 4)})
+    for idx, name in enumerate(MONTHS, start=1):
+        lexicon[name] = ('MONTH', idx)
+        if name != 'may':
+            lexicon[name[:3]] = ('MONTH', idx)
+    lexicon['sept'] = ('MONTH', 9)
+    lexicon.update({'today': ('RELDAY', 0), 'tomorrow': ('RELDAY', 1), 'tmrw': ('RELDAY', 1),
+                    'tomorrows': ('RELDAY', 1), 'tonight': ('TONIGHT', 0), 'yesterday': ('PAST_DAY', -1),
+                    'last': ('LAST', None), 'ago': ('AGO', None)})
+    for name in ('morning', 'afternoon', 'evening', 'night'):
+        lexicon[name] = ('POD', name)
+    for word, value in list(_UNITS.items()) + list(_TEENS.items()) + list(_TENS.items()):
+        lexicon[word] = ('NUMW', value)
+    for word, value in _ORDINALS.items():
+        lexicon[word] = ('ORDW', value)
+    for word, minutes in _UNIT_MINUTES.items():
+        lexicon[word] = ('UNIT', minutes)
+    for word in ('next', 'this', 'coming', 'upcoming'):
+        lexicon[word] = ('MOD', word)
+    for word in ('at', 'around', 'by', 'about', 'before', 'after', 'until', 'till', 'til', 'from', 'say',
+                 'approximately', 'roughly'):
+        lexicon[word] = ('CUE', word)
+    lexicon.update({
+        "o'clock": ('OCLOCK', None), 'oclock': ('OCLOCK', None), 'noon': ('NOON', 12), 'midday': ('NOON', 12),
+        'midnight': ('MIDNIGHT', 0), 'half': ('HALF', 30), 'quarter': ('QUARTER', 15),
+        'past': ('PAST', 1), 'to': ('TO', -1), 'of': ('OF', None), 'the': ('THE', None),
+        'in': ('IN', None), 'within': ('IN', None), 'a': ('A', 1), 'an': ('A', 1), 'couple': ('COUPLE', 2),
+        'oh': ('OH', 0), 'and': ('AND', None), 'am': ('MER', 'am'), 'pm': ('MER', 'pm'),
+        'ish': ('ISH', None),
+    })
+    return lexicon
+
+
+_LEXICON = _build_lexicon()
+
+# Temporal words the grammar does not resolve: seeing one of these unconsumed means abstain
+VAGUE_TEMPORAL_WORDS = frozenset({
+    'weekend', 'weekends', 'month', 'months', 'sometime', 'anytime', 'holiday', 'holidays', 'fortnight',
+    'lunch', 'lunchtime', 'dinnertime',
+})
+# Month names that are also common words; unconsumed they are not a time mention
+_AMBIGUOUS_MONTHS = frozenset({'may', 'march', 'mar', 'jan', 'aug'})
+
+_TOKEN_RE = re.compile(
+    r"(?P<iso>\d{4}-\d{1,2}-\d{1,2})"
+    r"|(?P<slash>\d{1,2}/\d{1,2}(?:/\d{2,4})?)"
+    r"|(?P<clock>\d{1,2}:\d{2})"
+    r"|(?P<ord>\d{1,2})(?:st|nd|rd|th)\b"
+    r"|(?P<num>\d+)"
+    r"|(?P<mer>[ap])\.\s?m\b\.?"
+    r"|(?P<merword>[ap]m)\b"
+    r"|(?P<word>[a-z]+(?:'[a-z]+)?)"
+)
+
+
+class Token(NamedTuple):
+    kind: str
+    value: object
+    text: str
+
+
+def tokenize(text: str) -> List[Token]:
+    """Single-pass tokenization into grammar tokens (unknown words are kind WORD)."""
+    tokens = []
+    for m in _TOKEN_RE.finditer((text or "").lower().replace('’', "'")):
+        group = m.lastgroup
+        if group == 'iso':
+            tokens.append(Token('ISO', tuple(int(part) for part in m.group(0).split('-')), m.group(0)))
+        elif group == 'slash':
+            tokens.append(Token('SLASH', tuple(int(part) for part in m.group(0).split('/')), m.group(0)))
+        elif group == 'clock':
+            hour, minute = m.group(0).split(':')
+            tokens.append(Token('CLOCK', (int(hour), int(minute)), m.group(0)))
+        elif group == 'ord':
+            tokens.append(Token('ORD', int(m.group('ord')), m.group(0)))
+        elif group == 'num':
+            tokens.append(Token('NUM', int(m.group(0)), m.group(0)))
+        elif group in ('mer', 'merword'):
+            tokens.append(Token('MER', 'am' if m.group(0)[0] == 'a' else 'pm', m.group(0)))
+        else:
+            word = m.group(0)
+            entry = _LEXICON.get(word)
+            if entry is None and word.endswith("'s"):
+                entry = _LEXICON.get(word[:-2])
+            kind, value = entry if entry else ('WORD', word)
+            tokens.append(Token(kind, value, word))
+    return tokens
+
+
+@dataclass(frozen=True)
+class DateTimeParse:
+    """
+    Result of parsing one utterance.
+
+    Attributes:
+        value: Resolved datetime, or None
+        confidence: 0..1
+        source: "grammar", "none" (no time expression) or "abstain" (needs the LLM)
+        parts: Grammar productions that fired, e.g. ("weekday", "clock")
+    """
+    value: Optional[datetime]
+    confidence: float
+    source: str
+    parts: Tuple[str, ...] = ()
+
+    @property
+    def abstained(self) -> bool:
+        return self.source == "abstain"
+
+
+class _State:
+    """What the grammar has recognized so far in one utterance."""
+
+    def __init__(self):
+        self.day: Optional[date] = None
+        self.weekday_bare = False
+        self.hour: Optional[int] = None
+        self.minute = 0
+        self.meridiem: Optional[str] = None
+        self.pod: Optional[str] = None
+        self.offset: Optional[timedelta] = None
+        self.parts: List[str] = []
+        self.used = set()
+        # (part, start, end, (day, hour, minute, pod) after it) for each production that fired
+        self.spans: List[Tuple[str, int, int, tuple]] = []
+
+
+def _number(tokens: List[Token], i: int, max_value: int = 59) -> Optional[Tuple[int, int]]:
+    """(value, next index) for a digit or number-word quantity ("5", "twenty five", "forty-five")."""
+    if i >= len(tokens):
+        return None
+    tok = tokens[i]
+    if tok.kind == 'NUM' and tok.value <= max_value:
+        return tok.value, i + 1
+    if tok.kind != 'NUMW':
+        return None
+    value, j = tok.value, i + 1
+    if value >= 20 and j < len(tokens) and tokens[j].kind == 'NUMW' and tokens[j].value < 10:
+        value, j = value + tokens[j].value, j + 1
+    return (value, j) if value <= max_value else None
+
+
+def _minutes_after_hour(tokens: List[Token], i: int) -> Tuple[int, int]:
+    """Spoken minutes after an hour word: "thirty", "forty five", "oh five"."""
+    if i < len(tokens) and tokens[i].kind == 'OH':
+        number = _number(tokens, i + 1, max_value=9)
+        if number:
+            return number
+    if i < len(tokens) and tokens[i].kind == 'NUMW' and tokens[i].value >= 10:
+        number = _number(tokens, i, max_value=59)
+        if number:
+            return number
+    return 0, i
+
+
+# Tokens that name a day; a bare number next to one is its clock hour
+_DAY_KINDS = ('RELDAY', 'WEEKDAY', 'TONIGHT')
+
+
+class _Grammar:
+    def __init__(self, tokens: List[Token], now: datetime):
+        self.tokens = tokens
+        self.now = now
+        self.state = _State()
+        # A reply that is nothing but a time ("three thirty", "10") needs no cue
+        self.bare_reply = all(tok.kind in ('NUM', 'NUMW', 'OH', 'MER', 'OCLOCK', 'CLOCK') for tok in tokens)
+
+    def _kind(self, i: int) -> Optional[str]:
+        return self.tokens[i].kind if i < len(self.tokens) else None
+
+    def _use(self, start: int, end: int, part: str) -> int:
+        state = self.state
+        state.used.update(range(start, end))
+        state.parts.append(part)
+        state.spans.append((part, start, end, (state.day, state.hour, state.minute, state.pod)))
+        return end
+
+    def _next_to_day(self, i: int, end: int) -> bool:
+        """Whether tokens[i:end] sits right next to a day or part of day ("friday 9", "7 tomorrow")."""
+        if i > 0 and self.tokens[i - 1].kind in _DAY_KINDS + ('POD',):
+            return True
+        j = end
+        if self._kind(j) == 'WORD' and self.tokens[j].value == 'on':
+            j += 1
+        elif self._kind(j) == 'IN' and self._kind(j + 1) == 'THE' and self._kind(j + 2) == 'POD':
+            return True
+        if self._kind(j) == 'MOD':
+            j += 1
+        return self._kind(j) in _DAY_KINDS + (('POD',) if j == end else ())
+
+    def _cued(self, i: int) -> bool:
+        j = i - 1
+        while j >= 0 and self.tokens[j].kind == 'THE':
+            j -= 1
+        return j >= 0 and self.tokens[j].kind == 'CUE'
+
+    # --- date productions -------------------------------------------------
+
+    def relative_day(self, i: int) -> Optional[int]:
+        tok = self.tokens[i]
+        if tok.kind == 'TONIGHT':
+            self.state.day = self.now.date()
+            self.state.pod = 'tonight'
+            return self._use(i, i + 1, 'tonight')
+        if tok.kind == 'RELDAY':
+            self.state.day = self.now.date() + timedelta(days=tok.value)
+            return self._use(i, i + 1, 'relday')
+        # "(the) day after tomorrow"
+        if tok.kind == 'UNIT' and tok.value == 1440 and self._kind(i + 1) == 'CUE' \
+                and self.tokens[i + 1].value == 'after' and self._kind(i + 2) == 'RELDAY' and self.tokens[i + 2].value == 1:
+            self.state.day = self.now.date() + timedelta(days=2)
+            return self._use(i, i + 3, 'relday')
+        return None
+
+    def weekday(self, i: int) -> Optional[int]:
+        start, modifier = i, None
+        if self._kind(i) == 'MOD':
+            modifier, i = self.tokens[i].value, i + 1
+        if self._kind(i) != 'WEEKDAY':
+            return None
+        delta = (self.tokens[i].value - self.now.weekday()) % 7
+        if delta == 0 and modifier == 'next':
+            delta = 7
+        self.state.day = self.now.date() + timedelta(days=delta)
+        self.state.weekday_bare = modifier is None
+        return self._use(start, i + 1, 'weekday')
+
+    def calendar_date(self, i: int) -> Optional[int]:
+        tok = self.tokens[i]
+        if tok.kind == 'ISO':
+            year, month, day = tok.value
+            return self._set_date(i, i + 1, month, day, year)
+        if tok.kind == 'SLASH':
+            month, day = tok.value[:2]
+            year = tok.value[2] if len(tok.value) > 2 else None
+            if year is not None and year < 100:
+                year += 2000
+            return self._set_date(i, i + 1, month, day, year)
+        # "march 5th", "march the fifth", "march 5"
+        if tok.kind == 'MONTH':
+            j = i + 1 + (self._kind(i + 1) == 'THE')
+            day = self._day_of_month(j)
+            if day:
+                return self._set_date(i, day[1], tok.value, day[0])
+            return None
+        # "(the) 5th (of march)"
+        start = i
+        if tok.kind == 'THE':
+            i += 1
+        day = self._day_of_month(i, ordinal_only=True)
+        if not day:
+            return None
+        j = day[1]
+        j_month = j + (self._kind(j) == 'OF')
+        if self._kind(j_month) == 'MONTH':
+            return self._set_date(start, j_month + 1, self.tokens[j_month].value, day[0])
+        month = self.now.month
+        if day[0] < self.now.day:
+            month = month % 12 + 1
+        return self._set_date(start, j, month, day[0], roll_year=month < self.now.month)
+
+    def _day_of_month(self, i: int, ordinal_only: bool = False) -> Optional[Tuple[int, int]]:
+        kind = self._kind(i)
+        if kind in ('ORD', 'ORDW'):
+            value = self.tokens[i].value
+            return (value, i + 1) if 1 <= value <= 31 else None
+        # "twenty first"
+        if kind == 'NUMW' and self.tokens[i].value in (20, 30) and self._kind(i + 1) == 'ORDW' \
+                and self.tokens[i + 1].value < 10:
+            return self.tokens[i].value + self.tokens[i + 1].value, i + 2
+        if not ordinal_only and kind == 'NUM' and 1 <= self.tokens[i].value <= 31 \
+                and self._kind(i + 1) not in ('MER', 'OCLOCK'):
+            return self.tokens[i].value, i + 1
+        return None
+
+    def _set_date(self, start: int, end: int, month: int, day: int, year: Optional[int] = None,
+                  roll_year: bool = False) -> Optional[int]:
+        explicit_year = year is not None
+        year = year or self.now.year + (1 if roll_year else 0)
+        try:
+            resolved = date(year, month, day)
+        except ValueError:
+            return None
+        if not explicit_year and resolved < self.now.date():
+            try:
+                resolved = date(year + 1, month, day)
+            except ValueError:
+                return None
+        self.state.day = resolved
+        return self._use(start, end, 'date')
+
+    def offset(self, i: int) -> Optional[int]:
+        """"in 2 hours", "in an hour", "in half an hour", "in a couple (of) days"."""
+        if self._kind(i) != 'IN':
+            return None
+        j = i + 1
+        if self._kind(j) == 'HALF' and self._kind(j + 1) == 'A' and self._kind(j + 2) == 'UNIT':
+            qty, j = 0.5, j + 2
+        elif self._kind(j) == 'A' and self._kind(j + 1) == 'COUPLE':
+            qty, j = 2, j + 2 + (self._kind(j + 2) == 'OF')
+        elif self._kind(j) in ('A', 'COUPLE'):
+            qty, j = self.tokens[j].value, j + 1 + (self._kind(j + 1) == 'OF')
+        else:
+            number = _number(self.tokens, j, max_value=365)
+            if not number:
+                return None
+            qty, j = number
+        if self._kind(j) != 'UNIT':
+            return None
+        minutes = qty * self.tokens[j].value
+        if self.tokens[j].value < 1440:
+            self.state.offset = timedelta(minutes=minutes)
+        else:
+            self.state.day = self.now.date() + timedelta(minutes=minutes)
+        return self._use(i, j + 1, 'offset')
+
+    def past_reference(self, i: int) -> Optional[int]:
+        """"yesterday (morning)", "last night/tuesday/week", "two days ago": when it started, not a booking time."""
+        kind = self._kind(i)
+        if kind == 'PAST_DAY':
+            end = i + 1 + (self._kind(i + 1) == 'POD')
+            return self._use(i, end, 'past')
+        if kind == 'LAST' and self._kind(i + 1) in ('POD', 'WEEKDAY', 'UNIT'):
+            return self._use(i, i + 2, 'past')
+        if kind in ('NUM', 'NUMW', 'A', 'COUPLE'):
+            j = i + 1 + (self._kind(i + 1) == 'COUPLE') + (self._kind(i + 1) == 'OF')
+            if self._kind(j) == 'UNIT' and self._kind(j + 1) == 'AGO':
+                return self._use(i, j + 2, 'past')
+        return None
+
+    # --- time productions -------------------------------------------------
+
+    def clock_phrase(self, i: int) -> Optional[int]:
+        """"half past three", "quarter to five", "ten to six", "20 minutes past 4"."""
+        j = i
+        if self._kind(j) == 'A' and self._kind(j + 1) == 'QUARTER':
+            j += 1
+        spoken_fraction = self._kind(j) in ('HALF', 'QUARTER')
+        if spoken_fraction:
+            minutes, j = self.tokens[j].value, j + 1
+        else:
+            number = _number(self.tokens, j, max_value=59)
+            # "from 2 to 4" is a range, not 3:58
+            if not number or number[0] % 5 or (self._cued(i) and self.tokens[i - 1].value == 'from'):
+                return None
+            minutes, j = number
+            if self._kind(j) == 'UNIT' and self.tokens[j].value == 1:
+                j += 1
+        kind, value = (self.tokens[j].kind, self.tokens[j].value) if j < len(self.tokens) else (None, None)
+        if kind == 'PAST' or (kind == 'CUE' and value == 'after'):
+            direction = 1
+        elif kind == 'TO' or (kind == 'CUE' and value in ('till', 'til')):
+            direction = -1
+        else:
+            return None
+        if direction < 0 and spoken_fraction and minutes == 30:
+            return None
+        hour = _number(self.tokens, j + 1, max_value=12)
+        if not hour or hour[0] == 0:
+            return None
+        hour_value, end = hour
+        total = hour_value * 60 + direction * minutes
+        self.state.hour, self.state.minute = divmod(total, 60)
+        if self.state.hour == 0:
+            self.state.hour = 12
+        end = self._meridiem(end)
+        return self._use(i, end, 'clock_phrase')
+
+    def clock(self, i: int) -> Optional[int]:
+        tok = self.tokens[i]
+        if tok.kind in ('NOON', 'MIDNIGHT'):
+            self.state.hour, self.state.minute, self.state.meridiem = tok.value, 0, 'set'
+            return self._use(i, i + 1, 'clock')
+        if tok.kind == 'CLOCK':
+            hour, minute = tok.value
+            if hour > 23 or minute > 59:
+                return None
+            end = i + 1
+        elif tok.kind in ('NUM', 'NUMW'):
+            number = _number(self.tokens, i, max_value=23)
+            if not number:
+                return None
+            hour, end = number
+            minute = 0
+            if tok.kind == 'NUMW' and hour <= 12:
+                minute, end = _minutes_after_hour(self.tokens, end)
+            # "four forty-five" is a time on its own; a bare "2" or "two" needs a cue or a day next to it
+            if not (minute or self._cued(i) or self.bare_reply or self._kind(end) in ('MER', 'OCLOCK', 'ISH')
+                    or self._next_to_day(i, end)):
+                return None
+        else:
+            return None
+        if self._kind(end) == 'OCLOCK':
+            end += 1
+        self.state.hour, self.state.minute = hour, minute
+        if hour > 12 or hour == 0:
+            self.state.meridiem = 'set'
+        end = self._meridiem(end)
+        if self._kind(end) == 'ISH':
+            end += 1
+        return self._use(i, end, 'clock')
+
+    def _meridiem(self, i: int) -> int:
+        if self._kind(i) == 'MER' and self.state.hour is not None and 1 <= self.state.hour <= 12:
+            self.state.meridiem = self.tokens[i].value
+            return i + 1
+        return i
+
+    def part_of_day(self, i: int) -> Optional[int]:
+        start = i
+        if self._kind(i) == 'MOD' and self.tokens[i].value == 'this':
+            i += 1
+        elif self._kind(i) == 'IN' and self._kind(i + 1) == 'THE':
+            i += 2
+        if self._kind(i) != 'POD':
+            return None
+        self.state.pod = self.tokens[i].value
+        return self._use(start, i + 1, 'part_of_day')
+
+    def run(self) -> _State:
+        productions = (self.past_reference, self.offset, self.relative_day, self.weekday, self.clock_phrase, self.calendar_date,
+                       self.clock, self.part_of_day)
+        i = 0
+        while i < len(self.tokens):
+            for production in productions:
+                end = production(i)
+                if end is not None:
+                    i = end
+                    break
+            else:
+                i += 1
+        return self.state
+
+
+def _resolve_hour(state: _State) -> Tuple[int, bool]:
+    """24h hour for the recognized clock time, and whether AM/PM had to be guessed."""
+    hour = state.hour
+    if state.meridiem == 'set':
+        return hour % 24, False
+    if state.meridiem == 'pm':
+        return (hour % 12) + 12, False
+    if state.meridiem == 'am':
+        return hour % 12, False
+    if state.pod in ('afternoon', 'evening', 'tonight', 'night'):
+        return (hour % 12) + 12, False
+    if state.pod == 'morning':
+        return hour % 12, False
+    # Business hours: "at 3" is 3 PM, "at 9" is 9 AM
+    return (hour + 12 if 1 <= hour <= 6 else hour), True
+
+
+_DAY_PARTS = frozenset({'relday', 'tonight', 'weekday', 'date', 'offset'})
+_TIME_PARTS = frozenset({'clock', 'clock_phrase', 'part_of_day', 'tonight'})
+# Words that offer alternatives or reject a time instead of picking one
+_ALTERNATIVE_WORDS = frozenset({'or', 'nor', 'not', 'between'})
+# What may sit between a past reference and the time it governs ("yesterday at about 3", "last week on tuesday")
+_PAST_LINK_KINDS = ('CUE', 'THE', 'AND')
+
+
+def _governed_by_past(tokens: List[Token], spans: list) -> bool:
+    """Whether a day or clock time is attached to a past reference ("yesterday at 3 pm", "10 last night")."""
+    for part, start, end, _ in spans:
+        if part != 'past':
+            continue
+        for other, o_start, o_end, _ in spans:
+            if other not in _DAY_PARTS | _TIME_PARTS:
+                continue
+            gap = range(end, o_start) if o_start >= end else range(o_end, start)
+            if len(gap) <= 2 and all(tokens[k].kind in _PAST_LINK_KINDS or tokens[k].value == 'on' for k in gap):
+                return True
+    return False
+
+
+def _conflicting(tokens: List[Token], spans: list) -> bool:
+    """Whether the utterance weighs several times rather than naming one."""
+    expressions = [span for span in spans if span[0] in _DAY_PARTS | _TIME_PARTS]
+    days = {snapshot[0] for part, _, _, snapshot in expressions if part in _DAY_PARTS and snapshot[0]}
+    clocks = {snapshot[1:3] for part, _, _, snapshot in expressions if part in ('clock', 'clock_phrase')}
+    pods = {snapshot[3] for part, _, _, snapshot in expressions if part in ('part_of_day', 'tonight')}
+    if len(days) > 1 or len(clocks) > 1 or len(pods) > 1:
+        return True
+    words = {tok.value for tok in tokens if tok.kind == 'WORD'} & _ALTERNATIVE_WORDS
+    return bool(expressions) and ('between' in words or (bool(words) and len(expressions) > 1))
+
+
+def _has_vague_temporal(tokens: List[Token], used: set) -> bool:
+    for idx, tok in enumerate(tokens):
+        if idx in used:
+            continue
+        if tok.kind == 'WORD' and tok.value in VAGUE_TEMPORAL_WORDS:
+            return True
+        if tok.kind == 'MONTH' and tok.text not in _AMBIGUOUS_MONTHS:
+            return True
+        if tok.kind in ('WEEKDAY', 'OCLOCK', 'CLOCK', 'ISO', 'SLASH', 'NOON', 'MIDNIGHT'):
+            return True
+        if tok.kind == 'UNIT' and tok.value == 10080:
+            return True
+    return False
+
+
+# Outcome counts across calls, reported in the ops metrics snapshot
+parse_outcomes: Counter = Counter()
+
+
+def parse_relative_datetime(text: str, now: Optional[datetime] = None) -> DateTimeParse:
+    """
+    Parse a scheduling phrase relative to now.
+
+    Args:
+        text: Caller utterance
+        now: Reference time (defaults to datetime.now())
+
+    Returns:
+        DateTimeParse; .abstained means the phrase mentions a time the grammar cannot resolve
+    """
+    if now is None:
+        now = datetime.now()
+    tokens = tokenize(text)
+    state = _Grammar(tokens, now).run()
+    vague = _has_vague_temporal(tokens, state.used)
+
+    if _governed_by_past(tokens, state.spans):
+        # When it started, not when to come
+        result = DateTimeParse(None, 0.0, "none", tuple(state.parts))
+    elif _conflicting(tokens, state.spans):
+        result = DateTimeParse(None, 0.0, "abstain", tuple(state.parts))
+    elif state.offset is not None and state.hour is None:
+        result = DateTimeParse(now + state.offset, 0.9, "grammar", tuple(state.parts))
+    elif state.day is None and state.hour is None and state.pod is None:
+        result = DateTimeParse(None, 0.0, "abstain" if vague else "none", tuple(state.parts))
+    else:
+        guessed = False
+        if state.hour is not None:
+            hour, guessed = _resolve_hour(state)
+            minute = state.minute
+        else:
+            hour, minute = PART_OF_DAY_HOURS.get(state.pod, DEFAULT_HOUR), 0
+        day = state.day or now.date()
+        value = datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute)
+        if value < now:
+            if state.day is None:
+                # Only a time of day: the next occurrence
+                value += timedelta(days=1)
+            elif state.weekday_bare:
+                value += timedelta(days=7)
+            elif state.hour is None and state.day == now.date():
+                # "today" with no time: the next whole hour
+                value = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        confidence = 0.95
+        if state.hour is None:
+            confidence -= 0.1
+        if guessed:
+            confidence -= 0.15
+        if vague:
+            confidence -= 0.3
+        result = DateTimeParse(value, round(confidence, 2), "grammar", tuple(state.parts))
+        # Still in the past ("2 pm today" said at 3): misheard or meant another day, not a booking time
+        if confidence < MIN_CONFIDENCE or value < now:
+            result = DateTimeParse(None, 0.0 if value < now else result.confidence, "abstain", result.parts)
+
+    parse_outcomes[result.source] += 1
+    return result
+
+
+def datetime_grammar_stats() -> dict:
+    total = sum(parse_outcomes.values())
+    return {
+        "outcomes": dict(parse_outcomes),
+        "abstainRate": round(parse_outcomes["abstain"] / total, 3) if total else None,
+    }
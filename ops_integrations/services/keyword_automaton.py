@@ -0,0 +1,114 @@
+"""
+Aho–Corasick multi-pattern matcher.
+
+Builds a trie over a fixed keyword set once, then finds every occurrence of every
+keyword in a text in a single left-to-right pass, independent of how many
+keywords there are. Matches report whether they fall on word boundaries so
+callers can choose substring or whole-word semantics without rescanning.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+
+class KeywordMatch(NamedTuple):
+    """A keyword occurrence: text[start:end] == keyword."""
+    start: int
+    end: int
+    keyword: str
+    word_start: bool  # preceded by start of text or a non-alphanumeric character
+    word_end: bool    # followed by end of text or a non-alphanumeric character
+
+    @property
+    def whole_word(self) -> bool:
+        return self.word_start and self.word_end
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton over a fixed set of keywords."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._keyword_ids: Dict[str, int] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for keyword in keywords:
+            if keyword and keyword not in self._keyword_ids:
+                self._keyword_ids[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+                self._insert(keyword)
+        self._lengths = [len(k) for k in self.keywords]
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self._keyword_ids
+
+    def _insert(self, keyword: str) -> None:
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state] = self._out[state] + (self._keyword_ids[keyword],)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Merge outputs so every suffix keyword is reported at this state
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str, whole_words: bool = False) -> Iterator[KeywordMatch]:
+        """
+        Yield every keyword occurrence in text, in order of end position.
+
+        Args:
+            text: Text to scan (match case is the caller's responsibility)
+            whole_words: Only yield matches bounded by non-alphanumeric characters
+        """
+        goto, fail, out, lengths, keywords = self._goto, self._fail, self._out, self._lengths, self.keywords
+        n = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                word_end = end == n or not text[end].isalnum()
+                for kid in out[state]:
+                    start = end - lengths[kid]
+                    word_start = start == 0 or not text[start - 1].isalnum()
+                    if whole_words and not (word_start and word_end):
+                        continue
+                    yield KeywordMatch(start, end, keywords[kid], word_start, word_end)
+
+    def find_all(self, text: str, whole_words: bool = False) -> Set[str]:
+        """Return the distinct keywords that occur in text."""
+        return {match.keyword for match in self.iter_matches(text, whole_words)}
+
+    def first_positions(self, text: str) -> Dict[str, int]:
+        """Return each present keyword's first start offset (same as str.find)."""
+        positions: Dict[str, int] = {}
+        for match in self.iter_matches(text):
+            current = positions.get(match.keyword)
+            if current is None or match.start < current:
+                positions[match.keyword] = match.start
+        return positions
@@ -0,0 +1,185 @@
+"""
+Cross-call result cache for LLM calls on short, repetitive utterances.
+
+Keys combine the normalized utterance, the dialog step, the prompt version and,
+for calls that resolve relative dates, a date bucket so that a cached
+"tomorrow morning" is only reused while "tomorrow" still means the same day.
+Entries live in an in-memory LRU with TTL and can optionally be persisted to a
+SQLite file so warm results survive restarts.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Phrases whose resolution depends on the time of day rather than just the date
+_TIME_RELATIVE_RE = re.compile(
+    r"\b(now|right away|asap|hours?|minutes?|mins?|soon|later|in a bit)\b", re.IGNORECASE
+)
+_NON_WORD_RE = re.compile(r"[^\w\s']+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so trivial variants share a key."""
+    if not text:
+        return ""
+    normalized = _NON_WORD_RE.sub(" ", text.lower())
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+def date_bucket_for(text: str, now: Optional[datetime] = None) -> str:
+    """
+    Get the date bucket a relative datetime phrase resolves against.
+
+    Args:
+        text: Utterance containing the phrase
+        now: Reference time (default: current time)
+
+    Returns:
+        'YYYY-MM-DD' for day-relative phrases, 'YYYY-MM-DD HH:MM' for phrases
+        relative to the current time ("in two hours", "right now")
+    """
+    now = now or datetime.now()
+    if _TIME_RELATIVE_RE.search(text or ""):
+        return now.strftime("%Y-%m-%d %H:%M")
+    return now.strftime("%Y-%m-%d")
+
+
+def _encode(value: Any) -> str:
+    def default(obj):
+        if isinstance(obj, datetime):
+            return {"__datetime__": obj.isoformat()}
+        raise TypeError(f"Unsupported cache value type: {type(obj)!r}")
+    return json.dumps(value, default=default)
+
+
+def _decode(raw: str) -> Any:
+    def hook(obj):
+        if set(obj) == {"__datetime__"}:
+            return datetime.fromisoformat(obj["__datetime__"])
+        return obj
+    return json.loads(raw, object_hook=hook)
+
+
+class LLMResultCache:
+    """LRU + TTL cache for LLM results with hit-rate metrics and an optional on-disk tier."""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 6 * 3600,
+                 persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats_counters = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expired": 0}
+        if persist_path:
+            self._open_disk_tier(persist_path)
+
+    def _open_disk_tier(self, path: str) -> None:
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"LLM cache disk tier disabled ({path}): {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(task: str, text: str, dialog_step: Optional[str] = None,
+                 prompt_version: str = "", date_bucket: Optional[str] = None) -> str:
+        """Build a cache key from the normalized utterance and everything that changes the answer."""
+        parts = [task, prompt_version, dialog_step or "", date_bucket or "", normalize_utterance(text)]
+        return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) for a key, promoting disk hits into memory."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self.stats_counters["hits"] += 1
+                    return True, value
+                del self._entries[key]
+                self.stats_counters["expired"] += 1
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except Exception as e:
+                    logger.debug(f"LLM cache disk read failed: {e}")
+                    row = None
+                if row and row[1] >= now:
+                    value = _decode(row[0])
+                    self._store_locked(key, value, row[1])
+                    self.stats_counters["hits"] += 1
+                    self.stats_counters["disk_hits"] += 1
+                    return True, value
+            self.stats_counters["misses"] += 1
+            return False, None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value in memory and, when enabled, on disk."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store_locked(key, value, expires_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, _encode(value), expires_at),
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    logger.debug(f"LLM cache disk write failed: {e}")
+
+    def _store_locked(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats_counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            for counter in self.stats_counters:
+                self.stats_counters[counter] = 0
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM llm_cache")
+                    self._db.commit()
+                except Exception as e:
+                    logger.debug(f"LLM cache disk clear failed: {e}")
+
+    def stats(self) -> dict:
+        """Get hit-rate metrics for dashboards."""
+        with self._lock:
+            hits = self.stats_counters["hits"]
+            misses = self.stats_counters["misses"]
+            lookups = hits + misses
+            return {
+                **self.stats_counters,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": (hits / lookups) if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
@@ -0,0 +1,271 @@
+"""
+Bot audio played back over a bidirectional Twilio Media Stream.
+
+With <Connect><Stream>, Twilio plays whatever 8 kHz mu-law audio the server
+sends on the stream's WebSocket as `media` messages. Speaking a prompt that
+way skips the TwiML REST update, Twilio's HTTP fetch of the mp3 and the
+stream reconnect that every <Play> turn otherwise costs.
+
+PCMToMulaw transcodes a provider's PCM stream chunk by chunk.
+MediaStreamPlayer cuts mu-law audio into 20 ms frames, sends them paced at
+real time (a few frames ahead of the play head, so a `clear` stops playback
+almost immediately) and follows each prompt with a `mark`; Twilio echoes the
+mark back when playback reaches it.
+"""
+
+import asyncio
+import base64
+import io
+import json
+import logging
+import struct
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+try:
+    import audioop as _audioop  # type: ignore
+except Exception:
+    _audioop = None
+
+try:
+    from mutagen.mp3 import MP3 as _MP3  # type: ignore
+except Exception:
+    _MP3 = None
+
+logger = logging.getLogger(__name__)
+
+MULAW_SAMPLE_RATE = 8000
+FRAME_MS = 20
+FRAME_BYTES = MULAW_SAMPLE_RATE * FRAME_MS // 1000  # one mu-law byte per sample
+MULAW_SILENCE = b"\xff"
+
+
+def mulaw_duration(num_bytes: int) -> float:
+    """Playback length in seconds of num_bytes of 8 kHz mu-law."""
+    return num_bytes / float(MULAW_SAMPLE_RATE)
+
+
+def audio_duration(audio: bytes, audio_format: str = "mp3") -> Optional[float]:
+    """
+    Playback length of a synthesized clip, read from the audio itself.
+
+    Args:
+        audio: Complete clip
+        audio_format: 'mp3' or 'mulaw'
+
+    Returns:
+        Seconds, or None when the clip cannot be parsed (or mutagen is missing)
+    """
+    if not audio:
+        return None
+    if audio_format == "mulaw":
+        return mulaw_duration(len(audio))
+    if _MP3 is None:
+        return None
+    try:
+        return float(_MP3(io.BytesIO(audio)).info.length)
+    except Exception as e:
+        logger.debug(f"Could not read mp3 duration: {e}")
+        return None
+
+
+def _linear16_to_mulaw_byte(sample: int) -> int:
+    # G.711 on the top 14 bits, rounding like audioop.lin2ulaw
+    value = sample >> 2
+    mask = 0x7F if value < 0 else 0xFF
+    value = min(-value if value < 0 else value, 8159) + 0x21
+    segment = max(0, (value >> 6).bit_length())
+    if segment >= 8:
+        return 0x7F ^ mask
+    return ((segment << 4) | ((value >> (segment + 1)) & 0x0F)) ^ mask
+
+
+def _mulaw_rms(frame: bytes) -> float:
+    if _audioop is not None:
+        return float(_audioop.rms(_audioop.ulaw2lin(frame, 2), 2))
+    total = 0
+    for byte in frame:
+        byte = ~byte & 0xFF
+        sample = ((((byte & 0x0F) << 3) + 0x84) << ((byte >> 4) & 0x07)) - 0x84
+        total += sample * sample
+    return (total / len(frame)) ** 0.5 if frame else 0.0
+
+
+class PCMToMulaw:
+    """Incremental 16-bit little-endian mono PCM -> 8 kHz mu-law transcoder."""
+
+    def __init__(self, source_rate: int):
+        self.source_rate = source_rate
+        self._carry = b""  # odd trailing byte of a chunk split mid-sample
+        self._state = None
+        self._phase = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Transcode the next piece of the PCM stream; chunks may split samples."""
+        data = self._carry + chunk
+        whole = len(data) - (len(data) % 2)
+        data, self._carry = data[:whole], data[whole:]
+        if not data:
+            return b""
+        if _audioop is not None:
+            if self.source_rate != MULAW_SAMPLE_RATE:
+                data, self._state = _audioop.ratecv(data, 2, 1, self.source_rate, MULAW_SAMPLE_RATE, self._state)
+            return _audioop.lin2ulaw(data, 2)
+        # Pure Python fallback: keep every Nth sample (provider rates are multiples of 8 kHz)
+        step = max(1, self.source_rate // MULAW_SAMPLE_RATE)
+        samples = struct.unpack(f"<{len(data) // 2}h", data)
+        out = bytearray()
+        for index in range(len(samples)):
+            if (self._phase + index) % step == 0:
+                out.append(_linear16_to_mulaw_byte(samples[index]))
+        self._phase = (self._phase + len(samples)) % step
+        return bytes(out)
+
+
+class MediaStreamPlayer:
+    """Sends mu-law prompts to one call's Media Stream, paced at real time, and tracks their marks."""
+
+    def __init__(self, send_text: Callable[[str], Awaitable[None]], stream_sid: str, lead_frames: int = 3):
+        self.send_text = send_text
+        self.stream_sid = stream_sid
+        self.lead_frames = lead_frames
+        self.connected = True
+        self.playing: Optional[str] = None  # mark name of the prompt being sent
+        self._lock = asyncio.Lock()
+        self._play_head = 0.0  # monotonic time at which the audio sent so far finishes playing
+        self._generation = 0  # bumped by clear() to stop the prompt being sent
+        self._marks: Dict[str, asyncio.Future] = {}
+        self._levels: Deque[Tuple[float, float]] = deque(maxlen=100)  # (play time, RMS) of recent frames
+        self.counters = {"prompts": 0, "frames": 0, "marks_sent": 0, "marks_acked": 0, "cleared": 0, "failed": 0}
+
+    async def _send(self, message: dict) -> None:
+        await self.send_text(json.dumps(message))
+
+    async def play(self, chunks: AsyncIterator[bytes], label: str) -> bool:
+        """
+        Send a prompt's mu-law audio as 20 ms media frames, then a mark named label.
+
+        Prompts queue behind each other; frames are released no more than
+        lead_frames ahead of real time.
+
+        Args:
+            chunks: mu-law audio, possibly still arriving from the provider
+            label: Mark name Twilio echoes back once the prompt has played
+
+        Returns:
+            True when the whole prompt and its mark were sent; False when the
+            stream failed, the prompt had no audio or clear() interrupted it
+        """
+        async with self._lock:
+            if not self.connected:
+                return False
+            generation = self._generation
+            self.playing = label
+            pending = b""
+            frames = 0
+            try:
+                async for chunk in chunks:
+                    pending += chunk
+                    while len(pending) >= FRAME_BYTES:
+                        frame, pending = pending[:FRAME_BYTES], pending[FRAME_BYTES:]
+                        if not await self._send_frame(frame, generation):
+                            return False
+                        frames += 1
+                if pending:
+                    if not await self._send_frame(pending.ljust(FRAME_BYTES, MULAW_SILENCE), generation):
+                        return False
+                    frames += 1
+                if not frames:
+                    logger.warning(f"No audio to play on stream {self.stream_sid} for {label}")
+                    self.counters["failed"] += 1
+                    return False
+                # Acknowledged marks are kept until the next prompt so a late wait_mark still sees them
+                self._marks = {name: f for name, f in self._marks.items() if not f.done()}
+                self._marks[label] = asyncio.get_event_loop().create_future()
+                await self._send({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": label}})
+                self.counters["marks_sent"] += 1
+                self.counters["prompts"] += 1
+                return True
+            except Exception as e:
+                logger.error(f"Media stream playback failed for {self.stream_sid} ({label}) after {frames} frames: {e}")
+                self.counters["failed"] += 1
+                self.connected = False
+                return False
+            finally:
+                self.playing = None
+
+    async def _send_frame(self, frame: bytes, generation: int) -> bool:
+        now = time.monotonic()
+        if self._play_head < now:
+            self._play_head = now  # the previous prompt has finished playing
+        wait = self._play_head - now - self.lead_frames * FRAME_MS / 1000.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if generation != self._generation:
+            return False
+        payload = base64.b64encode(frame).decode("ascii")
+        await self._send({"event": "media", "streamSid": self.stream_sid, "media": {"payload": payload}})
+        self._levels.append((self._play_head, _mulaw_rms(frame)))
+        self._play_head += FRAME_MS / 1000.0
+        self.counters["frames"] += 1
+        return True
+
+    def remaining(self) -> float:
+        """Seconds of audio already sent that Twilio has not played yet."""
+        return max(0.0, self._play_head - time.monotonic())
+
+    def is_playing(self) -> bool:
+        """Audio is being sent or has been sent and not yet played."""
+        return self.connected and (self.playing is not None or self.remaining() > 0)
+
+    def level(self, window: float = 0.3) -> float:
+        """
+        Loudest RMS (16-bit scale) among frames playing in the last window seconds.
+
+        The window covers the round trip before the bot's voice shows up as
+        echo in the caller's audio.
+        """
+        now = time.monotonic()
+        return max((rms for played_at, rms in self._levels if now - window <= played_at <= now), default=0.0)
+
+    def on_mark(self, name: str) -> None:
+        """Twilio reached the mark: everything sent before it has played."""
+        future = self._marks.get(name)
+        if future is not None and not future.done():
+            future.set_result(True)
+            self.counters["marks_acked"] += 1
+
+    async def wait_mark(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a mark acknowledgement; False on timeout, clear() or disconnect."""
+        future = self._marks.get(name)
+        if future is None:
+            return False
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    async def clear(self) -> None:
+        """Stop playback: drop Twilio's buffered audio and abandon the prompt being sent."""
+        self._generation += 1
+        self._play_head = 0.0
+        self._levels.clear()
+        self.counters["cleared"] += 1
+        self._drop_marks()
+        try:
+            await self._send({"event": "clear", "streamSid": self.stream_sid})
+        except Exception as e:
+            logger.debug(f"clear failed for stream {self.stream_sid}: {e}")
+
+    def close(self) -> None:
+        """The stream has ended; nothing more can be played on it."""
+        self.connected = False
+        self._generation += 1
+        self._drop_marks()
+
+    def _drop_marks(self) -> None:
+        marks, self._marks = self._marks, {}
+        for future in marks.values():
+            if not future.done():
+                future.set_result(False)
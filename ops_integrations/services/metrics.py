@@ -0,0 +1,22 @@
+"""
+Small helpers shared by the rolling latency/accuracy stats reported in the metrics snapshot.
+"""
+
+from typing import Iterable, Optional
+
+
+def percentile(values: Iterable[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of `values`, or None when there are none.
+
+    Args:
+        values: Samples, in any order
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The sample at that rank, or None for an empty window
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
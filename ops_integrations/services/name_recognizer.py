@@ -0,0 +1,374 @@
+"""
+Offline caller-name recognition for the awaiting_name dialog step.
+
+The recognizer tokenizes the reply once, strips fillers ("um", "yeah hi"),
+looks for an introduction ("my name is", "this is", "call me") and checks the
+candidate against a gazetteer of given names loaded lazily from
+config/first_names.txt (override with FIRST_NAMES_TXT). ASR misspellings
+("Jonh", "Micheal", "Kathrine") are mapped to the closest gazetteer name that
+shares their phonetic key.
+
+Every reply gets one of three outcomes:
+    a name          (gazetteer/phonetic hit, or any word after "my name is")
+    rejected        (only fillers, yes/no, numbers, function words)
+    abstain         (an unknown word the gazetteer cannot vouch for)
+Callers ask GPT only on abstain. stats() reports how often each happened.
+"""
+
+import logging
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAMES_PATH = os.getenv(
+    "FIRST_NAMES_TXT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "first_names.txt"),
+)
+
+# Hesitations and acknowledgements that can precede a name ("um, yeah, hi, it's John")
+FILLER_WORDS = frozenset({
+    'um', 'umm', 'uhm', 'uh', 'er', 'erm', 'ah', 'oh', 'hmm', 'hm', 'mm', 'mhm', 'huh', 'uh-huh',
+    'well', 'so', 'like', 'just', 'okay', 'ok', 'alright', 'yeah', 'yes', 'yep', 'yup', 'ya', 'sure',
+    'hi', 'hello', 'hey', 'good', 'morning', 'afternoon', 'evening', 'there', 'sorry',
+})
+
+# Words after a name that do not belong to it ("John here", "Sarah speaking")
+TRAILING_WORDS = frozenset({'here', 'speaking', 'calling', 'please', 'thanks', 'thank', 'you'})
+
+# Words that are never a caller's name; a reply made only of these has no name
+NON_NAME_WORDS = FILLER_WORDS | TRAILING_WORDS | frozenset({
+    # Politeness, yes/no
+    'thankyou', 'welcome', 'bye', 'goodbye', 'pardon', 'excuse', 'no', 'nope', 'nah', 'fine', 'right',
+    'correct', 'great', 'nice', 'bad', 'cool', 'night', 'all', 'not',
+    # Pronouns, articles, conjunctions, adverbs
+    'i', 'me', 'my', 'mine', 'myself', 'your', 'yours', 'he', 'him', 'his', 'she', 'her', 'hers',
+    'it', 'its', "it's", 'we', 'us', 'our', 'they', 'them', 'their', 'this', 'that', "that's", 'these', 'those',
+    'who', 'what', "what's", 'when', 'where', 'why', 'how', 'which', "i'm", 'im', "i'll", "i've", "you're",
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'than', 'then', 'also', 'too', 'very',
+    'really', 'quite', 'only', 'even', 'still', 'again', 'now', 'soon', 'later', 'maybe', 'probably',
+    'actually', 'name', "name's", 'names', 'something', 'nothing', 'anything', 'someone', 'somebody',
+    # Prepositions
+    'back', 'up', 'down', 'out', 'in', 'on', 'at', 'to', 'for', 'of', 'by', 'from', 'into', 'through',
+    'during', 'before', 'after', 'above', 'below', 'between', 'among', 'within', 'without', 'against',
+    'toward', 'towards', 'upon', 'across', 'behind', 'beneath', 'beside', 'beyond', 'inside', 'outside',
+    'under', 'over', 'around', 'throughout', 'with', 'about', 'off', 'near',
+    # Numbers and ordinals
+    'zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten', 'eleven',
+    'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen',
+    'twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety', 'hundred', 'thousand',
+    'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth',
+    'eleventh', 'twelfth', 'thirteenth', 'fourteenth', 'fifteenth', 'sixteenth', 'seventeenth',
+    'eighteenth', 'nineteenth', 'twentieth', 'last', 'next',
+    # Common verbs
+    'is', 'am', 'are', 'was', 'were', 'be', 'been', 'do', 'does', 'did', 'done', 'have', 'has', 'had',
+    'can', 'could', 'would', 'should', 'might', 'must', 'get', 'got', 'go', 'going', 'come', 'coming',
+    'call', 'talk', 'talking', 'say', 'said', 'know', 'think', 'want', 'need', 'see', 'saw', 'met',
+    "don't", "can't", "won't", "didn't", "doesn't", "isn't", 'hear', 'repeat', 'wait', 'hold', 'help',
+    # What callers say in place of a name
+    'leak', 'leaking', 'sink', 'toilet', 'drain', 'pipe', 'pipes', 'water', 'heater', 'clog', 'clogged',
+    'plumber', 'plumbing', 'emergency', 'service', 'repair', 'appointment', 'kitchen', 'bathroom',
+    'shower', 'faucet', 'gas', 'sewer', 'basement', 'house', 'home', 'address', 'phone', 'number',
+    'today', 'tomorrow', 'yesterday', 'transfer', 'human', 'operator', 'agent', 'person',
+})
+
+# Stock replies whose words can also be names ("hope so" is not Hope, "will do" is not Will)
+NON_NAME_PHRASES = frozenset({
+    ('hope', 'so'), ('will', 'do'), ('sure', 'thing'), ('you', 'bet'), ('no', 'problem'), ('no', 'worries'),
+    ('sounds', 'good'), ('got', 'it'), ('of', 'course'), ('for', 'sure'), ('go', 'ahead'), ('guess', 'so'),
+    ('think', 'so'), ('fair', 'enough'), ('will', 'be'), ('hang', 'on'), ('all', 'good'), ('bless', 'you'),
+})
+_PHRASE_LENGTHS = sorted({len(phrase) for phrase in NON_NAME_PHRASES}, reverse=True)
+
+# Introductions that vouch for whatever word follows them
+_STRONG_INTROS = (
+    ('my', 'name', 'is'), ("my", "name's"), ('the', 'name', 'is'), ("the", "name's"),
+    ('name', 'is'), ("name's",), ('call', 'me'),
+)
+# Introductions that also introduce non-names ("it's leaking", "i'm good"): the
+# following word must be a known name
+_WEAK_INTROS = (
+    ("i'm",), ('im',), ('i', 'am'), ('this', 'is'), ("it's",), ('it', 'is'), ("that's",), ('that', 'is'),
+)
+_INTROS = tuple(sorted(((intro, True) for intro in _STRONG_INTROS), key=lambda item: -len(item[0]))) + \
+    tuple(sorted(((intro, False) for intro in _WEAK_INTROS), key=lambda item: -len(item[0])))
+
+_TOKEN_RE = re.compile(r"[a-zà-ÿ]+(?:['’-][a-zà-ÿ]+)*")
+
+_PHONETIC_LETTERS = str.maketrans({"c": "k", "q": "k", "z": "s", "v": "f"})
+
+# A misspelling maps to a name only at one substituted letter or one swapped pair, never at an added
+# or dropped letter: that is how real names relate ("will"/"willa", "dan"/"dana", "jo"/"joe")
+MAX_PHONETIC_DISTANCE = 1
+
+
+def phonetic_key(word: str) -> str:
+    """
+    Metaphone-style consonant skeleton of a word.
+
+    Spellings a speech recognizer confuses share a key: "Jon"/"John" (JN),
+    "Catherine"/"Kathryn" (KTRN), "Stephen"/"Steven" (STFN).
+    """
+    w = re.sub(r"[^a-z]", "", word.lower())
+    if not w:
+        return ""
+    for prefix, repl in (("kn", "n"), ("gn", "n"), ("wr", "r"), ("ps", "s"), ("wh", "w"), ("x", "s")):
+        if w.startswith(prefix):
+            w = repl + w[len(prefix):]
+            break
+    w = w.replace("x", "ks")
+    for pattern, repl in (
+        ("chr", "kr"), ("sch", "sk"), ("ph", "f"), ("gh", ""), ("ck", "k"), ("sh", "x"), ("ch", "x"),
+        ("th", "t"), ("dg", "j"),
+    ):
+        w = w.replace(pattern, repl)
+    w = re.sub(r"c(?=[eiy])", "s", w)
+    w = re.sub(r"g(?=[eiy])", "j", w)
+    w = w.translate(_PHONETIC_LETTERS)
+    if not w:
+        return ""
+    # Silent h: keep it only before a vowel
+    w = w[0] + re.sub(r"h(?![aeiou])", "", w[1:])
+
+    key = ["A" if w[0] in "aeiouyw" else w[0].upper()]
+    for ch in w[1:]:
+        if ch in "aeiouyw":
+            key.append("")
+            continue
+        code = ch.upper()
+        if key[-1] != code:
+            key.append(code)
+    return "".join(key)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)."""
+    if a == b:
+        return 0
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class NameGazetteer:
+    """Set of known given names plus a phonetic index over them."""
+
+    def __init__(self, names: List[str]):
+        ordered = list(dict.fromkeys(name.strip().lower() for name in names if name.strip()))
+        self.names = frozenset(ordered)
+        self._by_key: Dict[str, Tuple[str, ...]] = {}
+        for name in ordered:
+            key = phonetic_key(name)
+            self._by_key[key] = self._by_key.get(key, ()) + (name,)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_NAMES_PATH) -> "NameGazetteer":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls([line for line in f if not line.startswith("#")])
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def closest(self, word: str, max_distance: int = MAX_PHONETIC_DISTANCE) -> Optional[Tuple[str, int]]:
+        """
+        Find the known name a misspelled word most likely stands for.
+
+        Args:
+            word: Lowercased word not in the gazetteer
+            max_distance: Largest edit distance accepted
+
+        Returns:
+            (name, edit distance) among same-length names sharing the word's
+            phonetic key, or None: a word that is a known name plus or minus
+            letters is more likely a name missing from the gazetteer
+        """
+        best = None
+        for name in self._by_key.get(phonetic_key(word), ()):
+            if len(name) != len(word):
+                continue
+            distance = edit_distance(word, name)
+            if distance <= max_distance and (best is None or distance < best[1]):
+                best = (name, distance)
+        return best
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    """
+    Outcome of recognizing a name in one reply.
+
+    Attributes:
+        name: Title-cased name ("John", "Michael Smith"), or None
+        confidence: 0..1 score of the decision
+        source: "gazetteer", "phonetic", "introduced", "rejected" or "abstain"
+    """
+    name: Optional[str]
+    confidence: float
+    source: str
+
+    @property
+    def abstained(self) -> bool:
+        return self.source == "abstain"
+
+
+_REJECTED = NameMatch(None, 0.9, "rejected")
+_ABSTAIN = NameMatch(None, 0.0, "abstain")
+
+
+def _is_wordlike(token: str) -> bool:
+    return len(token) >= 2 and token not in NON_NAME_WORDS
+
+
+def _without_phrases(tokens: List[str]) -> List[str]:
+    """tokens with every NON_NAME_PHRASES occurrence removed."""
+    kept, i = [], 0
+    while i < len(tokens):
+        length = next((n for n in _PHRASE_LENGTHS if tuple(tokens[i:i + n]) in NON_NAME_PHRASES), 0)
+        if length:
+            i += length
+        else:
+            kept.append(tokens[i])
+            i += 1
+    return kept
+
+
+def _title(token: str) -> str:
+    return "-".join("'".join(part[:1].upper() + part[1:] for part in piece.split("'")) for piece in token.split("-"))
+
+
+class NameRecognizer:
+    """Gazetteer-backed name scorer that abstains instead of guessing."""
+
+    def __init__(self, gazetteer: NameGazetteer):
+        self.gazetteer = gazetteer
+        self.outcomes = Counter()
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return [token.replace('’', "'") for token in _TOKEN_RE.findall((text or "").lower())]
+
+    def _given_name(self, token: str, min_phonetic_len: int) -> Optional[Tuple[str, str, int]]:
+        """(canonical name, source, edit distance) for a gazetteer or phonetic hit."""
+        if token in self.gazetteer:
+            return token, "gazetteer", 0
+        if len(token) >= min_phonetic_len and token not in NON_NAME_WORDS:
+            hit = self.gazetteer.closest(token)
+            if hit:
+                return hit[0], "phonetic", hit[1]
+        return None
+
+    @staticmethod
+    def _with_surname(given: str, tokens: List[str], pos: int) -> str:
+        """Append tokens[pos] as a surname when it looks like one."""
+        if pos < len(tokens) and _is_wordlike(tokens[pos]):
+            return f"{_title(given)} {_title(tokens[pos])}"
+        return _title(given)
+
+    def _match(self, tokens: List[str]) -> NameMatch:
+        abstained = False
+        for i in range(len(tokens)):
+            for intro, strong in _INTROS:
+                if tuple(tokens[i:i + len(intro)]) != intro:
+                    continue
+                j = i + len(intro)
+                while j < len(tokens) and tokens[j] in FILLER_WORDS:
+                    j += 1
+                if j == len(tokens) or not _is_wordlike(tokens[j]):
+                    break
+                hit = self._given_name(tokens[j], min_phonetic_len=3)
+                if hit:
+                    name, source, distance = hit
+                    confidence = 0.95 if source == "gazetteer" else round(0.85 - 0.05 * distance, 2)
+                    return NameMatch(self._with_surname(name, tokens, j + 1), confidence, source)
+                if strong:
+                    return NameMatch(self._with_surname(tokens[j], tokens, j + 1), 0.7, "introduced")
+                abstained = True
+                break
+        if abstained:
+            return _ABSTAIN
+
+        # A bare reply: "Sarah", "um, Michael Smith", "John here"
+        tokens = _without_phrases(tokens)
+        start, end = 0, len(tokens)
+        while start < end and tokens[start] in FILLER_WORDS:
+            start += 1
+        while end > start and tokens[end - 1] in TRAILING_WORDS:
+            end -= 1
+        rest = tokens[start:end]
+        if all(token in NON_NAME_WORDS for token in rest):
+            return _REJECTED
+        if len(rest) > 2:
+            return _ABSTAIN
+        hit = self._given_name(rest[0], min_phonetic_len=4)
+        if not hit:
+            return _ABSTAIN
+        name, source, distance = hit
+        confidence = 0.9 if source == "gazetteer" else round(0.7 - 0.05 * distance, 2)
+        return NameMatch(self._with_surname(name, rest, 1), confidence, source)
+
+    def recognize(self, text: str) -> NameMatch:
+        """
+        Recognize the caller's name in a reply.
+
+        Args:
+            text: Transcript of the caller's reply
+
+        Returns:
+            NameMatch; match.abstained means only a model can decide
+        """
+        try:
+            match = self._match(self.tokenize(text))
+        except Exception as e:
+            logger.debug(f"Name recognizer failed on {text!r}: {e}")
+            match = _ABSTAIN
+        self.outcomes[match.source] += 1
+        return match
+
+    def record_fallback(self, name: Optional[str]) -> None:
+        """Count the result of the model call made after an abstain."""
+        self.outcomes["fallback_name" if name else "fallback_none"] += 1
+
+    def stats(self) -> dict:
+        local = sum(self.outcomes[source] for source in ("gazetteer", "phonetic", "introduced", "rejected"))
+        total = local + self.outcomes["abstain"]
+        return {
+            "gazetteerNames": len(self.gazetteer),
+            "outcomes": dict(self.outcomes),
+            "localHitRate": round(local / total, 3) if total else None,
+        }
+
+
+_recognizer_cache: Dict[str, NameRecognizer] = {}
+
+
+def get_name_recognizer(path: Optional[str] = None) -> NameRecognizer:
+    """
+    Get the recognizer for the gazetteer at path (default: FIRST_NAMES_TXT or
+    config/first_names.txt), loading the gazetteer on first use.
+    """
+    path = path or DEFAULT_NAMES_PATH
+    cached = _recognizer_cache.get(path)
+    if cached is None:
+        try:
+            gazetteer = NameGazetteer.from_file(path)
+            logger.info(f"Loaded {len(gazetteer)} given names from {path}")
+        except Exception as e:
+            logger.warning(f"Name gazetteer not loaded from {path}: {e}")
+            gazetteer = NameGazetteer([])
+        cached = NameRecognizer(gazetteer)
+        _recognizer_cache[path] = cached
+    return cached
@@ -28,6 +28,15 @@ except ImportError:
     SentenceTransformer = None
     cosine_similarity = None
 
+try:
+    from .keyword_automaton import KeywordAutomaton
+except Exception:
+    import sys as _sys
+    _OPS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if _OPS_ROOT not in _sys.path:
+        _sys.path.insert(0, _OPS_ROOT)
+    from services.keyword_automaton import KeywordAutomaton
+
 # BERT model initialization disabled to eliminate batch processing overhead
 BERT_MODEL = None
 
@@ -393,28 +402,169 @@ def get_semantic_service_matches(text: str, service_keywords: Dict[str, List[str
     semantic_matches.sort(key=lambda x: x[1], reverse=True)
     return semantic_matches
 
-def infer_job_type_from_text(text: str) -> str:
-    """Infer job type from text using keyword matching with first-mentioned priority."""
+# Service hierarchy (higher = more specific, will suppress lower levels)
+SERVICE_HIERARCHY = {
+    # Level 5: Most specific services - these suppress all lower levels
+    "clogged_kitchen_sink": 5, "clogged_bathroom_sink": 5, "clogged_shower_tub": 5,
+    "clogged_floor_drain": 5, "clogged_toilet": 5, "main_sewer_backup": 5,
+    "leaky_faucet": 5, "faucet_replacement": 5, "faucet_cartridge": 5,
+    "kitchen_faucet_replacement": 5, "bathroom_faucet_replacement": 5, "kitchen_faucet_repair": 5,
+    "bathroom_faucet_repair": 5, "kitchen_faucet_leak": 5, "bathroom_faucet_leak": 5,
+    "toilet_leak": 5, "toilet_replacement": 5, "running_toilet": 5,
+    "leak_detection": 5, "slab_leak_repair": 5, "burst_pipe": 5,
+    "water_heater_repair": 5, "water_heater_install": 5, "tankless_water_heater": 5,
+    "sump_pump_install": 5, "sump_pump_repair": 5, "gas_line_leak": 5,
+    "gas_line_install": 5, "dishwasher_hookup": 5, "washing_machine_hookup": 5,
+    "hose_bib": 5, "shower_valve": 5, "mixing_valve": 5, "bathtub_install": 5,
+    "faucet_aerator": 5, "drain_tile": 5, "trenchless_sewer": 5, "camera_inspection": 5,
+    "grease_trap": 5, "commercial_restroom": 5, "commercial_backflow": 5,
+    "emergency_shutoff": 5, "emergency_leak": 5, "hydrostatic_test": 5,
+    "water_line": 5, "drain_snaking": 5, "hydro_jetting": 5, "showerhead_replacement": 5,
+    "toilet_flange": 5, "toilet_seal": 5, "pipe_thawing": 5, "re_piping": 5,
+    "whole_house_re_piping": 5, "water_pressure_adjustment": 5, "pressure_reducing_valve": 5,
+    "pressure_relief_valve": 5, "water_heater_expansion": 5, "water_heater_flush": 5,
+    "water_softener": 5, "water_filtration": 5, "backflow_prevention": 5,
+    "sewage_ejector": 5, "well_pump": 5, "well_pressure_tank": 5, "ice_maker_line": 5,
+    "garbage_disposal": 5,
+
+    # Level 3: Medium specific services
+    "water_heater": 3, "sewer_cam": 3,
+
+    # Level 2: General categories (suppressed by specific services)
+    "leak": 2, "clog": 2, "gas_line": 2,
+
+    # Level 1: Most general (heavily suppressed)
+    "install": 1
+}
+
+# Categories that infer_job_type_from_text treats as "look for something more specific nearby"
+GENERAL_SERVICE_CATEGORIES = frozenset({"sewer_cam", "water_heater", "leak", "clog", "gas_line", "install"})
+
+# Near-identical services that should never be reported as each other's secondary intent
+SIMILAR_SERVICE_GROUPS = [
+    ('kitchen_faucet_leak', 'bathroom_faucet_leak'),
+    ('kitchen_faucet_repair', 'bathroom_faucet_repair'),
+    ('kitchen_faucet_replacement', 'bathroom_faucet_replacement'),
+    ('water_heater_repair', 'water_heater_expansion'),
+    ('sump_pump_repair', 'sump_pump_install'),
+    ('shower_valve', 'mixing_valve'),
+    ('pressure_reducing_valve', 'pressure_relief_valve'),
+]
+
+# Specific primaries that never take a generic (hierarchy <= 2) secondary
+_NO_GENERIC_SECONDARY = frozenset({'water_heater_repair', 'water_heater_expansion',
+                                   'kitchen_faucet_leak', 'bathroom_faucet_replacement',
+                                   'sump_pump_repair', 'tankless_water_heater'})
+
+
+class _ServiceMatcher:
+    """
+    SERVICE_KEYWORDS compiled into one Aho–Corasick automaton plus the lookup
+    tables the job-type inference needs, built once at import.
+
+    Keyword postings keep each keyword's rank within its service's list, so "the
+    first listed keyword of each service that occurs in the text" falls out of a
+    single scan instead of a keyword-by-keyword substring loop.
+    """
+
+    def __init__(self, service_keywords: Dict[str, List[str]]):
+        self.services: List[str] = list(service_keywords)
+        self.keywords_by_service: List[List[str]] = [list(kws) for kws in service_keywords.values()]
+        # keyword -> [(service index, rank of keyword within that service's list)]
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        # Services with an empty keyword match every text at position 0
+        self.always_match: Dict[int, int] = {}
+        for sid, keywords in enumerate(self.keywords_by_service):
+            for rank, keyword in enumerate(keywords):
+                if not keyword:
+                    self.always_match.setdefault(sid, rank)
+                else:
+                    self.postings.setdefault(keyword, []).append((sid, rank))
+        self.automaton = KeywordAutomaton(self.postings)
+
+        self.hierarchy: List[int] = [SERVICE_HIERARCHY.get(service, 2) for service in self.services]
+        # service -> every category it belongs to (a service may sit in several)
+        self.categories: Dict[str, frozenset] = {}
+        # service -> the last category listing it (what the secondary-intent check compares)
+        self.last_category: Dict[str, str] = {}
+        for cat_name, cat_services in SERVICE_CATEGORIES.items():
+            for service in cat_services:
+                self.categories[service] = self.categories.get(service, frozenset()) | {cat_name}
+                self.last_category[service] = cat_name
+        self.exclusions: Dict[str, frozenset] = {svc: frozenset(excl) for svc, excl in EXCLUSION_RULES.items()}
+        self.similar_group: Dict[str, int] = {}
+        for gid, group in enumerate(SIMILAR_SERVICE_GROUPS):
+            for service in group:
+                self.similar_group[service] = gid
+
+    def shares_category(self, service_a: str, service_b: str) -> bool:
+        cats = self.categories.get(service_a)
+        return bool(cats) and not cats.isdisjoint(self.categories.get(service_b, ()))
+
+    def first_keyword_per_service(self, text: str) -> List[Tuple[int, str]]:
+        """
+        For each service (in SERVICE_KEYWORDS order), the first of its keywords, in
+        list order, that occurs anywhere in text as a substring.
+
+        Returns:
+            List of (service index, keyword) tuples
+        """
+        best: Dict[int, int] = dict(self.always_match)
+        for keyword in self.automaton.find_all(text):
+            for sid, rank in self.postings[keyword]:
+                current = best.get(sid)
+                if current is None or rank < current:
+                    best[sid] = rank
+        return [(sid, self.keywords_by_service[sid][best[sid]]) for sid in sorted(best)]
+
+    def hits(self, text: str, whole_words: bool = False) -> List[Tuple[int, str, str]]:
+        """Every (position, service, keyword) occurrence in text, in one scan."""
+        found = []
+        for match in self.automaton.iter_matches(text, whole_words):
+            for sid, _ in self.postings[match.keyword]:
+                found.append((match.start, self.services[sid], match.keyword))
+        found.sort(key=lambda hit: hit[0])
+        return found
+
+
+_SERVICE_MATCHER = _ServiceMatcher(SERVICE_KEYWORDS)
+
+
+def _normalize_service_text(text: str) -> str:
     # Normalize text - handle tabs, newlines, and extra whitespace
     text_lower = text.lower().replace('\t', ' ').replace('\n', ' ')
-    text_lower = ' '.join(text_lower.split())  # Normalize whitespace
-    
-    # Track all matches with their positions
-    matches = []
-    
-    # Check all services and record match positions
-    for service_type, keywords in SERVICE_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                # Find the position of the first occurrence
-                position = text_lower.find(keyword)
-                matches.append((position, service_type, keyword))
-                break  # Only record first match per service type
+    return ' '.join(text_lower.split())
+
+
+def find_service_keyword_hits(text: str, whole_words: bool = False) -> List[Tuple[int, str, str]]:
+    """
+    Find every service keyword occurrence in text with a single automaton pass.
+
+    Args:
+        text: Caller text (normalized the same way as job-type inference)
+        whole_words: Only report keywords bounded by non-alphanumeric characters,
+            so e.g. "leak" does not fire inside "leaking"
+
+    Returns:
+        List of (position, service_type, keyword) tuples sorted by position
+    """
+    return _SERVICE_MATCHER.hits(_normalize_service_text(text), whole_words)
+
+
+def infer_job_type_from_text(text: str) -> str:
+    """Infer job type from text using keyword matching with first-mentioned priority."""
+    text_lower = _normalize_service_text(text)
+    matcher = _SERVICE_MATCHER
+
+    # First listed keyword per service, at its first occurrence
+    positions = matcher.automaton.first_positions(text_lower)
+    matches = [(positions.get(keyword, 0), matcher.services[sid], keyword)
+               for sid, keyword in matcher.first_keyword_per_service(text_lower)]
     
     if not matches:
         return None
     
-    # Sort by position (first mentioned first) and then by specificity
+    # Sort by position (first mentioned first); ties keep SERVICE_KEYWORDS order
     matches.sort(key=lambda x: x[0])
     
     # Get the first mentioned service
@@ -422,12 +572,10 @@ def infer_job_type_from_text(text: str) -> str:
     
     # Additional logic: if the first match is a general category, 
     # check if there's a more specific match that comes soon after
-    general_categories = {"sewer_cam", "water_heater", "leak", "clog", "gas_line", "install"}
-    
-    if first_service in general_categories:
+    if first_service in GENERAL_SERVICE_CATEGORIES:
         # Look for more specific matches within the first 50 characters
         for position, service, keyword in matches[1:]:
-            if position - first_position <= 50 and service not in general_categories:
+            if position - first_position <= 50 and service not in GENERAL_SERVICE_CATEGORIES:
                 return service
     
     # Special handling for "sink" - if it's just "sink" without context, prefer kitchen sink
@@ -457,76 +605,37 @@ def infer_multiple_job_types_from_text(text: str) -> dict:
             'description_suffix': str  # Formatted description of secondary intents
         }
     """
-    # Normalize text
-    text_lower = text.lower().replace('\t', ' ').replace('\n', ' ')
-    text_lower = ' '.join(text_lower.split())
-    
-    # Define service hierarchy (higher = more specific, will suppress lower levels)
-    service_hierarchy = {
-        # Level 5: Most specific services - these suppress all lower levels
-        "clogged_kitchen_sink": 5, "clogged_bathroom_sink": 5, "clogged_shower_tub": 5,
-        "clogged_floor_drain": 5, "clogged_toilet": 5, "main_sewer_backup": 5,
-        "leaky_faucet": 5, "faucet_replacement": 5, "faucet_cartridge": 5,
-        "kitchen_faucet_replacement": 5, "bathroom_faucet_replacement": 5, "kitchen_faucet_repair": 5,
-        "bathroom_faucet_repair": 5, "kitchen_faucet_leak": 5, "bathroom_faucet_leak": 5,
-        "toilet_leak": 5, "toilet_replacement": 5, "running_toilet": 5,
-        "leak_detection": 5, "slab_leak_repair": 5, "burst_pipe": 5,
-        "water_heater_repair": 5, "water_heater_install": 5, "tankless_water_heater": 5,
-        "sump_pump_install": 5, "sump_pump_repair": 5, "gas_line_leak": 5,
-        "gas_line_install": 5, "dishwasher_hookup": 5, "washing_machine_hookup": 5,
-        "hose_bib": 5, "shower_valve": 5, "mixing_valve": 5, "bathtub_install": 5,
-        "faucet_aerator": 5, "drain_tile": 5, "trenchless_sewer": 5, "camera_inspection": 5,
-        "grease_trap": 5, "commercial_restroom": 5, "commercial_backflow": 5,
-        "emergency_shutoff": 5, "emergency_leak": 5, "hydrostatic_test": 5,
-        "water_line": 5, "drain_snaking": 5, "hydro_jetting": 5, "showerhead_replacement": 5,
-        "toilet_flange": 5, "toilet_seal": 5, "pipe_thawing": 5, "re_piping": 5,
-        "whole_house_re_piping": 5, "water_pressure_adjustment": 5, "pressure_reducing_valve": 5,
-        "pressure_relief_valve": 5, "water_heater_expansion": 5, "water_heater_flush": 5,
-        "water_softener": 5, "water_filtration": 5, "backflow_prevention": 5,
-        "sewage_ejector": 5, "well_pump": 5, "well_pressure_tank": 5, "ice_maker_line": 5,
-        "garbage_disposal": 5,
-        
-        # Level 3: Medium specific services
-        "water_heater": 3, "sewer_cam": 3,
-        
-        # Level 2: General categories (suppressed by specific services)
-        "leak": 2, "clog": 2, "gas_line": 2,
-        
-        # Level 1: Most general (heavily suppressed)
-        "install": 1
-    }
+    text_lower = _normalize_service_text(text)
+    matcher = _SERVICE_MATCHER
     
     # Use improved sentence boundary detection
     sentences = detect_sentence_boundaries(text_lower)
     
     # Find all matches with position, sentence context, and hierarchy level
     all_matches = []
+    positions = matcher.automaton.first_positions(text_lower)
     
-    # First, do keyword-based matching (primary method)
+    # First, do keyword-based matching (primary method): one automaton scan per sentence
     for sentence_idx, sentence in enumerate(sentences):
-        for service_type, keywords in SERVICE_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in sentence:
-                    position = text_lower.find(keyword)
-                    hierarchy_level = service_hierarchy.get(service_type, 2)
-                    
-                    # Calculate proximity score (keywords closer together = higher relevance)
-                    proximity_score = len(sentence) - len(keyword)  # Shorter sentence = higher relevance
-                    
-                    match_data = {
-                        'position': position,
-                        'service': service_type,
-                        'keyword': keyword,
-                        'hierarchy': hierarchy_level,
-                        'sentence_idx': sentence_idx,
-                        'sentence': sentence,
-                        'proximity_score': proximity_score,
-                        'match_type': 'keyword',
-                        'confidence': 1.0  # High confidence for keyword matches
-                    }
-                    
-                    all_matches.append(match_data)
-                    break  # Only record first match per service type
+        for sid, keyword in matcher.first_keyword_per_service(sentence):
+            position = positions.get(keyword, 0 if not keyword else -1)
+            
+            # Calculate proximity score (keywords closer together = higher relevance)
+            proximity_score = len(sentence) - len(keyword)  # Shorter sentence = higher relevance
+            
+            match_data = {
+                'position': position,
+                'service': matcher.services[sid],
+                'keyword': keyword,
+                'hierarchy': matcher.hierarchy[sid],
+                'sentence_idx': sentence_idx,
+                'sentence': sentence,
+                'proximity_score': proximity_score,
+                'match_type': 'keyword',
+                'confidence': 1.0  # High confidence for keyword matches
+            }
+            
+            all_matches.append(match_data)
     
     # BERT semantic matching disabled to eliminate batch processing overhead
     # System now relies entirely on keyword-based matching which is fast and effective
@@ -556,49 +665,19 @@ def infer_multiple_job_types_from_text(text: str) -> dict:
         # If we have high-level matches, suppress lower levels in same categories
         if level >= 4:  # Specific services
             for match in level_matches:
-                # Check if this specific service should suppress generic ones
-                should_add = True
-                service_category = None
-                
-                # Find which category this service belongs to
-                for cat_name, cat_services in SERVICE_CATEGORIES.items():
-                    if match['service'] in cat_services:
-                        service_category = cat_name
-                        break
-                
                 # Remove any lower-level services in the same category
-                if service_category:
-                    filtered_matches = [m for m in filtered_matches 
-                                      if not (m['hierarchy'] < level and 
-                                            any(m['service'] in cat_services for cat_services in SERVICE_CATEGORIES.values() 
-                                               if match['service'] in cat_services))]
-                
-                if should_add:
-                    filtered_matches.append(match)
+                filtered_matches = [m for m in filtered_matches
+                                    if not (m['hierarchy'] < level and
+                                            matcher.shares_category(match['service'], m['service']))]
+                filtered_matches.append(match)
         else:
-            # For lower-level services, only add if no higher-level service exists
+            # For lower-level services, only add if no higher-level service exists in the same category
             for match in level_matches:
-                conflicts_with_higher = False
-                service_category = None
-                
-                # Find category
-                for cat_name, cat_services in SERVICE_CATEGORIES.items():
-                    if match['service'] in cat_services:
-                        service_category = cat_name
-                        break
-                
-                # Check if higher-level service exists in same category
-                if service_category:
-                    for existing_match in filtered_matches:
-                        if existing_match['hierarchy'] > level:
-                            for cat_services in SERVICE_CATEGORIES.values():
-                                if (match['service'] in cat_services and 
-                                    existing_match['service'] in cat_services):
-                                    conflicts_with_higher = True
-                                    break
-                            if conflicts_with_higher:
-                                break
-                
+                conflicts_with_higher = any(
+                    existing_match['hierarchy'] > level and
+                    matcher.shares_category(match['service'], existing_match['service'])
+                    for existing_match in filtered_matches
+                )
                 if not conflicts_with_higher:
                     filtered_matches.append(match)
     
@@ -609,9 +688,7 @@ def infer_multiple_job_types_from_text(text: str) -> dict:
         # Build list of services to exclude
         services_to_exclude = set()
         for specific_service in specific_services_detected:
-            if specific_service in EXCLUSION_RULES:
-                for excluded_service in EXCLUSION_RULES[specific_service]:
-                    services_to_exclude.add(excluded_service)
+            services_to_exclude.update(matcher.exclusions.get(specific_service, ()))
         
         # Filter out excluded services
         filtered_matches = [m for m in filtered_matches if m['service'] not in services_to_exclude]
@@ -686,14 +763,8 @@ def infer_multiple_job_types_from_text(text: str) -> dict:
             is_distinct = False
         
         # Check category overlap - don't add if same category as primary unless both high hierarchy
-        primary_category = None
-        match_category = None
-        
-        for cat_name, cat_services in SERVICE_CATEGORIES.items():
-            if primary_service in cat_services:
-                primary_category = cat_name
-            if match['service'] in cat_services:
-                match_category = cat_name
+        primary_category = matcher.last_category.get(primary_service)
+        match_category = matcher.last_category.get(match['service'])
         
         if (primary_category == match_category and 
             match_category is not None and 
@@ -701,44 +772,16 @@ def infer_multiple_job_types_from_text(text: str) -> dict:
             is_distinct = False
         
         # Additional exclusion check - don't add if excluded by primary service
-        if (primary_service in EXCLUSION_RULES and 
-            match['service'] in EXCLUSION_RULES[primary_service]):
-            is_distinct = False
-        
-        # Additional check: if primary and secondary are very similar, don't add secondary
-        if (primary_service in ['kitchen_faucet_leak', 'bathroom_faucet_leak'] and 
-            match['service'] in ['kitchen_faucet_leak', 'bathroom_faucet_leak']):
-            is_distinct = False
-        
-        if (primary_service in ['kitchen_faucet_repair', 'bathroom_faucet_repair'] and 
-            match['service'] in ['kitchen_faucet_repair', 'bathroom_faucet_repair']):
-            is_distinct = False
-        
-        if (primary_service in ['kitchen_faucet_replacement', 'bathroom_faucet_replacement'] and 
-            match['service'] in ['kitchen_faucet_replacement', 'bathroom_faucet_replacement']):
-            is_distinct = False
-        
-        # Additional strict filtering for similar services
-        if (primary_service in ['water_heater_repair', 'water_heater_expansion'] and 
-            match['service'] in ['water_heater_repair', 'water_heater_expansion']):
-            is_distinct = False
-        
-        if (primary_service in ['sump_pump_repair', 'sump_pump_install'] and 
-            match['service'] in ['sump_pump_repair', 'sump_pump_install']):
+        if match['service'] in matcher.exclusions.get(primary_service, ()):
             is_distinct = False
         
-        if (primary_service in ['shower_valve', 'mixing_valve'] and 
-            match['service'] in ['shower_valve', 'mixing_valve']):
-            is_distinct = False
-        
-        if (primary_service in ['pressure_reducing_valve', 'pressure_relief_valve'] and 
-            match['service'] in ['pressure_reducing_valve', 'pressure_relief_valve']):
+        # Additional strict filtering: near-identical services aren't a second issue
+        primary_group = matcher.similar_group.get(primary_service)
+        if primary_group is not None and matcher.similar_group.get(match['service']) == primary_group:
             is_distinct = False
         
         # Check if the secondary service is too generic compared to primary
-        if (match['hierarchy'] <= 2 and primary_service in ['water_heater_repair', 'water_heater_expansion', 
-                                                           'kitchen_faucet_leak', 'bathroom_faucet_replacement',
-                                                           'sump_pump_repair', 'tankless_water_heater']):
+        if match['hierarchy'] <= 2 and primary_service in _NO_GENERIC_SECONDARY:
             is_distinct = False
         
         if is_distinct:
@@ -844,7 +887,68 @@ def get_function_definition():
                 "required": ["intent", "customer", "job", "location", "fsm_backend", "confidence", "handoff_needed"]
             }
         }
-    } 
+    }
+
+# Fields the single turn-analysis call can return; callers request a subset
+TURN_ANALYSIS_FIELDS = ("intent_tag", "job_type", "urgency", "customer_name", "raw_address", "datetime")
+
+def get_turn_analysis_function_definition(fields=None, intent_tags=None):
+    """
+    Get the function definition for the single structured turn-analysis call.
+
+    Only the requested fields are included in the schema so that each dialog
+    step pays for exactly the extraction it needs in one round trip.
+
+    Args:
+        fields: Iterable of field names from TURN_ANALYSIS_FIELDS (default: all)
+        intent_tags: Allowed intent tags for the intent_tag field
+
+    Returns:
+        Tool definition for OpenAI function calling
+    """
+    requested = [f for f in (fields or TURN_ANALYSIS_FIELDS) if f in TURN_ANALYSIS_FIELDS]
+    field_schemas = {
+        "intent_tag": {
+            "type": "string",
+            "enum": list(intent_tags or []) + ["UNKNOWN"],
+            "description": "Intent tag for the utterance; UNKNOWN when unclear or not plumbing related"
+        },
+        "job_type": {
+            "type": ["string", "null"],
+            "enum": PLUMBING_SERVICES + [None],
+            "description": "Most specific plumbing service mentioned, or null"
+        },
+        "urgency": {
+            "type": "string",
+            "enum": ["emergency", "same_day", "flex"]
+        },
+        "customer_name": {
+            "type": ["string", "null"],
+            "description": "Caller's first name if they stated it, otherwise null"
+        },
+        "raw_address": {
+            "type": ["string", "null"],
+            "description": "Service address exactly as spoken, otherwise null"
+        },
+        "datetime": {
+            "type": ["string", "null"],
+            "description": "Requested appointment time as 'YYYY-MM-DD HH:MM' resolved against NOW, otherwise null"
+        },
+    }
+    if not intent_tags:
+        field_schemas["intent_tag"].pop("enum")
+    return {
+        "type": "function",
+        "function": {
+            "name": "analyze_turn",
+            "description": "Analyze one caller utterance and return the requested structured fields",
+            "parameters": {
+                "type": "object",
+                "properties": {name: field_schemas[name] for name in requested},
+                "required": requested
+            }
+        }
+    }
 
 def calculate_context_score(text: str, keyword: str, position: int, window_size: int = 50) -> float:
     """
@@ -0,0 +1,316 @@
+"""
+Catalogue of the fixed prompts the voice services speak, extracted from their source.
+
+The dialog code is parsed (not imported) and every text that can be decided
+without a caller is collected:
+
+- phone.py: string literals, constant f-strings, locals bound to a literal and
+  both arms of a conditional passed to add_tts_or_say_to_twiml, plus
+  f-string templates whose placeholders all have a known, small set of values
+  (e.g. {_speakable(job_type)} over the plumbing service list).
+- salon_phone_service.py: ConversationRelay text frames ({"type": "text",
+  "token": ...}) and the welcomeGreeting attribute.
+
+Phone prompts are played from the shared TTS cache, so pre-synthesizing them
+saves the first caller the synthesis time. Salon prompts are voiced by
+ConversationRelay's own TTS provider; they are catalogued for the coverage
+report only.
+
+At runtime every synthesized utterance is recorded, so coverage_report() shows
+how much of what callers actually hear the catalogue covers.
+"""
+
+import ast
+import asyncio
+import itertools
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_OPS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PHONE_SOURCE = os.path.join(_OPS_ROOT, 'adapters', 'phone.py')
+SALON_SOURCE = os.path.join(_OPS_ROOT, 'services', 'salon_phone_service.py')
+SPEAK_FUNCTIONS = ('add_tts_or_say_to_twiml',)
+MAX_TEMPLATE_VARIANTS = 100
+MAX_TRACKED_UNCATALOGUED = 500
+
+
+@dataclass(frozen=True)
+class CataloguePrompt:
+    text: str
+    source: str  # 'phone' or 'salon'
+    line: int
+    cacheable: bool  # played from the shared TTS cache (False: voiced by ConversationRelay)
+
+
+def _speak_form(text: str) -> str:
+    # add_tts_or_say_to_twiml speaks underscores as spaces
+    return text.replace("_", " ")
+
+
+def _constant_strings(node: ast.AST, bindings: Dict[str, List[str]]) -> List[str]:
+    """Strings an expression can evaluate to without a caller, or [] if it depends on one."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, ast.JoinedStr) and all(isinstance(v, ast.Constant) for v in node.values):
+        return ["".join(str(v.value) for v in node.values)]
+    if isinstance(node, ast.Name):
+        return list(bindings.get(node.id, []))
+    if isinstance(node, ast.IfExp):
+        body, orelse = _constant_strings(node.body, bindings), _constant_strings(node.orelse, bindings)
+        return body + orelse if body and orelse else []
+    return []
+
+
+def _template_strings(node: ast.AST, variants: Dict[str, Sequence[str]]) -> List[str]:
+    """Expand an f-string whose placeholders all have known variants (capped at MAX_TEMPLATE_VARIANTS)."""
+    if not isinstance(node, ast.JoinedStr):
+        return []
+    parts: List[Sequence[str]] = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append([str(value.value)])
+        elif isinstance(value, ast.FormattedValue) and value.format_spec is None and value.conversion == -1:
+            options = variants.get(ast.unparse(value.value))
+            if not options:
+                return []
+            parts.append(options)
+        else:
+            return []
+    combos = 1
+    for options in parts:
+        combos *= len(options)
+    if combos > MAX_TEMPLATE_VARIANTS:
+        logger.debug(f"Template at line {node.lineno} has {combos} variants; not catalogued")
+        return []
+    return ["".join(combo) for combo in itertools.product(*parts)]
+
+
+def _local_bindings(func: ast.AST) -> Dict[str, List[str]]:
+    """Locals of a function that are only ever bound to fixed strings."""
+    bindings: Dict[str, List[str]] = {}
+    dynamic = set()
+    for node in ast.walk(func):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            values = _constant_strings(node.value, {})
+            if values:
+                bindings.setdefault(name, []).extend(values)
+            else:
+                dynamic.add(name)
+    return {name: values for name, values in bindings.items() if name not in dynamic}
+
+
+def _speak_argument(call: ast.Call) -> Optional[ast.AST]:
+    for keyword in call.keywords:
+        if keyword.arg == 'text':
+            return keyword.value
+    return call.args[2] if len(call.args) >= 3 else None
+
+
+def extract_phone_prompts(
+    path: str = PHONE_SOURCE,
+    variants: Optional[Dict[str, Sequence[str]]] = None,
+    speak_functions: Iterable[str] = SPEAK_FUNCTIONS,
+) -> Tuple[List[CataloguePrompt], int]:
+    """
+    Collect the fixed texts passed to the speak helper in a phone dialog module.
+
+    Args:
+        path: Source file to parse
+        variants: Known values per placeholder expression source, e.g.
+            {"_speakable(job_type)": ["leak", "clog", ...]}
+        speak_functions: Names of the helpers whose text argument is spoken
+
+    Returns:
+        (prompts, number of speak sites whose text depends on the caller)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    speak_functions = set(speak_functions)
+    variants = variants or {}
+    prompts: List[CataloguePrompt] = []
+    dynamic_sites = 0
+    seen = set()
+    for func in ast.walk(tree):
+        if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        bindings = _local_bindings(func)
+        for node in ast.walk(func):
+            # Nested functions are walked again on their own; count each call once
+            if not isinstance(node, ast.Call) or id(node) in seen:
+                continue
+            seen.add(id(node))
+            name = node.func.id if isinstance(node.func, ast.Name) else getattr(node.func, 'attr', None)
+            if name not in speak_functions:
+                continue
+            arg = _speak_argument(node)
+            if arg is None:
+                continue
+            texts = _constant_strings(arg, bindings) or _template_strings(arg, variants)
+            if not texts:
+                dynamic_sites += 1
+            for text in texts:
+                prompts.append(CataloguePrompt(_speak_form(text), 'phone', node.lineno, True))
+    return prompts, dynamic_sites
+
+
+def extract_relay_prompts(path: str = SALON_SOURCE) -> List[CataloguePrompt]:
+    """Collect ConversationRelay text frames and welcome greetings from a salon service module."""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    prompts: List[CataloguePrompt] = []
+    for func in ast.walk(tree):
+        if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        bindings = _local_bindings(func)
+        for node in ast.walk(func):
+            if isinstance(node, ast.Dict):
+                fields = {k.value: v for k, v in zip(node.keys, node.values)
+                          if isinstance(k, ast.Constant) and isinstance(k.value, str)}
+                kind = fields.get('type')
+                if isinstance(kind, ast.Constant) and kind.value == 'text' and 'token' in fields:
+                    for text in _constant_strings(fields['token'], bindings):
+                        if text.strip():
+                            prompts.append(CataloguePrompt(text, 'salon', node.lineno, False))
+            elif isinstance(node, ast.JoinedStr):
+                # welcomeGreeting="{welcome}" inside the ConversationRelay markup
+                for before, value in zip(node.values, node.values[1:]):
+                    if (isinstance(before, ast.Constant) and str(before.value).rstrip().endswith('welcomeGreeting="')
+                            and isinstance(value, ast.FormattedValue)):
+                        for text in _constant_strings(value.value, bindings):
+                            prompts.append(CataloguePrompt(text, 'salon', node.lineno, False))
+    return prompts
+
+
+class PromptCatalogue:
+    """Fixed prompts plus counters comparing them with what is synthesized at runtime."""
+
+    def __init__(self, prompts: Iterable[CataloguePrompt], dynamic_sites: int = 0):
+        unique: Dict[Tuple[str, str], CataloguePrompt] = {}
+        for prompt in prompts:
+            unique.setdefault((prompt.source, prompt.text), prompt)
+        self.prompts = list(unique.values())
+        self.dynamic_sites = dynamic_sites
+        self._cacheable = {p.text for p in self.prompts if p.cacheable}
+        self.runtime = {"utterances": 0, "catalogued": 0, "cache_hits": 0, "catalogued_cache_hits": 0}
+        self.uncatalogued: Counter = Counter()
+        self.last_run: Dict[str, Any] = {}
+
+    def cacheable_texts(self) -> List[str]:
+        """Texts to pre-synthesize, in catalogue order."""
+        seen, texts = set(), []
+        for prompt in self.prompts:
+            if prompt.cacheable and prompt.text not in seen:
+                seen.add(prompt.text)
+                texts.append(prompt.text)
+        return texts
+
+    def record_runtime(self, text: str, cache_hit: bool) -> None:
+        """Count one utterance synthesized (or served from cache) during a call."""
+        catalogued = text in self._cacheable
+        self.runtime["utterances"] += 1
+        self.runtime["catalogued"] += int(catalogued)
+        self.runtime["cache_hits"] += int(cache_hit)
+        self.runtime["catalogued_cache_hits"] += int(catalogued and cache_hit)
+        if not catalogued and (text in self.uncatalogued or len(self.uncatalogued) < MAX_TRACKED_UNCATALOGUED):
+            self.uncatalogued[text] += 1
+
+    def coverage_report(self, top: int = 10) -> Dict[str, Any]:
+        """Catalogue size, last pre-synthesis run and runtime coverage for dashboards."""
+        utterances = self.runtime["utterances"]
+        return {
+            "prompts": len(self.prompts),
+            "cacheable": len(self._cacheable),
+            "relayOnly": sum(1 for p in self.prompts if not p.cacheable),
+            "dynamicSites": self.dynamic_sites,
+            "lastRun": dict(self.last_run),
+            "runtime": dict(self.runtime),
+            "coverage": (self.runtime["catalogued"] / utterances) if utterances else 0.0,
+            "topUncatalogued": [{"text": text[:120], "count": count}
+                                for text, count in self.uncatalogued.most_common(top)],
+        }
+
+    async def presynthesize(
+        self,
+        synthesize: Callable[[str], Awaitable[bool]],
+        concurrency: int = 3,
+        voice: str = "",
+    ) -> Dict[str, Any]:
+        """
+        Synthesize every cacheable prompt with at most `concurrency` in flight.
+
+        Args:
+            synthesize: Coroutine taking a text and returning True once its audio is cached
+            concurrency: Maximum simultaneous provider requests
+            voice: Label of the voice settings this run warms, for the report
+
+        Returns:
+            Summary of the run (also kept as last_run)
+        """
+        texts = self.cacheable_texts()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        started = time.time()
+        run = {"voice": voice, "total": len(texts), "ready": 0, "failed": 0, "startedAt": started,
+               "durationSec": None, "cancelled": False}
+        self.last_run = run
+
+        async def warm(text: str) -> None:
+            async with semaphore:
+                try:
+                    ok = await synthesize(text)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.debug(f"Pre-synthesis failed for '{text[:50]}': {e}")
+                    ok = False
+                run["ready" if ok else "failed"] += 1
+
+        try:
+            await asyncio.gather(*(warm(text) for text in texts))
+        except asyncio.CancelledError:
+            run["cancelled"] = True
+            raise
+        finally:
+            run["durationSec"] = round(time.time() - started, 3)
+        logger.info(f"🎵 Pre-synthesized {run['ready']}/{run['total']} catalogue prompts "
+                    f"({run['failed']} failed) in {run['durationSec']}s for voice {voice}")
+        return run
+
+
+_catalogue_cache: Dict[Tuple[str, str], PromptCatalogue] = {}
+
+
+def get_prompt_catalogue(
+    phone_path: Optional[str] = None,
+    salon_path: Optional[str] = None,
+    variants: Optional[Dict[str, Sequence[str]]] = None,
+) -> PromptCatalogue:
+    """
+    Get the catalogue for the phone and salon sources, extracting it on first use.
+    A source that cannot be parsed contributes no prompts.
+    """
+    phone_path = phone_path or PHONE_SOURCE
+    salon_path = salon_path or SALON_SOURCE
+    cached = _catalogue_cache.get((phone_path, salon_path))
+    if cached is None:
+        prompts: List[CataloguePrompt] = []
+        dynamic_sites = 0
+        try:
+            phone_prompts, dynamic_sites = extract_phone_prompts(phone_path, variants)
+            prompts.extend(phone_prompts)
+        except Exception as e:
+            logger.warning(f"Phone prompts not catalogued from {phone_path}: {e}")
+        try:
+            prompts.extend(extract_relay_prompts(salon_path))
+        except Exception as e:
+            logger.warning(f"Salon prompts not catalogued from {salon_path}: {e}")
+        cached = PromptCatalogue(prompts, dynamic_sites)
+        logger.info(f"Prompt catalogue: {len(cached.prompts)} prompts, {dynamic_sites} caller-dependent speak sites")
+        _catalogue_cache[(phone_path, salon_path)] = cached
+    return cached
@@ -0,0 +1,91 @@
+"""
+Single-flight coalescing for concurrent async work.
+
+Concurrent requesters for the same key (e.g. (call, utterance, task)) await one
+shared future instead of each issuing an identical LLM request. Completed
+results can be kept for a short window so a requester that arrives just after
+the work finished reuses the result too.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls that share a key onto one shared future."""
+
+    def __init__(self, result_ttl_seconds: float = 0.0, max_results: int = 512):
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_results = max_results
+        self._inflight: dict = {}
+        self._results: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.stats_counters = {"executed": 0, "coalesced": 0, "reused": 0}
+
+    def submit(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> "asyncio.Future":
+        """
+        Register work for a key without awaiting it.
+
+        Registration is synchronous, so a caller can claim the key before its
+        first await and later requesters are guaranteed to join it.
+
+        Args:
+            key: Coalescing key
+            factory: Zero-argument callable returning the awaitable to run
+
+        Returns:
+            Shared future resolving to the factory's result
+        """
+        self._prune_results()
+        retained = self._results.get(key)
+        if retained is not None:
+            self.stats_counters["reused"] += 1
+            future = asyncio.get_event_loop().create_future()
+            future.set_result(retained[1])
+            return future
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats_counters["coalesced"] += 1
+            return inflight
+        self.stats_counters["executed"] += 1
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+        return task
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory once per key among concurrent requesters and return its result."""
+        # Shield so one requester being cancelled does not cancel the shared work
+        return await asyncio.shield(self.submit(key, factory))
+
+    def _on_done(self, key: Hashable, task: "asyncio.Future") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.result_ttl_seconds > 0:
+            self._results[key] = (time.monotonic() + self.result_ttl_seconds, task.result())
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def _prune_results(self) -> None:
+        now = time.monotonic()
+        while self._results:
+            key, (expires_at, _) = next(iter(self._results.items()))
+            if expires_at >= now:
+                break
+            self._results.popitem(last=False)
+
+    def forget(self, prefix: Hashable) -> None:
+        """Drop retained results whose tuple key starts with prefix (e.g. a call SID)."""
+        for key in [k for k in self._results if isinstance(k, tuple) and k and k[0] == prefix]:
+            self._results.pop(key, None)
+
+    def stats(self) -> dict:
+        """Get coalescing counters for dashboards."""
+        return {**self.stats_counters, "inflight": len(self._inflight), "retained": len(self._results)}
@@ -0,0 +1,139 @@
+"""
+Free/busy index for appointment slot search.
+
+find_next_compliant_slot used to probe the calendar once per 15-minute
+candidate (up to 288 get_events requests for a 72-hour horizon). BusyIndex is
+built from one get_events call covering the whole horizon: events become
+merged, sorted busy intervals, a window check is a binary search, and the slot
+search jumps straight past each conflicting interval instead of stepping
+through it. The same pass can collect the next N alternative slots.
+
+All datetimes are naive UTC, matching CalendarAdapter.get_events().
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SLOT_STEP_MINUTES = 15
+
+# Google Calendar returns at most 2500 events per page
+MAX_EVENTS_PER_FETCH = 2500
+
+
+def ceil_to_step(dt: datetime, step_minutes: int = SLOT_STEP_MINUTES) -> datetime:
+    """Round dt up to the next step boundary (seconds dropped)."""
+    dt = dt.replace(second=0, microsecond=0)
+    remainder = (step_minutes - (dt.minute % step_minutes)) % step_minutes
+    return dt + timedelta(minutes=remainder)
+
+
+def _naive_utc(raw: str) -> datetime:
+    value = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def event_interval(event: Dict[str, Any]) -> Optional[Tuple[datetime, datetime]]:
+    """(start, end) of a timed calendar event as naive UTC; None for all-day or malformed events."""
+    s_raw = ((event.get("start") or {}).get("dateTime") or "")
+    e_raw = ((event.get("end") or {}).get("dateTime") or "")
+    if not s_raw or not e_raw:
+        return None
+    try:
+        return _naive_utc(s_raw), _naive_utc(e_raw)
+    except Exception:
+        return None
+
+
+class BusyIndex:
+    """Merged, sorted busy intervals with binary-search window checks."""
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime]]):
+        merged: List[List[datetime]] = []
+        for start, end in sorted(iv for iv in intervals if iv[1] > iv[0]):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    @classmethod
+    def from_events(cls, events: Iterable[Dict[str, Any]]) -> "BusyIndex":
+        return cls(iv for iv in (event_interval(ev) for ev in events or []) if iv)
+
+    @classmethod
+    def fetch(cls, calendar: Any, start: datetime, end: datetime) -> "BusyIndex":
+        """Build the index from a single get_events request covering [start, end)."""
+        return cls.from_events(calendar.get_events(start_date=start, end_date=end, max_results=MAX_EVENTS_PER_FETCH))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def first_conflict(self, start: datetime, end: datetime) -> Optional[int]:
+        """Index of the first busy interval overlapping [start, end), or None."""
+        i = bisect_right(self.ends, start)
+        if i < len(self.starts) and self.starts[i] < end:
+            return i
+        return None
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        return self.first_conflict(start, end) is None
+
+    def iter_free_slots(
+        self,
+        earliest: datetime,
+        horizon_end: datetime,
+        duration_minutes: int,
+        buffer_minutes: int,
+        step_minutes: int = SLOT_STEP_MINUTES,
+    ):
+        """
+        Yield step-aligned starts in [earliest, horizon_end] whose job window,
+        padded by buffer_minutes on both sides, touches no busy interval.
+        Consecutive yields are duration_minutes apart at least (non-overlapping jobs).
+        """
+        duration = timedelta(minutes=duration_minutes)
+        buffer = timedelta(minutes=buffer_minutes)
+        candidate = ceil_to_step(earliest, step_minutes)
+        while candidate <= horizon_end:
+            conflict = self.first_conflict(candidate - buffer, candidate + duration + buffer)
+            if conflict is None:
+                yield candidate
+                candidate = ceil_to_step(candidate + duration, step_minutes)
+            else:
+                # Jump past the conflicting interval instead of stepping through it
+                candidate = ceil_to_step(max(self.ends[conflict] + buffer, candidate + timedelta(minutes=step_minutes)),
+                                         step_minutes)
+
+    def find_free_slots(
+        self,
+        earliest: datetime,
+        horizon_end: datetime,
+        duration_minutes: int = 120,
+        buffer_minutes: int = 60,
+        count: int = 1,
+        step_minutes: int = SLOT_STEP_MINUTES,
+    ) -> List[datetime]:
+        """
+        The first `count` free slots from earliest (see iter_free_slots).
+
+        Args:
+            earliest: Earliest acceptable start
+            horizon_end: Latest acceptable start
+            duration_minutes: Job length
+            buffer_minutes: Free time required before and after the job
+            count: Number of slots to return
+            step_minutes: Start-time alignment
+
+        Returns:
+            Up to `count` start times in ascending order
+        """
+        slots = []
+        for slot in self.iter_free_slots(earliest, horizon_end, duration_minutes, buffer_minutes, step_minutes):
+            slots.append(slot)
+            if len(slots) >= count:
+                break
+        return slots
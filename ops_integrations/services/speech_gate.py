@@ -0,0 +1,63 @@
+"""
+Accuracy metrics for the speech gate that mutes caller audio while the bot talks.
+
+Each gated turn compares when the gate opened with when the bot's audio
+actually finished playing: the Twilio mark acknowledgement on the Media Stream
+path, or push time plus the decoded clip length on the TwiML path. A gate that
+opens late (overshoot) drops the start of the caller's reply and adds dead
+air; one that opens early (undershoot) lets the bot's own echo into the
+transcriber. The word-count estimate the gate used to rely on is recorded
+alongside, as its error against the decoded length.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from .metrics import percentile
+
+
+class SpeechGateStats:
+    """Per-turn gate overshoot/undershoot over the last `window` gated turns."""
+
+    def __init__(self, window: int = 500):
+        self._overshoot: Deque[float] = deque(maxlen=window)
+        self._undershoot: Deque[float] = deque(maxlen=window)
+        self._estimate_error: Deque[float] = deque(maxlen=window)
+        self.counters: Dict[str, int] = {"turns": 0, "mark": 0, "duration": 0, "timeout": 0, "undershoot_turns": 0}
+
+    def record(self, source: str, gate_opened_at: float, playback_ended_at: float,
+               estimate_error: Optional[float] = None) -> None:
+        """
+        Record one gated turn.
+
+        Args:
+            source: What opened the gate: 'mark' (ack received), 'duration'
+                (decoded clip length) or 'timeout' (mark never arrived in time)
+            gate_opened_at: When caller audio was let through again
+            playback_ended_at: When the bot's audio actually finished
+            estimate_error: Word-count estimate minus the decoded length, in seconds
+        """
+        self.counters["turns"] += 1
+        self.counters[source] = self.counters.get(source, 0) + 1
+        delta = gate_opened_at - playback_ended_at
+        self._overshoot.append(max(0.0, delta))
+        self._undershoot.append(max(0.0, -delta))
+        if delta < 0:
+            self.counters["undershoot_turns"] += 1
+        if estimate_error is not None:
+            self._estimate_error.append(estimate_error)
+
+    def stats(self) -> Dict[str, object]:
+        """Percentiles in seconds for dashboards."""
+        over = list(self._overshoot)
+        under = list(self._undershoot)
+        errors = [abs(e) for e in self._estimate_error]
+        return {
+            **self.counters,
+            "overshootP50": percentile(over, 50),
+            "overshootP95": percentile(over, 95),
+            "undershootP95": percentile(under, 95),
+            "undershootMax": max(under) if under else None,
+            "wordEstimateAbsErrorP50": percentile(errors, 50),
+            "wordEstimateAbsErrorP95": percentile(errors, 95),
+        }
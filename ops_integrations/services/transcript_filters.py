@@ -0,0 +1,284 @@
+"""
+Transcript suppression/removal filters compiled once from a data file.
+
+config/transcription_filters.json lists the regexes clean_and_filter_transcription
+applies: "suppress_patterns" drop the whole transcript, "remove_patterns" are cut
+out of it. Patterns are plain `re` syntax matched against lowercased text.
+
+At load time the list is split by shape:
+    plain phrases ("thank you for watching")      -> Aho–Corasick automaton
+    word-bounded phrases (r"\bdial tone\b")        -> same automaton + boundary check
+    anything else (URLs, "subscribe.*channel")     -> precompiled regexes
+so a transcript costs one automaton pass plus at most a handful of regex
+searches, whatever the length of the list. find_suppression() still reports the
+first pattern in file order that matches, exactly like the old loop.
+
+The repetition helpers below work on one normalized token stream: tokens are
+interned to ints once, and a phrase of n words repeating back-to-back at i is a
+run of n equal tokens at lag n (tok[k] == tok[k + n] for k = i..i+n-1). One
+right-to-left pass per lag gives every repeat and its count in O(tokens),
+for any phrase length up to a bound, including Whisper's sentence loops.
+"""
+
+import json
+import logging
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .keyword_automaton import KeywordAutomaton
+except Exception:
+    import sys as _sys
+    _OPS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if _OPS_ROOT not in _sys.path:
+        _sys.path.insert(0, _OPS_ROOT)
+    from services.keyword_automaton import KeywordAutomaton
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILTERS_PATH = os.getenv(
+    "TRANSCRIPTION_FILTERS_JSON",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "transcription_filters.json"),
+)
+
+# Words a caller may legitimately repeat ("no no no", "ten ten", "tomorrow, tomorrow")
+ALLOWED_REPETITION_WORDS = frozenset({
+    # Time-related words
+    'am', 'pm', 'a.m.', 'p.m.', 'morning', 'afternoon', 'evening', 'night',
+    'today', 'tomorrow', 'yesterday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec',
+    'o\'clock', 'oclock', 'hour', 'hours', 'minute', 'minutes', 'second', 'seconds',
+    # Yes/no responses
+    'yes', 'no', 'yeah', 'yep', 'yup', 'nope', 'nah', 'ok', 'okay', 'sure', 'right',
+    # Numbers (for time)
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+    'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen', 'twenty',
+    'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety', 'hundred',
+    # Time indicators
+    'sharp', 'exactly', 'precisely', 'around', 'about', 'approximately', 'roughly',
+    'early', 'late', 'soon', 'later', 'earlier', 'now', 'then', 'when', 'time'
+})
+
+# Longest phrase (in words) checked for back-to-back loops
+MAX_REPEAT_PERIOD = 24
+
+_PLAIN_PHRASE = re.compile(r"[a-z0-9 '-]+")
+_BOUNDED_PHRASE = re.compile(r"\\b([a-z0-9 '-]+)\\b")
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same definition as `\b` for str patterns
+    return ch.isalnum() or ch == '_'
+
+
+class TranscriptFilter:
+    """Compiled suppression and removal patterns for transcript cleaning."""
+
+    def __init__(self, suppress_patterns: List[str], remove_patterns: List[str]):
+        self.suppress_patterns = list(suppress_patterns)
+        self.remove_patterns = list(remove_patterns)
+
+        # Suppression: phrase -> [(pattern index, needs word boundaries)], plus the
+        # remaining regexes in file order
+        self._phrases, self._suppress_regexes = self._split(self.suppress_patterns)
+        self._automaton = KeywordAutomaton(self._phrases)
+
+        # Removal: the same split, with the regexes folded into one case-insensitive
+        # alternation (these are few; the literal phrases go through the automaton)
+        self._remove_phrases, remove_regexes = self._split(self.remove_patterns)
+        self._remove_automaton = KeywordAutomaton(self._remove_phrases)
+        self._remove_regex = (
+            re.compile("|".join(f"(?:{rx.pattern})" for _, rx in remove_regexes), re.IGNORECASE)
+            if remove_regexes else None
+        )
+        self._remove_compiled = [re.compile(pattern, re.IGNORECASE) for pattern in self.remove_patterns]
+        self.fired = Counter()
+
+    @staticmethod
+    def _split(patterns: List[str]):
+        phrases: Dict[str, List[tuple]] = {}
+        regexes = []
+        for idx, pattern in enumerate(patterns):
+            bounded = _BOUNDED_PHRASE.fullmatch(pattern)
+            if bounded:
+                phrases.setdefault(bounded.group(1), []).append((idx, True))
+            elif _PLAIN_PHRASE.fullmatch(pattern):
+                phrases.setdefault(pattern, []).append((idx, False))
+            else:
+                regexes.append((idx, re.compile(pattern)))
+        return phrases, regexes
+
+    @staticmethod
+    def _phrase_hits(automaton, phrases, text_lower: str):
+        """Yield (start, end, pattern index) for automaton hits that satisfy their boundaries."""
+        n = len(text_lower)
+        for match in automaton.iter_matches(text_lower):
+            for idx, bounded in phrases[match.keyword]:
+                if bounded and not (
+                    (match.start == 0 or not _is_word_char(text_lower[match.start - 1])) and
+                    (match.end == n or not _is_word_char(text_lower[match.end]))
+                ):
+                    continue
+                yield match.start, match.end, idx
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_FILTERS_PATH) -> "TranscriptFilter":
+        with open(path, "r") as f:
+            cfg = json.load(f)
+        return cls(cfg.get("suppress_patterns", []), cfg.get("remove_patterns", []))
+
+    def find_suppression(self, text_lower: str) -> Optional[str]:
+        """
+        Find the first suppression pattern (in data file order) that matches.
+
+        Args:
+            text_lower: Lowercased transcript
+
+        Returns:
+            The pattern string as written in the data file, or None
+        """
+        best = min((idx for _, _, idx in self._phrase_hits(self._automaton, self._phrases, text_lower)),
+                   default=len(self.suppress_patterns))
+        # Only regexes listed before the best phrase hit can change the answer
+        for idx, regex in self._suppress_regexes:
+            if idx >= best:
+                break
+            if regex.search(text_lower):
+                best = idx
+                break
+
+        if best == len(self.suppress_patterns):
+            return None
+        pattern = self.suppress_patterns[best]
+        self.fired[pattern] += 1
+        return pattern
+
+    def remove(self, text: str) -> str:
+        """Cut every removal pattern out of text (case-insensitive)."""
+        text_lower = text.lower()
+        if len(text_lower) != len(text):
+            # Lowercasing changed offsets (rare Unicode); apply patterns one by one
+            for regex in self._remove_compiled:
+                text = regex.sub('', text)
+            return text
+
+        spans = [(start, end) for start, end, _ in
+                 self._phrase_hits(self._remove_automaton, self._remove_phrases, text_lower)]
+        if self._remove_regex is not None:
+            spans.extend(m.span() for m in self._remove_regex.finditer(text) if m.end() > m.start())
+        if not spans:
+            return text
+
+        # Cut leftmost, longest, non-overlapping spans
+        spans.sort(key=lambda span: (span[0], -span[1]))
+        pieces, pos = [], 0
+        for start, end in spans:
+            if start < pos:
+                continue
+            pieces.append(text[pos:start])
+            pos = end
+        pieces.append(text[pos:])
+        return ''.join(pieces)
+
+    def stats(self) -> dict:
+        return {
+            "suppressPatterns": len(self.suppress_patterns),
+            "automatonPhrases": len(self._phrases),
+            "regexPatterns": len(self._suppress_regexes),
+            "removePatterns": len(self.remove_patterns),
+            "fired": dict(self.fired.most_common(10)),
+        }
+
+
+_filter_cache: Dict[str, TranscriptFilter] = {}
+
+
+def get_transcript_filter(path: Optional[str] = None) -> TranscriptFilter:
+    """
+    Get the compiled filter for path (default: TRANSCRIPTION_FILTERS_JSON or
+    config/transcription_filters.json), loading it on first use.
+    """
+    path = path or DEFAULT_FILTERS_PATH
+    cached = _filter_cache.get(path)
+    if cached is None:
+        try:
+            cached = TranscriptFilter.from_file(path)
+            logger.info(f"Loaded transcription filters from {path} "
+                        f"(suppress={len(cached.suppress_patterns)}, remove={len(cached.remove_patterns)})")
+        except Exception as e:
+            logger.warning(f"Transcription filters not loaded from {path}: {e}")
+            cached = TranscriptFilter([], [])
+        _filter_cache[path] = cached
+    return cached
+
+
+def tokenize_for_repetition(words: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    Normalize words once for repetition checks.
+
+    Returns:
+        (normalized words, interned token ids); equal normalized words share an id
+    """
+    norms = [word.lower().strip('.,!?') for word in words]
+    ids: Dict[str, int] = {}
+    return norms, [ids.setdefault(norm, len(ids)) for norm in norms]
+
+
+def lag_runs(ids: List[int], period: int) -> List[int]:
+    """
+    runs[k] = how many consecutive positions from k satisfy ids[j] == ids[j + period].
+
+    A phrase of `period` tokens starting at i is immediately repeated iff
+    runs[i] >= period, and then it occurs (runs[i] + period) // period times in a row.
+    """
+    n = len(ids) - period
+    runs = [0] * (max(n, 0) + 1)
+    for k in range(n - 1, -1, -1):
+        if ids[k] == ids[k + period]:
+            runs[k] = runs[k + 1] + 1
+    return runs
+
+
+def iter_repeats(ids: List[int], period: int) -> Iterator[Tuple[int, int]]:
+    """Yield (start, repeat count) for every position where a `period`-token phrase repeats back-to-back."""
+    if len(ids) < period * 2:
+        return
+    runs = lag_runs(ids, period)
+    for i in range(len(ids) - period * 2 + 1):
+        if runs[i] >= period:
+            yield i, (runs[i] + period) // period
+
+
+def collapse_repeats(ids: List[int], period: int, min_repeats: int = 2) -> Tuple[List[int], List[Tuple[int, int]]]:
+    """
+    Greedy left-to-right collapse of back-to-back repeats of `period`-token phrases.
+
+    Args:
+        ids: Token ids
+        period: Phrase length in tokens
+        min_repeats: Collapse only phrases repeated at least this many times
+
+    Returns:
+        (indices of tokens to keep, [(start, repeat count)] for each collapsed phrase)
+    """
+    n = len(ids)
+    if n < period * 2:
+        return list(range(n)), []
+    runs = lag_runs(ids, period)
+    keep, collapsed = [], []
+    i = 0
+    while i < n:
+        if i + period * 2 <= n and runs[i] >= period:
+            repeats = (runs[i] + period) // period
+            if repeats >= min_repeats:
+                keep.extend(range(i, i + period))
+                collapsed.append((i, repeats))
+                i += repeats * period
+                continue
+        keep.append(i)
+        i += 1
+    return keep, collapsed
+
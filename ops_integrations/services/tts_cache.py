@@ -0,0 +1,245 @@
+"""
+Content-addressed cache for synthesized TTS audio shared across calls.
+
+A clip is keyed by a hash of everything that changes the audio: the spoken
+text, the provider and its voice, model and speed, and the audio format
+(mp3 for <Play>, mu-law for Media Stream playback). The greeting, "What's your
+name?" and the goodbye therefore synthesize once per voice configuration, not
+once per call. Clips live in a byte-budgeted in-memory LRU and are written
+through to a content-addressed directory (<dir>/<key[:2]>/<key>.mp3, or
+.ulaw for mu-law clips) so a restart starts warm; the directory has its own byte budget and evicts the
+least recently used files.
+
+Because a key always names the same bytes, the /tts/ route can serve clips by
+key with immutable HTTP caching.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+# File suffix and HTTP content type of each audio format
+AUDIO_SUFFIXES = {"mp3": ".mp3", "mulaw": ".ulaw"}
+AUDIO_CONTENT_TYPES = {"mp3": "audio/mpeg", "mulaw": "audio/basic"}
+
+
+def tts_cache_key(text: str, provider: str, voice: str, model: str, speed: Optional[float] = None,
+                  audio_format: str = "mp3") -> str:
+    """
+    Get the content key for a clip.
+
+    Args:
+        text: Exact text sent to the provider
+        provider: 'elevenlabs' or 'openai'
+        voice: Provider voice id
+        model: Provider model id
+        speed: Playback speed, for providers that take one
+        audio_format: 'mp3' for <Play> URLs, 'mulaw' for Media Stream playback
+
+    Returns:
+        64-character sha256 hex digest
+    """
+    speed_part = "" if speed is None else f"{float(speed):g}"
+    parts = [provider or "", voice or "", model or "", speed_part, text or ""]
+    if audio_format != "mp3":
+        parts.insert(4, audio_format)  # mp3 keys predate the format and stay unchanged
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def is_tts_cache_key(value: str) -> bool:
+    """True when value has the shape of a tts_cache_key digest."""
+    return bool(_KEY_RE.match(value or ""))
+
+
+class TTSAudioCache:
+    """Byte-budgeted LRU of audio clips with a content-addressed on-disk spill directory."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir: Optional[str] = None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        # key -> size of each file in the disk tier, least recently used first
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        # key -> audio format of each clip in either tier that is not mp3
+        self._formats: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats_counters = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0,
+                               "disk_evictions": 0, "stores": 0, "bytes_served": 0}
+        if disk_dir:
+            self._open_disk_tier(disk_dir)
+
+    def _open_disk_tier(self, disk_dir: str) -> None:
+        try:
+            os.makedirs(disk_dir, exist_ok=True)
+            found = []
+            for root, _, files in os.walk(disk_dir):
+                for name in files:
+                    key, suffix = os.path.splitext(name)
+                    audio_format = next((f for f, s in AUDIO_SUFFIXES.items() if s == suffix), None)
+                    if audio_format is None or not is_tts_cache_key(key):
+                        continue
+                    stat = os.stat(os.path.join(root, name))
+                    found.append((stat.st_mtime, key, stat.st_size, audio_format))
+            for _, key, size, audio_format in sorted(found):
+                self._disk[key] = size
+                self._disk_bytes += size
+                if audio_format != "mp3":
+                    self._formats[key] = audio_format
+            self.disk_dir = disk_dir
+            logger.info(f"🎵 TTS cache disk tier at {disk_dir}: {len(self._disk)} clips, {self._disk_bytes} bytes")
+        except Exception as e:
+            logger.warning(f"TTS cache disk tier disabled ({disk_dir}): {e}")
+            self.disk_dir = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir or "", key[:2], key + AUDIO_SUFFIXES[self.audio_format(key)])
+
+    def audio_format(self, key: str) -> str:
+        """Format the clip for key was stored with ('mp3' when unknown)."""
+        return self._formats.get(key, "mp3")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the clip for key, promoting disk hits into memory, or None."""
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.stats_counters["hits"] += 1
+                return audio
+            if self.disk_dir and key in self._disk:
+                try:
+                    path = self._path(key)
+                    with open(path, "rb") as f:
+                        audio = f.read()
+                    os.utime(path)
+                    self._disk.move_to_end(key)
+                except Exception as e:
+                    logger.debug(f"TTS cache disk read failed for {key}: {e}")
+                    self._forget_disk_locked(key)
+                    audio = None
+                if audio:
+                    self._store_locked(key, audio)
+                    self.stats_counters["hits"] += 1
+                    self.stats_counters["disk_hits"] += 1
+                    return audio
+            self.stats_counters["misses"] += 1
+            return None
+
+    def contains(self, key: str) -> bool:
+        """True when either tier holds key; does not touch LRU order or counters."""
+        with self._lock:
+            return key in self._entries or key in self._disk
+
+    def put(self, key: str, audio: bytes, audio_format: str = "mp3") -> None:
+        """
+        Store a clip in memory and, when enabled, on disk.
+
+        Args:
+            key: Content key of the clip
+            audio: Clip bytes
+            audio_format: 'mp3' or 'mulaw'; names the file suffix and served content type
+        """
+        if not audio:
+            return
+        with self._lock:
+            if audio_format != "mp3":
+                self._formats[key] = audio_format
+            self._store_locked(key, audio)
+            self.stats_counters["stores"] += 1
+            if self.disk_dir and key not in self._disk:
+                self._write_disk_locked(key, audio)
+
+    def _store_locked(self, key: str, audio: bytes) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = audio
+        self._bytes += len(audio)
+        # Keep at least the newest clip even if it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            if evicted_key not in self._disk:
+                self._formats.pop(evicted_key, None)
+            self.stats_counters["evictions"] += 1
+
+    def _write_disk_locked(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so a reader never sees a partial clip
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"TTS cache disk write failed for {key}: {e}")
+            return
+        self._disk[key] = len(audio)
+        self._disk_bytes += len(audio)
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+            oldest = next(iter(self._disk))
+            try:
+                os.remove(self._path(oldest))
+            except OSError:
+                pass
+            self._forget_disk_locked(oldest)
+            self.stats_counters["disk_evictions"] += 1
+
+    def _forget_disk_locked(self, key: str) -> None:
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+        if key not in self._entries:
+            self._formats.pop(key, None)
+
+    def note_served(self, size: int) -> None:
+        """Count bytes handed out by the HTTP route."""
+        with self._lock:
+            self.stats_counters["bytes_served"] += size
+
+    def clear(self) -> None:
+        """Drop every clip from both tiers and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for key in list(self._disk):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._disk.clear()
+            self._disk_bytes = 0
+            self._formats.clear()
+            for counter in self.stats_counters:
+                self.stats_counters[counter] = 0
+
+    def stats(self) -> Dict[str, object]:
+        """Get hit-rate and size metrics for dashboards."""
+        with self._lock:
+            hits = self.stats_counters["hits"]
+            misses = self.stats_counters["misses"]
+            lookups = hits + misses
+            return {
+                **self.stats_counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "hit_rate": (hits / lookups) if lookups else 0.0,
+                "persistent": self.disk_dir is not None,
+            }
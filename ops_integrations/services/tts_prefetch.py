@@ -0,0 +1,163 @@
+"""
+Speculative TTS for the prompts a call is likely to hear next.
+
+Most dialog steps have only a few possible replies, and their text is known
+as soon as the step is entered: once a slot has been suggested, the caller
+will either hear the booking confirmation or be asked for another time.
+TTSPrefetcher synthesizes those candidates in the background while the
+current prompt plays and the caller answers, so the reply is already cached
+when the dialog speaks it.
+
+Predictions are made per step. When the call moves on, candidates of the old
+step that were not spoken are dropped: queued ones never start and running
+ones are cancelled. Speculations are keyed by the cache key of the exact clip
+that would be spoken, after any per-caller name or conversation starter, so
+a prediction counts as a hit only when that audio is what the caller hears.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Speculation:
+    __slots__ = ("task", "state", "synthesized", "claimed")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.state = "queued"  # queued, running, done, failed or cached
+        self.synthesized = False  # provider work was started for it
+        self.claimed = False  # spoken (by this or another call): never cancelled
+
+
+class TTSPrefetcher:
+    """Bounded background synthesis of each call's predicted next prompts."""
+
+    def __init__(self, max_concurrency: int = 2):
+        """
+        Args:
+            max_concurrency: Speculative syntheses running at once across all calls
+        """
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._calls: Dict[str, Dict[str, _Speculation]] = {}
+        self._states: Dict[str, Hashable] = {}
+        self.counters: Dict[str, int] = {
+            "transitions": 0, "predicted": 0, "already_cached": 0, "synthesized": 0,
+            "cancelled_queued": 0, "cancelled_running": 0, "hits": 0, "spoken": 0, "wasted": 0,
+        }
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+            self._loop = loop
+        return self._semaphore
+
+    def predict(self, call_sid: str, state: Hashable,
+                prompts: Iterable[Tuple[str, Optional[Callable[[], Awaitable[bool]]]]]) -> None:
+        """
+        Record the call's dialog state and speculate on its next prompts if it changed.
+
+        Args:
+            call_sid: Call the prompts are for
+            state: Dialog state the predictions depend on (e.g. step and suggested time);
+                the same state again is not a transition and changes nothing
+            prompts: (clip key, synthesize) in order of likelihood; synthesize
+                returns True once the clip is cached, and is None when it already is
+        """
+        if self._states.get(call_sid) == state:
+            return
+        self._states[call_sid] = state
+        self.counters["transitions"] += 1
+        previous = self._calls.pop(call_sid, {})
+        current: Dict[str, _Speculation] = {}
+        for key, synthesize in prompts:
+            if key in current:
+                continue
+            spec = previous.pop(key, None)
+            if spec is None:
+                self.counters["predicted"] += 1
+                spec = _Speculation()
+                if synthesize is None:
+                    spec.state = "cached"
+                    self.counters["already_cached"] += 1
+                else:
+                    spec.task = asyncio.get_running_loop().create_task(self._run(spec, synthesize))
+            current[key] = spec
+        for spec in previous.values():
+            self._drop(spec)
+        if current:
+            self._calls[call_sid] = current
+
+    async def _run(self, spec: _Speculation, synthesize: Callable[[], Awaitable[bool]]) -> None:
+        async with self._slots():
+            spec.state = "running"
+            spec.synthesized = True
+            self.counters["synthesized"] += 1
+            try:
+                ok = await synthesize()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Speculative TTS failed: {e}")
+                ok = False
+            spec.state = "done" if ok else "failed"
+
+    def _drop(self, spec: _Speculation) -> None:
+        """The branch was not taken."""
+        if spec.claimed:
+            return
+        if spec.state == "queued":
+            self.counters["cancelled_queued"] += 1
+            spec.task.cancel()
+            return
+        if spec.state == "running":
+            self.counters["cancelled_running"] += 1
+            spec.task.cancel()
+        if spec.synthesized:
+            self.counters["wasted"] += 1
+
+    def claim(self, call_sid: str, key: str) -> bool:
+        """
+        Note that a call is speaking a clip now.
+
+        Args:
+            call_sid: Call speaking
+            key: Cache key of the clip as it is spoken
+
+        Returns:
+            True when the clip was predicted for this call
+        """
+        for other_sid, specs in self._calls.items():
+            if other_sid != call_sid and key in specs:
+                # The same clip in flight: do not cancel it under this call
+                specs[key].claimed = True
+        specs = self._calls.get(call_sid)
+        if not specs:
+            return False
+        self.counters["spoken"] += 1
+        spec = specs.pop(key, None)
+        if spec is None:
+            return False
+        spec.claimed = True
+        self.counters["hits"] += 1
+        return True
+
+    def forget(self, call_sid: str) -> None:
+        """The call has ended: drop whatever it did not get to speak."""
+        self._states.pop(call_sid, None)
+        for spec in self._calls.pop(call_sid, {}).values():
+            self._drop(spec)
+
+    def stats(self) -> Dict[str, object]:
+        c = self.counters
+        return {
+            **c,
+            "calls": len(self._calls),
+            "hitRate": (c["hits"] / c["spoken"]) if c["spoken"] else None,
+            "wastedRatio": (c["wasted"] / c["synthesized"]) if c["synthesized"] else None,
+        }
@@ -0,0 +1,189 @@
+"""
+In-flight TTS synthesis that can be played while the provider is still sending.
+
+A TTSStream collects the audio chunks of one clip as a provider's blocking
+SDK iterator yields them (in a worker thread) and lets any number of readers
+iterate over the chunks from the start, waiting for the next one as needed.
+The /tts/ route hands a reader to Twilio, so playback starts with the first
+chunk instead of after the whole clip; the complete clip is cached by the
+owner once the provider finishes.
+
+TTSLatencyStats keeps per-provider time-to-first-audio and total synthesis
+time so provider and model choices can be compared on what callers notice.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional
+
+from .metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class TTSStream:
+    """Audio chunks of one clip, readable from the start while they are still arriving."""
+
+    def __init__(self, key: str, audio_format: str = "mp3"):
+        self.key = key
+        self.audio_format = audio_format
+        self.cache_key: Optional[str] = None  # key the finished clip is cached under
+        self.provider: Optional[str] = None
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.started_at = time.monotonic()
+        self.first_chunk_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.task: Optional[asyncio.Future] = None  # producer, kept referenced while it runs
+        self._wakeup = asyncio.Event()
+
+    @classmethod
+    def completed(cls, key: str, audio: bytes, provider: Optional[str] = None,
+                  audio_format: str = "mp3") -> "TTSStream":
+        """A stream over a clip that is already complete (e.g. a cache hit)."""
+        stream = cls(key, audio_format)
+        stream.cache_key = key
+        stream.provider = provider
+        stream.push(audio)
+        stream.finish()
+        return stream
+
+    def _notify(self) -> None:
+        wakeup, self._wakeup = self._wakeup, asyncio.Event()
+        wakeup.set()
+
+    def push(self, chunk: bytes) -> None:
+        """Append a chunk and wake readers."""
+        if not chunk:
+            return
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.monotonic()
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Mark the clip complete (or failed); waiting readers drain and stop."""
+        self.error = error
+        self.done = True
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    async def pump(self, make_chunks: Callable[[], Iterable[bytes]], provider: str) -> bool:
+        """
+        Run a blocking chunk iterator in a worker thread and append its chunks as they arrive.
+
+        Args:
+            make_chunks: Zero-argument callable returning the provider's chunk iterator
+            provider: Provider name recorded on the stream
+
+        Returns:
+            True when the iterator finished after yielding audio; False when it
+            failed or yielded nothing (the error is logged, not raised)
+        """
+        loop = asyncio.get_event_loop()
+        self.provider = provider
+        before = self.size
+        stop = threading.Event()
+
+        def _drain() -> None:
+            for chunk in make_chunks():
+                if stop.is_set():
+                    break
+                if chunk:
+                    # Scheduled in order, and before the executor future resolves
+                    loop.call_soon_threadsafe(self.push, bytes(chunk))
+
+        try:
+            await loop.run_in_executor(None, _drain)
+        except asyncio.CancelledError:
+            stop.set()
+            raise
+        except Exception as e:
+            logger.error(f"{provider} TTS stream failed after {self.size - before} bytes: {e}")
+            return False
+        if self.size == before:
+            logger.error(f"{provider} TTS returned empty response")
+            return False
+        return True
+
+    async def wait_first_chunk(self, timeout: Optional[float] = None) -> bool:
+        """Wait until audio is available; False when the stream failed empty or timed out."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.chunks and not self.done:
+            wakeup = self._wakeup
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return bool(self.chunks)
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Yield every chunk from the start, waiting for new ones until the stream is done."""
+        index = 0
+        while True:
+            if index < len(self.chunks):
+                chunk = self.chunks[index]
+                index += 1
+                yield chunk
+                continue
+            if self.done:
+                return
+            await self._wakeup.wait()
+
+    async def result(self) -> Optional[bytes]:
+        """The complete clip once the stream is done, or None when it failed."""
+        while not self.done:
+            await self._wakeup.wait()
+        if self.error is not None or not self.chunks:
+            return None
+        return b"".join(self.chunks)
+
+    @property
+    def time_to_first_audio(self) -> Optional[float]:
+        return None if self.first_chunk_at is None else self.first_chunk_at - self.started_at
+
+
+class TTSLatencyStats:
+    """Per-provider time-to-first-audio and total synthesis time over the last `window` clips."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._first_audio: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._total: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"streams": 0, "failed": 0, "bytes": 0})
+
+    def record(self, provider: str, ok: bool, first_audio: Optional[float] = None,
+               total: Optional[float] = None, size: int = 0) -> None:
+        """Record one provider attempt; latencies in seconds from the start of the clip's synthesis."""
+        counters = self.counters[provider]
+        counters["streams"] += 1
+        counters["failed"] += int(not ok)
+        counters["bytes"] += size
+        if ok and first_audio is not None:
+            self._first_audio[provider].append(first_audio)
+        if ok and total is not None:
+            self._total[provider].append(total)
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """Latency percentiles (seconds) per provider for dashboards."""
+        out: Dict[str, Dict[str, object]] = {}
+        for provider, counters in self.counters.items():
+            first = list(self._first_audio[provider])
+            total = list(self._total[provider])
+            out[provider] = {
+                **counters,
+                "firstAudioP50": percentile(first, 50),
+                "firstAudioP95": percentile(first, 95),
+                "totalP50": percentile(total, 50),
+                "totalP95": percentile(total, 95),
+            }
+        return out
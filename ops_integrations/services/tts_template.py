@@ -0,0 +1,126 @@
+"""
+Template TTS: personalized prompts spoken from cached phrase segments.
+
+A prompt like "Alright, Dana, the next available is tomorrow at 9:00 AM. Do
+you want this time?" is unique to one caller, so caching it by its text never
+pays off. Split at its variable parts (the caller's name, a slot time), every
+static segment ("the next available is", "Do you want this time?") is the
+same for every caller and is synthesized once; only the short variable
+segments need the provider. The segments' audio is joined frame by frame:
+8 kHz mu-law is headerless, and mp3 joins cleanly at frame boundaries once
+each part's ID3 tags and Xing/Info header frame are dropped.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_MP3_BITRATES_V1_L3 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MP3_BITRATES_V2_L3 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def split_template(text: str, variables: Iterable[str]) -> List[Tuple[str, bool]]:
+    """
+    Cut text into static and variable segments.
+
+    Punctuation right after a variable stays with it ("9:00 AM."), so the
+    static segment that follows starts cleanly.
+
+    Args:
+        text: Full prompt
+        variables: Caller-specific substrings (names, dates, addresses)
+
+    Returns:
+        (segment, is_variable) pairs in speaking order; [(text, False)] when no variable occurs
+    """
+    values = sorted({v.strip() for v in variables if v and v.strip()}, key=len, reverse=True)
+    if not values:
+        return [(text, False)]
+    # Whole words only: a caller named "Al" must not split "Alright"
+    pattern = re.compile(r"(?<!\w)(" + "|".join(re.escape(v) for v in values) + r")(?!\w)([,.!?;:]*)")
+    segments: List[Tuple[str, bool]] = []
+    position = 0
+    for match in pattern.finditer(text):
+        before = text[position:match.start()].strip()
+        if before:
+            segments.append((before, False))
+        segments.append((match.group(0).strip(), True))
+        position = match.end()
+    rest = text[position:].strip()
+    if rest:
+        segments.append((rest, False))
+    return segments or [(text, False)]
+
+
+def _mp3_frame_length(header: bytes) -> Optional[int]:
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if layer != 1 or version == 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        return 144000 * _MP3_BITRATES_V1_L3[bitrate_index] // sample_rate + padding
+    return 72000 * _MP3_BITRATES_V2_L3[bitrate_index] // sample_rate + padding
+
+
+def strip_mp3_container(audio: bytes) -> bytes:
+    """
+    Reduce an mp3 clip to its audio frames.
+
+    Drops a leading ID3v2 tag, a trailing ID3v1 tag and a Xing/Info/VBRI
+    header frame, whose frame count would be wrong for the joined clip.
+    """
+    start, end = 0, len(audio)
+    if audio[:3] == b"ID3" and len(audio) >= 10:
+        size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+        start = 10 + size + (10 if audio[5] & 0x10 else 0)
+    if end - start >= 128 and audio[end - 128:end - 125] == b"TAG":
+        end -= 128
+    frame_length = _mp3_frame_length(audio[start:start + 4])
+    if frame_length:
+        first_frame = audio[start:start + frame_length]
+        if b"Xing" in first_frame[4:48] or b"Info" in first_frame[4:48] or first_frame[36:40] == b"VBRI":
+            start += frame_length
+    return audio[start:end]
+
+
+def join_audio(parts: Sequence[bytes], audio_format: str = "mp3") -> bytes:
+    """Concatenate segment clips into one playable clip ('mp3' or headerless 'mulaw')."""
+    if audio_format == "mp3":
+        return b"".join(strip_mp3_container(part) for part in parts)
+    return b"".join(parts)
+
+
+class TemplateTTSStats:
+    """Cache hits of the static and variable segments of template prompts."""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {
+            "prompts": 0, "static_segments": 0, "static_hits": 0,
+            "variable_segments": 0, "variable_hits": 0, "whole_fallbacks": 0,
+        }
+
+    def record(self, segments: Sequence[Tuple[bool, bool]]) -> None:
+        """
+        Args:
+            segments: (is_variable, was_cached) for each segment of one prompt
+        """
+        self.counters["prompts"] += 1
+        for is_variable, hit in segments:
+            kind = "variable" if is_variable else "static"
+            self.counters[f"{kind}_segments"] += 1
+            if hit:
+                self.counters[f"{kind}_hits"] += 1
+
+    def stats(self) -> Dict[str, object]:
+        c = self.counters
+        return {
+            **c,
+            "staticHitRate": (c["static_hits"] / c["static_segments"]) if c["static_segments"] else None,
+            "variableHitRate": (c["variable_hits"] / c["variable_segments"]) if c["variable_segments"] else None,
+        }
@@ -0,0 +1,49 @@
+"""
+Perceived versus total latency of the bot's turns.
+
+A turn starts when the caller stops speaking. Time to first audible
+response is when the caller first hears something back, which is the filler
+("One moment.") on turns where one was played. Total turn time runs to the
+delivery of the real response. The gap between the two is what filler audio
+hides from the caller.
+"""
+
+from collections import deque
+from typing import Deque, Dict
+
+from .metrics import percentile
+
+
+class TurnLatencyStats:
+    """First-audible and total turn time over the last `window` turns."""
+
+    def __init__(self, window: int = 500):
+        self._first_audible: Deque[float] = deque(maxlen=window)
+        self._total: Deque[float] = deque(maxlen=window)
+        self.counters: Dict[str, int] = {"turns": 0, "filler_turns": 0, "fillers_skipped": 0}
+
+    def record(self, first_audible: float, total: float, filler: bool = False) -> None:
+        """
+        Record one answered turn.
+
+        Args:
+            first_audible: Seconds from end of caller speech to the first audio delivered
+            total: Seconds from end of caller speech to the response being delivered
+            filler: A filler was played before the response
+        """
+        self.counters["turns"] += 1
+        if filler:
+            self.counters["filler_turns"] += 1
+        self._first_audible.append(first_audible)
+        self._total.append(total)
+
+    def stats(self) -> Dict[str, object]:
+        first = list(self._first_audible)
+        total = list(self._total)
+        return {
+            **self.counters,
+            "firstAudibleP50": percentile(first, 50),
+            "firstAudibleP95": percentile(first, 95),
+            "totalP50": percentile(total, 50),
+            "totalP95": percentile(total, 95),
+        }
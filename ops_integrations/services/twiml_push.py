@@ -0,0 +1,193 @@
+"""
+Mid-call TwiML updates: an async Twilio Calls client and a per-call push coalescer.
+
+Twilio applies a Call update by abandoning whatever the call is doing and
+running the new TwiML, so only the most recent response for a call matters.
+TwiMLPushCoalescer keeps at most one pending TwiML per call, sends it as soon
+as the minimum interval since the previous push allows, and drops any
+pending TwiML that a newer one replaces before it was sent. A push already
+on the wire is left to finish: Twilio may have applied it.
+
+TwilioCallUpdater posts the updates over one pooled keep-alive connection
+to api.twilio.com instead of running the synchronous SDK in a thread.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+from .metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class TwilioCallUpdater:
+    """Updates in-progress calls through the Twilio REST API with a shared async HTTP client."""
+
+    def __init__(self, account_sid: str, auth_token: str, base_url: str = "https://api.twilio.com",
+                 timeout: float = 10.0, max_connections: int = 20):
+        self.account_sid = account_sid
+        self._auth = (account_sid, auth_token)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # Pooled connections belong to the event loop that opened them
+        if self._http is None or self._loop is not loop:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=self._auth,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections, keepalive_expiry=60.0),
+            )
+            self._loop = loop
+        return self._http
+
+    async def update(self, call_sid: str, **params: str) -> dict:
+        """
+        POST a Call update, e.g. update(sid, Twiml=xml) or update(sid, Url=url, Method="GET").
+
+        Returns:
+            The updated Call resource
+
+        Raises:
+            httpx.HTTPError: Transport failure or a non-2xx response
+        """
+        path = f"/2010-04-01/Accounts/{self.account_sid}/Calls/{call_sid}.json"
+        response = await self._client().post(path, data=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+class _CallPushState:
+    __slots__ = ("pending", "pending_since", "pending_interval", "waiter", "last_push_at", "last_done_at",
+                 "last_twiml", "task", "changed")
+
+    def __init__(self):
+        self.pending: Optional[str] = None
+        self.pending_since = 0.0
+        self.pending_interval: Optional[float] = None
+        self.waiter: Optional[asyncio.Future] = None
+        self.last_push_at = 0.0
+        self.last_done_at = 0.0  # when the previous push returned, i.e. about when Twilio started it
+        self.last_twiml: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Event()  # set when a newer TwiML (and interval) replaces the pending one
+
+
+class TwiMLPushCoalescer:
+    """Last-write-wins TwiML push scheduler, one flusher task per call."""
+
+    def __init__(self, send: Callable[[str, str], Awaitable[None]], min_interval: float = 1.5, window: int = 500):
+        """
+        Args:
+            send: Delivers one TwiML document to a call
+            min_interval: Minimum seconds between the starts of two pushes to the same call
+            window: Pushes kept for the queue-delay percentiles
+        """
+        self.send = send
+        self.min_interval = min_interval
+        self._calls: Dict[str, _CallPushState] = {}
+        self._delays: Deque[float] = deque(maxlen=window)
+        self.counters = {"submitted": 0, "pushed": 0, "superseded": 0, "duplicates": 0, "failed": 0}
+
+    def submit(self, call_sid: str, twiml: str, min_interval: Optional[float] = None) -> "asyncio.Future[bool]":
+        """
+        Schedule twiml as the call's next update.
+
+        Args:
+            min_interval: Spacing for this TwiML after the previous push completed,
+                instead of the default spacing between push starts (e.g. the
+                length of a short clip it follows, counted from when it started)
+
+        Returns:
+            Future resolving True once it has been pushed, and False if it was
+            not: it is identical to the TwiML already on the call (nothing new
+            starts playing), a newer submit replaced it first, the push failed
+            or the call was forgotten
+        """
+        self.counters["submitted"] += 1
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        state = self._calls.setdefault(call_sid, _CallPushState())
+        if state.pending is None and state.last_twiml == twiml:
+            self.counters["duplicates"] += 1
+            future.set_result(False)
+            return future
+        if state.waiter is not None and not state.waiter.done():
+            self.counters["superseded"] += 1
+            state.waiter.set_result(False)
+        state.pending, state.waiter = twiml, future
+        state.pending_since = time.monotonic()
+        state.pending_interval = min_interval
+        state.changed.set()
+        if state.task is None or state.task.done():
+            state.task = loop.create_task(self._flush(call_sid, state))
+        return future
+
+    async def _flush(self, call_sid: str, state: _CallPushState) -> None:
+        while state.pending is not None:
+            if state.pending_interval is None:
+                wait = state.last_push_at + self.min_interval - time.monotonic()
+            else:
+                wait = state.last_done_at + state.pending_interval - time.monotonic()
+            if wait > 0:
+                state.changed.clear()
+                try:
+                    await asyncio.wait_for(state.changed.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            twiml, waiter = state.pending, state.waiter
+            state.pending, state.waiter = None, None
+            if twiml is None:
+                continue
+            state.last_push_at = time.monotonic()
+            self._delays.append(state.last_push_at - state.pending_since)
+            state.last_twiml = twiml
+            ok = False
+            try:
+                await self.send(call_sid, twiml)
+                self.counters["pushed"] += 1
+                ok = True
+            except Exception as e:
+                logger.error(f"TwiML push to {call_sid} failed: {e}")
+                self.counters["failed"] += 1
+                state.last_twiml = None
+            finally:
+                state.last_done_at = time.monotonic()
+                if waiter is not None and not waiter.done():
+                    waiter.set_result(ok)
+
+    def forget(self, call_sid: str) -> None:
+        """The call has ended: drop its pending TwiML and stop its flusher."""
+        state = self._calls.pop(call_sid, None)
+        if state is None:
+            return
+        if state.waiter is not None and not state.waiter.done():
+            state.waiter.set_result(False)
+        if state.task is not None and not state.task.done():
+            state.task.cancel()
+
+    def stats(self) -> Dict[str, object]:
+        delays = list(self._delays)
+        return {
+            **self.counters,
+            "calls": len(self._calls),
+            "queueDelayP50": percentile(delays, 50),
+            "queueDelayP95": percentile(delays, 95),
+        }
@@ -0,0 +1,177 @@
+"""
+Per-utterance analysis shared by the phone heuristics.
+
+UtteranceAnalysis is built once per transcript: it lowercases, normalizes and
+tokenizes the text and runs one Aho–Corasick pass over every keyword the
+heuristics test for (transfer, goodbye, yes/no, emergency, urgency, noise).
+Heuristics then answer from set lookups on that object instead of each one
+re-lowercasing, re-splitting and substring-scanning the same string.
+
+Intent pattern scores and job-type inference are computed lazily, on first use,
+and memoized on the object. analyze_utterance() also memoizes by text, so code
+paths that still pass plain strings share the same analysis.
+"""
+
+import os
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Tuple, Union
+
+try:
+    from .keyword_automaton import KeywordAutomaton
+except Exception:
+    import sys as _sys
+    _OPS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if _OPS_ROOT not in _sys.path:
+        _sys.path.insert(0, _OPS_ROOT)
+    from services.keyword_automaton import KeywordAutomaton
+
+# Substring keyword groups used by the heuristics in adapters/phone.py
+TRANSFER_KEYWORDS = ("transfer", "transfer me", "dispatcher", "operator", "human", "representative", "agent")
+
+GOODBYE_KEYWORDS = (
+    "thank you for listening", "thank you for watching", "see you next time",
+    "have a good day", "take care", "thanks for your time", "appreciate it",
+    "we're done", "we are done", "all set", "we're good", "we are good",
+)
+
+EMERGENCY_KEYWORDS = (
+    "emergency", "burst pipe", "pipe burst", "water everywhere", "flooding", "sewage", "sewer backup", "gas leak",
+)
+
+URGENCY_EMERGENCY_KEYWORDS = ('emergency', 'burst', 'flooding', 'water everywhere', 'immediately', 'urgent')
+URGENCY_SAME_DAY_KEYWORDS = ('today', 'asap', 'soon', 'quickly', 'urgent')
+URGENCY_FLEX_KEYWORDS = ('tomorrow', 'next week', 'when convenient', 'schedule', 'appointment')
+
+STRICT_YES_KEYWORDS = ("yes", "yeah", "yep", "yup")
+STRICT_POSITIVE_KEYWORDS = (
+    "sure", "okay", "ok", "correct", "right", "absolutely", "definitely", "perfect", "great", "good",
+    "sounds good", "works", "fine",
+)
+STRICT_POSITIVE_PHRASES = (
+    "let's do it", "that works", "that sounds good", "i'll take it", "book it", "schedule it", "go ahead", "do it",
+    "sounds great", "looks good", "works for me", "i'm good", "that's good",
+)
+VOCAL_CONFIRMATIONS = ("uh huh", "mm hmm", "mhm", "for sure", "of course", "you bet")
+
+STRICT_NO_KEYWORDS = ("no", "nope", "nah")
+STRICT_NEGATIVE_KEYWORDS = (
+    "not", "can't", "cannot", "won't", "will not", "don't", "do not", "doesn't", "does not", "unable",
+    "unavailable", "busy", "conflict",
+)
+STRICT_NEGATIVE_PHRASES = (
+    "that doesn't work", "that does not work", "not that time", "not today", "can't make it", "cannot make it",
+    "not available", "busy then", "have other plans", "doesn't work", "does not work", "not good", "not right",
+    "wrong time", "bad time",
+)
+VOCAL_NEGATIONS = ("uh uh", "nuh uh", "mm mm", "not really", "maybe not", "probably not")
+NEGATIVE_EXPRESSIONS = ("i don't think so", "i don't agree", "that's not right", "that's wrong")
+
+NOISE_MARKERS = ("pissedconsumer", "review")
+
+_KEYWORD_GROUPS = (
+    TRANSFER_KEYWORDS, GOODBYE_KEYWORDS, EMERGENCY_KEYWORDS,
+    URGENCY_EMERGENCY_KEYWORDS, URGENCY_SAME_DAY_KEYWORDS, URGENCY_FLEX_KEYWORDS,
+    STRICT_YES_KEYWORDS, STRICT_POSITIVE_KEYWORDS, STRICT_POSITIVE_PHRASES, VOCAL_CONFIRMATIONS,
+    STRICT_NO_KEYWORDS, STRICT_NEGATIVE_KEYWORDS, STRICT_NEGATIVE_PHRASES, VOCAL_NEGATIONS, NEGATIVE_EXPRESSIONS,
+    NOISE_MARKERS,
+)
+_HEURISTIC_AUTOMATON = KeywordAutomaton(keyword for group in _KEYWORD_GROUPS for keyword in group)
+
+
+@dataclass(frozen=True)
+class UtteranceAnalysis:
+    """
+    Normalized views of one transcript plus keyword hits, computed once.
+
+    Attributes:
+        text: Original transcript
+        lower: text.lower()
+        norm: lowercased with whitespace collapsed
+        stripped: norm with leading/trailing whitespace and .,!? removed
+        tokens: stripped.split()
+        token_set: frozenset(tokens)
+        hits: every heuristic keyword occurring in norm (substring semantics)
+    """
+    text: str
+    lower: str
+    norm: str
+    stripped: str
+    tokens: Tuple[str, ...]
+    token_set: FrozenSet[str]
+    hits: FrozenSet[str]
+    _pattern_scores: Dict[int, Dict[str, float]] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_text(cls, text: str) -> "UtteranceAnalysis":
+        text = text or ""
+        lower = text.lower()
+        norm = " ".join(lower.split())
+        stripped = " ".join(lower.strip().strip(".,!?").split())
+        tokens = tuple(stripped.split())
+        # Keywords start and end with a letter, so their hits are the same in
+        # norm and in stripped (which only drops edge punctuation/whitespace)
+        return cls(
+            text=text,
+            lower=lower,
+            norm=norm,
+            stripped=stripped,
+            tokens=tokens,
+            token_set=frozenset(tokens),
+            hits=frozenset(_HEURISTIC_AUTOMATON.find_all(norm)),
+        )
+
+    def has_any(self, keywords: Iterable[str]) -> bool:
+        """True if any of keywords (drawn from the groups above) occurs in the utterance."""
+        return not self.hits.isdisjoint(keywords)
+
+    @cached_property
+    def stripped_analysis(self) -> "UtteranceAnalysis":
+        """Analysis of the edge-stripped text (what is_noise_or_unknown feeds the yes/no checks)."""
+        if self.stripped == self.text:
+            return self
+        return analyze_utterance(self.stripped)
+
+    def pattern_scores(self, intents_data: Any = None) -> Dict[str, float]:
+        """Intent pattern scores from the compiled intent index, computed once per index version."""
+        try:
+            from ..flows.intent_index import get_intent_index
+        except Exception:
+            from flows.intent_index import get_intent_index
+        index = get_intent_index(intents_data)
+        scores = self._pattern_scores.get(index.version)
+        if scores is None:
+            scores = index.score(self.text)
+            # Keep only the current index's scores; a reloaded index makes older ones stale
+            self._pattern_scores.clear()
+            self._pattern_scores[index.version] = scores
+        return scores
+
+    @cached_property
+    def job_types(self) -> dict:
+        """infer_multiple_job_types_from_text() result for this utterance."""
+        try:
+            from .plumbing_services import infer_multiple_job_types_from_text
+        except Exception:
+            from services.plumbing_services import infer_multiple_job_types_from_text
+        return infer_multiple_job_types_from_text(self.text)
+
+
+@lru_cache(maxsize=256)
+def _analyze_text(text: str) -> UtteranceAnalysis:
+    return UtteranceAnalysis.from_text(text)
+
+
+def analyze_utterance(text: Union[str, UtteranceAnalysis, None]) -> UtteranceAnalysis:
+    """
+    Get the shared analysis for a transcript.
+
+    Args:
+        text: Transcript text, or an analysis already built for it
+
+    Returns:
+        UtteranceAnalysis (memoized per distinct text)
+    """
+    if isinstance(text, UtteranceAnalysis):
+        return text
+    return _analyze_text(text or "")
@@ -12,7 +12,7 @@ from typing import Dict, Any, Optional, List
 
 from .client import SquareClient
 from .config import SquareConfig
-from .services import LocationsService, CatalogService, CustomersService, BookingsService
+from .services import LocationsService, CatalogService, CustomersService, BookingsService, get_availability_cache
 from .exceptions import SquareAPIError, SquareBookingError
 
 
@@ -45,6 +45,9 @@ class SalonBookingManager:
         self.catalog = CatalogService(self.client)
         self.customers = CustomersService(self.client)
         self.bookings = BookingsService(self.client)
+        # Availability is shared by every manager in the process and prefetched in the background
+        self.availability_cache = get_availability_cache(self.bookings)
+        self.bookings.availability_cache = self.availability_cache
         
         # Cache commonly used IDs
         self._location_id = None
@@ -114,6 +117,43 @@ class SalonBookingManager:
             logger.error(f"Failed to find service variation ID: {e}")
             return None
     
+    def prefetch_availability(self) -> int:
+        """
+        Start prefetching availability for every bookable service at the main location
+        
+        Returns:
+            Number of service variations now tracked
+        """
+        try:
+            location_id = self.get_location_id()
+            tracked = 0
+            for service in self.catalog.get_bookable_services(location_id):
+                variation_id = self.catalog.get_service_variation_id(service.get("id"))
+                if variation_id:
+                    self.availability_cache.track(location_id, variation_id)
+                    tracked += 1
+            logger.info(f"Prefetching availability for {tracked} service variations")
+            return tracked
+        except Exception as e:
+            logger.error(f"Failed to start availability prefetch: {e}")
+            return 0
+    
+    def handle_booking_webhook(self, payload: Dict[str, Any]) -> bool:
+        """
+        Apply a Square booking webhook (booking.created / booking.updated) to the availability cache
+        
+        Args:
+            payload: Parsed webhook body (verify the signature before calling)
+            
+        Returns:
+            True if the event updated the cache
+        """
+        try:
+            return self.availability_cache.handle_webhook(payload)
+        except Exception as e:
+            logger.error(f"Failed to apply booking webhook: {e}")
+            return False
+    
     def create_booking_from_call(self, customer_info: Dict[str, str], 
                                service_name: str, preferred_time: datetime,
                                notes: Optional[str] = None) -> Dict[str, Any]:
@@ -226,12 +266,16 @@ class SalonBookingManager:
             if (end_search - start_search).total_seconds() < 24 * 3600:
                 end_search = start_search + timedelta(hours=25)
             
-            availabilities = self.bookings.search_availability(
-                location_id=location_id,
-                service_variation_id=service_variation_id,
-                start_at=start_search,
-                end_at=end_search
+            availabilities = self.availability_cache.slots(
+                location_id, service_variation_id, start_search, end_search, limit=5
             )
+            if availabilities is None:
+                availabilities = self.bookings.search_availability(
+                    location_id=location_id,
+                    service_variation_id=service_variation_id,
+                    start_at=start_search,
+                    end_at=end_search
+                )
             
             # Format alternatives for easy use
             alternatives = []
@@ -8,10 +8,13 @@ from .locations import LocationsService
 from .catalog import CatalogService
 from .customers import CustomersService
 from .bookings import BookingsService
+from .availability_cache import AvailabilityCache, get_availability_cache
 
 __all__ = [
     'LocationsService',
     'CatalogService', 
     'CustomersService',
-    'BookingsService'
+    'BookingsService',
+    'AvailabilityCache',
+    'get_availability_cache'
 ]
@@ -0,0 +1,385 @@
+"""
+Square Availability Cache
+
+In-memory availability per (location, service variation), prefetched for the
+next few days so in-call lookups do not wait on /v2/bookings/availability/search.
+
+Slots are stored per UTC day. A background thread refreshes days that are
+missing, older than the TTL, or touched by a booking change, fetching each run
+of consecutive days with a single search (Square needs a window of at least 24
+hours, so one search covers several days as cheaply as one). Lookups answer
+from memory while every day in the range is cached and younger than max_age_sec;
+otherwise the caller falls back to a live search.
+
+Booking webhooks (booking.created / booking.updated, which also covers
+cancellations) and bookings made through BookingsService update the cache:
+slots overlapping a new booking for the same team member are dropped at once,
+and the affected days are queued for a refetch, which restores slots freed by a
+cancellation or a reschedule.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_DAYS = int(os.getenv('SQUARE_AVAILABILITY_PREFETCH_DAYS', '7'))
+REFRESH_TTL_SEC = float(os.getenv('SQUARE_AVAILABILITY_TTL_SEC', '300'))
+MAX_AGE_SEC = float(os.getenv('SQUARE_AVAILABILITY_MAX_AGE_SEC', '900'))
+PREFETCH_INTERVAL_SEC = float(os.getenv('SQUARE_AVAILABILITY_PREFETCH_INTERVAL_SEC', '60'))
+
+# Square rejects availability windows longer than 32 days
+MAX_SEARCH_DAYS = 31
+
+Key = Tuple[str, str]
+
+
+def _utc(value: datetime) -> datetime:
+    """Aware UTC datetime; naive values are taken as UTC, like the API calls that append 'Z'."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _parse(raw: str) -> Optional[datetime]:
+    try:
+        return _utc(datetime.fromisoformat(raw.replace("Z", "+00:00")))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _segments_span(item: Dict[str, Any]) -> Optional[Tuple[datetime, datetime, Set[str]]]:
+    """(start, end, team member ids) of a booking or availability; None without a start."""
+    start = _parse(item.get("start_at", ""))
+    if start is None:
+        return None
+    segments = item.get("appointment_segments") or []
+    minutes = sum(int(seg.get("duration_minutes") or 0) for seg in segments) or 60
+    members = {seg.get("team_member_id") for seg in segments if seg.get("team_member_id")}
+    return start, start + timedelta(minutes=minutes), members
+
+
+@dataclass
+class _Day:
+    slots: List[Tuple[datetime, Dict[str, Any]]]
+    fetched_at: float
+    dirty: bool = False
+
+
+@dataclass
+class _KeyState:
+    days: Dict[date, _Day] = field(default_factory=dict)
+
+
+class AvailabilityCache:
+    """Prefetched availability slots per (location_id, service_variation_id)."""
+
+    def __init__(self, bookings: Any, prefetch_days: int = PREFETCH_DAYS,
+                 ttl_sec: float = REFRESH_TTL_SEC, max_age_sec: float = MAX_AGE_SEC):
+        """
+        Initialize AvailabilityCache
+
+        Args:
+            bookings: BookingsService used for the underlying searches
+            prefetch_days: Days ahead (including today) kept in memory
+            ttl_sec: Age after which the background task refreshes a day
+            max_age_sec: Age after which lookups stop trusting a day
+        """
+        self.bookings = bookings
+        self.prefetch_days = max(1, min(prefetch_days, MAX_SEARCH_DAYS))
+        self.ttl_sec = ttl_sec
+        self.max_age_sec = max_age_sec
+        self._keys: Dict[Key, _KeyState] = {}
+        self._booking_days: Dict[str, Tuple[str, date]] = {}
+        self._invalidated_at: Dict[Tuple[str, date], float] = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"searches": 0, "search_errors": 0, "hits": 0, "misses": 0,
+                         "webhooks": 0, "slots_dropped": 0, "days_invalidated": 0}
+
+    # --- prefetch ---------------------------------------------------------
+
+    def track(self, location_id: str, service_variation_id: str) -> None:
+        """Keep availability for this pair prefetched from now on."""
+        with self._lock:
+            if (location_id, service_variation_id) not in self._keys:
+                self._keys[(location_id, service_variation_id)] = _KeyState()
+                self._wake.set()
+
+    def _days_to_refresh(self, state: _KeyState, days: List[date], now_mono: float) -> List[date]:
+        stale = []
+        for day in days:
+            entry = state.days.get(day)
+            if entry is None or entry.dirty or now_mono - entry.fetched_at >= self.ttl_sec:
+                stale.append(day)
+        return stale
+
+    def prefetch(self, now: Optional[datetime] = None) -> int:
+        """
+        Refresh missing, stale and invalidated days for every tracked pair.
+
+        Returns:
+            Number of availability searches made
+        """
+        now = _utc(now or datetime.utcnow())
+        today = now.date()
+        horizon = [today + timedelta(days=i) for i in range(self.prefetch_days)]
+        searches = 0
+        with self._lock:
+            keys = list(self._keys.items())
+        for (location_id, variation_id), state in keys:
+            with self._lock:
+                # Drop days that have passed
+                for day in [d for d in state.days if d < today]:
+                    del state.days[day]
+                for stamp_key in [k for k in self._invalidated_at if k[1] < today]:
+                    del self._invalidated_at[stamp_key]
+                for booking_id in [b for b, (_, d) in self._booking_days.items() if d < today]:
+                    del self._booking_days[booking_id]
+                stale = self._days_to_refresh(state, horizon, time.monotonic())
+            for run in _consecutive_runs(stale):
+                self._fetch_run(location_id, variation_id, state, run, now)
+                searches += 1
+        return searches
+
+    def _fetch_run(self, location_id: str, variation_id: str, state: _KeyState,
+                   run: List[date], now: datetime) -> None:
+        start = max(_day_start(run[0]), now)
+        end = max(_day_start(run[-1]) + timedelta(days=1), start + timedelta(hours=24))
+        fetched_at = time.monotonic()
+        self.counters["searches"] += 1
+        try:
+            availabilities = self.bookings.search_availability(
+                location_id=location_id,
+                service_variation_id=variation_id,
+                start_at=start.replace(tzinfo=None),
+                end_at=end.replace(tzinfo=None),
+            )
+        except Exception as e:
+            self.counters["search_errors"] += 1
+            logger.warning(f"Availability prefetch failed for {location_id}/{variation_id}: {e}")
+            return
+        by_day: Dict[date, List[Tuple[datetime, Dict[str, Any]]]] = {day: [] for day in run}
+        for availability in availabilities or []:
+            slot = _parse(availability.get("start_at", ""))
+            if slot is not None and slot.date() in by_day:
+                by_day[slot.date()].append((slot, availability))
+        with self._lock:
+            for day, slots in by_day.items():
+                slots.sort(key=lambda pair: pair[0])
+                # A booking change that arrived while the search was in flight keeps the day queued
+                dirty = self._invalidated_at.get((location_id, day), 0.0) >= fetched_at
+                state.days[day] = _Day(slots, fetched_at, dirty)
+
+    # --- lookups ----------------------------------------------------------
+
+    def slots(self, location_id: str, service_variation_id: str, start: datetime, end: datetime,
+              team_member_id: Optional[str] = None, limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached availabilities starting in [start, end), in time order.
+
+        Args:
+            location_id: Square location ID
+            service_variation_id: Service variation ID
+            start: Start of the range
+            end: End of the range
+            team_member_id: Only slots with this team member
+            limit: Stop after this many slots; later days need not be cached
+
+        Returns:
+            The availabilities, or None when part of the range is not cached
+            (the pair is then tracked so the next lookup can be served)
+        """
+        start, end = _utc(start), _utc(end)
+        with self._lock:
+            state = self._keys.get((location_id, service_variation_id))
+            result = None if state is None else self._collect(state, start, end, team_member_id, limit)
+            if result is None:
+                self.counters["misses"] += 1
+            else:
+                self.counters["hits"] += 1
+        if state is None:
+            self.track(location_id, service_variation_id)
+        return result
+
+    def _collect(self, state: _KeyState, start: datetime, end: datetime, team_member_id: Optional[str],
+                 limit: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        now_mono = time.monotonic()
+        found = []
+        day = start.date()
+        while _day_start(day) < end:
+            entry = state.days.get(day)
+            if entry is None or now_mono - entry.fetched_at >= self.max_age_sec:
+                return None
+            for slot, availability in entry.slots:
+                if start <= slot < end and (team_member_id is None or team_member_id in _members(availability)):
+                    found.append(availability)
+                    if limit is not None and len(found) >= limit:
+                        return found
+            day += timedelta(days=1)
+        return found
+
+    def is_available(self, location_id: str, service_variation_id: str, desired_time: datetime,
+                     team_member_id: Optional[str] = None, tolerance_sec: int = 300) -> Optional[bool]:
+        """
+        Whether a slot starts within tolerance_sec of desired_time.
+
+        Returns:
+            True/False from memory, or None when the cache cannot answer
+        """
+        desired = _utc(desired_time)
+        tolerance = timedelta(seconds=tolerance_sec)
+        candidates = self.slots(location_id, service_variation_id, desired - tolerance,
+                                desired + tolerance + timedelta(seconds=1), team_member_id)
+        if candidates is None:
+            return None
+        return len(candidates) > 0
+
+    # --- invalidation -----------------------------------------------------
+
+    def apply_booking(self, booking: Dict[str, Any]) -> None:
+        """
+        Account for a created, updated or cancelled booking.
+
+        Slots of the same team member overlapping an active booking are dropped now;
+        the booking's day and its previous day (for reschedules) are refetched.
+        """
+        span = _segments_span(booking)
+        booking_id = booking.get("id")
+        location_id = booking.get("location_id")
+        if span is None or not location_id:
+            return
+        start, end, members = span
+        active = not str(booking.get("status", "ACCEPTED")).startswith(("CANCELLED", "DECLINED", "NO_SHOW"))
+        with self._lock:
+            affected = {start.date()}
+            if booking_id:
+                previous = self._booking_days.get(booking_id)
+                if previous and previous[0] == location_id:
+                    affected.add(previous[1])
+                self._booking_days[booking_id] = (location_id, start.date())
+            stamp = time.monotonic()
+            for day in affected:
+                self._invalidated_at[(location_id, day)] = stamp
+            for (key_location, _), state in self._keys.items():
+                if key_location != location_id:
+                    continue
+                for day in affected:
+                    entry = state.days.get(day)
+                    if entry is None:
+                        continue
+                    entry.dirty = True
+                    self.counters["days_invalidated"] += 1
+                    if active and day == start.date():
+                        kept = [(slot, item) for slot, item in entry.slots if not _conflicts(item, start, end, members)]
+                        self.counters["slots_dropped"] += len(entry.slots) - len(kept)
+                        entry.slots = kept
+        self._wake.set()
+
+    def handle_webhook(self, payload: Dict[str, Any]) -> bool:
+        """
+        Apply a Square booking webhook (booking.created / booking.updated).
+
+        Returns:
+            True when the event was a booking event the cache used
+        """
+        event_type = str(payload.get("type", ""))
+        if not event_type.startswith("booking."):
+            return False
+        data_object = (payload.get("data") or {}).get("object") or {}
+        booking = data_object.get("booking") or data_object
+        if not booking.get("start_at"):
+            return False
+        self.counters["webhooks"] += 1
+        self.apply_booking(booking)
+        return True
+
+    # --- background refresh -----------------------------------------------
+
+    def start(self, interval_sec: float = PREFETCH_INTERVAL_SEC) -> None:
+        """Prefetch now and every interval_sec (or as soon as something is invalidated) on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval_sec,),
+                                        name="square-availability", daemon=True)
+        self._thread.start()
+
+    def _run(self, interval_sec: float) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.prefetch()
+            except Exception as e:
+                logger.error(f"Availability prefetch loop error: {e}")
+            self._wake.wait(interval_sec)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                "pairs": len(self._keys),
+                "cachedDays": sum(len(state.days) for state in self._keys.values()),
+                "hitRate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+                **self.counters,
+            }
+
+
+def _members(availability: Dict[str, Any]) -> Set[str]:
+    return {seg.get("team_member_id") for seg in availability.get("appointment_segments") or []
+            if seg.get("team_member_id")}
+
+
+def _conflicts(availability: Dict[str, Any], start: datetime, end: datetime, members: Set[str]) -> bool:
+    span = _segments_span(availability)
+    if span is None:
+        return False
+    slot_start, slot_end, slot_members = span
+    if members and slot_members and not (members & slot_members):
+        return False
+    return slot_start < end and slot_end > start
+
+
+def _consecutive_runs(days: List[date]) -> List[List[date]]:
+    runs: List[List[date]] = []
+    for day in sorted(days):
+        if runs and day - runs[-1][-1] == timedelta(days=1) and len(runs[-1]) < MAX_SEARCH_DAYS:
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    return runs
+
+
+_shared_cache: Optional[AvailabilityCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_availability_cache(bookings: Any) -> AvailabilityCache:
+    """
+    Process-wide AvailabilityCache, created with the first BookingsService passed in
+    and prefetching in the background (SQUARE_AVAILABILITY_PREFETCH=false disables the thread).
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                cache = AvailabilityCache(bookings)
+                if os.getenv('SQUARE_AVAILABILITY_PREFETCH', 'true').lower() not in ('0', 'false', 'no', 'off'):
+                    cache.start()
+                _shared_cache = cache
+    return _shared_cache
@@ -7,7 +7,7 @@ booking creation, and management.
 
 import logging
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from ..client import SquareClient
 from ..exceptions import SquareBookingError, SquareValidationError
@@ -27,6 +27,8 @@ class BookingsService:
             client: Square API client instance
         """
         self.client = client
+        # Set by SalonBookingManager; answers availability checks from memory when it can
+        self.availability_cache = None
     
     def search_availability(self, location_id: str, service_variation_id: str,
                           start_at: datetime, end_at: datetime,
@@ -151,6 +153,8 @@ class BookingsService:
             
             booking_id = booking.get("id")
             logger.info(f"Created booking with ID: {booking_id}")
+            if self.availability_cache is not None:
+                self.availability_cache.apply_booking(booking)
             
             return booking
             
@@ -261,6 +265,8 @@ class BookingsService:
                 raise SquareBookingError("Failed to update booking - no booking data returned")
             
             logger.info(f"Updated booking: {booking_id}")
+            if self.availability_cache is not None:
+                self.availability_cache.apply_booking(booking)
             return booking
             
         except Exception as e:
@@ -372,6 +378,13 @@ class BookingsService:
             True if time slot is available, False otherwise
         """
         try:
+            if self.availability_cache is not None:
+                cached = self.availability_cache.is_available(
+                    location_id, service_variation_id, desired_time, team_member_id=team_member_id
+                )
+                if cached is not None:
+                    return cached
+            
             # Search availability in a 1-hour window around desired time
             start_search = desired_time - timedelta(minutes=30)
             end_search = desired_time + timedelta(hours=23, minutes=30)  # Ensure 24+ hour window
@@ -390,7 +403,8 @@ class BookingsService:
                 if start_at_str:
                     available_time = datetime.fromisoformat(start_at_str.replace("Z", "+00:00"))
                     # Allow 5-minute tolerance
-                    time_diff = abs((available_time - desired_time).total_seconds())
+                    desired_utc = desired_time if desired_time.tzinfo else desired_time.replace(tzinfo=timezone.utc)
+                    time_diff = abs((available_time - desired_utc).total_seconds())
                     if time_diff <= 300:  # 5 minutes
                         return True
             
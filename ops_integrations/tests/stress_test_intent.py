@@ -8,7 +8,191 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from adapters.plumbing_services import infer_multiple_job_types_from_text
+from services.plumbing_services import infer_multiple_job_types_from_text
+
+# Multi-Intent Tests (15 scenarios)
+MULTI_INTENT_TESTS = [
+    {
+        "text": "Dishwasher won't drain and kitchen sink is clogged",
+        "description": "Appliance with drain issue",
+        "expected_primary": "dishwasher_hookup",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["clogged_kitchen_sink"]
+    },
+    {
+        "text": "Water heater is leaking and expansion tank needs replacement",
+        "description": "Water heater with component issue",
+        "expected_primary": "water_heater_repair",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["water_heater_expansion"]
+    },
+    {
+        "text": "Sewer line is backed up and need camera inspection",
+        "description": "Sewer with diagnostic",
+        "expected_primary": "main_sewer_backup",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["camera_inspection"]
+    },
+    {
+        "text": "Bathroom faucet is dripping and shower valve broken",
+        "description": "Faucet with valve issue",
+        "expected_primary": "bathroom_faucet_leak",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["shower_valve"]
+    },
+    {
+        "text": "Toilet is running and tank is leaking",
+        "description": "Toilet with multiple issues",
+        "expected_primary": "running_toilet",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["toilet_leak"]
+    },
+    {
+        "text": "Gas line leak and emergency shutoff needed",
+        "description": "Gas safety emergency",
+        "expected_primary": "gas_line_leak",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["emergency_shutoff"]
+    },
+    {
+        "text": "Sump pump failed and basement flooding",
+        "description": "Emergency pump failure",
+        "expected_primary": "sump_pump_repair",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Grease trap needs cleaning and backflow prevention",
+        "description": "Commercial services",
+        "expected_primary": "grease_trap",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["backflow_prevention"]
+    },
+    {
+        "text": "Whole house re-piping and trenchless sewer repair",
+        "description": "Major plumbing project",
+        "expected_primary": "whole_house_re_piping",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["trenchless_sewer"]
+    },
+    {
+        "text": "Water filtration system and ice maker line hookup",
+        "description": "Water treatment with appliance",
+        "expected_primary": "water_filtration",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["ice_maker_line"]
+    },
+    {
+        "text": "Slab leak repair and drain tile installation",
+        "description": "Underground leak with drainage",
+        "expected_primary": "slab_leak_repair",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["drain_tile"]
+    },
+    {
+        "text": "Burst pipe in wall and pipe thawing needed",
+        "description": "Emergency with frozen pipes",
+        "expected_primary": "burst_pipe",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["pipe_thawing"]
+    },
+    {
+        "text": "Kitchen faucet replacement and garbage disposal jammed",
+        "description": "Faucet with disposal issue",
+        "expected_primary": "kitchen_faucet_replacement",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["garbage_disposal"]
+    },
+    {
+        "text": "Pressure reducing valve and water softener system",
+        "description": "Pressure and treatment services",
+        "expected_primary": "pressure_reducing_valve",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["water_softener"]
+    },
+    {
+        "text": "Tankless water heater installation and expansion tank",
+        "description": "Water heater with component",
+        "expected_primary": "tankless_water_heater",
+        "expected_secondary_count": 1,
+        "expected_secondary": ["water_heater_expansion"]
+    }
+]
+
+# Single Intent Tests (10 scenarios)
+SINGLE_INTENT_TESTS = [
+    {
+        "text": "Outdoor spigot is frozen",
+        "description": "Outdoor faucet freezing",
+        "expected_primary": "hose_bib",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Shower mixing valve replacement needed",
+        "description": "Shower valve replacement",
+        "expected_primary": "shower_valve",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Dishwasher drainage problem",
+        "description": "Dishwasher drainage",
+        "expected_primary": "dishwasher_hookup",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Water pressure extremely low",
+        "description": "Water pressure issue",
+        "expected_primary": "water_pressure_adjustment",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Sewage ejector pump not working",
+        "description": "Ejector pump failure",
+        "expected_primary": "sewage_ejector",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "New bathtub installation needed",
+        "description": "Bathtub installation",
+        "expected_primary": "bathtub_install",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Well pump making strange noises",
+        "description": "Well system issues",
+        "expected_primary": "well_pump",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Commercial restroom needs new fixtures",
+        "description": "Commercial restroom work",
+        "expected_primary": "commercial_restroom",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Hydrostatic pressure test needed",
+        "description": "Construction pressure testing",
+        "expected_primary": "hydrostatic_test",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    },
+    {
+        "text": "Main water line needs replacement",
+        "description": "Main water line work",
+        "expected_primary": "water_line",
+        "expected_secondary_count": 0,
+        "expected_secondary": []
+    }
+]
+
 
 def run_random_stress_test():
     """Run random stress test with new challenging scenarios."""
@@ -18,195 +202,13 @@ def run_random_stress_test():
     print("15 multi-intent scenarios (max 1 secondary) | 10 single intent scenarios")
     print("=" * 70)
 
-    # Multi-Intent Tests (15 scenarios)
-    multi_intent_tests = [
-        {
-            "text": "Dishwasher won't drain and kitchen sink is clogged",
-            "description": "Appliance with drain issue",
-            "expected_primary": "dishwasher_hookup",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["clogged_kitchen_sink"]
-        },
-        {
-            "text": "Water heater is leaking and expansion tank needs replacement",
-            "description": "Water heater with component issue",
-            "expected_primary": "water_heater_repair",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["water_heater_expansion"]
-        },
-        {
-            "text": "Sewer line is backed up and need camera inspection",
-            "description": "Sewer with diagnostic",
-            "expected_primary": "main_sewer_backup",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["camera_inspection"]
-        },
-        {
-            "text": "Bathroom faucet is dripping and shower valve broken",
-            "description": "Faucet with valve issue",
-            "expected_primary": "bathroom_faucet_leak",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["shower_valve"]
-        },
-        {
-            "text": "Toilet is running and tank is leaking",
-            "description": "Toilet with multiple issues",
-            "expected_primary": "running_toilet",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["toilet_leak"]
-        },
-        {
-            "text": "Gas line leak and emergency shutoff needed",
-            "description": "Gas safety emergency",
-            "expected_primary": "gas_line_leak",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["emergency_shutoff"]
-        },
-        {
-            "text": "Sump pump failed and basement flooding",
-            "description": "Emergency pump failure",
-            "expected_primary": "sump_pump_repair",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Grease trap needs cleaning and backflow prevention",
-            "description": "Commercial services",
-            "expected_primary": "grease_trap",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["backflow_prevention"]
-        },
-        {
-            "text": "Whole house re-piping and trenchless sewer repair",
-            "description": "Major plumbing project",
-            "expected_primary": "whole_house_re_piping",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["trenchless_sewer"]
-        },
-        {
-            "text": "Water filtration system and ice maker line hookup",
-            "description": "Water treatment with appliance",
-            "expected_primary": "water_filtration",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["ice_maker_line"]
-        },
-        {
-            "text": "Slab leak repair and drain tile installation",
-            "description": "Underground leak with drainage",
-            "expected_primary": "slab_leak_repair",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["drain_tile"]
-        },
-        {
-            "text": "Burst pipe in wall and pipe thawing needed",
-            "description": "Emergency with frozen pipes",
-            "expected_primary": "burst_pipe",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["pipe_thawing"]
-        },
-        {
-            "text": "Kitchen faucet replacement and garbage disposal jammed",
-            "description": "Faucet with disposal issue",
-            "expected_primary": "kitchen_faucet_replacement",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["garbage_disposal"]
-        },
-        {
-            "text": "Pressure reducing valve and water softener system",
-            "description": "Pressure and treatment services",
-            "expected_primary": "pressure_reducing_valve",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["water_softener"]
-        },
-        {
-            "text": "Tankless water heater installation and expansion tank",
-            "description": "Water heater with component",
-            "expected_primary": "tankless_water_heater",
-            "expected_secondary_count": 1,
-            "expected_secondary": ["water_heater_expansion"]
-        }
-    ]
-
-    # Single Intent Tests (10 scenarios)
-    single_intent_tests = [
-        {
-            "text": "Outdoor spigot is frozen",
-            "description": "Outdoor faucet freezing",
-            "expected_primary": "hose_bib",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Shower mixing valve replacement needed",
-            "description": "Shower valve replacement",
-            "expected_primary": "shower_valve",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Dishwasher drainage problem",
-            "description": "Dishwasher drainage",
-            "expected_primary": "dishwasher_hookup",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Water pressure extremely low",
-            "description": "Water pressure issue",
-            "expected_primary": "water_pressure_adjustment",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Sewage ejector pump not working",
-            "description": "Ejector pump failure",
-            "expected_primary": "sewage_ejector",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "New bathtub installation needed",
-            "description": "Bathtub installation",
-            "expected_primary": "bathtub_install",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Well pump making strange noises",
-            "description": "Well system issues",
-            "expected_primary": "well_pump",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Commercial restroom needs new fixtures",
-            "description": "Commercial restroom work",
-            "expected_primary": "commercial_restroom",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Hydrostatic pressure test needed",
-            "description": "Construction pressure testing",
-            "expected_primary": "hydrostatic_test",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        },
-        {
-            "text": "Main water line needs replacement",
-            "description": "Main water line work",
-            "expected_primary": "water_line",
-            "expected_secondary_count": 0,
-            "expected_secondary": []
-        }
-    ]
 
     # Run Multi-Intent Tests
     print("\n🧪 MULTI-INTENT TESTS (15 RANDOM scenarios)")
     print("-" * 50)
     
     multi_passed = 0
-    for i, test in enumerate(multi_intent_tests, 1):
+    for i, test in enumerate(MULTI_INTENT_TESTS, 1):
         result = infer_multiple_job_types_from_text(test["text"])
         
         primary_match = result['primary'] == test['expected_primary']
@@ -258,7 +260,7 @@ def run_random_stress_test():
     print("-" * 50)
     
     single_passed = 0
-    for i, test in enumerate(single_intent_tests, 1):
+    for i, test in enumerate(SINGLE_INTENT_TESTS, 1):
         result = infer_multiple_job_types_from_text(test["text"])
         
         primary_match = result['primary'] == test['expected_primary']
@@ -0,0 +1,124 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from ops_integrations.services import availability_engine
+from ops_integrations.services.availability_engine import (
+    AvailabilityMatrix,
+    Technician,
+    SlotAssignment,
+    first_free_assignment,
+    get_technicians,
+)
+from ops_integrations.services.slot_engine import BusyIndex, ceil_to_step
+from ops_integrations.tests.test_slot_engine import CountingCalendar, random_calendar
+
+ALICE = Technician("alice", "alice@example.com")
+BOB = Technician("bob", "bob@example.com")
+
+
+def matrix_for(calendars, start, horizon_end, duration=120, buffer=60):
+    techs = [Technician(f"t{i}") for i in range(len(calendars))]
+    return AvailabilityMatrix.fetch(techs, calendars, start - timedelta(minutes=buffer),
+                                    horizon_end + timedelta(minutes=duration + buffer))
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_matches_busy_index_per_technician(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(availability_engine, "NUMPY_AVAILABLE", use_numpy)
+    rng = random.Random(39)
+    base = datetime(2025, 9, 10, 8, 0)
+    for _ in range(40):
+        calendars = [CountingCalendar(random_calendar(rng, base)) for _ in range(rng.randint(1, 4))]
+        start = base + timedelta(minutes=15 * rng.randint(0, 16))
+        horizon_end = start + timedelta(hours=12)
+        duration, buffer = rng.choice([(120, 60), (60, 30), (90, 15)])
+        matrix = matrix_for(calendars, start, horizon_end, duration, buffer)
+        assert all(cal.requests == 1 for cal in calendars)
+
+        expected = []
+        for row, cal in enumerate(calendars):
+            index = BusyIndex.from_events(cal.get_events(start - timedelta(hours=6), horizon_end + timedelta(hours=6)))
+            expected += [(slot, row) for slot in index.find_free_slots(start, horizon_end, duration, buffer, count=3)]
+        expected = [(slot, f"t{row}") for slot, row in sorted(expected)[:3]]
+        got = [(a.start, a.technician.name) for a in matrix.earliest(start, horizon_end, duration, buffer, count=3)]
+        assert got == expected
+
+
+def test_feasible_starts_is_a_window_convolution():
+    np = pytest.importorskip("numpy")
+    t0 = datetime(2025, 9, 10, 8, 0)
+    matrix = AvailabilityMatrix([ALICE, BOB], t0, 16, [[(t0 + timedelta(minutes=62), t0 + timedelta(minutes=72))], []])
+    # 10 minutes inside bucket 4 mark exactly that bucket
+    assert np.flatnonzero(matrix.busy[0]).tolist() == [4]
+    feasible = matrix.feasible_starts(duration_minutes=30, buffer_minutes=15)
+    # Window [c - 1, c + 3) must be free and inside the 16 buckets
+    assert np.flatnonzero(feasible[0]).tolist() == [1, 6, 7, 8, 9, 10, 11, 12, 13]
+    assert np.flatnonzero(feasible[1]).tolist() == list(range(1, 14))
+
+
+def test_earliest_pairs_span_technicians():
+    t0 = datetime(2025, 9, 10, 9, 0)
+    alice = CountingCalendar([(t0, t0 + timedelta(hours=4))])
+    bob = CountingCalendar([(t0 + timedelta(hours=1), t0 + timedelta(hours=2))])
+    matrix = AvailabilityMatrix.fetch([ALICE, BOB], [alice, bob], t0 - timedelta(hours=1), t0 + timedelta(hours=12))
+    pairs = [(a.technician.name, a.start) for a in matrix.earliest(t0, t0 + timedelta(hours=8), count=3)]
+    assert pairs == [("bob", t0 + timedelta(hours=3)), ("alice", t0 + timedelta(hours=5)),
+                     ("bob", t0 + timedelta(hours=5))]
+
+
+def test_first_free_assignment_skips_busy_calendars():
+    t0 = datetime(2025, 9, 10, 9, 0)
+    alice = CountingCalendar([(t0 + timedelta(hours=2), t0 + timedelta(hours=3))])
+    bob = CountingCalendar([])
+    assert first_free_assignment([ALICE, BOB], [alice, bob], t0) == SlotAssignment(BOB, t0)
+    assert first_free_assignment([ALICE, BOB], [alice, bob], t0 + timedelta(hours=5)) == \
+        SlotAssignment(ALICE, t0 + timedelta(hours=5))
+    # An off-grid request is checked, and booked, at the next quarter hour
+    assert first_free_assignment([ALICE, BOB], [alice, bob], t0 + timedelta(hours=4, minutes=50)) == \
+        SlotAssignment(ALICE, t0 + timedelta(hours=5))
+    bob._busy.append((t0, t0 + timedelta(minutes=30)))
+    assert first_free_assignment([ALICE, BOB], [alice, bob], t0) is None
+
+
+def test_phone_search_assigns_across_technicians(monkeypatch, tmp_path):
+    from ops_integrations.adapters import phone as phone_mod
+    base = ceil_to_step(datetime.now() + timedelta(days=1))
+    calendars = {
+        None: CountingCalendar([(base - timedelta(hours=1), base + timedelta(hours=6))]),
+        "bob@example.com": CountingCalendar([]),
+    }
+    path = tmp_path / "technicians.json"
+    path.write_text(json.dumps({"technicians": [{"name": "primary", "calendar_id": None},
+                                                {"name": "bob", "calendar_id": "bob@example.com"}]}))
+    monkeypatch.setattr(phone_mod, "get_technicians", lambda: get_technicians(str(path)))
+    monkeypatch.setattr(phone_mod, "get_calendar_adapter", lambda calendar_id=None: calendars[calendar_id])
+
+    assignments = phone_mod.find_compliant_assignments(base, count=2)
+    assert [(a.technician.name, a.start) for a in assignments] == [("bob", base), ("bob", base + timedelta(hours=2))]
+    assert all(cal.requests == 1 for cal in calendars.values())
+    assert phone_mod.find_next_compliant_slot(base) == base
+
+
+def test_phone_slots_are_distinct_when_technicians_share_starts(monkeypatch, tmp_path):
+    from ops_integrations.adapters import phone as phone_mod
+    base = ceil_to_step(datetime.now() + timedelta(days=1))
+    calendars = {None: CountingCalendar([]), "bob@example.com": CountingCalendar([])}
+    path = tmp_path / "technicians.json"
+    path.write_text(json.dumps({"technicians": [{"name": "primary", "calendar_id": None},
+                                                {"name": "bob", "calendar_id": "bob@example.com"}]}))
+    monkeypatch.setattr(phone_mod, "get_technicians", lambda: get_technicians(str(path)))
+    monkeypatch.setattr(phone_mod, "get_calendar_adapter", lambda calendar_id=None: calendars[calendar_id])
+
+    # Both technicians are free at every start; still three different times are offered
+    assert phone_mod.find_compliant_slots(base, count=3) == [base + timedelta(hours=2 * i) for i in range(3)]
+
+
+def test_missing_technicians_file_falls_back_to_default_calendar(tmp_path):
+    technicians = get_technicians(str(tmp_path / "missing.json"))
+    assert technicians == [Technician("primary", None)]
+    assert get_technicians() == [Technician("primary", None)]
@@ -0,0 +1,179 @@
+import asyncio
+import base64
+import json
+import math
+import struct
+
+import pytest
+from twilio.twiml.voice_response import VoiceResponse
+
+from ops_integrations.services.barge_in import BargeInDetector, pcm16_rms
+from ops_integrations.services.media_playback import PCMToMulaw
+from ops_integrations.services.speech_gate import SpeechGateStats
+from ops_integrations.services.tts_cache import TTSAudioCache
+
+FRAME = 320  # 20 ms of 8 kHz PCM16
+
+
+def tone(amplitude, frames=1):
+    samples = frames * FRAME // 2
+    return b"".join(struct.pack("<h", int(amplitude * math.sin(i * 2 * math.pi * 300 / 8000))) for i in range(samples))
+
+
+def loud_enough(frame):
+    return pcm16_rms(frame) > 50  # stand-in VAD: anything above line noise is "speech"
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+async def background_tasks_finish(timeout=3.0):
+    """Wait for the turn's background tasks (stream playback, speech gate timers); True if all ended."""
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    if not tasks:
+        return True
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    return not pending
+
+
+def test_sustained_speech_over_quiet_playback_triggers_with_preroll():
+    detector = BargeInDetector(loud_enough, sustain_ms=100, preroll_ms=40)
+    assert not detector.feed(b"\x00" * FRAME * 3, echo_level=0.0)
+    results = [detector.feed(tone(3000), echo_level=0.0) for _ in range(5)]
+    assert results == [False, False, False, False, True]
+    # Five voiced frames plus two frames of preroll
+    assert len(detector.captured()) == FRAME * 7
+
+
+def test_echo_level_raises_the_bar_and_short_bursts_do_not_count():
+    detector = BargeInDetector(loud_enough, sustain_ms=100, max_gap_ms=20)
+    # Bot playing at RMS ~5600: its echo at a quarter of that is not the caller
+    assert not any(detector.feed(tone(2000), echo_level=5600) for _ in range(20))
+    assert detector.echo_rejected == 20
+    # Bursts separated by silence never add up to a sustained run
+    for _ in range(5):
+        assert not detector.feed(tone(3000, frames=3) + b"\x00" * FRAME * 2, echo_level=0.0)
+    assert detector.feed(tone(8000, frames=5), echo_level=5600)
+
+
+class FakeVad:
+    def is_speech(self, frame, sample_rate):
+        return loud_enough(frame)
+
+
+class StreamSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    def events(self, name):
+        return [m for m in self.sent if m["event"] == name]
+
+
+@pytest.fixture
+def phone(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=1024 * 1024))
+    monkeypatch.setattr(phone_mod, "speech_gate_stats", SpeechGateStats())
+    monkeypatch.setattr(phone_mod, "barge_in_stats", {"barge_ins": 0, "echo_rejected_frames": 0})
+    monkeypatch.setattr(phone_mod, "media_playback_stats", {"turns": 0, "fallbacks": 0})
+    monkeypatch.setattr(phone_mod.settings, "MEDIA_STREAM_PLAYBACK", True)
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    monkeypatch.setattr(phone_mod.settings, "FORCE_SAY_ONLY", False)
+    # Two seconds of the bot speaking at RMS ~5600
+    bot_audio = PCMToMulaw(8000).feed(tone(8000, frames=100))
+    monkeypatch.setattr(phone_mod, "_tts_mulaw_chunks", lambda *args: iter([bot_audio]))
+    monkeypatch.setattr(phone_mod, "_tts_chunks", lambda *args: iter([b"mp3"]))
+    pushed = []
+
+    async def fake_rest_push(call_sid, response):
+        pushed.append(str(response))
+        return True
+
+    monkeypatch.setattr(phone_mod, "_push_twiml_rest", fake_rest_push)
+    yield phone_mod, pushed
+    phone_mod.manager.active_connections.pop("CA_BARGE", None)
+    phone_mod._close_media_player("CA_BARGE")
+    for store in (phone_mod.vad_states, phone_mod.audio_buffers, phone_mod.pending_gate_clips,
+                  phone_mod.tts_audio_store, phone_mod.tts_version_counter):
+        store.pop("CA_BARGE", None)
+
+
+async def _start_prompt(phone_mod, socket):
+    phone_mod.manager.active_connections["CA_BARGE"] = socket
+    await phone_mod.handle_media_packet("CA_BARGE", json.dumps({"event": "start", "streamSid": "MZ_BARGE"}))
+    phone_mod.vad_states["CA_BARGE"]["vad"] = FakeVad()
+    phone_mod.vad_states["CA_BARGE"]["has_processed_first_speech"] = True
+    twiml = VoiceResponse()
+    await phone_mod.add_tts_or_say_to_twiml(twiml, "CA_BARGE", "Your appointment is confirmed for tomorrow at nine.")
+    phone_mod.append_stream_resume(twiml, "CA_BARGE")
+    await phone_mod.push_twiml_to_call("CA_BARGE", twiml)
+    await asyncio.sleep(0.2)  # playback under way
+
+
+async def _caller_says(phone_mod, pcm):
+    for start in range(0, len(pcm), FRAME):
+        payload = base64.b64encode(PCMToMulaw(8000).feed(pcm[start:start + FRAME])).decode()
+        await phone_mod.handle_media_packet("CA_BARGE", json.dumps({"event": "media", "media": {"payload": payload}}))
+        await asyncio.sleep(0.02)
+
+
+def test_caller_talking_over_the_prompt_clears_playback_and_is_heard(phone):
+    phone_mod, pushed = phone
+    socket = StreamSocket()
+
+    async def scenario():
+        await _start_prompt(phone_mod, socket)
+        assert phone_mod.vad_states["CA_BARGE"]["speech_gate_active"]
+        await _caller_says(phone_mod, tone(12000, frames=15))
+        await asyncio.sleep(0.1)
+        state = phone_mod.vad_states["CA_BARGE"]
+        # The cleared prompt's playback has already ended
+        assert await background_tasks_finish(timeout=0.5)
+        return state["speech_gate_active"], state["is_speaking"], len(state["pending_audio"])
+
+    gate_active, caller_speaking, pending = run(scenario())
+    assert socket.events("clear") and not socket.events("mark")
+    assert len(socket.events("media")) < 30  # well short of the 100-frame prompt
+    assert not gate_active
+    # The interruption (and what followed) is in the normal VAD pipeline
+    assert caller_speaking and pending >= FRAME * 12
+    assert pushed == [] and phone_mod.media_playback_stats["fallbacks"] == 0
+    assert phone_mod._compute_ops_snapshot()["bargeIn"]["barge_ins"] == 1
+
+
+def test_echo_of_the_prompt_does_not_interrupt_it(phone):
+    phone_mod, _ = phone
+    socket = StreamSocket()
+
+    async def scenario():
+        await _start_prompt(phone_mod, socket)
+        await _caller_says(phone_mod, tone(2000, frames=15))  # the bot's voice leaking back, ~-12 dB
+        gate_active = phone_mod.vad_states["CA_BARGE"]["speech_gate_active"]
+        # The whole prompt plays out; Twilio acknowledges its mark and the gate reopens
+        player = phone_mod.media_players["CA_BARGE"]
+        for _ in range(100):
+            if socket.events("mark"):
+                break
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(player.remaining())
+        mark = socket.events("mark")[0]["mark"]["name"]
+        await phone_mod.handle_media_packet("CA_BARGE", json.dumps({"event": "mark", "mark": {"name": mark}}))
+        assert await background_tasks_finish()
+        return gate_active, phone_mod.vad_states["CA_BARGE"]["speech_gate_active"]
+
+    assert run(scenario()) == (True, False)
+    assert len(socket.events("media")) == 100
+    assert socket.events("clear") == []
+    assert phone_mod.barge_in_stats["barge_ins"] == 0
+    assert phone_mod.barge_in_stats["echo_rejected_frames"] >= 10
@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from ops_integrations.adapters.external_services import google_calendar
+from ops_integrations.adapters.external_services.google_calendar import CalendarAdapter, CalendarEventMirror
+
+
+def make_event(event_id, start, hours=1, status="confirmed"):
+    return {
+        "id": event_id,
+        "status": status,
+        "start": {"dateTime": start.isoformat() + "Z"},
+        "end": {"dateTime": (start + timedelta(hours=hours)).isoformat() + "Z"},
+    }
+
+
+class FakeRequest:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return self.fn()
+
+
+class FakeEvents:
+    """events() resource of the Calendar API with sync tokens and 2-item pages."""
+
+    def __init__(self, events):
+        self.events = {ev["id"]: ev for ev in events}
+        self.changes = []
+        self.calls = []
+        self.expired_tokens = set()
+        self.version = 0
+
+    def _token(self):
+        return f"sync-{self.version}"
+
+    def change(self, event):
+        self.events[event["id"]] = event
+        self.changes.append(event)
+        self.version += 1
+
+    def list(self, **params):
+        self.calls.append(params)
+
+        def run():
+            token = params.get("syncToken")
+            if token in self.expired_tokens:
+                raise HttpError(httplib2.Response({"status": 410}), b"Gone")
+            if token:
+                since = int(token.split("-")[1])
+                items = self.changes[since:]
+            elif "timeMax" in params:
+                lo = datetime.fromisoformat(params["timeMin"].rstrip("Z"))
+                hi = datetime.fromisoformat(params["timeMax"].rstrip("Z"))
+                items = [ev for ev in self.events.values() if ev["status"] != "cancelled"
+                         and ev["start"]["dateTime"] < hi.isoformat() + "Z"
+                         and ev["end"]["dateTime"] > lo.isoformat() + "Z"]
+                return {"items": items}
+            else:
+                items = [ev for ev in self.events.values() if ev["status"] != "cancelled"]
+            offset = int(params.get("pageToken") or 0)
+            page = {"items": items[offset:offset + 2]}
+            if offset + 2 < len(items):
+                page["nextPageToken"] = str(offset + 2)
+            else:
+                page["nextSyncToken"] = self._token()
+            return page
+        return FakeRequest(run)
+
+    def insert(self, calendarId, body):
+        return FakeRequest(lambda: {**body, "id": "new", "status": "confirmed"})
+
+
+class FakeService:
+    def __init__(self, events):
+        self._events = FakeEvents(events)
+
+    def events(self):
+        return self._events
+
+
+@pytest.fixture
+def adapter(monkeypatch, tmp_path):
+    monkeypatch.setenv("GOOGLE_CREDENTIALS_PATH", str(tmp_path / "missing.json"))
+    monkeypatch.setenv("GOOGLE_TOKEN_PATH", str(tmp_path / "missing-token.json"))
+    cal = CalendarAdapter()
+    assert not cal.enabled
+    base = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    cal.service = FakeService([make_event(f"e{i}", base + timedelta(hours=3 * i)) for i in range(5)])
+    cal.enabled = True
+    cal.base = base
+    return cal
+
+
+def test_get_events_served_from_mirror_after_sync(adapter):
+    fake = adapter.service.events()
+    adapter.mirror = CalendarEventMirror(adapter)
+    assert adapter.mirror.refresh()
+    # Five events in 2-item pages
+    assert len(fake.calls) == 3 and "timeMin" in fake.calls[0]
+    fake.calls.clear()
+
+    base = adapter.base
+    events = adapter.get_events(start_date=base + timedelta(hours=2), end_date=base + timedelta(hours=7))
+    assert [ev["id"] for ev in events] == ["e1", "e2"]
+    assert fake.calls == []
+    assert adapter.get_events(start_date=base, end_date=base + timedelta(days=1), max_results=2) == \
+        [fake.events["e0"], fake.events["e1"]]
+    assert fake.calls == []
+    assert adapter.mirror.stats()["hits"] == 2
+
+
+def test_incremental_sync_applies_changes_and_deletions(adapter):
+    fake = adapter.service.events()
+    mirror = CalendarEventMirror(adapter)
+    adapter.mirror = mirror
+    mirror.refresh()
+    base = adapter.base
+    fake.change(make_event("e1", base + timedelta(hours=3), status="cancelled"))
+    fake.change(make_event("e9", base + timedelta(hours=1)))
+    fake.calls.clear()
+
+    assert mirror.refresh()
+    assert fake.calls == [{"calendarId": "primary", "singleEvents": True, "maxResults": 2500, "syncToken": "sync-0"}]
+    ids = [ev["id"] for ev in adapter.get_events(start_date=base, end_date=base + timedelta(hours=7))]
+    assert ids == ["e0", "e9", "e2"]
+    assert mirror.counters["full_syncs"] == 1 and mirror.counters["incremental_syncs"] == 1
+
+
+def test_expired_sync_token_triggers_full_resync(adapter):
+    fake = adapter.service.events()
+    mirror = CalendarEventMirror(adapter)
+    mirror.refresh()
+    fake.expired_tokens.add("sync-0")
+    fake.change(make_event("e0", adapter.base, status="cancelled"))
+    assert mirror.refresh()
+    assert mirror.counters["token_resets"] == 1 and mirror.counters["full_syncs"] == 2
+    assert mirror.stats()["events"] == 4
+
+
+def test_stale_or_uncovered_ranges_fall_back_to_api(adapter):
+    fake = adapter.service.events()
+    adapter.mirror = CalendarEventMirror(adapter, ttl_sec=0)
+    adapter.mirror.refresh()
+    fake.calls.clear()
+    adapter.get_events(start_date=adapter.base, end_date=adapter.base + timedelta(hours=4))
+    assert len(fake.calls) == 1 and "timeMax" in fake.calls[0]
+
+    adapter.mirror.ttl_sec = 300
+    fake.calls.clear()
+    adapter.get_events(start_date=adapter.base - timedelta(days=30), end_date=adapter.base)
+    assert len(fake.calls) == 1
+
+
+def test_created_events_are_written_through(adapter):
+    adapter.mirror = CalendarEventMirror(adapter)
+    adapter.mirror.refresh()
+    start = adapter.base + timedelta(hours=1)
+    adapter.create_event("Leak repair", start, start + timedelta(hours=1))
+    ids = [ev["id"] for ev in adapter.get_events(start_date=adapter.base, end_date=adapter.base + timedelta(hours=4))]
+    assert ids == ["e0", "new", "e1"]
+
+
+def test_shared_adapter_is_built_once(monkeypatch):
+    built = []
+
+    class CountingAdapter:
+        def __init__(self, calendar_id=None):
+            built.append(self)
+            self.enabled = False
+            self.mirror = None
+
+        def enable_mirror(self):
+            return None
+
+    monkeypatch.setattr(google_calendar, "CalendarAdapter", CountingAdapter)
+    monkeypatch.setattr(google_calendar, "_shared_adapters", {})
+    first = google_calendar.get_calendar_adapter()
+    assert google_calendar.get_calendar_adapter() is first
+    assert len(built) == 1
+    assert google_calendar.get_calendar_adapter("tech-2@example.com") is not first
+    assert len(built) == 2
+    assert google_calendar.calendar_mirror_stats() == {"enabled": False}
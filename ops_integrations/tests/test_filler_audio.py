@@ -0,0 +1,184 @@
+import asyncio
+import json
+import time
+
+import pytest
+from twilio.twiml.voice_response import VoiceResponse
+
+from ops_integrations.services.speech_gate import SpeechGateStats
+from ops_integrations.services.tts_cache import TTSAudioCache
+from ops_integrations.services.turn_latency import TurnLatencyStats
+from ops_integrations.services.twiml_push import TwiMLPushCoalescer
+
+# 20 frames of 128 kbps / 44.1 kHz MPEG-1 Layer III: ~0.52 s
+FILLER_MP3 = (bytes.fromhex("FFFB9064") + b"\x00" * 413) * 20
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def phone(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=1024 * 1024))
+    monkeypatch.setattr(phone_mod, "turn_latency_stats", TurnLatencyStats())
+    monkeypatch.setattr(phone_mod, "speech_gate_stats", SpeechGateStats())
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    monkeypatch.setattr(phone_mod.settings, "FORCE_SAY_ONLY", False)
+    monkeypatch.setattr(phone_mod.settings, "MEDIA_STREAM_PLAYBACK", False)
+    monkeypatch.setattr(phone_mod.settings, "FILLER_AUDIO_ENABLED", True)
+    monkeypatch.setattr(phone_mod.settings, "FILLER_DELAY_SEC", 0.2)
+    monkeypatch.setattr(phone_mod.settings, "SPEECH_GATE_BUFFER_SEC", 0.2)
+    monkeypatch.setattr(phone_mod.settings, "EXTERNAL_WEBHOOK_URL", "https://example.com")
+    synthesized = []
+
+    def fake_mp3(text, provider, voice, model, speed):
+        synthesized.append(text)
+        yield FILLER_MP3 if text in phone_mod.FILLER_PROMPTS else b"mp3:" + text.encode()
+
+    monkeypatch.setattr(phone_mod, "_tts_chunks", fake_mp3)
+    pushes = []
+
+    async def record_push(call_sid, twiml):
+        pushes.append((time.monotonic(), twiml))
+
+    monkeypatch.setattr(phone_mod, "twiml_pusher", TwiMLPushCoalescer(record_push, min_interval=1.5))
+    phone_mod.call_dialog_state["CA_FILL"] = {"step": "awaiting_time", "intent": {}}
+    yield phone_mod, synthesized, pushes
+    for store in (phone_mod.call_dialog_state, phone_mod.call_info_store, phone_mod.turn_timings,
+                  phone_mod.vad_states, phone_mod.pending_gate_clips, phone_mod.last_twiml_store,
+                  phone_mod.tts_audio_store, phone_mod.tts_version_counter):
+        store.pop("CA_FILL", None)
+
+
+def _slow_handle_intent(delay):
+    async def handle_intent(call_sid, intent, followup_text=None):
+        await asyncio.sleep(delay)
+        twiml = VoiceResponse()
+        twiml.say("Tomorrow at noon works. Shall I book it?")
+        return twiml
+    return handle_intent
+
+
+async def _answer_turn(phone_mod, text="tomorrow at noon"):
+    phone_mod._begin_turn("CA_FILL")
+    started = time.monotonic()
+    await phone_mod.response_to_user_speech("CA_FILL", text)
+    return started
+
+
+def test_slow_response_is_masked_by_a_cached_filler(phone, monkeypatch):
+    phone_mod, synthesized, pushes = phone
+    monkeypatch.setattr(phone_mod, "handle_intent", _slow_handle_intent(0.4))
+
+    async def scenario():
+        await phone_mod._prewarm_fillers()
+        synthesized.clear()
+        return await _answer_turn(phone_mod)
+
+    started = run(scenario())
+    assert synthesized == []  # the filler came from the cache
+    assert len(pushes) == 2
+    (filler_at, filler), (response_at, response) = pushes
+    assert "/tts/" in filler and "<Say>Tomorrow at noon" in response
+    assert 0.18 <= filler_at - started < 0.3
+    # The response waits for the ~0.52 s filler and the 0.2 s buffer, not the 1.5 s push interval
+    assert 0.72 <= response_at - filler_at < 0.9
+    stats = phone_mod._compute_ops_snapshot()["turnLatency"]
+    assert stats["turns"] == 1 and stats["filler_turns"] == 1
+    assert stats["firstAudibleP50"] < 0.3 < 0.7 <= stats["totalP50"]
+
+
+def test_response_waits_for_the_filler_from_when_its_push_completed(phone, monkeypatch):
+    phone_mod, _, _ = phone
+    monkeypatch.setattr(phone_mod, "handle_intent", _slow_handle_intent(0.3))
+    pushes = []
+
+    async def slow_push(call_sid, twiml):
+        started = time.monotonic()
+        await asyncio.sleep(0.3)  # the REST round trip; Twilio starts the filler about when it returns
+        pushes.append((started, time.monotonic(), twiml))
+
+    monkeypatch.setattr(phone_mod, "twiml_pusher", TwiMLPushCoalescer(slow_push, min_interval=1.5))
+
+    async def scenario():
+        await phone_mod._prewarm_fillers()
+        await _answer_turn(phone_mod)
+
+    run(scenario())
+    assert len(pushes) == 2
+    (_, filler_done, filler), (response_sent, _, response) = pushes
+    assert "/tts/" in filler and "<Say>Tomorrow at noon" in response
+    # Not before the ~0.52 s filler and the 0.2 s buffer have passed since the filler landed
+    assert response_sent - filler_done >= 0.72
+
+
+def test_fast_response_plays_no_filler(phone, monkeypatch):
+    phone_mod, _, pushes = phone
+    monkeypatch.setattr(phone_mod, "handle_intent", _slow_handle_intent(0.05))
+
+    async def scenario():
+        await phone_mod._prewarm_fillers()
+        await _answer_turn(phone_mod)
+
+    run(scenario())
+    assert len(pushes) == 1 and "<Say>Tomorrow at noon" in pushes[0][1]
+    stats = phone_mod.turn_latency_stats.stats()
+    assert stats["filler_turns"] == 0 and stats["firstAudibleP50"] == stats["totalP50"]
+
+
+def test_uncached_filler_is_skipped_and_warmed_for_next_time(phone, monkeypatch):
+    phone_mod, synthesized, pushes = phone
+    monkeypatch.setattr(phone_mod, "handle_intent", _slow_handle_intent(0.4))
+    run(_answer_turn(phone_mod))
+    assert len(pushes) == 1 and "<Say>" in pushes[0][1]
+    assert phone_mod.turn_latency_stats.stats()["fillers_skipped"] == 1
+    assert synthesized == ["One moment."]
+    key = phone_mod.tts_cache_key("One moment.", *phone_mod._tts_voice_params()[0])
+    assert phone_mod.tts_audio_cache.get(key) == FILLER_MP3
+
+
+class StreamSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def test_filler_plays_over_the_media_stream_ahead_of_the_response(phone, monkeypatch):
+    phone_mod, _, pushes = phone
+    monkeypatch.setattr(phone_mod.settings, "MEDIA_STREAM_PLAYBACK", True)
+    monkeypatch.setattr(phone_mod, "_tts_mulaw_chunks", lambda text, *args: iter([b"\x7f" * 160 * 3]))
+
+    async def handle_intent(call_sid, intent, followup_text=None):
+        await asyncio.sleep(0.4)
+        twiml = VoiceResponse()
+        await phone_mod.add_tts_or_say_to_twiml(twiml, call_sid, "Tomorrow at noon works.")
+        phone_mod.append_stream_resume(twiml, call_sid)
+        return twiml
+
+    monkeypatch.setattr(phone_mod, "handle_intent", handle_intent)
+    socket = StreamSocket()
+
+    async def scenario():
+        phone_mod.manager.active_connections["CA_FILL"] = socket
+        await phone_mod.handle_media_packet("CA_FILL", json.dumps({"event": "start", "streamSid": "MZ_FILL"}))
+        await phone_mod._prewarm_fillers()
+        await _answer_turn(phone_mod)
+        await asyncio.sleep(0.3)
+        phone_mod.manager.active_connections.pop("CA_FILL", None)
+        phone_mod._close_media_player("CA_FILL")
+        await asyncio.sleep(0.01)
+
+    run(scenario())
+    assert pushes == []
+    marks = [m["mark"]["name"] for m in socket.sent if m["event"] == "mark"]
+    assert len(marks) == 2 and marks[0] != marks[1]
+    assert len([m for m in socket.sent if m["event"] == "media"]) == 6
+    assert phone_mod.turn_latency_stats.stats()["filler_turns"] == 1
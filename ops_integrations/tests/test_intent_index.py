@@ -0,0 +1,94 @@
+import json
+import os
+import random
+
+from ops_integrations.flows import intents as intents_mod
+from ops_integrations.flows.intent_index import IntentIndex, get_intent_index
+from ops_integrations.services.keyword_automaton import KeywordAutomaton
+
+
+def legacy_pattern_confidence(text, intents_data):
+    """Original nested-loop scorer, kept here as the reference implementation."""
+    text_lower = text.lower()
+    confidence_scores = {}
+    for intent in intents_data['intents']:
+        max_confidence = 0.0
+        for pattern in intent['patterns']:
+            pattern_lower = pattern.lower()
+            if pattern_lower in text_lower:
+                max_confidence = max(max_confidence, 0.95)
+                continue
+            if len(pattern_lower) > 3 and any(word in text_lower for word in pattern_lower.split()):
+                key_words = [w for w in pattern_lower.split() if len(w) > 2]
+                if key_words:
+                    matches = sum(1 for word in key_words if word in text_lower)
+                    if matches >= len(key_words) * 0.7:
+                        max_confidence = max(max_confidence, 0.85)
+                        continue
+            pattern_words = set(pattern_lower.split())
+            overlap = len(pattern_words.intersection(set(text_lower.split())))
+            if overlap > 0:
+                max_confidence = max(max_confidence, overlap / len(pattern_words) * 0.75)
+        if intent['tag'] == "BOOKING_REQUEST":
+            for keyword in ["book", "schedule", "appointment", "booking", "prefer to book", "want to book", "need to book"]:
+                if keyword in text_lower:
+                    max_confidence = max(max_confidence, 0.9)
+                    break
+        if max_confidence < 0.5:
+            text_words = set(text_lower.split())
+            best = 0.0
+            for pattern in intent['patterns']:
+                pattern_words = set(pattern.lower().split())
+                if pattern_words:
+                    best = max(best, len(text_words.intersection(pattern_words)) / len(pattern_words))
+            max_confidence = max(max_confidence, best * 0.6)
+        confidence_scores[intent['tag']] = max_confidence
+    return confidence_scores
+
+
+def corpus(intents_data):
+    patterns = [p for intent in intents_data['intents'] for p in intent['patterns']]
+    words = sorted({w for p in patterns for w in p.lower().split()} | {"the", "my", "is", "uh", "sink", "tomorrow"})
+    rng = random.Random(30)
+    texts = list(patterns)
+    texts += [
+        "My kitchen sink is clogged and the toilet keeps running",
+        "I'd like to book an appointment for Friday",
+        "Water everywhere! The pipe burst in the basement",
+        "hello", "", "yes", "Can you give me a quote for a remodel?",
+        "Schedule me in for drain cleaning next week please",
+    ]
+    for _ in range(300):
+        texts.append(" ".join(rng.choice(words) for _ in range(rng.randint(1, 9))))
+    return texts
+
+
+def test_index_scores_match_legacy_scorer():
+    intents_data = intents_mod.load_intents()
+    index = IntentIndex(intents_data)
+    for text in corpus(intents_data):
+        assert index.score(text) == legacy_pattern_confidence(text, intents_data), text
+
+
+def test_index_is_rebuilt_when_intents_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "intents.json"
+    path.write_text(json.dumps({"intents": [{"tag": "CLOG_BLOCKAGE", "patterns": ["drain is clogged"], "responses": []}]}))
+    monkeypatch.setattr(intents_mod, "INTENTS_PATH", str(path))
+    monkeypatch.setitem(intents_mod._intents_cache, "data", None)
+
+    first = get_intent_index()
+    assert get_intent_index() is first
+    assert first.tags == ["CLOG_BLOCKAGE"]
+
+    path.write_text(json.dumps({"intents": [{"tag": "LEAKING_FIXTURE", "patterns": ["faucet leaks"], "responses": []}]}))
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+    assert get_intent_index().tags == ["LEAKING_FIXTURE"]
+
+
+def test_automaton_reports_overlapping_and_whole_word_matches():
+    automaton = KeywordAutomaton(["leak", "leaking", "king", "clog"])
+    text = "the sink is leaking, unclog it"
+    assert automaton.find_all(text) == {"leak", "leaking", "king", "clog"}
+    assert automaton.find_all(text, whole_words=True) == {"leaking"}
+    assert automaton.first_positions(text) == {k: text.find(k) for k in ["leak", "leaking", "king", "clog"]}
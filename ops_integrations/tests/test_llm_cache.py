@@ -0,0 +1,55 @@
+import time
+from datetime import datetime
+
+from ops_integrations.services.llm_cache import LLMResultCache, date_bucket_for, normalize_utterance
+
+
+def test_normalized_variants_share_a_key():
+    assert normalize_utterance("  Yes, please! ") == "yes please"
+    key_a = LLMResultCache.make_key("classify", "Kitchen sink is clogged.", prompt_version="v1")
+    key_b = LLMResultCache.make_key("classify", "kitchen sink is   clogged", prompt_version="v1")
+    key_c = LLMResultCache.make_key("classify", "kitchen sink is clogged", prompt_version="v2")
+    assert key_a == key_b
+    assert key_a != key_c
+
+
+def test_date_bucket_tracks_relative_phrases():
+    now = datetime(2030, 1, 1, 9, 41)
+    assert date_bucket_for("tomorrow morning", now) == "2030-01-01"
+    assert date_bucket_for("in two hours", now) == "2030-01-01 09:41"
+    key_today = LLMResultCache.make_key("datetime", "tomorrow morning", date_bucket=date_bucket_for("tomorrow morning", now))
+    next_day = datetime(2030, 1, 2, 9, 41)
+    key_next = LLMResultCache.make_key("datetime", "tomorrow morning", date_bucket=date_bucket_for("tomorrow morning", next_day))
+    assert key_today != key_next
+
+
+def test_lru_eviction_and_hit_rate():
+    cache = LLMResultCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") == (False, None)
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_ttl_expiry():
+    cache = LLMResultCache(max_entries=10, ttl_seconds=0.01)
+    cache.set("a", "value")
+    time.sleep(0.02)
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["expired"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    first = LLMResultCache(persist_path=path)
+    first.set("turn", {"datetime": datetime(2030, 1, 2, 9, 0), "job_type": "running_toilet"})
+    second = LLMResultCache(persist_path=path)
+    found, value = second.get("turn")
+    assert found
+    assert value == {"datetime": datetime(2030, 1, 2, 9, 0), "job_type": "running_toilet"}
+    assert second.stats()["disk_hits"] == 1
@@ -0,0 +1,56 @@
+import asyncio
+import types
+
+from ops_integrations.flows.intent_model import LocalIntentClassifier, load_training_examples
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_trains_from_intents_json_and_calibrates_threshold():
+    model = LocalIntentClassifier.train(load_training_examples())
+    assert "BOOKING_REQUEST" in model.labels
+    assert 0.0 < model.threshold <= 1.0
+    label, confidence = model.predict("my water heater is not heating")
+    assert label == "WATER_HEATER_ISSUE"
+    assert confidence >= model.threshold
+
+
+def test_artifact_round_trip(tmp_path):
+    model = LocalIntentClassifier.train([
+        ("toilet is clogged", "CLOG_BLOCKAGE"),
+        ("drain is blocked", "CLOG_BLOCKAGE"),
+        ("faucet is dripping", "LEAKING_FIXTURE"),
+        ("pipe under the sink is leaking", "LEAKING_FIXTURE"),
+    ])
+    path = str(tmp_path / "intent_model.npz")
+    model.save(path)
+    loaded = LocalIntentClassifier.load(path)
+    assert loaded.labels == model.labels
+    assert loaded.threshold == model.threshold
+    assert loaded.predict("the shower drain is clogged") == model.predict("the shower drain is clogged")
+
+
+def test_empty_text_abstains():
+    model = LocalIntentClassifier.train(load_training_examples())
+    assert model.predict("...") == (None, 0.0)
+    assert model.predict_confident("") is None
+
+
+def test_confident_local_prediction_skips_gpt(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+
+    def fail_if_called(**kwargs):
+        raise AssertionError("GPT should not be called")
+
+    fake_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=fail_if_called)))
+    monkeypatch.setattr(phone_mod, "client", fake_client, raising=True)
+    monkeypatch.setattr(phone_mod, "_predict_intent_locally", lambda text: ("WATER_HEATER_ISSUE", 0.97), raising=True)
+    intent, confidence = run(phone_mod.classify_transcript_intent("water heater is not heating"))
+    assert intent == "WATER_HEATER_ISSUE"
+    assert confidence > 0.0
@@ -0,0 +1,266 @@
+import asyncio
+import base64
+import json
+import math
+import struct
+import time
+
+import pytest
+from starlette.requests import Request
+from starlette.testclient import TestClient
+from twilio.twiml.voice_response import VoiceResponse
+
+from ops_integrations.services.media_playback import FRAME_BYTES, MediaStreamPlayer, PCMToMulaw
+from ops_integrations.services.tts_cache import TTSAudioCache
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+async def background_tasks_finish(timeout=2.0):
+    """Wait for the turn's background tasks (stream playback, speech gate timers); True if all ended."""
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    if not tasks:
+        return True
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    return not pending
+
+
+class FakeStreamSocket:
+    """Records what the server sends on a Media Stream WebSocket."""
+
+    def __init__(self, fail_after=None):
+        self.sent = []
+        self.fail_after = fail_after
+
+    async def send_text(self, text):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise ConnectionError("stream closed")
+        self.sent.append((time.monotonic(), json.loads(text)))
+
+    def events(self, name):
+        return [msg for _, msg in self.sent if msg["event"] == name]
+
+
+async def chunks_of(*pieces):
+    for piece in pieces:
+        yield piece
+
+
+def test_pcm_transcoding_is_independent_of_chunk_boundaries():
+    pcm = b"".join(struct.pack("<h", int(8000 * math.sin(i / 10.0))) for i in range(2400))  # 100 ms at 24 kHz
+    whole = PCMToMulaw(24000).feed(pcm)
+    split = PCMToMulaw(24000)
+    pieces = b"".join(split.feed(pcm[i:i + 7]) for i in range(0, len(pcm), 7))
+    assert pieces == whole
+    assert abs(len(whole) - 800) <= 2
+
+
+def test_player_paces_frames_in_real_time_and_ends_with_a_mark():
+    socket = FakeStreamSocket()
+
+    async def scenario():
+        player = MediaStreamPlayer(socket.send_text, "MZ1", lead_frames=3)
+        # 10 whole frames split across uneven chunks plus a partial one
+        ok = await player.play(chunks_of(b"\x01" * 1000, b"\x02" * 650), "greeting")
+        acked = asyncio.ensure_future(player.wait_mark("greeting", timeout=1.0))
+        player.on_mark("greeting")
+        try:
+            return ok, await acked, player
+        finally:
+            player.close()
+
+    ok, acked, player = run(scenario())
+    assert ok and acked and not player.connected
+    media = socket.events("media")
+    assert len(media) == 11 and all(m["streamSid"] == "MZ1" for m in media)
+    frames = [base64.b64decode(m["media"]["payload"]) for m in media]
+    assert all(len(frame) == FRAME_BYTES for frame in frames)
+    assert frames[-1].endswith(b"\xff")  # padded with mu-law silence
+    assert socket.sent[-1][1] == {"event": "mark", "streamSid": "MZ1", "mark": {"name": "greeting"}}
+    # Never more than the lead ahead of the play head
+    start = socket.sent[0][0]
+    for index, (sent_at, _) in enumerate(socket.sent[:11]):
+        assert sent_at - start >= (index - 3) * 0.02 - 0.005
+    assert player.counters["frames"] == 11 and player.counters["marks_acked"] == 1
+
+
+def test_clear_abandons_the_prompt_being_sent():
+    socket = FakeStreamSocket()
+
+    async def scenario():
+        player = MediaStreamPlayer(socket.send_text, "MZ1", lead_frames=1)
+        playing = asyncio.ensure_future(player.play(chunks_of(b"\x00" * FRAME_BYTES * 50), "long"))
+        await asyncio.sleep(0.1)
+        await player.clear()
+        try:
+            return await playing
+        finally:
+            player.close()
+
+    assert run(scenario()) is False
+    assert len(socket.events("media")) < 50
+    assert socket.events("clear") and not socket.events("mark")
+
+
+@pytest.fixture
+def phone(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=1024 * 1024))
+    monkeypatch.setattr(phone_mod.settings, "MEDIA_STREAM_PLAYBACK", True)
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    monkeypatch.setattr(phone_mod.settings, "FORCE_SAY_ONLY", False)
+    monkeypatch.setattr(phone_mod.settings, "EXTERNAL_WEBHOOK_URL", "https://example.com")
+    # Short gate timers so each test can wait for its pushed prompts to finish playing
+    monkeypatch.setattr(phone_mod.settings, "SPEECH_GATE_BUFFER_SEC", 0.05)
+    monkeypatch.setattr(phone_mod, "_estimate_speech_duration", lambda text: 0.05)
+    synthesized = []
+
+    def fake_mulaw(text, provider, voice, model, speed):
+        synthesized.append(("mulaw", text))
+        yield b"\x7f" * (FRAME_BYTES * 3)
+
+    def fake_mp3(text, provider, voice, model, speed):
+        synthesized.append(("mp3", text))
+        yield b"mp3:" + text.encode()
+
+    pushed = []
+
+    async def fake_rest_push(call_sid, response):
+        pushed.append(str(response))
+        return True
+
+    monkeypatch.setattr(phone_mod, "_tts_mulaw_chunks", fake_mulaw)
+    monkeypatch.setattr(phone_mod, "_tts_chunks", fake_mp3)
+    monkeypatch.setattr(phone_mod, "_push_twiml_rest", fake_rest_push)
+    monkeypatch.setattr(phone_mod, "media_playback_stats", {"turns": 0, "fallbacks": 0})
+    yield phone_mod, synthesized, pushed
+    for sid in ("CA_MEDIA",):
+        phone_mod.manager.active_connections.pop(sid, None)
+        phone_mod._close_media_player(sid)
+        for store in (phone_mod.vad_states, phone_mod.tts_audio_store, phone_mod.tts_version_counter):
+            store.pop(sid, None)
+
+
+async def _speak_turn(phone_mod, socket, text, dial=False):
+    phone_mod.manager.active_connections["CA_MEDIA"] = socket
+    if "CA_MEDIA" not in phone_mod.media_players:
+        start = {"event": "start", "streamSid": "MZ_MEDIA", "start": {"callSid": "CA_MEDIA", "streamSid": "MZ_MEDIA"}}
+        await phone_mod.handle_media_packet("CA_MEDIA", json.dumps(start))
+    twiml = VoiceResponse()
+    await phone_mod.add_tts_or_say_to_twiml(twiml, "CA_MEDIA", text)
+    if dial:
+        twiml.dial("+15550000000")
+    else:
+        phone_mod.append_stream_resume(twiml, "CA_MEDIA")
+    await phone_mod.push_twiml_to_call("CA_MEDIA", twiml)
+    for _ in range(100):
+        await asyncio.sleep(0.02)
+        if socket.events("mark") or phone_mod.media_playback_stats["fallbacks"]:
+            break
+    return twiml
+
+
+def test_turn_is_spoken_over_the_stream_without_a_twiml_push(phone):
+    phone_mod, synthesized, pushed = phone
+    socket = FakeStreamSocket()
+
+    async def scenario():
+        twiml = await _speak_turn(phone_mod, socket, "What can we assist you with today?")
+        mark = socket.events("mark")[0]["mark"]["name"]
+        await phone_mod.handle_media_packet("CA_MEDIA", json.dumps({"event": "mark", "mark": {"name": mark}}))
+        assert await background_tasks_finish()
+        return twiml
+
+    twiml = run(scenario())
+    assert not phone_mod.vad_states["CA_MEDIA"]["speech_gate_active"]
+    assert "<Connect><Stream" in str(twiml)
+    assert pushed == []
+    assert len(socket.events("media")) == 3
+    assert synthesized == [("mulaw", "What can we assist you with today?")]
+    snapshot = phone_mod._compute_ops_snapshot()["mediaPlayback"]
+    assert snapshot["turns"] == 1 and snapshot["marks_acked"] == 1 and snapshot["fallbacks"] == 0
+
+
+def test_stream_failure_falls_back_to_a_twiml_push_with_a_playable_url(phone):
+    phone_mod, synthesized, pushed = phone
+    socket = FakeStreamSocket(fail_after=1)
+
+    async def scenario():
+        await _speak_turn(phone_mod, socket, "Let me check that.")
+        key = phone_mod.tts_audio_store["CA_MEDIA"]
+        request = Request({"type": "http", "method": "GET", "path": f"/tts/{key}.mp3", "headers": []})
+        response = await phone_mod.serve_tts(key, request)
+        audio = b"".join([chunk async for chunk in response.body_iterator])
+        assert await background_tasks_finish()
+        return audio
+
+    audio = run(scenario())
+    assert phone_mod.media_playback_stats["fallbacks"] == 1
+    assert len(pushed) == 1 and "/tts/" in pushed[0]
+    # The fallback mp3 is only synthesized once Twilio asks for it
+    assert audio == b"mp3:Let me check that."
+    assert synthesized == [("mulaw", "Let me check that."), ("mp3", "Let me check that.")]
+
+
+def test_fallback_after_a_played_prompt_pushes_only_the_rest(phone):
+    phone_mod, _, pushed = phone
+    # The first prompt's 3 frames and mark go out, then the socket drops
+    socket = FakeStreamSocket(fail_after=5)
+
+    async def scenario():
+        phone_mod.manager.active_connections["CA_MEDIA"] = socket
+        start = {"event": "start", "streamSid": "MZ_MEDIA", "start": {"callSid": "CA_MEDIA", "streamSid": "MZ_MEDIA"}}
+        await phone_mod.handle_media_packet("CA_MEDIA", json.dumps(start))
+        twiml = VoiceResponse()
+        await phone_mod.add_tts_or_say_to_twiml(twiml, "CA_MEDIA", "Got it.")
+        await phone_mod.add_tts_or_say_to_twiml(twiml, "CA_MEDIA", "What is the address?")
+        phone_mod.append_stream_resume(twiml, "CA_MEDIA")
+        await phone_mod.push_twiml_to_call("CA_MEDIA", twiml)
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if pushed:
+                break
+        assert await background_tasks_finish()
+        return str(twiml)
+
+    twiml = run(scenario())
+    assert twiml.count("<Play>") == 2
+    assert len(pushed) == 1 and pushed[0].count("<Play>") == 1
+    assert "<Connect><Stream" in pushed[0]
+    key = phone_mod.tts_cache_key("What is the address?", *phone_mod._tts_voice_params()[0])
+    assert key in pushed[0]
+
+
+def test_dropped_stream_is_reconnected_rather_than_ending_the_call(phone):
+    phone_mod, _, _ = phone
+    twiml = VoiceResponse()
+    phone_mod.append_stream_resume(twiml, "CA_MEDIA")
+    xml = str(twiml)
+    # Twilio runs the verbs after <Connect> once the socket closes
+    assert xml.index("</Connect>") < xml.index("<Redirect")
+    assert '<Redirect method="POST">https://example.com/stream/resume/CA_MEDIA</Redirect>' in xml
+    with TestClient(phone_mod.app) as client:
+        response = client.post("/stream/resume/CA_MEDIA")
+    assert response.status_code == 200 and "<Connect><Stream" in response.text
+
+
+def test_turns_that_leave_the_stream_are_pushed_as_twiml(phone):
+    phone_mod, _, pushed = phone
+    socket = FakeStreamSocket()
+
+    async def scenario():
+        await _speak_turn(phone_mod, socket, "Connecting you to our dispatch team now.", dial=True)
+        assert await background_tasks_finish()
+
+    run(scenario())
+    assert len(pushed) == 1 and "<Dial>" in pushed[0]
+    assert socket.events("media") == []
@@ -0,0 +1,139 @@
+import ast
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from ops_integrations.services.name_recognizer import (
+    NameGazetteer,
+    NameRecognizer,
+    get_name_recognizer,
+    phonetic_key,
+)
+
+
+def _name_extraction_cases():
+    """The non_name_cases / name_cases lists from test_name_extraction.py."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_name_extraction.py")
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    cases = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name) and isinstance(node.value, ast.List):
+            cases[node.targets[0].id] = ast.literal_eval(node.value)
+    return cases["non_name_cases"], cases["name_cases"]
+
+
+NON_NAME_CASES, NAME_CASES = _name_extraction_cases()
+
+
+class FakeCompletions:
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def fake_gpt(monkeypatch):
+    from ops_integrations.adapters import phone
+    completions = FakeCompletions("Nguyen")
+    monkeypatch.setattr(phone, "client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return completions
+
+
+def test_name_extraction_cases_are_decided_locally(fake_gpt):
+    from ops_integrations.adapters.phone import extract_name_from_text
+    recognizer = get_name_recognizer()
+    for text in NON_NAME_CASES:
+        assert recognizer.recognize(text).source == "rejected", text
+        assert extract_name_from_text(text) is None, text
+    for text, expected in NAME_CASES:
+        match = recognizer.recognize(text)
+        assert match.source == "gazetteer", text
+        assert extract_name_from_text(text) == expected, text
+    assert fake_gpt.calls == 0
+
+
+def test_asr_misspellings_map_to_known_names():
+    assert phonetic_key("catherine") == phonetic_key("kathryn")
+    assert phonetic_key("stephen") == phonetic_key("steven")
+    recognizer = get_name_recognizer()
+    assert recognizer.recognize("um, jonh").name == "John"
+    assert recognizer.recognize("my name is jonh").source == "phonetic"
+    assert recognizer.recognize("my name is emliy").name == "Emily"
+    # Short words never go through phonetic matching in a bare reply
+    assert recognizer.recognize("tent").abstained
+
+
+def test_real_names_missing_from_the_gazetteer_are_not_rewritten():
+    gazetteer = NameGazetteer(["willa", "dana", "joe", "john"])
+    recognizer = NameRecognizer(gazetteer)
+    assert gazetteer.closest("will") is None
+    assert gazetteer.closest("dan") is None
+    assert gazetteer.closest("jo") is None
+    assert gazetteer.closest("jonh") == ("john", 1)
+    # Kept as heard after a strong introduction, left to GPT in a bare reply
+    assert recognizer.recognize("my name is will").name == "Will"
+    assert recognizer.recognize("my name is will").source == "introduced"
+    assert recognizer.recognize("my name is dan").name == "Dan"
+    assert recognizer.recognize("jo").abstained
+    assert recognizer.recognize("um, will").abstained
+
+
+def test_fillers_introductions_and_surnames():
+    recognizer = get_name_recognizer()
+    assert recognizer.recognize("Yeah hi, it's Sarah Jones calling about my sink").name == "Sarah Jones"
+    assert recognizer.recognize("hi this is emily from 123 main st").name == "Emily"
+    assert recognizer.recognize("um, my name is uh Nguyen").name == "Nguyen"
+    assert recognizer.recognize("my name is john and my sink is leaking").name == "John"
+    assert recognizer.recognize("i'm fine thanks").source == "rejected"
+    # Weak introductions need a known name after them
+    assert recognizer.recognize("it's dripping everywhere").abstained
+    assert recognizer.recognize("will you come today").abstained
+
+
+def test_stock_replies_are_not_names(fake_gpt):
+    from ops_integrations.adapters.phone import extract_name_from_text
+    recognizer = get_name_recognizer()
+    for text in ("hope so", "I hope so!", "will do", "Will do, thanks", "sure thing", "you bet", "no worries"):
+        assert recognizer.recognize(text).source == "rejected", text
+        assert extract_name_from_text(text) is None, text
+    assert fake_gpt.calls == 0
+    # The same words are still names on their own or with a surname
+    assert recognizer.recognize("Hope").name == "Hope"
+    assert recognizer.recognize("sure thing, John Smith").name == "John Smith"
+
+
+def test_gpt_only_runs_when_recognizer_abstains(fake_gpt):
+    from ops_integrations.adapters.phone import extract_name_from_text
+    recognizer = get_name_recognizer()
+    before = recognizer.outcomes["fallback_name"]
+    assert extract_name_from_text("it's nguyen") == "Nguyen"
+    assert fake_gpt.calls == 1
+    assert extract_name_from_text("it's nguyen", allow_gpt=False) is None
+    assert fake_gpt.calls == 1
+    assert recognizer.outcomes["fallback_name"] == before + 1
+
+
+def test_stats_report_local_hit_rate():
+    recognizer = NameRecognizer(NameGazetteer(["john", "mary"]))
+    recognizer.recognize("john")
+    recognizer.recognize("thank you")
+    recognizer.recognize("my name is zed")
+    recognizer.recognize("xavier")
+    stats = recognizer.stats()
+    assert stats["gazetteerNames"] == 2
+    assert stats["outcomes"] == {"gazetteer": 1, "rejected": 1, "introduced": 1, "abstain": 1}
+    assert stats["localHitRate"] == 0.75
+
+
+def test_missing_gazetteer_still_accepts_strong_introductions(tmp_path):
+    recognizer = get_name_recognizer(str(tmp_path / "missing.txt"))
+    assert recognizer is get_name_recognizer(str(tmp_path / "missing.txt"))
+    assert recognizer.recognize("my name is john").name == "John"
+    assert recognizer.recognize("john").abstained
@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+from twilio.twiml.voice_response import VoiceResponse
+
+from ops_integrations.services.prompt_catalogue import (
+    CataloguePrompt,
+    PromptCatalogue,
+    extract_phone_prompts,
+    extract_relay_prompts,
+    get_prompt_catalogue,
+)
+from ops_integrations.services.tts_cache import TTSAudioCache
+
+PHONE_SOURCE = '''
+async def handle(twiml, call_sid, job_type, name, urgent):
+    greet = "Hello, who am I speaking with?"
+    await add_tts_or_say_to_twiml(twiml, call_sid, greet)
+    await add_tts_or_say_to_twiml(twiml, call_sid, f"Please hold.")
+    await add_tts_or_say_to_twiml(twiml, call_sid, "Dispatching now." if urgent else "We'll call back.")
+    await add_tts_or_say_to_twiml(twiml, call_sid, f"Tell me about your {_speakable(job_type)}.")
+    await add_tts_or_say_to_twiml(twiml, call_sid, f"Nice to meet you, {name}.")
+    reply = await answer(name)
+    await add_tts_or_say_to_twiml(twiml, call_sid, reply)
+    await add_tts_or_say_to_twiml(twiml, call_sid, text="Is water_heater ok?")
+'''
+
+SALON_SOURCE = '''
+def build():
+    welcome = "Welcome to the salon!"
+    return f"""<ConversationRelay url="{url}" welcomeGreeting="{welcome}" />"""
+
+async def relay(websocket, token):
+    await websocket.send_json({"type": "text", "token": "One moment.", "last": True})
+    await websocket.send_json({"type": "text", "token": token, "last": False})
+    await websocket.send_json({"type": "text", "token": "", "last": True})
+'''
+
+
+def test_extracts_fixed_phone_prompts_and_expands_small_templates(tmp_path):
+    path = tmp_path / "phone.py"
+    path.write_text(PHONE_SOURCE)
+    prompts, dynamic_sites = extract_phone_prompts(str(path), variants={"_speakable(job_type)": ["leak", "clog"]})
+    assert [p.text for p in prompts] == [
+        "Hello, who am I speaking with?",
+        "Please hold.",
+        "Dispatching now.",
+        "We'll call back.",
+        "Tell me about your leak.",
+        "Tell me about your clog.",
+        "Is water heater ok?",
+    ]
+    assert all(p.cacheable and p.source == "phone" for p in prompts)
+    # The greeting by name and the answer both depend on the caller
+    assert dynamic_sites == 2
+
+
+def test_extracts_relay_frames_and_welcome_greeting(tmp_path):
+    path = tmp_path / "salon.py"
+    path.write_text(SALON_SOURCE)
+    prompts = extract_relay_prompts(str(path))
+    assert sorted(p.text for p in prompts) == ["One moment.", "Welcome to the salon!"]
+    assert not any(p.cacheable for p in prompts)
+
+
+def test_real_sources_catalogue_greeting_and_salon_welcome():
+    catalogue = get_prompt_catalogue()
+    texts = catalogue.cacheable_texts()
+    assert any(t.startswith("Hello, thank you for trusting SafeHarbour") for t in texts)
+    assert "Connecting you to our dispatch team now." in texts
+    relay = [p.text for p in catalogue.prompts if not p.cacheable]
+    assert "Welcome to Bold Wings Salon! How can I assist you today?" in relay
+
+
+def test_presynthesize_bounds_concurrency_and_reports_failures():
+    catalogue = PromptCatalogue([CataloguePrompt(f"prompt {i}", "phone", i, True) for i in range(7)])
+    in_flight, peak = [0], [0]
+
+    async def synthesize(text):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        if text == "prompt 3":
+            raise RuntimeError("provider down")
+        return text != "prompt 5"
+
+    loop = asyncio.new_event_loop()
+    try:
+        run = loop.run_until_complete(catalogue.presynthesize(synthesize, concurrency=2, voice="openai/alloy"))
+    finally:
+        loop.close()
+    assert peak[0] == 2
+    assert (run["total"], run["ready"], run["failed"]) == (7, 5, 2)
+    assert catalogue.coverage_report()["lastRun"]["voice"] == "openai/alloy"
+
+
+def test_runtime_coverage_counts_catalogued_and_uncatalogued_utterances():
+    catalogue = PromptCatalogue([CataloguePrompt("Goodbye.", "phone", 1, True),
+                                 CataloguePrompt("Welcome!", "salon", 2, False)])
+    catalogue.record_runtime("Goodbye.", cache_hit=True)
+    catalogue.record_runtime("Thanks, Ana, what time works?", cache_hit=False)
+    catalogue.record_runtime("Thanks, Ana, what time works?", cache_hit=False)
+    catalogue.record_runtime("Welcome!", cache_hit=False)  # voiced by ConversationRelay, not our cache
+    report = catalogue.coverage_report()
+    assert (report["prompts"], report["cacheable"], report["relayOnly"]) == (2, 1, 1)
+    assert report["runtime"] == {"utterances": 4, "catalogued": 1, "cache_hits": 1, "catalogued_cache_hits": 1}
+    assert report["coverage"] == 0.25
+    assert report["topUncatalogued"][0] == {"text": "Thanks, Ana, what time works?", "count": 2}
+
+
+@pytest.fixture
+def phone(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    catalogue = PromptCatalogue([CataloguePrompt(t, "phone", i, True)
+                                 for i, t in enumerate(["Hello, who do I have?", "Goodbye.", "One moment."])])
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=1024 * 1024))
+    monkeypatch.setattr(phone_mod, "_prompt_catalogue", lambda: catalogue)
+    monkeypatch.setattr(phone_mod, "tts_prewarm_state", {"task": None, "voice": None})
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    monkeypatch.setattr(phone_mod.settings, "FORCE_SAY_ONLY", False)
+    monkeypatch.setattr(phone_mod.settings, "TTS_PREWARM_ENABLED", True)
+    synthesized = []
+
+    def fake_chunks(text, provider, voice, model, speed):
+        synthesized.append((text, speed))
+        yield f"{speed}:{text}".encode()
+
+    monkeypatch.setattr(phone_mod, "_tts_chunks", fake_chunks)
+    yield phone_mod, catalogue, synthesized
+    phone_mod.tts_audio_store.pop("CA_PREWARM", None)
+    phone_mod.vad_states.pop("CA_PREWARM", None)
+
+
+def test_prewarm_runs_once_per_voice_and_first_caller_hits_cache(phone, monkeypatch):
+    phone_mod, catalogue, synthesized = phone
+
+    async def scenario():
+        first = phone_mod.schedule_prompt_prewarm()
+        assert phone_mod.schedule_prompt_prewarm() is first
+        await first
+        assert len(synthesized) == 3
+
+        response = VoiceResponse()
+        await phone_mod.add_tts_or_say_to_twiml(response, "CA_PREWARM", "Hello, who do I have?")
+        assert len(synthesized) == 3
+
+        # Same settings: the finished run is reused
+        assert phone_mod.schedule_prompt_prewarm() is first
+        monkeypatch.setattr(phone_mod.settings, "OPENAI_TTS_SPEED", 1.0)
+        second = phone_mod.schedule_prompt_prewarm()
+        assert second is not first
+        await second
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+    assert sorted(speed for _, speed in synthesized) == [1.0, 1.0, 1.0, 1.25, 1.25, 1.25]
+    report = catalogue.coverage_report()
+    assert report["runtime"]["catalogued_cache_hits"] == 1
+    assert report["lastRun"]["voice"].endswith("/1.0/mp3")
+
+
+def test_prewarm_warms_mulaw_when_prompts_play_over_the_stream(phone, monkeypatch):
+    phone_mod, _, synthesized = phone
+    mulaw = []
+
+    def fake_mulaw(text, provider, voice, model, speed):
+        mulaw.append(text)
+        yield b"\x7f" * 160
+
+    monkeypatch.setattr(phone_mod, "_tts_mulaw_chunks", fake_mulaw)
+    monkeypatch.setattr(phone_mod.settings, "MEDIA_STREAM_PLAYBACK", True)
+    async def scenario():
+        await phone_mod.schedule_prompt_prewarm()
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+    assert sorted(mulaw) == ["Goodbye.", "Hello, who do I have?", "One moment."] and synthesized == []
+    key = phone_mod.tts_cache_key("Goodbye.", *phone_mod._tts_voice_params()[0], audio_format="mulaw")
+    assert phone_mod.tts_audio_cache.contains(key)
+
+
+def test_prewarm_can_be_disabled(phone, monkeypatch):
+    phone_mod, _, _ = phone
+    monkeypatch.setattr(phone_mod.settings, "TTS_PREWARM_ENABLED", False)
+    assert phone_mod.schedule_prompt_prewarm() is None
@@ -0,0 +1,239 @@
+import logging
+import random
+
+from ops_integrations.adapters.phone import has_excessive_repetitions, remove_repeated_phrases
+from ops_integrations.services.transcript_filters import collapse_repeats, iter_repeats
+from ops_integrations.tests.test_transcription_cleaning import CLEANING_TEST_CASES
+
+logger = logging.getLogger(__name__)
+
+
+# Verbatim copies of the nested-loop implementations the lag-run scan replaced.
+
+def legacy_has_excessive_repetitions(text):
+    """
+    Check if text has excessive repetitions that indicate noise/artifacts.
+    Allow repetitions only for time-related words and yes/no responses.
+    
+    Returns:
+        bool: True if text should be suppressed due to excessive repetitions
+    """
+    if not text:
+        return False
+    
+    # Split into words
+    words = text.split()
+    if len(words) <= 2:
+        return False
+    
+    # Define allowed repetition words (time-related and yes/no responses)
+    allowed_repetition_words = {
+        # Time-related words
+        'am', 'pm', 'a.m.', 'p.m.', 'morning', 'afternoon', 'evening', 'night',
+        'today', 'tomorrow', 'yesterday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+        'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october', 'november', 'december',
+        'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec',
+        'o\'clock', 'oclock', 'hour', 'hours', 'minute', 'minutes', 'second', 'seconds',
+        # Yes/no responses
+        'yes', 'no', 'yeah', 'yep', 'yup', 'nope', 'nah', 'ok', 'okay', 'sure', 'right',
+        # Numbers (for time)
+        'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten',
+        'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen', 'eighteen', 'nineteen', 'twenty',
+        'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety', 'hundred',
+        # Time indicators
+        'sharp', 'exactly', 'precisely', 'around', 'about', 'approximately', 'roughly',
+        'early', 'late', 'soon', 'later', 'earlier', 'now', 'then', 'when', 'time'
+    }
+    
+    # Check for single word repetitions (3+ consecutive same word)
+    i = 0
+    while i < len(words):
+        word = words[i].lower().strip('.,!?')
+        if not word:  # Skip empty words
+            i += 1
+            continue
+            
+        # Count consecutive repetitions of this word
+        repetitions = 1
+        j = i + 1
+        while j < len(words) and words[j].lower().strip('.,!?') == word:
+            repetitions += 1
+            j += 1
+        
+        # If we have 3+ repetitions of the same word, check if it's allowed
+        if repetitions >= 3:
+            if word in allowed_repetition_words:
+                logger.info(f"✅ Allowed repetition for '{word}' repeated {repetitions} times (time/yes-no word)")
+                # Continue processing - this will be cleaned to single instance later
+            else:
+                logger.info(f"🚫 Excessive word repetition detected: '{word}' repeated {repetitions} times")
+                return True
+        
+        i = j
+    
+    # Check for phrase repetitions (2+ consecutive same phrase)
+    for phrase_length in [2, 3]:
+        if len(words) >= phrase_length * 2:
+            i = 0
+            while i < len(words):
+                if i + phrase_length * 2 <= len(words):
+                    # Get current phrase and next phrase
+                    current_phrase = [w.lower().strip('.,!?') for w in words[i:i+phrase_length]]
+                    next_phrase = [w.lower().strip('.,!?') for w in words[i+phrase_length:i+phrase_length*2]]
+                    
+                    if current_phrase == next_phrase:
+                        # Found repetition, count how many times it repeats
+                        phrase_repetitions = 1
+                        check_pos = i + phrase_length
+                        while check_pos + phrase_length <= len(words):
+                            check_phrase = [w.lower().strip('.,!?') for w in words[check_pos:check_pos+phrase_length]]
+                            if check_phrase == current_phrase:
+                                phrase_repetitions += 1
+                                check_pos += phrase_length
+                            else:
+                                break
+                        
+                        # Check if phrase contains only allowed repetition words
+                        phrase_text = ' '.join(current_phrase)
+                        all_words_allowed = all(w in allowed_repetition_words for w in current_phrase)
+                        
+                        if phrase_repetitions >= 2:
+                            if all_words_allowed:
+                                logger.info(f"✅ Allowed phrase repetition: '{phrase_text}' repeated {phrase_repetitions} times (time/yes-no phrase)")
+                                # Continue processing - this will be cleaned to single instance later
+                            else:
+                                logger.info(f"🚫 Excessive phrase repetition detected: '{phrase_text}' repeated {phrase_repetitions} times")
+                                return True
+                
+                i += 1
+    
+    return False
+
+def legacy_remove_repeated_phrases(text):
+    """
+    Remove excessive repetition of words and short phrases.
+    Examples:
+    - "second, second, second, second" -> "second"
+    - "the the the problem" -> "the problem"
+    - "help me help me help me" -> "help me"
+    """
+    if not text:
+        return text
+    
+    # Split into words
+    words = text.split()
+    if len(words) <= 1:
+        return text
+    
+    # Remove consecutive repeated words
+    cleaned_words = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        cleaned_words.append(word)
+        
+        # Count consecutive repetitions of this word
+        repetitions = 1
+        j = i + 1
+        while j < len(words) and words[j].lower().strip('.,!?') == word.lower().strip('.,!?'):
+            repetitions += 1
+            j += 1
+        
+        # If we found repetitions, skip them (keep only the first occurrence)
+        if repetitions > 1:
+            logger.info(f"🔄 Removed {repetitions-1} repetitions of word '{word}'")
+            i = j
+        else:
+            i += 1
+    
+    # Join back into text
+    result = ' '.join(cleaned_words)
+    
+    # Handle repeated short phrases (2-3 words)
+    # Look for patterns like "help me help me" or "can you can you"
+    for phrase_length in [2, 3]:
+        if len(cleaned_words) >= phrase_length * 2:
+            # Check for repeated phrases
+            new_words = []
+            i = 0
+            while i < len(cleaned_words):
+                if i + phrase_length * 2 <= len(cleaned_words):
+                    # Get current phrase and next phrase
+                    current_phrase = cleaned_words[i:i+phrase_length]
+                    next_phrase = cleaned_words[i+phrase_length:i+phrase_length*2]
+                    
+                    # Normalize for comparison (remove punctuation, lowercase)
+                    current_normalized = [w.lower().strip('.,!?') for w in current_phrase]
+                    next_normalized = [w.lower().strip('.,!?') for w in next_phrase]
+                    
+                    if current_normalized == next_normalized:
+                        # Found repetition, count how many times it repeats
+                        phrase_repetitions = 1
+                        check_pos = i + phrase_length
+                        while check_pos + phrase_length <= len(cleaned_words):
+                            check_phrase = cleaned_words[check_pos:check_pos+phrase_length]
+                            check_normalized = [w.lower().strip('.,!?') for w in check_phrase]
+                            if check_normalized == current_normalized:
+                                phrase_repetitions += 1
+                                check_pos += phrase_length
+                            else:
+                                break
+                        
+                        # Keep only first occurrence
+                        if phrase_repetitions > 1:
+                            logger.info(f"🔄 Removed {phrase_repetitions-1} repetitions of phrase '{' '.join(current_phrase)}'")
+                        new_words.extend(current_phrase)
+                        i = check_pos
+                    else:
+                        new_words.append(cleaned_words[i])
+                        i += 1
+                else:
+                    new_words.append(cleaned_words[i])
+                    i += 1
+            
+            cleaned_words = new_words
+            result = ' '.join(cleaned_words)
+    
+    return result
+
+
+VOCAB = ["help", "me", "Help", "me,", "the", "sink", "is", "no", "no.", "ten", "am", "...", "!", "leak", "can", "you",
+         "tomorrow", "Second,", "second"]
+
+
+def corpus():
+    rng = random.Random(33)
+    texts = [case["input"] for case in CLEANING_TEST_CASES]
+    texts += ["", "a", "a b", "no no no", "yes yes yes please", "... !! ?", "ten am ten am ten am"]
+    for _ in range(600):
+        words = []
+        while len(words) < rng.randint(1, 30):
+            phrase = [rng.choice(VOCAB) for _ in range(rng.randint(1, 3))]
+            words.extend(phrase * (rng.randint(1, 3) if rng.random() < 0.4 else 1))
+        texts.append(" ".join(words))
+    return texts
+
+
+def test_has_excessive_repetitions_matches_legacy():
+    for text in corpus():
+        assert has_excessive_repetitions(text) == legacy_has_excessive_repetitions(text), text
+
+
+def test_remove_repeated_phrases_matches_legacy_for_short_phrases():
+    for text in corpus():
+        assert remove_repeated_phrases(text, max_phrase_length=3) == legacy_remove_repeated_phrases(text), text
+
+
+def test_whisper_sentence_loop_collapses_in_one_pass():
+    sentence = "I need someone to look at my water heater today."
+    looped = " ".join([sentence] * 10)
+    assert remove_repeated_phrases("Hi. " + looped + " Thanks") == "Hi. " + sentence + " Thanks"
+    # Two copies of a long sentence may be a caller repeating themselves
+    twice = sentence + " " + sentence
+    assert remove_repeated_phrases(twice) == twice
+
+
+def test_repeat_scan_reports_counts():
+    assert list(iter_repeats([1, 2, 1, 2, 1, 2, 3], 2)) == [(0, 3), (1, 2), (2, 2)]
+    assert collapse_repeats([1, 2, 1, 2, 1, 2, 3], 2) == ([0, 1, 6], [(0, 3)])
+    assert collapse_repeats([4, 5, 6, 7] * 2, 4, min_repeats=3) == (list(range(8)), [])
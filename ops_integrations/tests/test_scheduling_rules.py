@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 
 import pytest
 
-# Patch CalendarAdapter to a stub for deterministic tests
+# Patch the shared calendar adapter to a stub for deterministic tests
 class StubCalendar:
     def __init__(self, busy_intervals=None):
         self.enabled = True
@@ -28,7 +28,7 @@ class StubCalendar:
 def with_stub_calendar(monkeypatch, intervals):
     from ops_integrations.adapters import phone as phone_mod
     stub = StubCalendar(intervals)
-    monkeypatch.setattr(phone_mod, "CalendarAdapter", lambda: stub, raising=True)
+    monkeypatch.setattr(phone_mod, "get_calendar_adapter", lambda: stub, raising=True)
     return phone_mod
 
 
@@ -0,0 +1,415 @@
+import random
+
+from ops_integrations.services.plumbing_services import (
+    EXCLUSION_RULES,
+    SERVICE_CATEGORIES,
+    SERVICE_KEYWORDS,
+    detect_sentence_boundaries,
+    find_service_keyword_hits,
+    infer_job_type_from_text,
+    infer_multiple_job_types_from_text,
+)
+from ops_integrations.tests.stress_test_intent import MULTI_INTENT_TESTS, SINGLE_INTENT_TESTS
+
+
+# Verbatim copies of the nested-loop implementations the automaton replaced.
+
+def legacy_infer_job_type_from_text(text):
+    """Infer job type from text using keyword matching with first-mentioned priority."""
+    # Normalize text - handle tabs, newlines, and extra whitespace
+    text_lower = text.lower().replace('\t', ' ').replace('\n', ' ')
+    text_lower = ' '.join(text_lower.split())  # Normalize whitespace
+    
+    # Track all matches with their positions
+    matches = []
+    
+    # Check all services and record match positions
+    for service_type, keywords in SERVICE_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                # Find the position of the first occurrence
+                position = text_lower.find(keyword)
+                matches.append((position, service_type, keyword))
+                break  # Only record first match per service type
+    
+    if not matches:
+        return None
+    
+    # Sort by position (first mentioned first) and then by specificity
+    matches.sort(key=lambda x: x[0])
+    
+    # Get the first mentioned service
+    first_position, first_service, first_keyword = matches[0]
+    
+    # Additional logic: if the first match is a general category, 
+    # check if there's a more specific match that comes soon after
+    general_categories = {"sewer_cam", "water_heater", "leak", "clog", "gas_line", "install"}
+    
+    if first_service in general_categories:
+        # Look for more specific matches within the first 50 characters
+        for position, service, keyword in matches[1:]:
+            if position - first_position <= 50 and service not in general_categories:
+                return service
+    
+    # Special handling for "sink" - if it's just "sink" without context, prefer kitchen sink
+    if first_service == "clogged_kitchen_sink" and first_keyword == "sink":
+        # Check if there are other sink-related matches that might be more specific
+        for position, service, keyword in matches[1:]:
+            if service in ["clogged_bathroom_sink", "clogged_shower_tub"] and position - first_position <= 30:
+                return service
+    
+    return first_service
+
+def legacy_infer_multiple_job_types_from_text(text):
+    """
+    Infer multiple job types from text with balanced accuracy improvements.
+    
+    Features:
+    - Service Priority Hierarchy: Specific services suppress generic ones
+    - Max 1 Secondary Intent: Reduces over-detection 
+    - Improved NLP: Better sentence boundary detection
+    - Conservative BERT Semantic Analysis: Only supplements keyword matching with high confidence
+    - Simple but effective scoring system
+    
+    Returns:
+        dict: {
+            'primary': str,  # Primary job type (most specific and relevant)
+            'secondary': list,  # List of secondary job types (max 1)
+            'description_suffix': str  # Formatted description of secondary intents
+        }
+    """
+    # Normalize text
+    text_lower = text.lower().replace('\t', ' ').replace('\n', ' ')
+    text_lower = ' '.join(text_lower.split())
+    
+    # Define service hierarchy (higher = more specific, will suppress lower levels)
+    service_hierarchy = {
+        # Level 5: Most specific services - these suppress all lower levels
+        "clogged_kitchen_sink": 5, "clogged_bathroom_sink": 5, "clogged_shower_tub": 5,
+        "clogged_floor_drain": 5, "clogged_toilet": 5, "main_sewer_backup": 5,
+        "leaky_faucet": 5, "faucet_replacement": 5, "faucet_cartridge": 5,
+        "kitchen_faucet_replacement": 5, "bathroom_faucet_replacement": 5, "kitchen_faucet_repair": 5,
+        "bathroom_faucet_repair": 5, "kitchen_faucet_leak": 5, "bathroom_faucet_leak": 5,
+        "toilet_leak": 5, "toilet_replacement": 5, "running_toilet": 5,
+        "leak_detection": 5, "slab_leak_repair": 5, "burst_pipe": 5,
+        "water_heater_repair": 5, "water_heater_install": 5, "tankless_water_heater": 5,
+        "sump_pump_install": 5, "sump_pump_repair": 5, "gas_line_leak": 5,
+        "gas_line_install": 5, "dishwasher_hookup": 5, "washing_machine_hookup": 5,
+        "hose_bib": 5, "shower_valve": 5, "mixing_valve": 5, "bathtub_install": 5,
+        "faucet_aerator": 5, "drain_tile": 5, "trenchless_sewer": 5, "camera_inspection": 5,
+        "grease_trap": 5, "commercial_restroom": 5, "commercial_backflow": 5,
+        "emergency_shutoff": 5, "emergency_leak": 5, "hydrostatic_test": 5,
+        "water_line": 5, "drain_snaking": 5, "hydro_jetting": 5, "showerhead_replacement": 5,
+        "toilet_flange": 5, "toilet_seal": 5, "pipe_thawing": 5, "re_piping": 5,
+        "whole_house_re_piping": 5, "water_pressure_adjustment": 5, "pressure_reducing_valve": 5,
+        "pressure_relief_valve": 5, "water_heater_expansion": 5, "water_heater_flush": 5,
+        "water_softener": 5, "water_filtration": 5, "backflow_prevention": 5,
+        "sewage_ejector": 5, "well_pump": 5, "well_pressure_tank": 5, "ice_maker_line": 5,
+        "garbage_disposal": 5,
+        
+        # Level 3: Medium specific services
+        "water_heater": 3, "sewer_cam": 3,
+        
+        # Level 2: General categories (suppressed by specific services)
+        "leak": 2, "clog": 2, "gas_line": 2,
+        
+        # Level 1: Most general (heavily suppressed)
+        "install": 1
+    }
+    
+    # Use improved sentence boundary detection
+    sentences = detect_sentence_boundaries(text_lower)
+    
+    # Find all matches with position, sentence context, and hierarchy level
+    all_matches = []
+    
+    # First, do keyword-based matching (primary method)
+    for sentence_idx, sentence in enumerate(sentences):
+        for service_type, keywords in SERVICE_KEYWORDS.items():
+            for keyword in keywords:
+                if keyword in sentence:
+                    position = text_lower.find(keyword)
+                    hierarchy_level = service_hierarchy.get(service_type, 2)
+                    
+                    # Calculate proximity score (keywords closer together = higher relevance)
+                    proximity_score = len(sentence) - len(keyword)  # Shorter sentence = higher relevance
+                    
+                    match_data = {
+                        'position': position,
+                        'service': service_type,
+                        'keyword': keyword,
+                        'hierarchy': hierarchy_level,
+                        'sentence_idx': sentence_idx,
+                        'sentence': sentence,
+                        'proximity_score': proximity_score,
+                        'match_type': 'keyword',
+                        'confidence': 1.0  # High confidence for keyword matches
+                    }
+                    
+                    all_matches.append(match_data)
+                    break  # Only record first match per service type
+    
+    # BERT semantic matching disabled to eliminate batch processing overhead
+    # System now relies entirely on keyword-based matching which is fast and effective
+    
+    if not all_matches:
+        return {
+            'primary': None,
+            'secondary': [],
+            'description_suffix': ''
+        }
+    
+    # Apply Service Priority Hierarchy - specific services suppress generic ones
+    filtered_matches = []
+    services_by_hierarchy = {}
+    
+    # Group by hierarchy level
+    for match in all_matches:
+        level = match['hierarchy']
+        if level not in services_by_hierarchy:
+            services_by_hierarchy[level] = []
+        services_by_hierarchy[level].append(match)
+    
+    # Start with highest hierarchy level and work down
+    for level in sorted(services_by_hierarchy.keys(), reverse=True):
+        level_matches = services_by_hierarchy[level]
+        
+        # If we have high-level matches, suppress lower levels in same categories
+        if level >= 4:  # Specific services
+            for match in level_matches:
+                # Check if this specific service should suppress generic ones
+                should_add = True
+                service_category = None
+                
+                # Find which category this service belongs to
+                for cat_name, cat_services in SERVICE_CATEGORIES.items():
+                    if match['service'] in cat_services:
+                        service_category = cat_name
+                        break
+                
+                # Remove any lower-level services in the same category
+                if service_category:
+                    filtered_matches = [m for m in filtered_matches 
+                                      if not (m['hierarchy'] < level and 
+                                            any(m['service'] in cat_services for cat_services in SERVICE_CATEGORIES.values() 
+                                               if match['service'] in cat_services))]
+                
+                if should_add:
+                    filtered_matches.append(match)
+        else:
+            # For lower-level services, only add if no higher-level service exists
+            for match in level_matches:
+                conflicts_with_higher = False
+                service_category = None
+                
+                # Find category
+                for cat_name, cat_services in SERVICE_CATEGORIES.items():
+                    if match['service'] in cat_services:
+                        service_category = cat_name
+                        break
+                
+                # Check if higher-level service exists in same category
+                if service_category:
+                    for existing_match in filtered_matches:
+                        if existing_match['hierarchy'] > level:
+                            for cat_services in SERVICE_CATEGORIES.values():
+                                if (match['service'] in cat_services and 
+                                    existing_match['service'] in cat_services):
+                                    conflicts_with_higher = True
+                                    break
+                            if conflicts_with_higher:
+                                break
+                
+                if not conflicts_with_higher:
+                    filtered_matches.append(match)
+    
+    # Apply Exclusion Rules - remove generic services when specific ones are detected
+    specific_services_detected = [m['service'] for m in filtered_matches if m['hierarchy'] >= 4]
+    
+    if specific_services_detected:
+        # Build list of services to exclude
+        services_to_exclude = set()
+        for specific_service in specific_services_detected:
+            if specific_service in EXCLUSION_RULES:
+                for excluded_service in EXCLUSION_RULES[specific_service]:
+                    services_to_exclude.add(excluded_service)
+        
+        # Filter out excluded services
+        filtered_matches = [m for m in filtered_matches if m['service'] not in services_to_exclude]
+    
+    # Remove duplicates by service name
+    unique_matches = {}
+    for match in filtered_matches:
+        service = match['service']
+        if service not in unique_matches:
+            unique_matches[service] = match
+        else:
+            # Keep the one with better position/proximity/semantic score
+            existing = unique_matches[service]
+            existing_score = existing.get('semantic_score', 0)
+            match_score = match.get('semantic_score', 0)
+            
+            # Prioritize keyword matches over semantic matches
+            if (match['match_type'] == 'keyword' and existing['match_type'] == 'semantic'):
+                unique_matches[service] = match
+            elif (match['match_type'] == 'semantic' and existing['match_type'] == 'keyword'):
+                pass  # Keep existing keyword match
+            elif (match['hierarchy'] > existing['hierarchy'] or 
+                (match['hierarchy'] == existing['hierarchy'] and match_score > existing_score) or
+                (match['hierarchy'] == existing['hierarchy'] and match_score == existing_score and match['position'] < existing['position'])):
+                unique_matches[service] = match
+    
+    final_matches = list(unique_matches.values())
+    
+    # Sort by position and hierarchy for primary selection
+    # Prioritize keyword matches over semantic matches
+    final_matches.sort(key=lambda x: (x['match_type'] != 'keyword', x['position'], -x['hierarchy'], -x.get('semantic_score', 0)))
+    
+    # Additional check: if the first match is generic and there's a specific service very close by, prefer the specific one
+    if len(final_matches) > 1:
+        first_match = final_matches[0]
+        if first_match['hierarchy'] <= 2:  # If first is generic
+            # Look for more specific matches within 20 characters
+            for match in final_matches[1:]:
+                if (match['hierarchy'] >= 4 and  # Is specific
+                    abs(match['position'] - first_match['position']) <= 20):  # Is close
+                    # Swap to prefer specific service
+                    final_matches[0], final_matches[final_matches.index(match)] = match, first_match
+                    break
+    
+    if len(final_matches) == 0:
+        return {
+            'primary': None,
+            'secondary': [],
+            'description_suffix': ''
+        }
+    
+    # Select primary (first mentioned with highest hierarchy)
+    primary_service = final_matches[0]['service']
+    
+    # Select secondary services (max 1 to reduce over-detection)
+    secondary_matches = final_matches[1:]
+    
+    # Advanced filtering for secondary services using NLP proximity
+    filtered_secondary = []
+    
+    for match in secondary_matches:
+        if len(filtered_secondary) >= 1:  # Max 1 secondary intent
+            break
+            
+        # Check if this secondary service is truly distinct from primary
+        is_distinct = True
+        
+        # Check sentence proximity - if in same sentence as primary, might be description of same issue
+        primary_sentence = final_matches[0]['sentence_idx']
+        if match['sentence_idx'] == primary_sentence and match['hierarchy'] <= 2:
+            # If in same sentence and low hierarchy, might be describing same issue
+            is_distinct = False
+        
+        # Check category overlap - don't add if same category as primary unless both high hierarchy
+        primary_category = None
+        match_category = None
+        
+        for cat_name, cat_services in SERVICE_CATEGORIES.items():
+            if primary_service in cat_services:
+                primary_category = cat_name
+            if match['service'] in cat_services:
+                match_category = cat_name
+        
+        if (primary_category == match_category and 
+            match_category is not None and 
+            match['hierarchy'] <= 3):
+            is_distinct = False
+        
+        # Additional exclusion check - don't add if excluded by primary service
+        if (primary_service in EXCLUSION_RULES and 
+            match['service'] in EXCLUSION_RULES[primary_service]):
+            is_distinct = False
+        
+        # Additional check: if primary and secondary are very similar, don't add secondary
+        if (primary_service in ['kitchen_faucet_leak', 'bathroom_faucet_leak'] and 
+            match['service'] in ['kitchen_faucet_leak', 'bathroom_faucet_leak']):
+            is_distinct = False
+        
+        if (primary_service in ['kitchen_faucet_repair', 'bathroom_faucet_repair'] and 
+            match['service'] in ['kitchen_faucet_repair', 'bathroom_faucet_repair']):
+            is_distinct = False
+        
+        if (primary_service in ['kitchen_faucet_replacement', 'bathroom_faucet_replacement'] and 
+            match['service'] in ['kitchen_faucet_replacement', 'bathroom_faucet_replacement']):
+            is_distinct = False
+        
+        # Additional strict filtering for similar services
+        if (primary_service in ['water_heater_repair', 'water_heater_expansion'] and 
+            match['service'] in ['water_heater_repair', 'water_heater_expansion']):
+            is_distinct = False
+        
+        if (primary_service in ['sump_pump_repair', 'sump_pump_install'] and 
+            match['service'] in ['sump_pump_repair', 'sump_pump_install']):
+            is_distinct = False
+        
+        if (primary_service in ['shower_valve', 'mixing_valve'] and 
+            match['service'] in ['shower_valve', 'mixing_valve']):
+            is_distinct = False
+        
+        if (primary_service in ['pressure_reducing_valve', 'pressure_relief_valve'] and 
+            match['service'] in ['pressure_reducing_valve', 'pressure_relief_valve']):
+            is_distinct = False
+        
+        # Check if the secondary service is too generic compared to primary
+        if (match['hierarchy'] <= 2 and primary_service in ['water_heater_repair', 'water_heater_expansion', 
+                                                           'kitchen_faucet_leak', 'bathroom_faucet_replacement',
+                                                           'sump_pump_repair', 'tankless_water_heater']):
+            is_distinct = False
+        
+        if is_distinct:
+            filtered_secondary.append(match['service'])
+    
+    # Format description suffix
+    if len(filtered_secondary) == 0:
+        description_suffix = ''
+    else:
+        description_suffix = f"Also detected: {filtered_secondary[0]}"
+    
+    return {
+        'primary': primary_service,
+        'secondary': filtered_secondary,
+        'description_suffix': description_suffix
+    }
+
+
+FILLER = ["my", "the", "and", "also", "but", "is", "was", "really", "upstairs", "since", "yesterday",
+          "please", "leaking", "clogged", ",", ".", "while", "plus", "along with", "we", "need"]
+
+
+def corpus():
+    rng = random.Random(31)
+    keywords = [keyword for keywords in SERVICE_KEYWORDS.values() for keyword in keywords]
+    texts = [case["text"] for case in MULTI_INTENT_TESTS + SINGLE_INTENT_TESTS]
+    texts += ["", "   ", "hello there", "SINK", "my\tkitchen\nsink", "leakleak", "toilets and sinks"]
+    for _ in range(400):
+        words = [rng.choice(keywords) if rng.random() < 0.35 else rng.choice(FILLER)
+                 for _ in range(rng.randint(1, 18))]
+        texts.append(" ".join(words))
+    return texts
+
+
+def test_job_type_matches_legacy():
+    for text in corpus():
+        assert infer_job_type_from_text(text) == legacy_infer_job_type_from_text(text), text
+
+
+def test_multiple_job_types_match_legacy():
+    for text in corpus():
+        assert infer_multiple_job_types_from_text(text) == legacy_infer_multiple_job_types_from_text(text), text
+
+
+def test_keyword_hits_report_positions_and_word_boundaries():
+    hits = find_service_keyword_hits("The kitchen sink clogged and is leaking")
+    assert (4, "clogged_kitchen_sink", "kitchen sink clogged") in hits
+    assert [h[0] for h in hits] == sorted(h[0] for h in hits)
+
+    substring = {keyword for _, _, keyword in find_service_keyword_hits("leaking pipes")}
+    whole = {keyword for _, _, keyword in find_service_keyword_hits("leaking pipes", whole_words=True)}
+    assert "leak" in substring
+    assert "leak" not in whole
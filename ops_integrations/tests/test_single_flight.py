@@ -0,0 +1,71 @@
+import asyncio
+
+from ops_integrations.services.single_flight import SingleFlight
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_concurrent_requesters_share_one_execution():
+    flights = SingleFlight()
+    executions = []
+
+    async def work():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return "CLOG_BLOCKAGE", 0.9
+
+    async def scenario():
+        key = ("CA1", "kitchen sink is clogged", "classify")
+        return await asyncio.gather(*(flights.do(key, work) for _ in range(5)))
+
+    results = run(scenario())
+    assert executions == [1]
+    assert all(result == ("CLOG_BLOCKAGE", 0.9) for result in results)
+    assert flights.stats()["coalesced"] == 4
+
+
+def test_submit_claims_key_before_first_await():
+    flights = SingleFlight()
+
+    async def scenario():
+        future = flights.submit(("CA1", "yes", "classify"), lambda: asyncio.sleep(0, result="dialog"))
+        joined = await flights.do(("CA1", "yes", "classify"), lambda: asyncio.sleep(0, result="broadcast"))
+        return await future, joined
+
+    assert run(scenario()) == ("dialog", "dialog")
+
+
+def test_retained_results_and_forget():
+    flights = SingleFlight(result_ttl_seconds=30.0)
+
+    async def scenario():
+        first = await flights.do(("CA1", "no", "classify"), lambda: asyncio.sleep(0, result=1))
+        second = await flights.do(("CA1", "no", "classify"), lambda: asyncio.sleep(0, result=2))
+        flights.forget("CA1")
+        third = await flights.do(("CA1", "no", "classify"), lambda: asyncio.sleep(0, result=3))
+        return first, second, third
+
+    assert run(scenario()) == (1, 1, 3)
+    assert flights.stats()["reused"] == 1
+
+
+def test_failures_are_not_retained():
+    flights = SingleFlight(result_ttl_seconds=30.0)
+
+    async def boom():
+        raise RuntimeError("timeout")
+
+    async def scenario():
+        try:
+            await flights.do("key", boom)
+        except RuntimeError:
+            pass
+        return await flights.do("key", lambda: asyncio.sleep(0, result="ok"))
+
+    assert run(scenario()) == "ok"
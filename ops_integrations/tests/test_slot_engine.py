@@ -0,0 +1,84 @@
+import random
+from datetime import datetime, timedelta
+
+from ops_integrations.services.slot_engine import BusyIndex, ceil_to_step
+from ops_integrations.tests.test_scheduling_rules import StubCalendar
+
+
+class CountingCalendar(StubCalendar):
+    def __init__(self, busy_intervals=None):
+        super().__init__(busy_intervals)
+        self.requests = 0
+
+    def get_events(self, start_date=None, end_date=None, max_results=100):
+        self.requests += 1
+        return super().get_events(start_date, end_date, max_results)
+
+
+# The per-candidate scan find_next_compliant_slot used before the index: one get_events per 15 minutes.
+def legacy_find_next_compliant_slot(phone_mod, cal, start, duration_minutes=120, search_horizon_hours=72):
+    horizon_end = start + timedelta(hours=search_horizon_hours)
+    candidate = start
+    while candidate <= horizon_end:
+        if phone_mod._is_slot_free_with_buffer(candidate, duration_minutes=duration_minutes, buffer_minutes=60,
+                                               calendar=cal):
+            return candidate
+        candidate += timedelta(minutes=15)
+    return start
+
+
+def random_calendar(rng, base):
+    intervals = []
+    cursor = base - timedelta(hours=3)
+    for _ in range(rng.randint(0, 25)):
+        cursor += timedelta(minutes=rng.choice([0, 10, 30, 45, 90, 200]))
+        length = timedelta(minutes=rng.choice([15, 30, 60, 120, 180, 7]))
+        intervals.append((cursor, cursor + length))
+        cursor += length
+    return intervals
+
+
+def test_busy_index_merges_and_binary_searches():
+    t0 = datetime(2025, 9, 10, 9, 0)
+    index = BusyIndex([(t0, t0 + timedelta(hours=1)), (t0 + timedelta(minutes=30), t0 + timedelta(hours=2)),
+                       (t0 + timedelta(hours=5), t0 + timedelta(hours=6))])
+    assert len(index) == 2
+    assert not index.is_free(t0 + timedelta(minutes=90), t0 + timedelta(hours=3))
+    assert index.is_free(t0 + timedelta(hours=2), t0 + timedelta(hours=5))
+    assert not index.is_free(t0 - timedelta(hours=1), t0 + timedelta(minutes=1))
+
+
+def test_find_free_slots_returns_non_overlapping_alternatives():
+    t0 = datetime(2025, 9, 10, 9, 0)
+    index = BusyIndex([(t0 + timedelta(hours=3), t0 + timedelta(hours=4))])
+    slots = index.find_free_slots(t0, t0 + timedelta(hours=24), duration_minutes=120, buffer_minutes=60, count=3)
+    # 9:00 fits (11:00 + 1h buffer touches the 12:00 event exactly); the next one starts after 13:00 + 1h buffer
+    assert slots == [t0, t0 + timedelta(hours=5), t0 + timedelta(hours=7)]
+
+
+def test_matches_per_candidate_scan_with_one_request(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    rng = random.Random(37)
+    base = ceil_to_step(datetime.now() + timedelta(days=1))
+    for _ in range(60):
+        intervals = random_calendar(rng, base)
+        start = base + timedelta(minutes=15 * rng.randint(0, 16))
+        cal = CountingCalendar(intervals)
+        monkeypatch.setattr(phone_mod, "get_calendar_adapter", lambda: cal, raising=True)
+
+        expected = legacy_find_next_compliant_slot(phone_mod, cal, start, search_horizon_hours=12)
+        cal.requests = 0
+        assert phone_mod.find_next_compliant_slot(start, search_horizon_hours=12) == expected
+        assert cal.requests == 1
+
+
+def test_find_compliant_slots_offers_alternatives(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    base = ceil_to_step(datetime.now() + timedelta(days=1))
+    cal = CountingCalendar([(base + timedelta(hours=1), base + timedelta(hours=2))])
+    monkeypatch.setattr(phone_mod, "get_calendar_adapter", lambda: cal, raising=True)
+    slots = phone_mod.find_compliant_slots(base, count=3)
+    assert cal.requests == 1
+    assert slots[0] == base + timedelta(hours=3)
+    assert all(b - a >= timedelta(hours=2) for a, b in zip(slots, slots[1:]))
+    assert len(slots) == 3
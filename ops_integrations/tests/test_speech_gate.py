@@ -6,7 +6,11 @@ Test speech gate functionality to ensure faster listening after TTS.
 import sys
 import os
 import asyncio
+import json
 import time
+
+import pytest
+from twilio.twiml.voice_response import VoiceResponse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Add the project root to the path
@@ -67,6 +71,136 @@ def test_speech_gate_timing():
         print("❌ Speech gate still active - listening may be delayed")
         return False
 
+# One 128 kbps / 44.1 kHz MPEG-1 Layer III frame: 1152 samples, ~26 ms
+MP3_FRAME = bytes.fromhex("FFFB9064") + b"\x00" * 413
+LONG_PROMPT = ("Thanks for the details, I have a technician available tomorrow morning between eight and ten, "
+               "does that window work for you or would you prefer a later time in the afternoon?")
+
+
+class _StreamSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+@pytest.fixture
+def gated_phone(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    from ops_integrations.services.speech_gate import SpeechGateStats
+    from ops_integrations.services.tts_cache import TTSAudioCache
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=1024 * 1024))
+    monkeypatch.setattr(phone_mod, "speech_gate_stats", SpeechGateStats())
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    monkeypatch.setattr(phone_mod.settings, "FORCE_SAY_ONLY", False)
+    monkeypatch.setattr(phone_mod.settings, "SPEECH_GATE_BUFFER_SEC", 0.05)
+    monkeypatch.setattr(phone_mod.settings, "SPEECH_GATE_MARK_TAIL_SEC", 0.05)
+    monkeypatch.setattr(phone_mod, "_tts_chunks", lambda *args: iter([MP3_FRAME * 20]))  # ~0.52 s
+    monkeypatch.setattr(phone_mod, "_tts_mulaw_chunks", lambda *args: iter([b"\x7f" * 1600]))  # 0.2 s
+
+    async def no_rest_push(call_sid, response):
+        return True
+
+    monkeypatch.setattr(phone_mod, "_push_twiml_rest", no_rest_push)
+    yield phone_mod
+    phone_mod.manager.active_connections.pop("CA_GATE", None)
+    phone_mod._close_media_player("CA_GATE")
+    for store in (phone_mod.vad_states, phone_mod.pending_gate_clips, phone_mod.tts_audio_store,
+                  phone_mod.tts_version_counter):
+        store.pop("CA_GATE", None)
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_twiml_prompt_gate_lasts_for_the_decoded_audio_not_the_word_count(gated_phone):
+    phone = gated_phone
+
+    async def scenario():
+        twiml = VoiceResponse()
+        await phone.add_tts_or_say_to_twiml(twiml, "CA_GATE", LONG_PROMPT)
+        # Nothing is playing until the TwiML is delivered
+        assert not phone.vad_states["CA_GATE"].get("speech_gate_active")
+        await phone.push_twiml_to_call("CA_GATE", twiml)
+        await asyncio.sleep(0.3)
+        during = phone.vad_states["CA_GATE"]["speech_gate_active"]
+        await asyncio.sleep(0.5)
+        return during, phone.vad_states["CA_GATE"]["speech_gate_active"]
+
+    during, after = _run(scenario())
+    assert during and not after  # the word estimate alone would have kept it closed ~10 s
+    stats = phone.speech_gate_stats.stats()
+    assert stats["duration"] == 1 and stats["undershoot_turns"] == 0
+    assert 0.0 <= stats["overshootP50"] < 0.15
+    assert stats["wordEstimateAbsErrorP50"] > 5
+
+
+def test_media_stream_gate_opens_on_the_playback_mark(gated_phone, monkeypatch):
+    phone = gated_phone
+    monkeypatch.setattr(phone.settings, "MEDIA_STREAM_PLAYBACK", True)
+    monkeypatch.setattr(phone.settings, "SPEECH_GATE_BUFFER_SEC", 0.5)
+    socket = _StreamSocket()
+
+    async def scenario():
+        phone.manager.active_connections["CA_GATE"] = socket
+        await phone.handle_media_packet("CA_GATE", json.dumps({"event": "start", "streamSid": "MZ_GATE"}))
+        twiml = VoiceResponse()
+        await phone.add_tts_or_say_to_twiml(twiml, "CA_GATE", LONG_PROMPT)
+        phone.append_stream_resume(twiml, "CA_GATE")
+        await phone.push_twiml_to_call("CA_GATE", twiml)
+        while not any(m["event"] == "mark" for m in socket.sent):
+            await asyncio.sleep(0.01)
+        # Twilio is still playing the last frames
+        await asyncio.sleep(0.05)
+        assert phone.vad_states["CA_GATE"]["speech_gate_active"]
+        mark = [m for m in socket.sent if m["event"] == "mark"][0]["mark"]["name"]
+        await phone.handle_media_packet("CA_GATE", json.dumps({"event": "mark", "mark": {"name": mark}}))
+        assert phone.vad_states["CA_GATE"]["speech_gate_active"]  # echo tail
+        await asyncio.sleep(0.1)
+        phone._close_media_player("CA_GATE")
+        return phone.vad_states["CA_GATE"]["speech_gate_active"]
+
+    assert _run(scenario()) is False
+    stats = phone.speech_gate_stats.stats()
+    assert stats["mark"] == 1 and stats["undershoot_turns"] == 0
+    assert 0.04 <= stats["overshootP50"] < 0.1
+
+
+def test_overdue_mark_opens_the_gate_and_counts_the_undershoot(gated_phone, monkeypatch):
+    phone = gated_phone
+    monkeypatch.setattr(phone.settings, "MEDIA_STREAM_PLAYBACK", True)
+    socket = _StreamSocket()
+
+    async def scenario():
+        phone.manager.active_connections["CA_GATE"] = socket
+        await phone.handle_media_packet("CA_GATE", json.dumps({"event": "start", "streamSid": "MZ_GATE"}))
+        twiml = VoiceResponse()
+        await phone.add_tts_or_say_to_twiml(twiml, "CA_GATE", "One moment.")
+        phone.append_stream_resume(twiml, "CA_GATE")
+        await phone.push_twiml_to_call("CA_GATE", twiml)
+        while not any(m["event"] == "mark" for m in socket.sent):
+            await asyncio.sleep(0.01)
+        while phone.vad_states["CA_GATE"]["speech_gate_active"]:
+            await asyncio.sleep(0.01)
+        # Twilio was slow: the mark arrives after the gate gave up waiting
+        await asyncio.sleep(0.1)
+        mark = [m for m in socket.sent if m["event"] == "mark"][0]["mark"]["name"]
+        await phone.handle_media_packet("CA_GATE", json.dumps({"event": "mark", "mark": {"name": mark}}))
+        await asyncio.sleep(0.01)
+        phone._close_media_player("CA_GATE")
+
+    _run(scenario())
+    stats = phone.speech_gate_stats.stats()
+    assert stats["timeout"] == 1 and stats["undershoot_turns"] == 1
+    assert stats["undershootMax"] >= 0.09
+
+
 if __name__ == "__main__":
     success = test_speech_gate_timing()
     sys.exit(0 if success else 1) 
\ No newline at end of file
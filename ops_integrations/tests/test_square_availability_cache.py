@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ops_integrations.square import salon_booking_integration
+from ops_integrations.square.config import SquareConfig
+from ops_integrations.square.services import availability_cache
+from ops_integrations.square.services.availability_cache import AvailabilityCache
+from ops_integrations.square.services.bookings import BookingsService
+
+NOW = datetime(2025, 9, 10, 6, 0)
+LOCATION = "L1"
+CUT = "var-cut"
+COLOR = "var-color"
+
+
+def iso(dt):
+    return dt.isoformat() + "Z"
+
+
+class FakeClient:
+    """Square client answering availability searches with hourly slots for two team members."""
+
+    def __init__(self):
+        self.searches = []
+        self.booked = set()  # (team member, start)
+
+    def post(self, endpoint, data=None):
+        assert endpoint == "/v2/bookings/availability/search"
+        window = data["query"]["filter"]["start_at_range"]
+        variation = data["query"]["filter"]["segment_filters"][0]["service_variation_id"]
+        start = datetime.fromisoformat(window["start_at"].rstrip("Z"))
+        end = datetime.fromisoformat(window["end_at"].rstrip("Z"))
+        self.searches.append((variation, start, end))
+        slots = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            for hour in range(9, 17):
+                for member in ("tm1", "tm2"):
+                    slot = day.replace(hour=hour)
+                    if start <= slot < end and (member, slot) not in self.booked:
+                        slots.append({
+                            "start_at": iso(slot),
+                            "location_id": LOCATION,
+                            "appointment_segments": [{"duration_minutes": 60, "team_member_id": member,
+                                                      "service_variation_id": variation}],
+                        })
+            day += timedelta(days=1)
+        return {"availabilities": slots}
+
+
+@pytest.fixture
+def service():
+    bookings = BookingsService(FakeClient())
+    bookings.availability_cache = AvailabilityCache(bookings, prefetch_days=7)
+    return bookings
+
+
+def booking(booking_id, start, member="tm1", status="ACCEPTED"):
+    return {"id": booking_id, "location_id": LOCATION, "start_at": iso(start), "status": status,
+            "appointment_segments": [{"duration_minutes": 60, "team_member_id": member}]}
+
+
+def test_prefetch_searches_once_per_pair_and_lookups_stay_in_memory(service):
+    cache, client = service.availability_cache, service.client
+    cache.track(LOCATION, CUT)
+    cache.track(LOCATION, COLOR)
+    assert cache.prefetch(now=NOW) == 2
+    assert [(v, end - start) for v, start, end in client.searches] == \
+        [(CUT, timedelta(days=7, hours=-6)), (COLOR, timedelta(days=7, hours=-6))]
+    client.searches.clear()
+
+    tomorrow_ten = NOW.replace(hour=10) + timedelta(days=1)
+    assert service.check_availability_for_time(LOCATION, CUT, tomorrow_ten)
+    assert not service.check_availability_for_time(LOCATION, CUT, tomorrow_ten.replace(hour=20))
+    assert service.check_availability_for_time(LOCATION, COLOR, tomorrow_ten + timedelta(minutes=4),
+                                               team_member_id="tm2")
+    slots = cache.slots(LOCATION, CUT, tomorrow_ten, tomorrow_ten + timedelta(hours=2), team_member_id="tm1")
+    assert [s["start_at"] for s in slots] == [iso(tomorrow_ten), iso(tomorrow_ten + timedelta(hours=1))]
+    assert client.searches == []
+    # Nothing stale yet: another prefetch does no work
+    assert cache.prefetch(now=NOW) == 0
+
+
+def test_uncovered_ranges_fall_back_to_live_search_and_get_tracked(service):
+    cache, client = service.availability_cache, service.client
+    desired = NOW.replace(hour=11) + timedelta(days=2)
+    assert cache.slots(LOCATION, CUT, desired, desired + timedelta(hours=1)) is None
+    assert service.check_availability_for_time(LOCATION, CUT, desired)
+    assert len(client.searches) == 1
+    # The miss tracked the pair; the next prefetch fills it
+    assert cache.prefetch(now=NOW) == 1
+    assert cache.is_available(LOCATION, CUT, desired) is True
+
+
+def test_created_booking_drops_conflicting_slots_and_requeues_the_day(service):
+    cache, client = service.availability_cache, service.client
+    cache.track(LOCATION, CUT)
+    cache.prefetch(now=NOW)
+    client.searches.clear()
+    slot = NOW.replace(hour=13) + timedelta(days=3)
+
+    client.booked.add(("tm1", slot))
+    assert cache.handle_webhook({"type": "booking.created", "data": {"object": {"booking": booking("b1", slot)}}})
+    # tm1 at 13:00 is gone right away, tm2 is still offered
+    members = [s["appointment_segments"][0]["team_member_id"]
+               for s in cache.slots(LOCATION, CUT, slot, slot + timedelta(minutes=1))]
+    assert members == ["tm2"]
+    assert client.searches == []
+    # Only the touched day is refetched, with Square's minimum 24-hour window
+    assert cache.prefetch(now=NOW) == 1
+    (_, start, end), = client.searches
+    assert start == slot.replace(hour=0) and end - start == timedelta(hours=24)
+    assert cache.stats()["webhooks"] == 1 and cache.stats()["slots_dropped"] == 1
+
+
+def test_reschedule_and_cancel_refetch_old_and_new_days(service):
+    cache, client = service.availability_cache, service.client
+    cache.track(LOCATION, CUT)
+    cache.prefetch(now=NOW)
+    first = NOW.replace(hour=9) + timedelta(days=1)
+    moved = first + timedelta(days=2)
+    cache.apply_booking(booking("b2", first))
+    cache.prefetch(now=NOW)
+    client.searches.clear()
+
+    cache.handle_webhook({"type": "booking.updated", "data": {"object": {"booking": booking("b2", moved)}}})
+    assert cache.prefetch(now=NOW) == 2
+    assert sorted(start.date() for _, start, _ in client.searches) == [first.date(), moved.date()]
+
+    client.searches.clear()
+    cache.handle_webhook({"type": "booking.updated",
+                          "data": {"object": {"booking": booking("b2", moved, status="CANCELLED_BY_CUSTOMER")}}})
+    # A cancellation frees time: nothing is dropped, the day is refetched
+    assert cache.is_available(LOCATION, CUT, moved, team_member_id="tm1") is True
+    assert cache.prefetch(now=NOW) == 1
+    assert cache.handle_webhook({"type": "customer.created", "data": {}}) is False
+
+
+def test_bookings_made_here_update_the_cache(service):
+    cache, client = service.availability_cache, service.client
+    cache.track(LOCATION, CUT)
+    cache.prefetch(now=NOW)
+    slot = NOW.replace(hour=15) + timedelta(days=1)
+    client.post = lambda endpoint, data=None: {"booking": {**data["booking"], "id": "b3", "status": "ACCEPTED"}}
+    service.create_booking(LOCATION, "cust", CUT, slot, team_member_id="tm2", duration_minutes=60)
+    remaining = cache.slots(LOCATION, CUT, slot, slot + timedelta(minutes=1))
+    assert [s["appointment_segments"][0]["team_member_id"] for s in remaining] == ["tm1"]
+
+
+def test_salon_manager_alternatives_come_from_the_shared_cache(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setenv("SQUARE_AVAILABILITY_PREFETCH", "false")
+    monkeypatch.setattr(availability_cache, "_shared_cache", None)
+    manager = salon_booking_integration.SalonBookingManager(SquareConfig(access_token="test"))
+    assert salon_booking_integration.SalonBookingManager(SquareConfig(access_token="test")).availability_cache \
+        is manager.availability_cache
+    manager.bookings.client = client
+    manager.availability_cache.track(LOCATION, CUT)
+    manager.availability_cache.prefetch(now=NOW)
+    client.searches.clear()
+
+    preferred = NOW.replace(hour=16) + timedelta(days=1)
+    alternatives = manager.find_alternative_times(LOCATION, CUT, preferred)
+    assert [a["datetime"] for a in alternatives] == [
+        preferred.replace(tzinfo=timezone.utc),
+        preferred.replace(tzinfo=timezone.utc),
+        (preferred + timedelta(hours=17)).replace(tzinfo=timezone.utc),
+        (preferred + timedelta(hours=17)).replace(tzinfo=timezone.utc),
+        (preferred + timedelta(hours=18)).replace(tzinfo=timezone.utc),
+    ]
+    assert client.searches == []
@@ -0,0 +1,86 @@
+import json
+import random
+import re
+
+from ops_integrations.services.transcript_filters import (
+    DEFAULT_FILTERS_PATH,
+    TranscriptFilter,
+    get_transcript_filter,
+)
+from ops_integrations.tests.test_transcription_cleaning import CLEANING_TEST_CASES
+
+
+def load_patterns():
+    with open(DEFAULT_FILTERS_PATH) as f:
+        cfg = json.load(f)
+    return cfg["suppress_patterns"], cfg["remove_patterns"]
+
+
+# The pattern-by-pattern loops clean_and_filter_transcription used before compilation.
+def legacy_should_suppress(text_lower, suppress_patterns):
+    return any(re.search(pattern, text_lower) for pattern in suppress_patterns)
+
+
+def legacy_remove(text, remove_patterns):
+    for pattern in remove_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    return text
+
+
+def corpus(suppress_patterns):
+    rng = random.Random(32)
+    phrases = [p.replace('\\b', '') for p in suppress_patterns if re.fullmatch(r"[a-z\\ ]+", p)]
+    filler = ["my", "sink", "is", "humming", "clicking", "hum_", "the", "static-y", "quieter", "check",
+              "description", "subscribe", "to", "my", "channel", "leak", "please", "echo.", "(beep)",
+              "like", "and", "comment", "tone", "dial", "background", "www", ".com", "example.org"]
+    texts = [case["input"] for case in CLEANING_TEST_CASES]
+    texts += ["", "hum", "humdrum", "a hum.", "_hum", "dial  tone", "Check the description below",
+              "I'd like to comment", "https://x.y/z", "call 555.1234", "10 a.m. tomorrow"]
+    for _ in range(400):
+        words = [rng.choice(phrases) if rng.random() < 0.1 else rng.choice(filler)
+                 for _ in range(rng.randint(1, 14))]
+        texts.append(" ".join(words))
+    return texts
+
+
+def test_compiled_filter_matches_legacy_loops():
+    suppress_patterns, remove_patterns = load_patterns()
+    compiled = TranscriptFilter(suppress_patterns, remove_patterns)
+    for text in corpus(suppress_patterns):
+        text_lower = text.lower()
+        fired = compiled.find_suppression(text_lower)
+        assert (fired is not None) == legacy_should_suppress(text_lower, suppress_patterns), text
+        if fired is None:
+            assert compiled.remove(text) == legacy_remove(text, remove_patterns), text
+        else:
+            assert fired == next(p for p in suppress_patterns if re.search(p, text_lower)), text
+
+
+def test_reports_first_listed_pattern_and_counts_it():
+    compiled = TranscriptFilter([r'https?://[^\s]+', r'\bdial tone\b', r'\bhum\b', 'pissedconsumer'], [])
+    assert compiled.find_suppression("a hum then a dial tone") == r'\bdial tone\b'
+    assert compiled.find_suppression("a hum, see http://x.io") == r'https?://[^\s]+'
+    assert compiled.find_suppression("humming along") is None
+    assert compiled.find_suppression("www.pissedconsumer") == 'pissedconsumer'
+    assert compiled.stats()["fired"] == {r'\bdial tone\b': 1, r'https?://[^\s]+': 1, 'pissedconsumer': 1}
+    assert compiled.stats()["automatonPhrases"] == 3
+
+
+def test_filters_load_from_configured_file(tmp_path):
+    path = tmp_path / "filters.json"
+    path.write_text(json.dumps({"suppress_patterns": [r"\bfoo bar\b"], "remove_patterns": ["baz"]}))
+    compiled = get_transcript_filter(str(path))
+    assert compiled is get_transcript_filter(str(path))
+    assert compiled.find_suppression("a foo bar b") == r"\bfoo bar\b"
+    assert compiled.remove("keep BAZ this") == "keep  this"
+
+    missing = get_transcript_filter(str(tmp_path / "missing.json"))
+    assert missing.find_suppression("anything") is None
+
+
+def test_clean_and_filter_transcription_uses_compiled_filter():
+    from ops_integrations.adapters.phone import clean_and_filter_transcription
+    assert clean_and_filter_transcription("For more information, visit www.FEMA.gov") == ("", True)
+    assert clean_and_filter_transcription("there is a loud hum in the pipes") == ("", True)
+    assert clean_and_filter_transcription("My kitchen sink is clogged") == ("My kitchen sink is clogged", False)
+    assert clean_and_filter_transcription("Check the description my sink leaks") == ("my sink leaks", False)
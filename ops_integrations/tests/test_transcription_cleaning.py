@@ -172,72 +172,74 @@ def remove_repeated_phrases(text: str) -> str:
     
     return result
 
+CLEANING_TEST_CASES = [
+    # FEMA.gov suppression cases
+    {
+        "input": "For more information, visit www.FEMA.gov",
+        "description": "FEMA.gov reference (should be completely suppressed)"
+    },
+    {
+        "input": "My toilet is broken. For more information, visit www.FEMA.gov",
+        "description": "Plumbing issue with FEMA.gov reference (should remove FEMA part)"
+    },
+    {
+        "input": "I need help with plumbing visit www.fema.gov please",
+        "description": "Mixed content with FEMA.gov"
+    },
+    
+    # Repeated phrase cases
+    {
+        "input": "Second, second, second, second",
+        "description": "Repeated word 'second'"
+    },
+    {
+        "input": "The the the problem is in my kitchen",
+        "description": "Repeated word 'the'"
+    },
+    {
+        "input": "Help me help me help me with my sink",
+        "description": "Repeated phrase 'help me'"
+    },
+    {
+        "input": "Can you can you can you come today?",
+        "description": "Repeated phrase 'can you'"
+    },
+    {
+        "input": "My water heater water heater is broken broken broken",
+        "description": "Multiple types of repetition"
+    },
+    
+    # Other suppression patterns
+    {
+        "input": "Thank you for watching this video",
+        "description": "Video artifact (should be suppressed)"
+    },
+    {
+        "input": "Visit www.example.com for details",
+        "description": "Website reference (should be suppressed)"
+    },
+    
+    # Valid content that should pass through
+    {
+        "input": "My kitchen sink is clogged and won't drain",
+        "description": "Valid plumbing issue (should pass through)"
+    },
+    {
+        "input": "I need a plumber to come today for an emergency",
+        "description": "Valid emergency request (should pass through)"
+    },
+    
+    # Mixed cases
+    {
+        "input": "My sink sink is clogged. For more information visit www.FEMA.gov",
+        "description": "Valid issue with repetition and FEMA.gov"
+    }
+]
+
 def test_transcription_cleaning():
     """Test the transcription cleaning functionality with various examples."""
     
-    test_cases = [
-        # FEMA.gov suppression cases
-        {
-            "input": "For more information, visit www.FEMA.gov",
-            "description": "FEMA.gov reference (should be completely suppressed)"
-        },
-        {
-            "input": "My toilet is broken. For more information, visit www.FEMA.gov",
-            "description": "Plumbing issue with FEMA.gov reference (should remove FEMA part)"
-        },
-        {
-            "input": "I need help with plumbing visit www.fema.gov please",
-            "description": "Mixed content with FEMA.gov"
-        },
-        
-        # Repeated phrase cases
-        {
-            "input": "Second, second, second, second",
-            "description": "Repeated word 'second'"
-        },
-        {
-            "input": "The the the problem is in my kitchen",
-            "description": "Repeated word 'the'"
-        },
-        {
-            "input": "Help me help me help me with my sink",
-            "description": "Repeated phrase 'help me'"
-        },
-        {
-            "input": "Can you can you can you come today?",
-            "description": "Repeated phrase 'can you'"
-        },
-        {
-            "input": "My water heater water heater is broken broken broken",
-            "description": "Multiple types of repetition"
-        },
-        
-        # Other suppression patterns
-        {
-            "input": "Thank you for watching this video",
-            "description": "Video artifact (should be suppressed)"
-        },
-        {
-            "input": "Visit www.example.com for details",
-            "description": "Website reference (should be suppressed)"
-        },
-        
-        # Valid content that should pass through
-        {
-            "input": "My kitchen sink is clogged and won't drain",
-            "description": "Valid plumbing issue (should pass through)"
-        },
-        {
-            "input": "I need a plumber to come today for an emergency",
-            "description": "Valid emergency request (should pass through)"
-        },
-        
-        # Mixed cases
-        {
-            "input": "My sink sink is clogged. For more information visit www.FEMA.gov",
-            "description": "Valid issue with repetition and FEMA.gov"
-        }
-    ]
+    test_cases = CLEANING_TEST_CASES
     
     print("=" * 80)
     print("TRANSCRIPTION CLEANING TEST RESULTS")
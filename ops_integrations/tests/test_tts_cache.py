@@ -0,0 +1,182 @@
+import asyncio
+import os
+import time
+
+import pytest
+from starlette.testclient import TestClient
+from twilio.twiml.voice_response import VoiceResponse
+
+from ops_integrations.adapters.tts_manager import TTSManager
+from ops_integrations.services.tts_cache import TTSAudioCache, is_tts_cache_key, tts_cache_key
+
+
+def test_key_covers_every_voice_setting():
+    key = tts_cache_key("What's your name?", "openai", "alloy", "tts-1", 1.25)
+    assert is_tts_cache_key(key)
+    assert key == tts_cache_key("What's your name?", "openai", "alloy", "tts-1", 1.25)
+    assert len({
+        key,
+        tts_cache_key("What's your name?", "openai", "alloy", "tts-1", 1.0),
+        tts_cache_key("What's your name?", "openai", "nova", "tts-1", 1.25),
+        tts_cache_key("What's your name?", "openai", "alloy", "tts-1-hd", 1.25),
+        tts_cache_key("What's your name?", "elevenlabs", "alloy", "tts-1", 1.25),
+        tts_cache_key("What is your name?", "openai", "alloy", "tts-1", 1.25),
+    }) == 6
+
+
+def test_memory_tier_evicts_least_recently_used_bytes():
+    cache = TTSAudioCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")  # 12 bytes: "b" is the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    stats = cache.stats()
+    assert stats["bytes"] == 8 and stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_disk_tier_survives_restart_and_keeps_its_budget(tmp_path):
+    keys = [tts_cache_key(f"prompt {i}", "openai", "alloy", "tts-1", 1.25) for i in range(3)]
+    first = TTSAudioCache(max_bytes=1024, disk_dir=str(tmp_path), max_disk_bytes=10)
+    first.put(keys[0], b"00000")
+    first.put(keys[1], b"11111")
+    assert os.path.exists(tmp_path / keys[0][:2] / f"{keys[0]}.mp3")
+
+    restarted = TTSAudioCache(max_bytes=1024, disk_dir=str(tmp_path), max_disk_bytes=10)
+    assert restarted.stats()["disk_entries"] == 2
+    assert restarted.get(keys[1]) == b"11111"
+    assert restarted.stats()["disk_hits"] == 1
+    # Over the disk budget: the file used least recently goes
+    restarted.put(keys[2], b"22222")
+    assert not restarted.contains(keys[0])
+    assert not os.path.exists(tmp_path / keys[0][:2] / f"{keys[0]}.mp3")
+    assert restarted.stats()["disk_bytes"] == 10
+
+
+def test_mulaw_clips_are_stored_under_their_own_suffix(tmp_path):
+    key = tts_cache_key("Hi", "openai", "alloy", "tts-1", 1.25, audio_format="mulaw")
+    TTSAudioCache(disk_dir=str(tmp_path)).put(key, b"\x7f" * 160, "mulaw")
+    assert os.listdir(tmp_path / key[:2]) == [f"{key}.ulaw"]
+    restarted = TTSAudioCache(disk_dir=str(tmp_path))
+    assert restarted.audio_format(key) == "mulaw"
+    assert restarted.get(key) == b"\x7f" * 160
+
+
+@pytest.fixture
+def synthesized():
+    return []
+
+
+@pytest.fixture
+def phone(monkeypatch, synthesized):
+    from ops_integrations.adapters import phone as phone_mod
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=1024 * 1024))
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    monkeypatch.setattr(phone_mod.settings, "FORCE_SAY_ONLY", False)
+    monkeypatch.setattr(phone_mod.settings, "EXTERNAL_WEBHOOK_URL", "https://example.com")
+
+    def fake_chunks(text, provider, voice, model, speed):
+        synthesized.append((provider, text))
+        time.sleep(0.01)
+        yield f"{provider}:{text}".encode()
+
+    monkeypatch.setattr(phone_mod, "_tts_chunks", fake_chunks)
+    yield phone_mod
+    for sid in ("CA_ONE", "CA_TWO"):
+        phone_mod.tts_audio_store.pop(sid, None)
+        phone_mod.tts_version_counter.pop(sid, None)
+        phone_mod.vad_states.pop(sid, None)
+
+
+def test_identical_prompts_across_calls_synthesize_once(phone, synthesized):
+    async def concurrent():
+        return await asyncio.gather(phone.synthesize_tts_keyed("Thanks for calling"),
+                                    phone.synthesize_tts_keyed("Thanks for calling"))
+
+    loop = asyncio.new_event_loop()
+    try:
+        (key_a, audio_a), (key_b, audio_b) = loop.run_until_complete(concurrent())
+        assert key_a == key_b and audio_a == audio_b == b"openai:Thanks for calling"
+        assert len(synthesized) == 1
+
+        urls = []
+        for sid in ("CA_ONE", "CA_TWO", "CA_ONE"):
+            response = VoiceResponse()
+            loop.run_until_complete(phone.add_tts_or_say_to_twiml(response, sid, "Goodbye!"))
+            urls.append(str(response).split("<Play>")[1].split("</Play>")[0])
+    finally:
+        loop.close()
+    key = phone.tts_audio_store["CA_ONE"]
+    assert urls[0] == urls[1] == f"https://example.com/tts/{key}.mp3"
+    # A repeat on the same call still changes the TwiML
+    assert urls[2] == f"https://example.com/tts/{key}.mp3?v=1"
+    assert len(synthesized) == 2
+
+
+def test_elevenlabs_fallback_is_cached_under_the_openai_key(phone, synthesized, monkeypatch):
+    monkeypatch.setattr(phone.settings, "USE_ELEVENLABS_TTS", True)
+    monkeypatch.setattr(phone.settings, "ELEVENLABS_API_KEY", "el-key")
+    monkeypatch.setattr(phone.settings, "ELEVENLABS_VOICE_ID", "voice-1")
+
+    def failing_elevenlabs(text, provider, voice, model, speed):
+        synthesized.append((provider, text))
+        if provider == "elevenlabs":
+            raise ConnectionError("quota exceeded")
+        yield b"openai-audio"
+
+    monkeypatch.setattr(phone, "_tts_chunks", failing_elevenlabs)
+    loop = asyncio.new_event_loop()
+    try:
+        key, audio = loop.run_until_complete(phone.synthesize_tts_keyed("Hello"))
+    finally:
+        loop.close()
+    (_, voice, model, speed) = phone._tts_voice_params()[1]
+    assert audio == b"openai-audio"
+    assert key == tts_cache_key("Hello", "openai", voice, model, speed)
+    assert synthesized == [("elevenlabs", "Hello"), ("openai", "Hello")]
+    assert phone.tts_audio_cache.stats()["entries"] == 1
+
+
+def test_route_serves_content_keys_with_immutable_caching(phone):
+    key = tts_cache_key("Hi", "openai", "alloy", "tts-1", 1.25)
+    phone.tts_audio_cache.put(key, b"mp3-bytes")
+    phone.tts_audio_store["CA_ONE"] = key
+    with TestClient(phone.app) as client:
+        response = client.get(f"/tts/{key}.mp3")
+        assert response.content == b"mp3-bytes"
+        assert "immutable" in response.headers["cache-control"]
+        assert client.get(f"/tts/{key}.mp3", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+        # Legacy per-call URL
+        assert client.get("/tts/CA_ONE.mp3").content == b"mp3-bytes"
+        assert client.get(f"/tts/{'0' * 64}.mp3").status_code == 404
+        assert response.headers["content-type"] == "audio/mpeg"
+        assert client.get(f"/tts/{key}.ulaw").status_code == 404
+
+
+def test_route_serves_mulaw_clips_as_audio_basic(phone):
+    key = tts_cache_key("Hi", "openai", "alloy", "tts-1", 1.25, audio_format="mulaw")
+    phone.tts_audio_cache.put(key, b"\x7f" * 160, "mulaw")
+    with TestClient(phone.app) as client:
+        response = client.get(f"/tts/{key}.ulaw")
+        assert response.content == b"\x7f" * 160
+        assert response.headers["content-type"] == "audio/basic"
+        assert client.get(f"/tts/{key}.mp3").status_code == 404
+
+
+def test_tts_manager_cache_hits_refresh_recency():
+    class Recognizer:
+        async def synthesize_tts(self, text, call_sid):
+            return text.encode()
+
+    manager = TTSManager(Recognizer())
+    manager.max_cache_size = 2
+    loop = asyncio.new_event_loop()
+    try:
+        for text in ("a", "b", "a", "c"):
+            loop.run_until_complete(manager.synthesize_tts(text, "CA1"))
+    finally:
+        loop.close()
+    # "a" was read after "b", so "b" is the entry evicted for "c"
+    assert list(manager.tts_cache) == ["a_CA1", "c_CA1"]
@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from twilio.twiml.voice_response import VoiceResponse
+
+from ops_integrations.services.tts_cache import TTSAudioCache
+from ops_integrations.services.tts_prefetch import TTSPrefetcher
+from ops_integrations.services.tts_template import TemplateTTSStats
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_prefetch_is_bounded_and_cancelled_when_the_branch_is_not_taken():
+    running, peak, finished = [], [0], []
+
+    def synthesize(text, delay):
+        async def work():
+            running.append(text)
+            peak[0] = max(peak[0], len(running))
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                running.remove(text)
+            finished.append(text)
+            return True
+        return work
+
+    async def scenario():
+        prefetcher = TTSPrefetcher(max_concurrency=1)
+        prefetcher.predict("CA1", "awaiting_time_confirm", [
+            ("yes", synthesize("yes", 0.05)), ("no", synthesize("no", 0.5)), ("again", synthesize("again", 0.5)),
+        ])
+        prefetcher.predict("CA1", "awaiting_time_confirm", [])  # same step: not a transition
+        await asyncio.sleep(0.1)  # "yes" done, "no" running, "again" queued
+        assert prefetcher.claim("CA1", "yes")
+        prefetcher.predict("CA1", "awaiting_operator_confirm", [("confirmed", None)])
+        await asyncio.sleep(0.05)
+        assert not prefetcher.claim("CA1", "something unpredicted")
+        return prefetcher.stats()
+
+    stats = run(scenario())
+    assert peak[0] == 1
+    assert finished == ["yes"]  # "no" was cancelled mid-synthesis, "again" never started
+    assert (stats["cancelled_running"], stats["cancelled_queued"]) == (1, 1)
+    assert (stats["synthesized"], stats["wasted"]) == (2, 1)
+    assert (stats["hits"], stats["spoken"], stats["already_cached"]) == (1, 2, 1)
+    assert stats["hitRate"] == 0.5 and stats["wastedRatio"] == 0.5
+
+
+@pytest.fixture
+def phone(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=1024 * 1024))
+    monkeypatch.setattr(phone_mod, "tts_template_stats", TemplateTTSStats())
+    monkeypatch.setattr(phone_mod, "tts_prefetcher", TTSPrefetcher(max_concurrency=2))
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    monkeypatch.setattr(phone_mod.settings, "FORCE_SAY_ONLY", False)
+    monkeypatch.setattr(phone_mod.settings, "MEDIA_STREAM_PLAYBACK", False)
+    monkeypatch.setattr(phone_mod.settings, "TTS_PREFETCH_ENABLED", True)
+    monkeypatch.setattr(phone_mod.settings, "EXTERNAL_WEBHOOK_URL", "https://example.com")
+    synthesized = []
+
+    def fake_mp3(text, provider, voice, model, speed):
+        synthesized.append(text)
+        yield b"mp3:" + text.encode()
+
+    async def delivered(call_sid, response):
+        return True
+
+    monkeypatch.setattr(phone_mod, "_tts_chunks", fake_mp3)
+    monkeypatch.setattr(phone_mod, "_push_twiml_rest", delivered)
+    yield phone_mod, synthesized
+    for store in (phone_mod.call_dialog_state, phone_mod.pending_gate_clips, phone_mod.tts_audio_store,
+                  phone_mod.tts_version_counter, phone_mod.turn_timings):
+        store.pop("CA_PRE", None)
+
+
+def test_confirmation_prompts_are_ready_before_the_caller_answers(phone):
+    phone_mod, synthesized = phone
+    slot = (datetime.now() + timedelta(days=3)).replace(hour=14, minute=30, second=0, microsecond=0)
+
+    async def scenario():
+        # The turn that suggested a slot: its TwiML is delivered and the caller starts answering
+        phone_mod.call_dialog_state["CA_PRE"] = {"step": "awaiting_time_confirm", "suggested_time": slot,
+                                                 "customer_name": "Dana", "intent": {}}
+        await phone_mod.push_twiml_to_call("CA_PRE", VoiceResponse())
+        await asyncio.sleep(0.1)
+        prefetched = list(synthesized)
+        synthesized.clear()
+        # Caller said YES
+        twiml = VoiceResponse()
+        await phone_mod.add_tts_or_say_to_twiml(
+            twiml, "CA_PRE", "Perfect! You'll get an SMS confirmation. Thanks for choosing SafeHarbour!")
+        twiml.hangup()
+        phone_mod.call_dialog_state["CA_PRE"]["step"] = "awaiting_operator_confirm"
+        await phone_mod.push_twiml_to_call("CA_PRE", twiml)
+        await asyncio.sleep(0.1)
+        phone_mod.tts_prefetcher.forget("CA_PRE")
+        return prefetched, str(twiml)
+
+    prefetched, twiml = run(scenario())
+    assert "Perfect! You'll get an SMS confirmation. Thanks for choosing SafeHarbour!" in prefetched
+    assert "No problem. What date and time works better?" in prefetched
+    # The reply was spoken straight from the cache, and a turn that hangs up prefetches nothing
+    assert synthesized == []
+    assert "<Play>https://example.com/tts/" in twiml
+    stats = phone_mod._compute_ops_snapshot()["ttsPrefetch"]
+    assert (stats["hits"], stats["spoken"]) == (1, 1)
+    # Only "No problem..." was synthesized for nothing
+    assert (stats["synthesized"], stats["wasted"]) == (2, 1)
+
+
+def test_prefetch_is_not_delivered_before_the_turn_is(phone, monkeypatch):
+    phone_mod, synthesized = phone
+
+    async def not_delivered(call_sid, response):
+        return False
+
+    monkeypatch.setattr(phone_mod, "_push_twiml_rest", not_delivered)
+    slot = (datetime.now() + timedelta(days=3)).replace(hour=14, minute=30, second=0, microsecond=0)
+
+    async def scenario():
+        phone_mod.call_dialog_state["CA_PRE"] = {"step": "awaiting_time_confirm", "suggested_time": slot,
+                                                 "customer_name": "Dana", "intent": {}}
+        await phone_mod.push_twiml_to_call("CA_PRE", VoiceResponse())
+        await asyncio.sleep(0.05)
+
+    run(scenario())
+    assert synthesized == [] and phone_mod.tts_prefetcher.stats()["transitions"] == 0
+
+
+def test_hit_needs_the_words_actually_spoken(phone, monkeypatch):
+    phone_mod, synthesized = phone
+    starter = ["Thanks"]
+    # The real starter rotates with the clock; here it rotates between prediction and speech
+    monkeypatch.setattr(phone_mod, "get_natural_conversation_starter", lambda text, dialog, call_sid: starter[0])
+    slot = (datetime.now() + timedelta(days=3)).replace(hour=14, minute=30, second=0, microsecond=0)
+
+    async def scenario():
+        phone_mod.call_dialog_state["CA_PRE"] = {"step": "awaiting_time_confirm", "suggested_time": slot,
+                                                 "customer_name": "Dana", "intent": {}}
+        await phone_mod.push_twiml_to_call("CA_PRE", VoiceResponse())
+        await asyncio.sleep(0.1)
+        synthesized.clear()
+        starter[0] = "Got it"
+        await phone_mod.add_tts_or_say_to_twiml(VoiceResponse(), "CA_PRE", "No problem. What date and time works better?")
+        await asyncio.sleep(0.05)
+        phone_mod.tts_prefetcher.forget("CA_PRE")
+
+    run(scenario())
+    assert "Got it," in synthesized  # the prefetched "Thanks, Dana, No problem..." was not what was said
+    stats = phone_mod.tts_prefetcher.stats()
+    assert (stats["hits"], stats["spoken"]) == (0, 1) and stats["hitRate"] == 0.0
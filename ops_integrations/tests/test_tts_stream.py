@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+from starlette.requests import Request
+
+from ops_integrations.services.tts_cache import TTSAudioCache
+from ops_integrations.services.tts_stream import TTSLatencyStats, TTSStream
+
+
+class StandInTTSHandler(BaseHTTPRequestHandler):
+    """Answers OpenAI /v1/audio/speech and ElevenLabs /v1/text-to-speech/{voice}/stream with paced chunks."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.requests.append((self.path.split("?")[0], json.loads(body or b"{}")))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, delay in enumerate(self.server.chunk_delays):
+            time.sleep(delay)
+            data = f"frame{index};".encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInTTSHandler)
+    server.requests = []
+    # First audio after 50 ms, then four more frames 100 ms apart
+    server.chunk_delays = [0.05, 0.1, 0.1, 0.1, 0.1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def phone(monkeypatch, stand_in_server):
+    from ops_integrations.adapters import phone as phone_mod
+    base_url = f"http://127.0.0.1:{stand_in_server.server_address[1]}"
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=1024 * 1024))
+    monkeypatch.setattr(phone_mod, "tts_latency_stats", TTSLatencyStats())
+    monkeypatch.setattr(phone_mod, "client", OpenAI(api_key="sk-test", base_url=f"{base_url}/v1", max_retries=0))
+    monkeypatch.setattr(phone_mod, "_elevenlabs_client", None)
+    monkeypatch.setattr(phone_mod.settings, "ELEVENLABS_BASE_URL", base_url)
+    monkeypatch.setattr(phone_mod.settings, "ELEVENLABS_API_KEY", "el-test")
+    monkeypatch.setattr(phone_mod.settings, "ELEVENLABS_VOICE_ID", "voice-1")
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    return phone_mod
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_late_readers_replay_from_the_start():
+    async def scenario():
+        stream = TTSStream("k")
+        first_reader = []
+
+        async def read(into):
+            async for chunk in stream.iter_chunks():
+                into.append(chunk)
+
+        reader = asyncio.ensure_future(read(first_reader))
+        pump = asyncio.ensure_future(stream.pump(lambda: iter([b"a", b"", b"b", b"c"]), "openai"))
+        assert await stream.wait_first_chunk(timeout=1.0)
+        assert await pump
+        stream.finish()
+        late_reader = []
+        await read(late_reader)
+        await reader
+        return first_reader, late_reader, await stream.result()
+
+    first, late, audio = run(scenario())
+    assert first == late == [b"a", b"b", b"c"]
+    assert audio == b"abc"
+
+
+def test_empty_or_failing_provider_reports_false():
+    def boom():
+        raise ConnectionError("down")
+        yield b""  # pragma: no cover
+
+    async def scenario():
+        stream = TTSStream("k")
+        assert not await stream.pump(lambda: iter([]), "openai")
+        assert not await stream.pump(boom, "elevenlabs")
+        stream.finish(RuntimeError("no audio"))
+        return await stream.wait_first_chunk(timeout=0.1), await stream.result()
+
+    assert run(scenario()) == (False, None)
+
+
+@pytest.mark.parametrize("provider", ["openai", "elevenlabs"])
+def test_audio_is_playable_before_the_provider_finishes(phone, stand_in_server, monkeypatch, provider):
+    monkeypatch.setattr(phone.settings, "USE_ELEVENLABS_TTS", provider == "elevenlabs")
+    text = f"Thanks for calling, this is {provider}."
+
+    async def scenario():
+        stream = phone.open_tts_stream(text)
+        assert phone.open_tts_stream(text) is stream
+        assert await stream.wait_first_chunk(timeout=5.0)
+        done_at_first_audio = stream.done
+
+        # Twilio fetching the URL now gets a chunked response fed by the same stream
+        request = Request({"type": "http", "method": "GET", "path": f"/tts/{stream.key}.mp3", "headers": []})
+        response = await phone.serve_tts(stream.key, request)
+        received = [chunk async for chunk in response.body_iterator]
+        audio = await stream.result()
+        return stream, done_at_first_audio, response, received, audio
+
+    stream, done_at_first_audio, response, received, audio = run(scenario())
+    assert not done_at_first_audio
+    # The first frame is playable while the remaining ~400 ms of frames are still being sent
+    assert stream.finished_at - stream.first_chunk_at > 0.3
+    assert response.headers["cache-control"] == "no-store"
+    assert b"".join(received) == audio == b"".join(f"frame{i};".encode() for i in range(5))
+    assert phone.tts_audio_cache.get(stream.cache_key) == audio
+    assert stream.key not in phone.tts_streams
+
+    path, body = stand_in_server.requests[0]
+    if provider == "openai":
+        assert path == "/v1/audio/speech" and body["input"] == text
+    else:
+        assert path == "/v1/text-to-speech/voice-1/stream" and body["text"] == text
+    stats = phone.tts_latency_stats.stats()[provider]
+    assert stats["streams"] == 1 and stats["failed"] == 0
+    assert stats["firstAudioP50"] < stats["totalP50"]
+
+
+def test_fallback_provider_audio_is_served_under_the_primary_url(phone, monkeypatch):
+    monkeypatch.setattr(phone.settings, "USE_ELEVENLABS_TTS", True)
+    monkeypatch.setattr(phone.settings, "ELEVENLABS_BASE_URL", "http://127.0.0.1:9")  # nothing listens here
+
+    async def scenario():
+        stream = phone.open_tts_stream("Please hold.")
+        audio = await stream.result()
+        request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+        response = await phone.serve_tts(stream.key, request)
+        return stream, audio, response
+
+    stream, audio, response = run(scenario())
+    assert stream.provider == "openai" and stream.cache_key != stream.key
+    assert response.body == audio
+    stats = phone.tts_latency_stats.stats()
+    assert stats["elevenlabs"]["failed"] == 1 and stats["openai"]["streams"] == 1
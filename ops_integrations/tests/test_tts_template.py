@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import pytest
+from twilio.twiml.voice_response import VoiceResponse
+
+from ops_integrations.services.media_playback import audio_duration
+from ops_integrations.services.tts_cache import TTSAudioCache
+from ops_integrations.services.tts_template import TemplateTTSStats, join_audio, split_template, strip_mp3_container
+
+# One 128 kbps / 44.1 kHz MPEG-1 Layer III frame (~26 ms)
+MP3_FRAME = bytes.fromhex("FFFB9064") + b"\x00" * 413
+XING_FRAME = bytes.fromhex("FFFB9064") + b"\x00" * 32 + b"Info" + b"\x00" * 377
+ID3V2 = b"ID3\x04\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10
+ID3V1 = b"TAG" + b"\x00" * 125
+
+PROMPT = "The next available is tomorrow at 9:00 AM. Do you want this time? Please say YES or NO."
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_split_keeps_static_text_apart_from_names_and_slots():
+    text = "Alright, Al, the next available is tomorrow at 9:00 AM. Do you want this time?"
+    assert split_template(text, ["Al", "tomorrow at 9:00 AM"]) == [
+        ("Alright,", False),  # "Al" only as a whole word
+        ("Al,", True),
+        ("the next available is", False),
+        ("tomorrow at 9:00 AM.", True),
+        ("Do you want this time?", False),
+    ]
+    assert split_template("Goodbye.", ["Al"]) == [("Goodbye.", False)]
+
+
+def test_mp3_parts_join_on_frame_boundaries():
+    encoder_output = ID3V2 + XING_FRAME + MP3_FRAME * 10 + ID3V1
+    assert strip_mp3_container(encoder_output) == MP3_FRAME * 10
+    joined = join_audio([encoder_output, MP3_FRAME * 5], "mp3")
+    assert joined == MP3_FRAME * 15
+    assert audio_duration(joined, "mp3") == pytest.approx(15 * 1152 / 44100, abs=0.01)
+    assert join_audio([b"\x7f" * 160, b"\xff" * 80], "mulaw") == b"\x7f" * 160 + b"\xff" * 80
+
+
+@pytest.fixture
+def phone(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+    monkeypatch.setattr(phone_mod, "tts_audio_cache", TTSAudioCache(max_bytes=4 * 1024 * 1024))
+    monkeypatch.setattr(phone_mod, "tts_template_stats", TemplateTTSStats())
+    monkeypatch.setattr(phone_mod.settings, "USE_ELEVENLABS_TTS", False)
+    monkeypatch.setattr(phone_mod.settings, "FORCE_SAY_ONLY", False)
+    monkeypatch.setattr(phone_mod.settings, "TTS_TEMPLATE_ENABLED", True)
+    monkeypatch.setattr(phone_mod.settings, "EXTERNAL_WEBHOOK_URL", "https://example.com")
+    synthesized = []
+
+    def fake_mp3(text, provider, voice, model, speed):
+        synthesized.append(text)
+        # Every clip carries encoder tags, as provider mp3 does
+        yield ID3V2 + XING_FRAME + MP3_FRAME * len(text.split())
+
+    monkeypatch.setattr(phone_mod, "_tts_chunks", fake_mp3)
+    yield phone_mod, synthesized
+    for call_sid in ("CA_DANA", "CA_BEA"):
+        for store in (phone_mod.call_dialog_state, phone_mod.pending_gate_clips, phone_mod.pending_stream_prompts,
+                      phone_mod.tts_audio_store, phone_mod.tts_version_counter):
+            store.pop(call_sid, None)
+
+
+async def _speak(phone_mod, call_sid, name):
+    phone_mod.call_dialog_state[call_sid] = {"step": "awaiting_time_confirm", "customer_name": name}
+    twiml = VoiceResponse()
+    await phone_mod.add_tts_or_say_to_twiml(twiml, call_sid, PROMPT)
+    stream = phone_mod.pending_gate_clips[call_sid][-1][1]
+    return str(twiml), await stream.result()
+
+
+def test_second_caller_reuses_the_cached_body(phone):
+    phone_mod, synthesized = phone
+
+    async def scenario():
+        first = await _speak(phone_mod, "CA_DANA", "Dana")
+        synthesized.clear()
+        second = await _speak(phone_mod, "CA_BEA", "Bea")
+        return first, second
+
+    (dana_twiml, dana_audio), (bea_twiml, bea_audio) = run(scenario())
+    assert synthesized == ["Bea,"]  # "Alright," and the prompt body came from the cache
+    # Alright, | Bea, | The next available is | tomorrow at 9:00 AM. | Do you want ... YES or NO.
+    assert bea_audio == MP3_FRAME * (1 + 1 + 4 + 4 + 10)
+    assert "<Play>https://example.com/tts/" in bea_twiml
+    key = phone_mod.tts_cache_key("Alright, Bea, " + PROMPT, *phone_mod._tts_voice_params()[0])
+    assert key in bea_twiml and phone_mod.tts_audio_cache.get(key) == bea_audio
+    stats = phone_mod._compute_ops_snapshot()["ttsTemplates"]
+    assert stats["prompts"] == 2
+    assert (stats["static_segments"], stats["static_hits"]) == (6, 3)
+    assert (stats["variable_segments"], stats["variable_hits"]) == (4, 1)  # the slot time repeated
+
+
+class StreamSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def test_media_stream_prompt_joins_mulaw_and_falls_back_to_one_voice(phone, monkeypatch):
+    phone_mod, _ = phone
+    mulaw_requests = []
+
+    def fake_mulaw(text, provider, voice, model, speed):
+        mulaw_requests.append(text)
+        if text == "Dana,":
+            raise RuntimeError("provider hiccup")
+        yield b"\x7f" * 160 * len(text.split())
+
+    monkeypatch.setattr(phone_mod, "_tts_mulaw_chunks", fake_mulaw)
+    monkeypatch.setattr(phone_mod.settings, "MEDIA_STREAM_PLAYBACK", True)
+
+    async def scenario():
+        phone_mod.manager.active_connections["CA_BEA"] = StreamSocket()
+        await phone_mod.handle_media_packet("CA_BEA", json.dumps({"event": "start", "streamSid": "MZ_BEA"}))
+        phone_mod.call_dialog_state["CA_DANA"] = {"step": "awaiting_time_confirm", "customer_name": "Dana"}
+        phone_mod.call_dialog_state["CA_BEA"] = {"step": "awaiting_time_confirm", "customer_name": "Bea"}
+        await phone_mod.add_tts_or_say_to_twiml(VoiceResponse(), "CA_BEA", PROMPT)
+        bea = await phone_mod.pending_stream_prompts["CA_BEA"][-1].result()
+        dana = await phone_mod.open_template_tts_stream(
+            "Alright, Dana, " + PROMPT, phone_mod._template_segments("Alright, Dana, " + PROMPT, "Dana"), "mulaw"
+        ).result()
+        phone_mod.manager.active_connections.pop("CA_BEA", None)
+        phone_mod._close_media_player("CA_BEA")
+        await asyncio.sleep(0.01)
+        return bea, dana
+
+    bea, dana = run(scenario())
+    assert bea == b"\x7f" * 160 * (1 + 1 + 4 + 4 + 10)
+    # Dana's name failed on its own, so the prompt was spoken whole rather than with a gap
+    assert mulaw_requests[-1] == "Alright, Dana, " + PROMPT
+    assert dana == b"\x7f" * 160 * 20
+    assert phone_mod.tts_template_stats.counters["whole_fallbacks"] == 1
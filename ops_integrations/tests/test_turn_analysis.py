@@ -0,0 +1,188 @@
+import asyncio
+import json
+import types
+from datetime import datetime
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeCompletions:
+    def __init__(self, arguments):
+        self.arguments = arguments
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        tool_call = types.SimpleNamespace(
+            function=types.SimpleNamespace(name="analyze_turn", arguments=json.dumps(self.arguments))
+        )
+        message = types.SimpleNamespace(tool_calls=[tool_call], content=None)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def with_fake_client(monkeypatch, arguments):
+    from ops_integrations.adapters import phone as phone_mod
+    completions = FakeCompletions(arguments)
+    fake_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    monkeypatch.setattr(phone_mod, "client", fake_client, raising=True)
+    phone_mod.llm_result_cache.clear()
+    return phone_mod, completions
+
+
+def test_schema_only_contains_requested_fields():
+    from ops_integrations.services.plumbing_services import get_turn_analysis_function_definition
+    tool = get_turn_analysis_function_definition(("customer_name", "datetime"), intent_tags=["EMERGENCY_FIX"])
+    params = tool["function"]["parameters"]
+    assert set(params["properties"]) == {"customer_name", "datetime"}
+    assert params["required"] == ["customer_name", "datetime"]
+
+
+def test_single_call_returns_all_turn_fields(monkeypatch):
+    phone_mod, completions = with_fake_client(monkeypatch, {
+        "intent_tag": "clog_blockage",
+        "job_type": "clogged_kitchen_sink",
+        "urgency": "flex",
+        "customer_name": "null",
+        "raw_address": "12 Oak Street",
+        "datetime": "2030-01-04 15:00",
+    })
+    analysis = run(phone_mod.analyze_turn("kitchen sink clogged, 12 Oak Street, friday at 3",
+                                     now=datetime(2030, 1, 1, 9, 0)))
+    assert len(completions.calls) == 1
+    assert completions.calls[0]["tool_choice"]["function"]["name"] == "analyze_turn"
+    assert analysis["intent_tag"] == "CLOG_BLOCKAGE"
+    assert analysis["customer_name"] is None
+    assert analysis["datetime"] == datetime(2030, 1, 4, 15, 0)
+
+
+def test_extract_intent_reuses_existing_analysis(monkeypatch):
+    phone_mod, completions = with_fake_client(monkeypatch, {})
+    analysis = {
+        "intent_tag": "CLOG_BLOCKAGE",
+        "job_type": "clogged_kitchen_sink",
+        "urgency": "same_day",
+        "customer_name": None,
+        "raw_address": None,
+        "datetime": None,
+    }
+    intent = run(phone_mod.extract_intent_from_text(None, "my kitchen sink is clogged",
+                                                 analysis=analysis, intent_confidence=0.9))
+    assert completions.calls == []
+    assert intent["job"]["type"] == "clogged_kitchen_sink"
+    assert intent["confidence"]["intent"] == 0.9
+
+
+def test_analysis_failure_yields_empty_fields(monkeypatch):
+    from ops_integrations.adapters import phone as phone_mod
+
+    def boom(**kwargs):
+        raise RuntimeError("network down")
+
+    fake_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=boom)))
+    monkeypatch.setattr(phone_mod, "client", fake_client, raising=True)
+    analysis = run(phone_mod.analyze_turn("hello", ("customer_name",)))
+    assert analysis == {"customer_name": None}
+
+
+def test_repeated_utterance_served_from_cache(monkeypatch):
+    phone_mod, completions = with_fake_client(monkeypatch, {"urgency": "flex"})
+    first = run(phone_mod.analyze_turn("no thanks", ("urgency",), dialog_step="awaiting_time_confirm"))
+    second = run(phone_mod.analyze_turn("No thanks.", ("urgency",), dialog_step="awaiting_time_confirm"))
+    assert first == second == {"urgency": "flex"}
+    assert len(completions.calls) == 1
+
+
+class FakeOpsSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+
+def test_broadcast_reuses_dialog_classification(monkeypatch):
+    phone_mod, completions = with_fake_client(monkeypatch, {"intent_tag": "CLOG_BLOCKAGE"})
+    ops_ws = FakeOpsSocket()
+    monkeypatch.setattr(phone_mod, "ops_ws_clients", {ops_ws}, raising=True)
+    text = "my kitchen sink is clogged again"
+
+    async def scenario():
+        broadcast = asyncio.ensure_future(phone_mod._broadcast_transcript("CA_FLIGHT", text))
+        classification = phone_mod.llm_flights.submit(
+            phone_mod._flight_key("CA_FLIGHT", text, "classify"),
+            lambda: phone_mod._classify_from_turn_analysis("CA_FLIGHT", text),
+        )
+        analysis = await phone_mod._analyze_turn_shared("CA_FLIGHT", text)
+        dialog_result = await classification
+        await broadcast
+        return analysis, dialog_result
+
+    analysis, dialog_result = run(scenario())
+    phone_mod.llm_flights.forget("CA_FLIGHT")
+    # Only the turn analysis reached the model; the broadcast joined the dialog's classification
+    assert len(completions.calls) == 1
+    assert analysis["intent_tag"] == "CLOG_BLOCKAGE"
+    assert ops_ws.sent[0]["data"]["intent"] == dialog_result[0] == "CLOG_BLOCKAGE"
+
+
+def test_same_utterance_in_another_step_is_analyzed_again(monkeypatch):
+    phone_mod, completions = with_fake_client(monkeypatch, {"intent_tag": "SCHEDULING"})
+
+    async def scenario():
+        await phone_mod._analyze_turn_shared("CA_STEP", "tomorrow", "awaiting_time")
+        await phone_mod._analyze_turn_shared("CA_STEP", "tomorrow", "awaiting_time")
+        await phone_mod._analyze_turn_shared("CA_STEP", "tomorrow", "awaiting_time_confirm")
+
+    run(scenario())
+    phone_mod.llm_flights.forget("CA_STEP")
+    # The retained flight result is per step, like the result cache
+    assert len(completions.calls) == 2
+    assert (phone_mod._flight_key("CA_STEP", "tomorrow", "classify", "awaiting_time")
+            != phone_mod._flight_key("CA_STEP", "tomorrow", "classify", "awaiting_time_confirm"))
+
+
+def test_followup_turns_make_one_llm_call_each(monkeypatch):
+    phone_mod, completions = with_fake_client(monkeypatch, {"datetime": None})
+    ops_ws = FakeOpsSocket()
+    monkeypatch.setattr(phone_mod, "ops_ws_clients", {ops_ws}, raising=True)
+    monkeypatch.setattr(phone_mod.settings, "LOCAL_INTENT_MODEL_ENABLED", False, raising=False)
+    pushed = []
+
+    async def fake_handle_intent(call_sid, intent, followup_text=None):
+        # The follow-up step's own model call
+        await phone_mod.analyze_turn(followup_text, ("datetime",), dialog_step="awaiting_time")
+        return "twiml"
+
+    async def fake_respond_with_filler(call_sid, work):
+        return await work
+
+    async def fake_push(call_sid, twiml):
+        pushed.append(twiml)
+
+    monkeypatch.setattr(phone_mod, "handle_intent", fake_handle_intent, raising=True)
+    monkeypatch.setattr(phone_mod, "_respond_with_filler", fake_respond_with_filler, raising=True)
+    monkeypatch.setattr(phone_mod, "push_twiml_to_call", fake_push, raising=True)
+    phone_mod.call_dialog_state["CA_FOLLOWUP"] = {"intent": {}, "step": "awaiting_time"}
+    turns = ["tomorrow afternoon works", "maybe around three", "my sink is still clogged"]
+
+    async def scenario():
+        for text in turns:
+            broadcast = asyncio.ensure_future(phone_mod._broadcast_transcript("CA_FOLLOWUP", text))
+            await phone_mod.response_to_user_speech("CA_FOLLOWUP", text)
+            await broadcast
+
+    try:
+        run(scenario())
+    finally:
+        phone_mod.call_dialog_state.pop("CA_FOLLOWUP", None)
+        phone_mod.llm_flights.forget("CA_FOLLOWUP")
+    # The dashboard labels follow-up turns without a classification request of its own
+    assert len(completions.calls) == len(turns)
+    assert len(pushed) == len(turns)
+    assert [payload["data"]["text"] for payload in ops_ws.sent] == turns
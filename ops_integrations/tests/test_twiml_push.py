@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+from twilio.twiml.voice_response import VoiceResponse
+
+from ops_integrations.services.twiml_push import TwilioCallUpdater, TwiMLPushCoalescer
+
+
+class FakeTwilioHandler(BaseHTTPRequestHandler):
+    """Answers Calls updates like api.twilio.com and records when each arrived and on which connection."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        form = {k: v[0] for k, v in parse_qs(body).items()}
+        self.server.updates.append({"at": time.monotonic(), "path": self.path, "form": form,
+                                    "client": self.client_address, "auth": self.headers.get("Authorization")})
+        time.sleep(self.server.latency)
+        if "Twiml" in form and self.server.reject_twiml:
+            status, payload = 400, b'{"code": 21220, "message": "Invalid TwiML"}'
+        else:
+            status, payload = 200, b'{"sid": "CA_PUSH", "status": "in-progress"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_twilio():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTwilioHandler)
+    server.updates = []
+    server.latency = 0.02
+    server.reject_twiml = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_coalescer_keeps_only_the_latest_pending_twiml():
+    sent = []
+
+    async def send(call_sid, twiml):
+        sent.append((time.monotonic(), twiml))
+
+    async def scenario():
+        pusher = TwiMLPushCoalescer(send, min_interval=0.2)
+        first = pusher.submit("CA1", "<Response>1</Response>")
+        await asyncio.sleep(0.01)
+        second = pusher.submit("CA1", "<Response>2</Response>")
+        third = pusher.submit("CA1", "<Response>3</Response>")
+        other_call = pusher.submit("CA2", "<Response>x</Response>")
+        results = await asyncio.gather(first, second, third, other_call)
+        same_again = await pusher.submit("CA1", "<Response>3</Response>")
+        return results, same_again, pusher.stats()
+
+    results, same_again, stats = run(scenario())
+    assert results == [True, False, True, True]
+    assert [twiml for _, twiml in sent] == ["<Response>1</Response>", "<Response>x</Response>", "<Response>3</Response>"]
+    assert sent[2][0] - sent[0][0] >= 0.19  # waited out the interval, then sent the newest
+    assert same_again is False  # already on the call: nothing was pushed, so nothing new plays
+    assert (stats["pushed"], stats["superseded"], stats["duplicates"]) == (3, 1, 1)
+
+
+@pytest.fixture
+def phone(monkeypatch, fake_twilio):
+    from ops_integrations.adapters import phone as phone_mod
+    updater = TwilioCallUpdater("AC_TEST", "token", base_url=f"http://127.0.0.1:{fake_twilio.server_address[1]}")
+    pusher = TwiMLPushCoalescer(lambda sid, xml: phone_mod._send_twiml_update(sid, xml), min_interval=0.3)
+    monkeypatch.setattr(phone_mod, "twilio_call_updater", updater)
+    monkeypatch.setattr(phone_mod, "twiml_pusher", pusher)
+    monkeypatch.setattr(phone_mod.settings, "MEDIA_STREAM_PLAYBACK", False)
+    monkeypatch.setattr(phone_mod.settings, "EXTERNAL_WEBHOOK_URL", "https://example.com")
+    yield phone_mod
+    phone_mod.last_twiml_store.pop("CA_PUSH", None)
+
+
+def _say(text):
+    response = VoiceResponse()
+    response.say(text)
+    return response
+
+
+def test_rapid_pushes_reach_twilio_latest_first_over_one_connection(phone, fake_twilio):
+    async def scenario():
+        first = asyncio.ensure_future(phone.push_twiml_to_call("CA_PUSH", _say("first")))
+        await asyncio.sleep(0.05)
+        stale = asyncio.ensure_future(phone.push_twiml_to_call("CA_PUSH", _say("stale")))
+        await asyncio.sleep(0.05)
+        latest = asyncio.ensure_future(phone.push_twiml_to_call("CA_PUSH", _say("latest")))
+        await asyncio.gather(first, stale, latest)
+        await phone.twilio_call_updater.aclose()
+
+    run(scenario())
+    updates = fake_twilio.updates
+    assert [u["path"] for u in updates] == ["/2010-04-01/Accounts/AC_TEST/Calls/CA_PUSH.json"] * 2
+    assert "first" in updates[0]["form"]["Twiml"] and "latest" in updates[1]["form"]["Twiml"]
+    # Submitted 0.1 s after the first: held for the 0.3 s window, not dropped as the old throttle did
+    assert 0.2 <= updates[1]["at"] - updates[0]["at"] < 0.45
+    assert updates[0]["client"] == updates[1]["client"]  # keep-alive: same TCP connection
+    assert updates[0]["auth"].startswith("Basic ")
+    assert phone.last_twiml_store["CA_PUSH"].count("latest") == 1
+    stats = phone._compute_ops_snapshot()["twimlPush"]
+    assert stats["pushed"] == 2 and stats["superseded"] == 1
+
+
+def test_rejected_twiml_falls_back_to_the_twiml_url(phone, fake_twilio):
+    fake_twilio.reject_twiml = True
+
+    async def scenario():
+        pushed = await phone.push_twiml_to_call("CA_PUSH", _say("hello"))
+        await phone.twilio_call_updater.aclose()
+        return pushed
+
+    run(scenario())
+    forms = [u["form"] for u in fake_twilio.updates]
+    assert "Twiml" in forms[0]
+    assert forms[1] == {"Url": "https://example.com/twiml/CA_PUSH", "Method": "GET"}
+    assert phone.twiml_pusher.stats()["pushed"] == 1
@@ -24,6 +24,7 @@ setup(
         "fastapi>=0.100",
         "uvicorn>=0.20",
         "websockets>=11.0",
+        "numpy>=1.21.0",
     ],
     python_requires=">=3.8",
 ) 
\ No newline at end of file